@@ -23,6 +23,7 @@ from apps.budgeting.models import (
     Reappropriation, ReappropriationStatus,
 )
 from apps.budgeting.models_employee import BudgetEmployee
+from apps.budgeting.services_calendar import FiscalCalendarService
 
 
 class BudgetEmployeeInline(admin.TabularInline):
@@ -87,24 +88,28 @@ class FiscalYearAdmin(admin.ModelAdmin):
     def open_planning_window(self, request, queryset):
         """Open planning window for selected fiscal years."""
         count = queryset.update(is_planning_active=True)
+        FiscalCalendarService.invalidate_calendar()
         self.message_user(request, f'{count} fiscal year(s) planning window opened.')
     
     @admin.action(description=_('Close planning window'))
     def close_planning_window(self, request, queryset):
         """Close planning window for selected fiscal years."""
         count = queryset.update(is_planning_active=False)
+        FiscalCalendarService.invalidate_calendar()
         self.message_user(request, f'{count} fiscal year(s) planning window closed.')
     
     @admin.action(description=_('Open revision window (March)'))
     def open_revision_window(self, request, queryset):
         """Open revision window for selected fiscal years."""
         count = queryset.update(is_revision_active=True)
+        FiscalCalendarService.invalidate_calendar()
         self.message_user(request, f'{count} fiscal year(s) revision window opened.')
     
     @admin.action(description=_('Close revision window'))
     def close_revision_window(self, request, queryset):
         """Close revision window for selected fiscal years."""
         count = queryset.update(is_revision_active=False)
+        FiscalCalendarService.invalidate_calendar()
         self.message_user(request, f'{count} fiscal year(s) revision window closed.')
     
     def save_model(self, request, obj, form, change):
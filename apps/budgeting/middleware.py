@@ -85,10 +85,11 @@ class BudgetLockMiddleware:
             FiscalYearInactiveException: If no planning-active fiscal year.
             BudgetLockedException: If budget proposal is locked.
         """
-        from apps.budgeting.models import FiscalYear, BudgetProposal
+        from apps.budgeting.models import FiscalYear
+        from apps.budgeting.services_calendar import FiscalCalendarService
         
         # User must have an organization
-        if not request.user.is_authenticated or not request.user.organization:
+        if not request.user.is_authenticated or not request.user.organization_id:
             raise FiscalYearInactiveException(
                 "You must be logged in with an organization to edit budgets."
             )
@@ -99,28 +100,29 @@ class BudgetLockMiddleware:
             request.GET.get('fiscal_year')
         )
         
+        # The fiscal year and proposal are read from the database, not the
+        # per-process fiscal calendar, so window and lock changes made in
+        # another worker apply immediately
         if fiscal_year_id:
             try:
-                fiscal_year = FiscalYear.objects.get(pk=fiscal_year_id)
-            except FiscalYear.DoesNotExist:
+                fiscal_year = FiscalYear.objects.filter(pk=int(fiscal_year_id)).first()
+            except (TypeError, ValueError):
+                fiscal_year = None
+            if not fiscal_year:
                 raise FiscalYearInactiveException(
                     "The specified fiscal year does not exist."
                 )
         else:
             # Default to planning-active fiscal year
-            fiscal_year = FiscalYear.objects.filter(is_planning_active=True).first()
+            fiscal_year = FiscalYear.objects.filter(is_planning_active=True).order_by('-start_date').first()
             if not fiscal_year:
                 raise FiscalYearInactiveException(
                     "No active planning window found. Please contact the administrator."
                 )
         
-        # Get or create BudgetProposal for this TMA
-        try:
-            proposal = BudgetProposal.objects.get(
-                organization=request.user.organization,
-                fiscal_year=fiscal_year
-            )
-        except BudgetProposal.DoesNotExist:
+        # BudgetProposal for this TMA
+        proposal = FiscalCalendarService.get_proposal(request.user.organization_id, fiscal_year)
+        if proposal is None:
             # If no proposal exists, check if planning window is open
             if not fiscal_year.is_planning_active:
                 raise FiscalYearInactiveException(
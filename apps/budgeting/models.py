@@ -181,15 +181,14 @@ class FiscalYear(AuditLogMixin):
         This is used for expenditure/receipt transactions, where we need
         the fiscal year that contains today's date.
         
+        Resolved from the cached fiscal calendar, so repeated calls
+        within and across requests do not query the database.
+        
         Returns:
             FiscalYear or None: The fiscal year containing today's date.
         """
-        from django.utils import timezone
-        today = timezone.now().date()
-        return cls.objects.filter(
-            start_date__lte=today,
-            end_date__gte=today
-        ).first()
+        from apps.budgeting.services_calendar import FiscalCalendarService
+        return FiscalCalendarService.get_operating_year()
     
     def can_edit_budget(self) -> bool:
         """
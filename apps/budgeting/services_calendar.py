@@ -0,0 +1,122 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Cached fiscal calendar. Holds the global fiscal years, from
+             which the current operating and planning-active years are
+             resolved for display; FiscalYear changes invalidate it. The
+             cache is per process, so invalidation only reaches the worker
+             that made the change: budget edit checks (lock and planning
+             window) read the database instead.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+class FiscalCalendarService:
+    """Resolve fiscal years without per-request queries."""
+
+    CALENDAR_KEY = 'fiscal_calendar'
+
+    # -----------------------------------------------------------------
+    # Fiscal years
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def get_fiscal_years() -> List:
+        """
+        Return all fiscal years, newest first.
+
+        The list is small (one row per year) and cached as a whole; the
+        lookups below are resolved from it in memory.
+        """
+        from apps.budgeting.models import FiscalYear
+
+        fiscal_years = cache.get(FiscalCalendarService.CALENDAR_KEY)
+        if fiscal_years is None:
+            fiscal_years = list(FiscalYear.objects.order_by('-start_date'))
+            cache.set(FiscalCalendarService.CALENDAR_KEY, fiscal_years, settings.FISCAL_CALENDAR_TIMEOUT)
+        return fiscal_years
+
+    @staticmethod
+    def get_fiscal_year(fiscal_year_id) -> Optional:
+        """Return the fiscal year with the given primary key, or None."""
+        try:
+            fiscal_year_id = int(fiscal_year_id)
+        except (TypeError, ValueError):
+            return None
+        return next(
+            (fy for fy in FiscalCalendarService.get_fiscal_years() if fy.pk == fiscal_year_id),
+            None
+        )
+
+    @staticmethod
+    def get_operating_year(as_of: Optional[date] = None) -> Optional:
+        """Return the fiscal year containing as_of (default: today)."""
+        as_of = as_of or timezone.now().date()
+        return next(
+            (fy for fy in FiscalCalendarService.get_fiscal_years()
+             if fy.start_date <= as_of <= fy.end_date),
+            None
+        )
+
+    @staticmethod
+    def get_planning_year() -> Optional:
+        """Return the latest fiscal year with an open planning window."""
+        return next(
+            (fy for fy in FiscalCalendarService.get_fiscal_years() if fy.is_planning_active),
+            None
+        )
+
+    # -----------------------------------------------------------------
+    # Budget proposals
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def get_proposal(organization_id: int, fiscal_year) -> Optional:
+        """
+        Return the budget proposal of an organization for a fiscal year.
+
+        Read from the database in one query on the (organization,
+        fiscal_year) index, so lock and edit checks see the committed
+        proposal status, not a cached copy. The proposal's fiscal_year is
+        set to the given instance.
+
+        Returns:
+            BudgetProposal or None if the organization has no proposal.
+        """
+        from apps.budgeting.models import BudgetProposal
+
+        proposal = BudgetProposal.objects.filter(
+            organization_id=organization_id, fiscal_year_id=fiscal_year.pk
+        ).first()
+        if proposal is not None:
+            proposal.fiscal_year = fiscal_year
+        return proposal
+
+    # -----------------------------------------------------------------
+    # Invalidation
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _delete(*keys: str) -> None:
+        """
+        Drop keys now and again on commit.
+
+        The second delete discards values other requests cached from the
+        pre-commit state while the transaction was open.
+        """
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def invalidate_calendar() -> None:
+        FiscalCalendarService._delete(FiscalCalendarService.CALENDAR_KEY)
@@ -8,12 +8,13 @@ Description: Django signals for the budgeting module.
              Handles automatic actions on model save/delete.
 -------------------------------------------------------------------------
 """
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from apps.budgeting.models import (
     FiscalYear, BudgetAllocation, ScheduleOfEstablishment, BudgetStatus
 )
+from apps.budgeting.services_calendar import FiscalCalendarService
 
 
 # Signal removed: FiscalYear.is_active field no longer exists
@@ -21,6 +22,13 @@ from apps.budgeting.models import (
 # and is_planning_active / is_revision_active flags.
 
 
+@receiver(post_save, sender=FiscalYear)
+@receiver(post_delete, sender=FiscalYear)
+def fiscal_year_changed(sender, instance: FiscalYear, **kwargs) -> None:
+    """Drop the cached fiscal calendar when a fiscal year changes."""
+    FiscalCalendarService.invalidate_calendar()
+
+
 # DISABLED: FiscalYear doesn't have is_locked or status fields
 # This signal was incorrectly referencing fields that don't exist on the model
 # @receiver(post_save, sender=FiscalYear)
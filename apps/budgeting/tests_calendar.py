@@ -0,0 +1,103 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the cached fiscal calendar and budget lock checks.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from apps.budgeting.middleware import BudgetLockMiddleware
+from apps.budgeting.models import BudgetProposal, BudgetProposalStatus, FiscalYear
+from apps.budgeting.services_calendar import FiscalCalendarService
+from apps.core.exceptions import BudgetLockedException, FiscalYearInactiveException
+from apps.core.models import Organization
+
+
+class FiscalCalendarTests(TestCase):
+    """Fiscal year lookups are cached; budget lock checks read the database."""
+
+    def setUp(self):
+        cache.clear()
+        today = timezone.now().date()
+        start_year = today.year if today.month >= 7 else today.year - 1
+        self.current = FiscalYear.objects.create(
+            year_name=f'{start_year}-{str(start_year + 1)[2:]}',
+            start_date=date(start_year, 7, 1), end_date=date(start_year + 1, 6, 30),
+        )
+        self.next = FiscalYear.objects.create(
+            year_name=f'{start_year + 1}-{str(start_year + 2)[2:]}',
+            start_date=date(start_year + 1, 7, 1), end_date=date(start_year + 2, 6, 30),
+            is_planning_active=True,
+        )
+        self.org = Organization.objects.create(name='Calendar TMA', org_type='TMA')
+        self.user = get_user_model().objects.create_user(
+            cnic='55555-5555555-5', email='calendar@example.com', password='pass',
+            organization=self.org,
+        )
+
+    def _check(self, data=None):
+        request = RequestFactory().post('/budgeting/allocation/', data or {})
+        request.user = self.user
+        BudgetLockMiddleware(lambda request: None)._check_budget_status(request)
+
+    def test_current_and_planning_years_are_cached(self):
+        self.assertEqual(FiscalYear.get_current_operating_year(), self.current)
+        with self.assertNumQueries(0):
+            self.assertEqual(FiscalYear.get_current_operating_year(), self.current)
+            self.assertEqual(FiscalCalendarService.get_planning_year(), self.next)
+            self.assertEqual(FiscalCalendarService.get_fiscal_year(str(self.next.pk)), self.next)
+            self.assertIsNone(FiscalCalendarService.get_fiscal_year('missing'))
+
+    def test_fiscal_year_save_invalidates_calendar(self):
+        self.assertEqual(FiscalCalendarService.get_planning_year(), self.next)
+
+        self.next.is_planning_active = False
+        self.next.save()
+        self.assertIsNone(FiscalCalendarService.get_planning_year())
+
+    def test_budget_lock_check_reads_proposal_from_database(self):
+        proposal = BudgetProposal.objects.create(
+            organization=self.org, fiscal_year=self.next, status=BudgetProposalStatus.DRAFT
+        )
+        with self.assertNumQueries(2):
+            self._check()
+
+        # Changes made by another worker reach this one without invalidation
+        BudgetProposal.objects.filter(pk=proposal.pk).update(is_locked=True)
+        with self.assertRaises(BudgetLockedException):
+            self._check()
+
+        BudgetProposal.objects.filter(pk=proposal.pk).update(is_locked=False)
+        FiscalYear.objects.filter(pk=self.next.pk).update(is_planning_active=False)
+        with self.assertRaises(FiscalYearInactiveException):
+            self._check()
+
+    def test_planning_window_is_rechecked_without_proposal(self):
+        self._check()
+        FiscalYear.objects.filter(pk=self.next.pk).update(is_planning_active=False)
+        with self.assertRaises(FiscalYearInactiveException):
+            self._check()
+
+    def test_window_and_year_changes_in_other_workers_apply(self):
+        # Calendar cached with the planning window closed
+        FiscalYear.objects.filter(pk=self.next.pk).update(is_planning_active=False)
+        cache.clear()
+        self.assertIsNone(FiscalCalendarService.get_planning_year())
+
+        FiscalYear.objects.filter(pk=self.next.pk).update(is_planning_active=True)
+        self._check()
+
+        added = FiscalYear.objects.bulk_create([FiscalYear(
+            year_name='2099-00', start_date=date(2099, 7, 1), end_date=date(2100, 6, 30),
+            is_planning_active=True,
+        )])[0]
+        self.assertIsNone(FiscalCalendarService.get_fiscal_year(added.pk))
+        self._check({'fiscal_year': added.pk})
@@ -1517,6 +1517,7 @@ from django.views import View
 from django.template.response import TemplateResponse
 from django.utils import timezone
 from apps.budgeting.services_report import BudgetBookService
+from apps.core.metrics import track_pdf_render
 
 
 class PrintBudgetBookView(LoginRequiredMixin, View):
@@ -1563,7 +1564,8 @@ class PrintBudgetBookView(LoginRequiredMixin, View):
                 try:
                     from weasyprint import HTML
                     # Generate PDF (base_url helps resolve relative assets)
-                    pdf_file = HTML(string=html_string, base_url=request.build_absolute_uri('/')).write_pdf()
+                    with track_pdf_render('budget_book'):
+                        pdf_file = HTML(string=html_string, base_url=request.build_absolute_uri('/')).write_pdf()
                     response = HttpResponse(pdf_file, content_type='application/pdf')
                     filename = f"Budget_Book_{context['fiscal_year'].year_name.replace(' ', '_')}.pdf"
                     response['Content-Disposition'] = f'attachment; filename="{filename}"'
@@ -1582,7 +1584,8 @@ class PrintBudgetBookView(LoginRequiredMixin, View):
                     from xhtml2pdf import pisa
                     from io import BytesIO
                     result = BytesIO()
-                    pdf = pisa.pisaDocument(BytesIO(html_string.encode('utf-8')), result)
+                    with track_pdf_render('budget_book'):
+                        pdf = pisa.pisaDocument(BytesIO(html_string.encode('utf-8')), result)
                     if not pdf.err:
                         response = HttpResponse(result.getvalue(), content_type='application/pdf')
                         filename = f"Budget_Book_{context['fiscal_year'].year_name.replace(' ', '_')}.pdf"
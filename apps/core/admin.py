@@ -11,7 +11,9 @@ Description: Django admin configuration for core models including
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.models import Division, District, Tehsil, Organization, BankAccount, Notification
+from apps.core.models import (
+    Division, District, Tehsil, Organization, BankAccount, Notification, EmailOutbox, EmailStatus
+)
 
 
 @admin.register(Division)
@@ -175,3 +177,30 @@ class NotificationAdmin(admin.ModelAdmin):
         """Prevent manual notification creation in admin (use services instead)."""
         return False
 
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin configuration for the email outbox (delivery monitoring)."""
+    
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'to', 'subject', 'body', 'from_email', 'status', 'attempts',
+        'next_attempt_at', 'last_error', 'sent_at', 'created_at', 'updated_at'
+    ]
+    actions = ['retry_now']
+    
+    def has_add_permission(self, request):
+        """Emails are queued by services (EmailOutboxService.enqueue)."""
+        return False
+    
+    @admin.action(description=_('Retry selected emails now'))
+    def retry_now(self, request, queryset):
+        """Reset selected emails to pending so the next dispatch sends them."""
+        from django.utils import timezone
+        count = queryset.exclude(status=EmailStatus.SENT).update(
+            status=EmailStatus.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f'{count} email(s) queued for retry.')
@@ -0,0 +1,100 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Buffered audit-trail writer. Audit rows added inside a
+             transaction are held until it commits and then inserted
+             with one bulk_create per model; rows of a rolled-back
+             transaction or savepoint are never written.
+-------------------------------------------------------------------------
+"""
+import threading
+import weakref
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from django.db import models, router, transaction
+
+
+_local = threading.local()
+
+
+class _Scope:
+    """
+    Marks entries added inside one savepoint.
+
+    The scope's only strong reference is its on_commit callback. Django
+    discards the callbacks of a rolled-back savepoint, so a dead weak
+    reference means the savepoint's entries must not be written.
+    """
+
+    def keep(self) -> None:
+        pass
+
+
+class _Buffer:
+    """Audit entries of one transaction, written when it commits."""
+
+    def __init__(self, using: str) -> None:
+        self.using = using
+        self.closed = False
+        self.entries: List[Tuple[weakref.ref, models.Model]] = []
+        self.scopes = weakref.WeakValueDictionary()
+
+    def add(self, entry: models.Model) -> None:
+        savepoints = tuple(transaction.get_connection(self.using).savepoint_ids)
+        scope = self.scopes.get(savepoints)
+        if scope is None:
+            scope = _Scope()
+            self.scopes[savepoints] = scope
+            transaction.on_commit(scope.keep, using=self.using)
+        self.entries.append((weakref.ref(scope), entry))
+
+    def flush(self) -> None:
+        self.closed = True
+        by_model = defaultdict(list)
+        for scope, entry in self.entries:
+            if scope() is not None:
+                by_model[type(entry)].append(entry)
+        self.entries = []
+        for model, entries in by_model.items():
+            model.objects.using(self.using).bulk_create(entries)
+
+
+class AuditWriter:
+    """Queue audit-trail rows for a single insert per model on commit."""
+
+    @staticmethod
+    def _buffers() -> weakref.WeakValueDictionary:
+        buffers = getattr(_local, 'buffers', None)
+        if buffers is None:
+            buffers = _local.buffers = weakref.WeakValueDictionary()
+        return buffers
+
+    @staticmethod
+    def add(entry: models.Model, using: Optional[str] = None) -> None:
+        """
+        Write an unsaved audit row once the current transaction commits.
+
+        Outside a transaction the row is saved immediately.
+
+        Args:
+            entry: Unsaved audit model instance
+            using: Database alias (default: the model's write database)
+        """
+        using = using or router.db_for_write(type(entry))
+        if not transaction.get_connection(using).in_atomic_block:
+            entry.save(using=using)
+            return
+
+        # A buffer whose transaction rolled back has lost its flush
+        # callback and been collected; a flushed one is closed
+        buffers = AuditWriter._buffers()
+        buffer = buffers.get(using)
+        if buffer is None or buffer.closed:
+            buffer = _Buffer(using)
+            buffers[using] = buffer
+            transaction.on_commit(buffer.flush, using=using)
+        buffer.add(entry)
@@ -1,40 +1,40 @@
-from apps.core.services import NotificationService
+from apps.core.counters import CounterService
+
+def _badge_counts(request):
+    """Badge counters of the request user, read from the cache once per request."""
+    if not hasattr(request, '_badge_counts'):
+        request._badge_counts = CounterService.get_counts(request.user)
+    return request._badge_counts
 
 def notifications(request):
     """
     Context processor to add unread notification count for the authenticated user.
+    
+    Reads the cached counter maintained by notification events.
     """
     if request.user.is_authenticated:
         return {
-            'unread_count': NotificationService.get_unread_count(request.user)
+            'unread_count': _badge_counts(request)['unread_count']
         }
     return {'unread_count': 0}
 
 def sidebar_counts(request):
     """
     Context processor to add sidebar counts for pending items.
+    
+    Reads the cached per-organization counters maintained by bill and
+    demand status transitions.
     """
     if not request.user.is_authenticated:
         return {}
     
     # Check if user has an organization attribute (e.g. from a profile or direct on user if using custom user model)
     # The requirement mentions request.user.organization, ensuring we handle cases where it might be missing
-    org = getattr(request.user, 'organization', None)
-    if not org:
+    if not getattr(request.user, 'organization_id', None):
         return {}
     
-    from apps.expenditure.models import Bill, BillStatus
-    from apps.revenue.models import RevenueDemand, DemandStatus
-    from django.utils import timezone
-    
+    counts = _badge_counts(request)
     return {
-        'pending_bills_count': Bill.objects.filter(
-            organization=org,
-            status=BillStatus.SUBMITTED
-        ).count(),
-        'overdue_demands_count': RevenueDemand.objects.filter(
-            organization=org,
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
-            due_date__lt=timezone.now().date()
-        ).count(),
+        'pending_bills_count': counts['pending_bills_count'],
+        'overdue_demands_count': counts['overdue_demands_count'],
     }
@@ -0,0 +1,191 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Cached badge counters (unread notifications per user,
+             submitted bills and overdue demands per organization).
+             Notification, bill and demand transitions adjust them in
+             place; misses are recomputed and a nightly job corrects drift.
+-------------------------------------------------------------------------
+"""
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+class CounterService:
+    """Read and maintain the sidebar and notification badge counters."""
+
+    # -----------------------------------------------------------------
+    # Keys. The overdue counter is dated: a demand becomes overdue by the
+    # passing of its due date, so each day starts from a fresh count.
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def unread_key(user_id: int) -> str:
+        return f"counter_unread_{user_id}"
+
+    @staticmethod
+    def pending_bills_key(organization_id: int) -> str:
+        return f"counter_pending_bills_{organization_id}"
+
+    @staticmethod
+    def overdue_demands_key(organization_id: int, day=None) -> str:
+        day = day or timezone.now().date()
+        return f"counter_overdue_demands_{organization_id}_{day.isoformat()}"
+
+    # -----------------------------------------------------------------
+    # Reads
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def get_counts(user) -> Dict[str, int]:
+        """
+        Return the badge counters of a user with a single cache read.
+
+        Missing counters are computed from the database and cached.
+
+        Returns:
+            Dict with 'unread_count' and, for users with an organization,
+            'pending_bills_count' and 'overdue_demands_count'.
+        """
+        keys = {'unread_count': CounterService.unread_key(user.pk)}
+        organization_id = getattr(user, 'organization_id', None)
+        if organization_id:
+            keys['pending_bills_count'] = CounterService.pending_bills_key(organization_id)
+            keys['overdue_demands_count'] = CounterService.overdue_demands_key(organization_id)
+
+        cached = cache.get_many(keys.values())
+        counts = {}
+        missing = {}
+        for name, key in keys.items():
+            if key in cached:
+                counts[name] = max(cached[key], 0)
+            else:
+                counts[name] = CounterService._compute(name, user.pk, organization_id)
+                missing[key] = counts[name]
+
+        if missing:
+            cache.set_many(missing, settings.COUNTER_CACHE_TIMEOUT)
+        return counts
+
+    @staticmethod
+    def _compute(name: str, user_id: int, organization_id: Optional[int]) -> int:
+        from apps.core.models import Notification
+        from apps.expenditure.models import Bill, BillStatus
+        from apps.revenue.models import RevenueDemand
+
+        if name == 'unread_count':
+            return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        if name == 'pending_bills_count':
+            return Bill.objects.filter(organization_id=organization_id, status=BillStatus.SUBMITTED).count()
+        return RevenueDemand.objects.filter(
+            CounterService._overdue_q(timezone.now().date()), organization_id=organization_id
+        ).count()
+
+    @staticmethod
+    def _overdue_q(day) -> Q:
+        from apps.revenue.models import DemandStatus
+        return Q(status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL], due_date__lt=day)
+
+    # -----------------------------------------------------------------
+    # Event updates (applied once the transaction commits)
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _adjust(key: str, delta: int) -> None:
+        """Add delta to a cached counter; a missing counter is left to be recomputed."""
+        if not delta:
+            return
+
+        def apply() -> None:
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                pass
+
+        transaction.on_commit(apply)
+
+    @staticmethod
+    def notification_created(user_id: int) -> None:
+        CounterService._adjust(CounterService.unread_key(user_id), 1)
+
+    @staticmethod
+    def notification_read(user_id: int) -> None:
+        CounterService._adjust(CounterService.unread_key(user_id), -1)
+
+    @staticmethod
+    def reset_unread(user_ids: Iterable[int]) -> None:
+        """Drop the unread counters of users after bulk reads or deletes."""
+        keys = [CounterService.unread_key(user_id) for user_id in set(user_ids)]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @staticmethod
+    def bill_status_changed(organization_id: int, old_status: Optional[str], new_status: str) -> None:
+        from apps.expenditure.models import BillStatus
+
+        delta = int(new_status == BillStatus.SUBMITTED) - int(old_status == BillStatus.SUBMITTED)
+        CounterService._adjust(CounterService.pending_bills_key(organization_id), delta)
+
+    @staticmethod
+    def demand_changed(organization_id: int, old_status: Optional[str], old_due_date,
+                       new_status: str, new_due_date, count: int = 1) -> None:
+        """
+        Adjust the overdue counter for a demand's status or due-date change.
+
+        count applies the same change to that many demands (batch issue).
+        """
+        from apps.revenue.models import DemandStatus
+
+        today = timezone.now().date()
+        outstanding = (DemandStatus.POSTED, DemandStatus.PARTIAL)
+
+        def overdue(status, due_date) -> bool:
+            return status in outstanding and due_date is not None and due_date < today
+
+        delta = int(overdue(new_status, new_due_date)) - int(overdue(old_status, old_due_date))
+        CounterService._adjust(CounterService.overdue_demands_key(organization_id, today), delta * count)
+
+    # -----------------------------------------------------------------
+    # Recompute
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def recompute() -> Dict[str, int]:
+        """
+        Recompute every counter with grouped queries and overwrite the cache.
+
+        Returns:
+            Number of users and organizations whose counters were written.
+        """
+        from django.contrib.auth import get_user_model
+        from apps.core.models import Notification, Organization
+        from apps.expenditure.models import Bill, BillStatus
+        from apps.revenue.models import RevenueDemand
+
+        today = timezone.now().date()
+
+        def grouped(queryset, field: str) -> Dict[int, int]:
+            return dict(queryset.values_list(field).annotate(count=Count('id')).order_by())
+
+        unread = grouped(Notification.objects.filter(is_read=False), 'recipient_id')
+        pending_bills = grouped(Bill.objects.filter(status=BillStatus.SUBMITTED), 'organization_id')
+        overdue = grouped(RevenueDemand.objects.filter(CounterService._overdue_q(today)), 'organization_id')
+
+        user_ids = list(get_user_model().objects.filter(is_active=True).values_list('id', flat=True))
+        organization_ids = list(Organization.objects.values_list('id', flat=True))
+
+        values = {CounterService.unread_key(user_id): unread.get(user_id, 0) for user_id in user_ids}
+        for organization_id in organization_ids:
+            values[CounterService.pending_bills_key(organization_id)] = pending_bills.get(organization_id, 0)
+            values[CounterService.overdue_demands_key(organization_id, today)] = overdue.get(organization_id, 0)
+
+        cache.set_many(values, settings.COUNTER_CACHE_TIMEOUT)
+        return {'users': len(user_ids), 'organizations': len(organization_ids)}
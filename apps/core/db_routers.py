@@ -0,0 +1,242 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Database router that sends read-only report traffic to the
+             'reporting' read replica, with replica-lag awareness and a
+             per-session "read your writes" window.
+-------------------------------------------------------------------------
+
+Reads go to the replica only inside a reporting scope, which is opened by
+ReportingDatabaseMixin (class-based views) or @use_reporting_db (function
+views). Outside that scope, and for every write, the primary is used.
+
+Inside the scope the replica connection carries the requesting user's
+organization in app.current_org_id (see apps.core.middleware), like the
+primary does, so row-level security applies to report reads too; it is
+cleared when the scope closes.
+
+The scope falls back to the primary when:
+- no 'reporting' alias is configured in DATABASES,
+- the session wrote something within REPORTING_DB_READ_YOUR_WRITES_SECONDS
+  (so users see their own postings immediately), or
+- the replica lags by more than REPORTING_DB_MAX_LAG_SECONDS.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+logger = logging.getLogger(__name__)
+
+REPORTING_DB_ALIAS = 'reporting'
+
+# Session key holding the timestamp of the session's last write request.
+LAST_WRITE_SESSION_KEY = '_db_last_write_at'
+
+_reporting_scope = contextvars.ContextVar('cfms_reporting_scope', default=False)
+
+_lag_lock = threading.Lock()
+_lag_cache = {'checked_at': 0.0, 'lag': None}
+
+
+def reporting_alias_configured() -> bool:
+    """Check whether a reporting replica alias is configured."""
+    return REPORTING_DB_ALIAS in settings.DATABASES
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """
+    Return the replication lag of the reporting replica in seconds.
+
+    The value is cached per process for REPORTING_DB_LAG_CHECK_SECONDS so
+    the check costs at most one query per interval. Returns None if the
+    lag cannot be determined (replica unreachable).
+    """
+    interval = getattr(settings, 'REPORTING_DB_LAG_CHECK_SECONDS', 10)
+    now = time.monotonic()
+
+    with _lag_lock:
+        if now - _lag_cache['checked_at'] < interval:
+            return _lag_cache['lag']
+
+    lag = _query_replica_lag()
+
+    with _lag_lock:
+        _lag_cache['checked_at'] = now
+        _lag_cache['lag'] = lag
+    return lag
+
+
+def _query_replica_lag() -> Optional[float]:
+    """Ask the replica how far behind the primary it is."""
+    connection = connections[REPORTING_DB_ALIAS]
+    try:
+        if connection.vendor != 'postgresql':
+            return 0.0
+        with connection.cursor() as cursor:
+            # An idle primary sends no WAL, so replay timestamps age even
+            # when the replica is fully caught up; treat equal LSNs as no lag.
+            cursor.execute(
+                "SELECT CASE "
+                "  WHEN NOT pg_is_in_recovery() THEN 0 "
+                "  WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "  ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+                "END"
+            )
+            return float(cursor.fetchone()[0])
+    except Exception:
+        logger.warning("Could not determine reporting replica lag", exc_info=True)
+        return None
+
+
+def mark_session_write(request) -> None:
+    """Start the read-your-writes window for the request's session."""
+    session = getattr(request, 'session', None)
+    if session is not None:
+        session[LAST_WRITE_SESSION_KEY] = time.time()
+
+
+def _within_read_your_writes_window(request) -> bool:
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    last_write = session.get(LAST_WRITE_SESSION_KEY)
+    if not last_write:
+        return False
+    window = getattr(settings, 'REPORTING_DB_READ_YOUR_WRITES_SECONDS', 60)
+    return time.time() - last_write < window
+
+
+def should_use_reporting_db(request=None) -> bool:
+    """Decide whether reads for this request may be served by the replica."""
+    if not reporting_alias_configured():
+        return False
+    if request is not None and _within_read_your_writes_window(request):
+        return False
+
+    lag = replica_lag_seconds()
+    max_lag = getattr(settings, 'REPORTING_DB_MAX_LAG_SECONDS', 30)
+    if lag is None or lag > max_lag:
+        return False
+    return True
+
+
+def current_read_alias() -> str:
+    """Database alias reads are routed to in the current context."""
+    return REPORTING_DB_ALIAS if _reporting_scope.get() else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def reporting_database(request=None):
+    """
+    Route reads to the reporting replica for the duration of the block,
+    subject to lag and read-your-writes checks.
+
+    The outermost scope sets the request's organization on the replica
+    connection and clears it on exit (see rls_organization).
+    """
+    from apps.core.middleware import request_organization_id, rls_organization
+
+    use_replica = should_use_reporting_db(request)
+    org_id = None
+    if use_replica and not _reporting_scope.get():
+        org_id = request_organization_id(request)
+
+    with ExitStack() as stack:
+        if org_id is not None:
+            stack.enter_context(rls_organization(org_id, connections[REPORTING_DB_ALIAS]))
+
+        token = _reporting_scope.set(use_replica)
+        try:
+            yield
+        finally:
+            _reporting_scope.reset(token)
+
+
+def use_reporting_db(view_func):
+    """Decorator for function-based report views."""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        with reporting_database(request):
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+            return response
+    return _wrapped
+
+
+class ReportingDatabaseMixin:
+    """
+    Mixin for class-based report views to read from the reporting replica.
+
+    Template responses are rendered inside the scope so lazily evaluated
+    querysets in templates are also served by the replica.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with reporting_database(request):
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+                response.render()
+            return response
+
+
+class ReportingRouter:
+    """
+    Route reads inside a reporting scope to the replica; everything else
+    (all writes, migrations) goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _reporting_scope.get():
+            return REPORTING_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Instances loaded from the replica must still be saved to the primary.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica is a copy of the primary, so relations are always valid.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPORTING_DB_ALIAS:
+            return False
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Record the time of each successful write request on the session, so
+    report views skip the replica until the write has had time to replicate.
+
+    Usage:
+        Add to MIDDLEWARE AFTER SessionMiddleware:
+        'apps.core.db_routers.ReadYourWritesMiddleware',
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method not in self.SAFE_METHODS
+            and response.status_code < 400
+            and reporting_alias_configured()
+        ):
+            mark_session_write(request)
+        return response
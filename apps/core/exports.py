@@ -0,0 +1,93 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Streaming CSV and Excel export responses. Rows are consumed
+             lazily from an iterator (e.g. queryset.iterator()), so the
+             worker's memory does not grow with the size of the export.
+-------------------------------------------------------------------------
+"""
+import csv
+import tempfile
+from typing import Any, Iterable, List, Sequence
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_response(filename: str, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> StreamingHttpResponse:
+    """
+    Stream rows as a CSV attachment.
+
+    A UTF-8 BOM is written first for Excel compatibility.
+    """
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield '\ufeff'
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(filename: str, title: str, headers: Sequence[str], rows: Iterable[Sequence[Any]],
+                  column_width: int = 15) -> FileResponse:
+    """
+    Write rows to a write-only workbook and stream it as an attachment.
+
+    openpyxl's write-only mode keeps no cells in memory; the finished
+    file is spooled to disk once it exceeds EXPORT_SPOOL_MAX_SIZE and
+    sent in blocks.
+
+    Raises:
+        ImportError: If openpyxl is not installed.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+
+    # Column widths must be set before the first row in write-only mode
+    for col_num in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = column_width
+
+    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    header_font = Font(bold=True, color='FFFFFF')
+    header_alignment = Alignment(horizontal='center', vertical='center')
+
+    header_row: List[WriteOnlyCell] = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_row.append(cell)
+    ws.append(header_row)
+
+    for row in rows:
+        ws.append(row)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_SIZE)
+    wb.save(spool)
+    spool.seek(0)
+
+    return FileResponse(spool, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
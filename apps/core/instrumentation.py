@@ -0,0 +1,253 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Per-request query and latency instrumentation for production.
+             Records query count, DB time, duplicate SQL and wall time per
+             resolved view, with per-view query budgets.
+-------------------------------------------------------------------------
+
+Settings:
+    REQUEST_INSTRUMENTATION_ENABLED: Turn the middleware on/off (default True).
+    QUERY_BUDGETS: Dict of view name -> max queries per request. The key
+        '*' sets a default budget for views not listed.
+
+Usage:
+    Add to MIDDLEWARE right after SecurityMiddleware, so the queries of the
+    session, authentication, tenant and budget-lock middleware are counted
+    against the request:
+    'apps.core.instrumentation.RequestInstrumentationMiddleware',
+
+    The body of a StreamingHttpResponse (e.g. the revenue CSV/Excel
+    exports) is generated after the middleware returns; its queries and
+    time are not measured.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from apps.core.metrics import HTTP_REQUEST_QUERIES, HTTP_REQUEST_SECONDS, QUERY_BUDGET_EXCEEDED
+
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds (the last bucket is +Inf)
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+QUERY_COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'IN \((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce SQL to its shape: literals and IN-lists become placeholders."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def sql_fingerprint(sql: str) -> str:
+    """Short stable hash identifying queries with the same shape."""
+    return hashlib.md5(normalize_sql(sql).encode('utf-8')).hexdigest()[:12]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style)."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.observations += 1
+
+    def as_dict(self) -> dict:
+        cumulative, running = [], 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'sum': self.total, 'count': self.observations}
+
+
+class ViewStats:
+    """In-process statistics for one view."""
+
+    def __init__(self):
+        self.requests = 0
+        self.budget_exceeded = 0
+        self.db_time_ms = 0.0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+
+    def as_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'budget_exceeded': self.budget_exceeded,
+            'db_time_ms': round(self.db_time_ms, 2),
+            'latency_ms': self.latency_ms.as_dict(),
+            'queries': self.queries.as_dict(),
+        }
+
+
+_stats_lock = threading.Lock()
+_view_stats: Dict[str, ViewStats] = {}
+
+
+def record_request(view_name: str, wall_ms: float, query_count: int,
+                   db_time_ms: float, over_budget: bool) -> None:
+    """
+    Add one request to the in-process per-view statistics and to the
+    exported metrics (which are aggregated across worker processes).
+    """
+    with _stats_lock:
+        stats = _view_stats.get(view_name)
+        if stats is None:
+            stats = _view_stats[view_name] = ViewStats()
+        stats.requests += 1
+        stats.db_time_ms += db_time_ms
+        stats.latency_ms.observe(wall_ms)
+        stats.queries.observe(query_count)
+        if over_budget:
+            stats.budget_exceeded += 1
+
+    HTTP_REQUEST_SECONDS.observe(wall_ms / 1000, view=view_name)
+    HTTP_REQUEST_QUERIES.observe(query_count, view=view_name)
+    if over_budget:
+        QUERY_BUDGET_EXCEEDED.inc(view=view_name)
+
+
+def get_view_stats() -> Dict[str, dict]:
+    """Snapshot of the per-view statistics of this process."""
+    with _stats_lock:
+        return {name: stats.as_dict() for name, stats in _view_stats.items()}
+
+
+def reset_view_stats() -> None:
+    """Clear the per-view statistics (used by tests)."""
+    with _stats_lock:
+        _view_stats.clear()
+
+
+def get_query_budget(view_name: str) -> Optional[int]:
+    """Return the configured query budget for a view, if any."""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    return budgets.get(view_name, budgets.get('*'))
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that counts and times every query and
+    tracks how often each SQL shape repeats.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter = Counter()
+        self.samples: Dict[str, str] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            fingerprint = sql_fingerprint(sql)
+            self.fingerprints[fingerprint] += 1
+            self.samples.setdefault(fingerprint, sql)
+
+    def duplicates(self, limit: int = 5) -> List[dict]:
+        """Most repeated SQL shapes (likely N+1 loops)."""
+        return [
+            {
+                'fingerprint': fingerprint,
+                'count': count,
+                'sql': normalize_sql(self.samples[fingerprint])[:200],
+            }
+            for fingerprint, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Record query count, DB time, duplicate SQL and wall time per request.
+
+    Writes one structured (JSON) log line per request, keeps in-process
+    histograms per view, and logs a warning when a view exceeds its
+    query budget. Streaming responses are measured up to the point the
+    response object is returned, not while their content is iterated.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'REQUEST_INSTRUMENTATION_ENABLED', True):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        self._report(request, response, recorder, wall_ms)
+        return response
+
+    def _report(self, request, response, recorder: QueryRecorder, wall_ms: float) -> None:
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else None) or '<unresolved>'
+        db_time_ms = recorder.duration * 1000
+        duplicates = recorder.duplicates()
+
+        budget = get_query_budget(view_name)
+        over_budget = budget is not None and recorder.count > budget
+
+        record_request(view_name, wall_ms, recorder.count, db_time_ms, over_budget)
+
+        user = getattr(request, 'user', None)
+        payload = {
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'wall_ms': round(wall_ms, 2),
+            'db_ms': round(db_time_ms, 2),
+            'queries': recorder.count,
+            'duplicate_queries': sum(d['count'] - 1 for d in duplicates),
+            'top_duplicates': duplicates[:3],
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+            'org_id': getattr(getattr(request, 'organization', None), 'pk', None),
+        }
+        logger.info('request_profile %s', json.dumps(payload, default=str))
+
+        if over_budget:
+            logger.warning(
+                f"Query budget exceeded for {view_name}: "
+                f"{recorder.count} queries (budget {budget})",
+                extra={'view': view_name, 'queries': recorder.count, 'budget': budget,
+                       'top_duplicates': duplicates[:3]}
+            )
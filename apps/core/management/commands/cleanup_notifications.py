@@ -149,6 +149,9 @@ class Command(BaseCommand):
             self.stdout.write('')
             self.stdout.write('Deleting notifications...')
             
+            from apps.core.counters import CounterService
+            CounterService.reset_unread(unread_query.values_list('recipient_id', flat=True).distinct())
+            
             read_deleted = read_query.delete()[0]
             unread_deleted = unread_query.delete()[0]
             total_deleted = read_deleted + unread_deleted
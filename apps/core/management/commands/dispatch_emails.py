@@ -0,0 +1,65 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to deliver queued emails from the
+             EmailOutbox.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py dispatch_emails                # deliver everything due, then exit
+    python manage.py dispatch_emails --loop         # keep running as a worker
+    python manage.py dispatch_emails --loop --interval 10 --batch-size 200
+
+Run it from cron every minute, or as a long-running worker with --loop.
+Several workers may run at once on PostgreSQL (rows are claimed with
+SKIP LOCKED).
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.outbox import EmailOutboxService
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the email outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Emails sent per batch over one connection'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new emails instead of exiting when the outbox is drained'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to wait between polls when the outbox is empty (with --loop)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        try:
+            while True:
+                result = EmailOutboxService.dispatch(batch_size)
+                for key, value in result.items():
+                    totals[key] += value
+
+                if sum(result.values()) < batch_size:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Sent {totals['sent']} emails "
+            f"({totals['retried']} to retry, {totals['failed']} failed)"
+        ))
@@ -0,0 +1,481 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to generate a large synthetic dataset
+             (many TMAs with realistic transaction volume) for
+             performance testing and benchmarking.
+-------------------------------------------------------------------------
+"""
+import random
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.budgeting.models import FiscalYear
+from apps.core.models import BankAccount, Division, District, Organization, Tehsil
+from apps.dashboard.models import DailyCashSummary, TmaDailyFact
+from apps.dashboard.services_cash import DailyCashService
+from apps.dashboard.services_facts import TmaFactService
+from apps.expenditure.models import Bill, BillLine, BillStatus, Payee
+from apps.finance.models import (
+    AccountBalance, AccountType, BankStatement, BankStatementLine, BudgetHead,
+    Fund, FunctionCode, JournalEntry, MajorHead, MinorHead, NAMHead, Voucher, VoucherType,
+)
+from apps.property.models import Mauza, Property, PropertyStatus
+from apps.revenue.models import (
+    CollectionStatus, DemandStatus, Payer, RevenueCollection, RevenueDemand,
+)
+from apps.revenue.services import RevenueBalanceService
+
+
+# All generated organizations use this DDO code prefix so they can be
+# found (and cleared) without touching real tenants.
+LOAD_DDO_PREFIX = 'LOAD-'
+
+# Compact chart of accounts used by the generated transactions:
+# (NAM code, name, account type)
+LOAD_CHART: List[Tuple[str, str, str]] = [
+    ('A01101', 'Basic Pay of Officers', AccountType.EXPENDITURE),
+    ('A01151', 'Basic Pay of Other Staff', AccountType.EXPENDITURE),
+    ('A01202', 'House Rent Allowance', AccountType.EXPENDITURE),
+    ('A01203', 'Conveyance Allowance', AccountType.EXPENDITURE),
+    ('A01217', 'Medical Allowance', AccountType.EXPENDITURE),
+    ('A03201', 'Postage and Telegraph', AccountType.EXPENDITURE),
+    ('A03202', 'Telephone and Trunk Call', AccountType.EXPENDITURE),
+    ('A03303', 'Electricity', AccountType.EXPENDITURE),
+    ('A03304', 'Hot and Cold Weather Charges', AccountType.EXPENDITURE),
+    ('A03805', 'Travelling Allowance', AccountType.EXPENDITURE),
+    ('A03807', 'P.O.L Charges', AccountType.EXPENDITURE),
+    ('A03901', 'Stationery', AccountType.EXPENDITURE),
+    ('A03902', 'Printing and Publication', AccountType.EXPENDITURE),
+    ('A03970', 'Others', AccountType.EXPENDITURE),
+    ('A13001', 'Repair of Transport', AccountType.EXPENDITURE),
+    ('A13101', 'Repair of Machinery and Equipment', AccountType.EXPENDITURE),
+    ('A13701', 'Repair of Computer Hardware', AccountType.EXPENDITURE),
+    ('C01440', 'Urban Immovable Property Tax', AccountType.REVENUE),
+    ('C02813', 'Education Fee', AccountType.REVENUE),
+    ('C03801', 'Rent of Immovable Property', AccountType.REVENUE),
+    ('C03804', 'Licence Fee', AccountType.REVENUE),
+    ('C03880', 'Fees and Fines', AccountType.REVENUE),
+    ('C04001', 'Water Rates', AccountType.REVENUE),
+    ('F01101', 'Cash at Bank', AccountType.ASSET),
+]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    """Deterministic UUID drawn from the seeded generator."""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _amount(rng: random.Random, low: int, high: int) -> Decimal:
+    """Random amount in whole rupees between low and high."""
+    return Decimal(rng.randint(low, high)).quantize(Decimal('0.01'))
+
+
+class Command(BaseCommand):
+    """
+    Generate a synthetic multi-tenant dataset at production-like volume.
+
+    Every TMA gets posted vouchers with balanced journal lines, the
+    matching AccountBalance summary rows, revenue demands with
+    collections, bills, properties and one bank statement whose lines
+    mirror the month's cheques (for reconciliation benchmarks).
+
+    Data is derived from --seed and the TMA number, so the same arguments
+    always produce the same dataset, and increasing --tmas leaves the
+    existing TMAs unchanged. Rows are written with bulk_create in batches.
+
+    Usage:
+        python manage.py generate_load_dataset --tmas 3 --vouchers 2000
+        python manage.py generate_load_dataset --tmas 132 --vouchers 50000 --lines 5
+        python manage.py generate_load_dataset --clear
+    """
+
+    help = 'Generate a large deterministic synthetic dataset for benchmarking'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--tmas', type=int, default=3,
+                            help='Number of synthetic TMAs to generate (default: 3)')
+        parser.add_argument('--vouchers', type=int, default=1000,
+                            help='Posted vouchers per TMA (default: 1000)')
+        parser.add_argument('--lines', type=int, default=5,
+                            help='Journal lines per voucher, at least 2 (default: 5)')
+        parser.add_argument('--demands', type=int, default=500,
+                            help='Revenue demands per TMA (default: 500)')
+        parser.add_argument('--bills', type=int, default=300,
+                            help='Bills per TMA (default: 300)')
+        parser.add_argument('--properties', type=int, default=200,
+                            help='Properties per TMA (default: 200)')
+        parser.add_argument('--fiscal-year', type=str, default=None,
+                            help='Fiscal year name (default: current operating year)')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed (default: 42)')
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help='Rows per bulk insert (default: 2000)')
+        parser.add_argument('--clear', action='store_true',
+                            help=f'Delete data of all {LOAD_DDO_PREFIX}* organizations and exit')
+
+    def handle(self, *args, **options) -> None:
+        if options['clear']:
+            self._clear()
+            return
+
+        if options['lines'] < 2:
+            raise CommandError('--lines must be at least 2 (one debit and one credit).')
+
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.fiscal_year = self._get_fiscal_year(options['fiscal_year'])
+        self.last_date = min(self.fiscal_year.end_date, timezone.now().date())
+        if self.last_date < self.fiscal_year.start_date:
+            self.last_date = self.fiscal_year.end_date
+
+        self.heads = self._ensure_chart()
+        self.district, self.tehsil, self.mauza = self._ensure_location()
+
+        started = timezone.now()
+        for number in range(1, options['tmas'] + 1):
+            org = self._ensure_organization(number)
+            if Voucher.objects.filter(organization=org, fiscal_year=self.fiscal_year).exists():
+                self.stdout.write(f'  {org.ddo_code}: already generated, skipping')
+                continue
+
+            rng = random.Random(self.seed * 100003 + number)
+            with transaction.atomic():
+                bank_account = self._create_bank_account(org, number)
+                bank_entries = self._generate_vouchers(
+                    org, rng, options['vouchers'], options['lines'], bank_account
+                )
+                self._generate_statement(bank_account, rng, bank_entries)
+                self._generate_revenue(org, rng, options['demands'], bank_account)
+                self._generate_bills(org, rng, options['bills'])
+                self._generate_properties(org, rng, number, options['properties'])
+                # Rows were bulk-inserted, bypassing the posting hooks
+                TmaFactService.rebuild([org.id], [self.fiscal_year.id])
+                DailyCashService.rebuild([org.id])
+                RevenueBalanceService.rebuild(org)
+            self.stdout.write(self.style.SUCCESS(f'  ✓ {org.ddo_code} ({org.name})'))
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ Load dataset ready in {elapsed:.1f}s\n'
+            f'  Fiscal Year: {self.fiscal_year.year_name}\n'
+            f'  TMAs: {options["tmas"]} × {options["vouchers"]} vouchers × {options["lines"]} lines'
+        ))
+
+    # ------------------------------------------------------------------
+    # Reference data
+    # ------------------------------------------------------------------
+
+    def _get_fiscal_year(self, year_name: str) -> FiscalYear:
+        if year_name:
+            fiscal_year = FiscalYear.objects.filter(year_name=year_name).first()
+        else:
+            fiscal_year = FiscalYear.get_current_operating_year()
+        if not fiscal_year:
+            raise CommandError('Fiscal year not found. Create one or pass --fiscal-year.')
+        return fiscal_year
+
+    def _ensure_chart(self) -> Dict[str, List[BudgetHead]]:
+        """Create (or reuse) the budget heads used by generated transactions."""
+        fund, _ = Fund.objects.get_or_create(code='GEN', defaults={'name': 'General Fund'})
+        function, _ = FunctionCode.objects.get_or_create(code='AD', defaults={'name': 'Administration'})
+
+        heads: Dict[str, List[BudgetHead]] = defaultdict(list)
+        for code, name, account_type in LOAD_CHART:
+            major, _ = MajorHead.objects.get_or_create(
+                code=code[:3], defaults={'name': f'Major Head {code[:3]}'}
+            )
+            minor, _ = MinorHead.objects.get_or_create(
+                code=code[:4], defaults={'name': f'Minor Head {code[:4]}', 'major': major}
+            )
+            nam_head, _ = NAMHead.objects.get_or_create(
+                code=code, defaults={'name': name, 'minor': minor, 'account_type': account_type}
+            )
+            head, _ = BudgetHead.objects.get_or_create(
+                department=None, fund=fund, function=function,
+                nam_head=nam_head, sub_head=None,
+                defaults={'posting_allowed': True, 'budget_control': False},
+            )
+            heads[nam_head.account_type].append(head)
+
+        for account_type in (AccountType.EXPENDITURE, AccountType.REVENUE, AccountType.ASSET):
+            if not heads[account_type]:
+                raise CommandError(f'No {account_type} budget head available for the load dataset.')
+        self.fund = fund
+        return heads
+
+    def _ensure_location(self):
+        division, _ = Division.objects.get_or_create(name='Load Test Division', defaults={'code': 'LTD'})
+        district, _ = District.objects.get_or_create(
+            name='Load Test District', defaults={'division': division, 'code': 'LTD-D'}
+        )
+        tehsil, _ = Tehsil.objects.get_or_create(
+            name='Load Test Tehsil', district=district, defaults={'code': 'LTD-T'}
+        )
+        mauza, _ = Mauza.objects.get_or_create(name='Load Test Mauza', district=district)
+        return district, tehsil, mauza
+
+    def _ensure_organization(self, number: int) -> Organization:
+        org, _ = Organization.objects.get_or_create(
+            ddo_code=f'{LOAD_DDO_PREFIX}{number:03d}',
+            defaults={'name': f'Load Test TMA {number:03d}', 'tehsil': self.tehsil},
+        )
+        return org
+
+    def _create_bank_account(self, org: Organization, number: int) -> BankAccount:
+        bank_account, _ = BankAccount.objects.get_or_create(
+            account_number=f'{LOAD_DDO_PREFIX}{number:03d}-0001',
+            defaults={
+                'organization': org,
+                'bank_name': 'National Bank of Pakistan',
+                'title': f'{org.name} Local Fund',
+                'gl_code': self.heads[AccountType.ASSET][0],
+            },
+        )
+        return bank_account
+
+    # ------------------------------------------------------------------
+    # General Ledger
+    # ------------------------------------------------------------------
+
+    def _random_date(self, rng: random.Random) -> date:
+        span = (self.last_date - self.fiscal_year.start_date).days
+        return self.fiscal_year.start_date + timedelta(days=rng.randint(0, span))
+
+    def _generate_vouchers(self, org: Organization, rng: random.Random, count: int,
+                           lines: int, bank_account: BankAccount) -> List[JournalEntry]:
+        """
+        Create posted payment and receipt vouchers in batches.
+
+        Payment vouchers debit expenditure heads and credit the bank;
+        receipt vouchers debit the bank and credit revenue heads. Returns
+        the bank-side entries so a statement can be generated from them.
+        """
+        bank_head = bank_account.gl_code
+        balances: Dict[Tuple[int, int], List[Decimal]] = defaultdict(
+            lambda: [Decimal('0.00'), Decimal('0.00')]
+        )
+        bank_entries: List[JournalEntry] = []
+
+        for batch_start in range(0, count, self.batch_size):
+            batch = []
+            for index in range(batch_start, min(batch_start + self.batch_size, count)):
+                is_payment = rng.random() < 0.65
+                voucher_type = VoucherType.PAYMENT if is_payment else VoucherType.RECEIPT
+                voucher_date = self._random_date(rng)
+                batch.append(Voucher(
+                    public_id=_uuid(rng),
+                    organization=org,
+                    fiscal_year=self.fiscal_year,
+                    voucher_no=f'{voucher_type}-{self.fiscal_year.year_name}-{index + 1:06d}',
+                    date=voucher_date,
+                    voucher_type=voucher_type,
+                    fund=self.fund,
+                    description=f'Load test {voucher_type} {index + 1}',
+                    is_posted=True,
+                    posted_at=timezone.make_aware(datetime.combine(voucher_date, time(12))),
+                ))
+            vouchers = Voucher.objects.bulk_create(batch)
+
+            entries = []
+            for voucher in vouchers:
+                is_payment = voucher.voucher_type == VoucherType.PAYMENT
+                pool = self.heads[AccountType.EXPENDITURE if is_payment else AccountType.REVENUE]
+                amounts = [_amount(rng, 500, 250000) for _ in range(lines - 1)]
+                total = sum(amounts)
+                instrument_no = f'{rng.randint(1000000, 9999999)}'
+
+                for amount in amounts:
+                    head = rng.choice(pool)
+                    entries.append(JournalEntry(
+                        public_id=_uuid(rng), voucher=voucher, fiscal_year=self.fiscal_year,
+                        budget_head=head, description=head.nam_head.name,
+                        debit=amount if is_payment else Decimal('0.00'),
+                        credit=Decimal('0.00') if is_payment else amount,
+                    ))
+                    balances[(head.id, voucher.date.month)][0 if is_payment else 1] += amount
+
+                bank_entry = JournalEntry(
+                    public_id=_uuid(rng), voucher=voucher, fiscal_year=self.fiscal_year,
+                    budget_head=bank_head, description='Bank',
+                    debit=Decimal('0.00') if is_payment else total,
+                    credit=total if is_payment else Decimal('0.00'),
+                    instrument_no=instrument_no,
+                )
+                entries.append(bank_entry)
+                balances[(bank_head.id, voucher.date.month)][1 if is_payment else 0] += total
+                if voucher.date.month == self.fiscal_year.start_date.month:
+                    bank_entries.append(bank_entry)
+
+            JournalEntry.objects.bulk_create(entries, batch_size=self.batch_size)
+
+        self._write_balances(org, balances)
+        return bank_entries
+
+    def _write_balances(self, org: Organization,
+                        balances: Dict[Tuple[int, int], List[Decimal]]) -> None:
+        """Write the AccountBalance rows that posting would have maintained."""
+        heads = {head.id: head for pool in self.heads.values() for head in pool}
+        rows = []
+        for (head_id, month), (debit, credit) in balances.items():
+            row = AccountBalance(
+                organization=org, fiscal_year=self.fiscal_year,
+                budget_head=heads[head_id], month=month,
+                total_debit=debit, total_credit=credit,
+            )
+            row.calculate_closing_balance()
+            rows.append(row)
+        AccountBalance.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def _generate_statement(self, bank_account: BankAccount, rng: random.Random,
+                            bank_entries: List[JournalEntry]) -> None:
+        """
+        One statement for the first month of the year: most cheques have
+        cleared (matchable lines), plus bank charges that are not in the GL.
+        """
+        statement = BankStatement.objects.create(
+            bank_account=bank_account,
+            month=self.fiscal_year.start_date.month,
+            year=self.fiscal_year,
+        )
+        lines = []
+        for entry in bank_entries:
+            if rng.random() < 0.8:
+                lines.append(BankStatementLine(
+                    public_id=_uuid(rng), statement=statement, date=entry.voucher.date,
+                    description=f'CHQ {entry.instrument_no}',
+                    debit=entry.credit, credit=entry.debit, ref_no=entry.instrument_no,
+                ))
+        for _ in range(max(1, len(bank_entries) // 20)):
+            lines.append(BankStatementLine(
+                public_id=_uuid(rng), statement=statement,
+                date=self.fiscal_year.start_date + timedelta(days=rng.randint(0, 27)),
+                description='BANK CHARGES', debit=_amount(rng, 100, 2000),
+                ref_no=f'BC{rng.randint(100000, 999999)}',
+            ))
+        BankStatementLine.objects.bulk_create(lines, batch_size=self.batch_size)
+
+    # ------------------------------------------------------------------
+    # Revenue, expenditure and property
+    # ------------------------------------------------------------------
+
+    def _generate_revenue(self, org: Organization, rng: random.Random, count: int,
+                          bank_account: BankAccount) -> None:
+        payers = Payer.objects.bulk_create([
+            Payer(public_id=_uuid(rng), organization=org, name=f'Payer {index + 1:06d}',
+                  cnic_ntn=f'{rng.randint(10000, 99999)}-{rng.randint(1000000, 9999999)}-{rng.randint(1, 9)}')
+            for index in range(max(1, count // 5))
+        ], batch_size=self.batch_size)
+
+        statuses = [DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+        demands = []
+        for index in range(count):
+            issue_date = self._random_date(rng)
+            demands.append(RevenueDemand(
+                public_id=_uuid(rng), organization=org, fiscal_year=self.fiscal_year,
+                payer=rng.choice(payers), budget_head=rng.choice(self.heads[AccountType.REVENUE]),
+                challan_no=f'CH-{index + 1:07d}', issue_date=issue_date,
+                due_date=issue_date + timedelta(days=30), amount=_amount(rng, 1000, 200000),
+                status=rng.choice(statuses),
+            ))
+        demands = RevenueDemand.objects.bulk_create(demands, batch_size=self.batch_size)
+
+        collections = []
+        for demand in demands:
+            if demand.status == DemandStatus.POSTED:
+                continue
+            received = demand.amount
+            if demand.status == DemandStatus.PARTIAL:
+                received = (demand.amount * Decimal(rng.randint(10, 90)) / 100).quantize(Decimal('0.01'))
+            collections.append(RevenueCollection(
+                public_id=_uuid(rng), organization=org, demand=demand, bank_account=bank_account,
+                receipt_date=min(demand.issue_date + timedelta(days=rng.randint(0, 45)), self.last_date),
+                receipt_no=f'RCPT-{len(collections) + 1:07d}', amount_received=received,
+                status=CollectionStatus.POSTED,
+            ))
+        RevenueCollection.objects.bulk_create(collections, batch_size=self.batch_size)
+
+    def _generate_bills(self, org: Organization, rng: random.Random, count: int) -> None:
+        payees = Payee.objects.bulk_create([
+            Payee(public_id=_uuid(rng), organization=org, name=f'Supplier {index + 1:05d}')
+            for index in range(max(1, count // 10))
+        ], batch_size=self.batch_size)
+
+        statuses = [BillStatus.SUBMITTED, BillStatus.VERIFIED, BillStatus.APPROVED, BillStatus.PAID]
+        bills, heads = [], []
+        for index in range(count):
+            gross = _amount(rng, 5000, 1500000)
+            income_tax = (gross * Decimal('0.045')).quantize(Decimal('0.01'))
+            public_id, payee = _uuid(rng), rng.choice(payees)
+            # Like BillForm, the expense head goes on a BillLine, not the legacy Bill.budget_head
+            heads.append(rng.choice(self.heads[AccountType.EXPENDITURE]))
+            bills.append(Bill(
+                public_id=public_id, organization=org, fiscal_year=self.fiscal_year, payee=payee,
+                bill_date=self._random_date(rng), bill_number=f'BILL-{index + 1:06d}',
+                description=f'Load test bill {index + 1}', gross_amount=gross,
+                income_tax_amount=income_tax, tax_amount=income_tax, net_amount=gross - income_tax,
+                status=rng.choice(statuses), fund=self.fund,
+            ))
+        bills = Bill.objects.bulk_create(bills, batch_size=self.batch_size)
+        BillLine.objects.bulk_create([
+            BillLine(bill=bill, budget_head=head, description=head.nam_head.name, amount=bill.gross_amount)
+            for bill, head in zip(bills, heads)
+        ], batch_size=self.batch_size)
+
+    def _generate_properties(self, org: Organization, rng: random.Random,
+                             number: int, count: int) -> None:
+        statuses = [PropertyStatus.RENTED_OUT, PropertyStatus.VACANT, PropertyStatus.SELF_USE]
+        properties = []
+        for index in range(count):
+            area = Decimal(rng.randint(2, 40))
+            annual_rent = _amount(rng, 24000, 1200000)
+            properties.append(Property(
+                public_id=_uuid(rng), organization=org,
+                property_code=f'{LOAD_DDO_PREFIX}{number:03d}-P{index + 1:06d}',
+                name=f'Shop {index + 1}', address=f'Load Test Bazaar, Shop {index + 1}',
+                district=self.district, mauza=self.mauza,
+                latitude=Decimal('34.0') + Decimal(rng.randint(0, 99999)) / 100000,
+                longitude=Decimal('71.5') + Decimal(rng.randint(0, 99999)) / 100000,
+                area_marlas=area, area_sqft=area * Decimal('225.00'), area_sqm=area * Decimal('20.90'),
+                ownership_title='TMA', status=rng.choice(statuses),
+                annual_rent=annual_rent, monthly_rent=annual_rent / Decimal('12.00'),
+            ))
+        Property.objects.bulk_create(properties, batch_size=self.batch_size)
+
+    # ------------------------------------------------------------------
+    # Cleanup
+    # ------------------------------------------------------------------
+
+    @transaction.atomic
+    def _clear(self) -> None:
+        orgs = Organization.objects.filter(ddo_code__startswith=LOAD_DDO_PREFIX)
+        if not orgs.exists():
+            self.stdout.write('No load dataset found.')
+            return
+
+        BankStatementLine.objects.filter(statement__bank_account__organization__in=orgs).delete()
+        BankStatement.objects.filter(bank_account__organization__in=orgs).delete()
+        AccountBalance.objects.filter(organization__in=orgs).delete()
+        TmaDailyFact.objects.filter(organization__in=orgs).delete()
+        DailyCashSummary.objects.filter(organization__in=orgs).delete()
+        RevenueCollection.objects.filter(organization__in=orgs).delete()
+        RevenueDemand.objects.filter(organization__in=orgs).delete()
+        Payer.objects.filter(organization__in=orgs).delete()
+        Bill.objects.filter(organization__in=orgs).delete()
+        Payee.objects.filter(organization__in=orgs).delete()
+        Property.objects.filter(organization__in=orgs).delete()
+        JournalEntry.objects.filter(voucher__organization__in=orgs).delete()
+        Voucher.objects.filter(organization__in=orgs).delete()
+        BankAccount.objects.filter(organization__in=orgs).delete()
+        count = orgs.count()
+        self.stdout.write(self.style.SUCCESS(f'✓ Cleared load dataset for {count} organizations'))
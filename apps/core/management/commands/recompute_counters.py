@@ -0,0 +1,32 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to recompute the cached sidebar and
+             notification badge counters from the database.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py recompute_counters
+
+Notification, bill and demand transitions adjust the counters in place;
+schedule this nightly (e.g. cron, shortly after midnight) to correct any
+drift and to pre-warm the day's overdue-demand counters.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.core.counters import CounterService
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached sidebar and notification counters'
+
+    def handle(self, *args, **options):
+        written = CounterService.recompute()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Recomputed counters for {written['users']} users "
+            f"and {written['organizations']} organizations"
+        ))
@@ -0,0 +1,350 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to time the performance-critical paths
+             (ledger reports, dashboards, search, posting, reconciliation)
+             against a load dataset and write the results as JSON.
+-------------------------------------------------------------------------
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.budgeting.models import FiscalYear
+from apps.core.management.commands.generate_load_dataset import LOAD_DDO_PREFIX
+from apps.core.models import Organization
+from apps.finance.models import (
+    AccountType, BankStatement, BudgetHead, JournalEntry, Voucher, VoucherType,
+)
+from apps.finance.services_reconciliation import ReconciliationEngine
+from apps.users.models import CustomUser
+
+
+BENCHMARK_USER_CNIC = '00000-0000000-0'
+BENCHMARK_USER_EMAIL = 'benchmark@cfms.local'
+BENCHMARK_HOST = 'localhost'
+
+
+class Rollback(Exception):
+    """Raised inside a benchmark to discard the writes it made."""
+
+
+class Command(BaseCommand):
+    """
+    Run the benchmark suite and report per-benchmark timings as JSON.
+
+    Page benchmarks go through the full middleware stack with the test
+    client, logged in as a dedicated superuser attached to the benchmark
+    organization. The cache is cleared before every run so cached
+    dashboards do not hide the cost of a cold request. Posting and
+    reconciliation benchmarks run inside a transaction that is rolled
+    back, so the dataset is unchanged and runs are repeatable.
+
+    Usage:
+        python manage.py run_benchmarks --output bench/$(git rev-parse --short HEAD).json
+        python manage.py run_benchmarks --compare bench/main.json --fail-on-regression
+        python manage.py run_benchmarks --only trial_balance general_ledger --repeat 10
+    """
+
+    help = 'Time critical views and services against the load dataset and write JSON results'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--org', type=str, default=None,
+                            help=f'DDO code of the organization to benchmark '
+                                 f'(default: first {LOAD_DDO_PREFIX}* organization)')
+        parser.add_argument('--fiscal-year', type=str, default=None,
+                            help='Fiscal year name (default: current operating year)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per benchmark (default: 5)')
+        parser.add_argument('--warmup', type=int, default=1,
+                            help='Untimed warm-up runs per benchmark (default: 1)')
+        parser.add_argument('--posting-batch', type=int, default=50,
+                            help='Vouchers posted per posting-throughput run (default: 50)')
+        parser.add_argument('--only', nargs='+', default=None,
+                            help='Run only the named benchmarks')
+        parser.add_argument('--output', type=str, default=None,
+                            help='Write the JSON results to this file (default: stdout)')
+        parser.add_argument('--compare', type=str, default=None,
+                            help='Baseline JSON file to compare median timings against')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Percent slowdown vs. baseline reported as a regression (default: 20)')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error if any benchmark regressed')
+
+    def handle(self, *args, **options) -> None:
+        self.org = self._get_organization(options['org'])
+        self.fiscal_year = self._get_fiscal_year(options['fiscal_year'])
+        self.posting_batch = options['posting_batch']
+        self.user = self._get_benchmark_user()
+        self.client = Client(HTTP_HOST=BENCHMARK_HOST, raise_request_exception=False)
+        self.client.force_login(self.user)
+        self.busiest_head = self._get_busiest_head()
+
+        benchmarks = self._benchmarks()
+        selected = options['only'] or list(benchmarks)
+        unknown = set(selected) - set(benchmarks)
+        if unknown:
+            raise CommandError(
+                f"Unknown benchmark(s): {', '.join(sorted(unknown))}. "
+                f"Available: {', '.join(benchmarks)}"
+            )
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[BENCHMARK_HOST]):
+            for name in selected:
+                self.stderr.write(f'  Running {name}...')
+                results[name] = self._measure(benchmarks[name], options['repeat'], options['warmup'])
+                if name == 'voucher_posting' and results[name].get('median_ms'):
+                    results[name]['vouchers_per_second'] = round(
+                        self.posting_batch / (results[name]['median_ms'] / 1000), 1
+                    )
+
+        report = {'meta': self._meta(options), 'benchmarks': results}
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"✓ Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            regressions = self._compare(results, options['compare'], options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"Performance regression in: {', '.join(regressions)}")
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def _get_organization(self, ddo_code: Optional[str]) -> Organization:
+        if ddo_code:
+            org = Organization.objects.filter(ddo_code=ddo_code).first()
+        else:
+            org = Organization.objects.filter(
+                ddo_code__startswith=LOAD_DDO_PREFIX
+            ).order_by('ddo_code').first()
+        if not org:
+            raise CommandError('No benchmark organization found. Run generate_load_dataset first.')
+        return org
+
+    def _get_fiscal_year(self, year_name: Optional[str]) -> FiscalYear:
+        if year_name:
+            fiscal_year = FiscalYear.objects.filter(year_name=year_name).first()
+        else:
+            fiscal_year = FiscalYear.get_current_operating_year()
+        if not fiscal_year:
+            raise CommandError('Fiscal year not found. Pass --fiscal-year.')
+        return fiscal_year
+
+    def _get_benchmark_user(self) -> CustomUser:
+        user = CustomUser.objects.filter(email=BENCHMARK_USER_EMAIL).first()
+        if user is None:
+            user = CustomUser.objects.create_superuser(
+                cnic=BENCHMARK_USER_CNIC, email=BENCHMARK_USER_EMAIL,
+                password=None, first_name='Benchmark', organization=self.org,
+            )
+        elif user.organization_id != self.org.id:
+            user.organization = self.org
+            user.save(update_fields=['organization'])
+        return user
+
+    def _get_busiest_head(self) -> Optional[BudgetHead]:
+        """The budget head with the most entries, the worst case for ledgers."""
+        row = (
+            JournalEntry.objects
+            .filter(voucher__organization=self.org, fiscal_year=self.fiscal_year)
+            .values('budget_head')
+            .annotate(entries=Count('id'))
+            .order_by('-entries')
+            .first()
+        )
+        return BudgetHead.objects.get(pk=row['budget_head']) if row else None
+
+    # ------------------------------------------------------------------
+    # Benchmarks
+    # ------------------------------------------------------------------
+
+    def _benchmarks(self) -> Dict[str, Callable[[], None]]:
+        fy = self.fiscal_year
+        ledger_params = {
+            'budget_head': self.busiest_head.pk if self.busiest_head else '',
+            'date_from': fy.start_date.isoformat(),
+            'date_to': fy.end_date.isoformat(),
+        }
+        return {
+            'trial_balance': self._page('reporting:trial_balance', as_of_date=fy.end_date.isoformat()),
+            'general_ledger': self._page('reporting:general_ledger', **ledger_params),
+            'account_statement': self._page('reporting:account_statement', **ledger_params),
+            'dashboard_executive': self._page('dashboard:index', render='full'),
+            'dashboard_provincial': self._page('dashboard:provincial', render='full'),
+            'workspace_finance': self._page('dashboard:workspace_finance'),
+            'smart_search': self._page('finance:smart_budget_head_search_api', q='pay'),
+            'voucher_posting': self._post_vouchers,
+            'reconciliation': self._auto_reconcile,
+        }
+
+    def _page(self, url_name: str, **params) -> Callable[[], None]:
+        url = reverse(url_name)
+
+        def run() -> None:
+            cache.clear()
+            response = self.client.get(url, params)
+            if response.status_code != 200:
+                raise CommandError(f'{url_name} returned HTTP {response.status_code}')
+        return run
+
+    def _post_vouchers(self) -> None:
+        """Create and post a batch of two-line payment vouchers, then roll back."""
+        expense_head = BudgetHead.objects.filter(
+            nam_head__account_type=AccountType.EXPENDITURE
+        ).order_by('id').first()
+        bank_head = self.org.bank_accounts.first().gl_code
+        voucher_date = max(min(timezone.now().date(), self.fiscal_year.end_date),
+                           self.fiscal_year.start_date)
+        try:
+            with transaction.atomic():
+                for index in range(self.posting_batch):
+                    voucher = Voucher.objects.create(
+                        organization=self.org, fiscal_year=self.fiscal_year,
+                        voucher_no=f'BENCH-{index:05d}', date=voucher_date,
+                        voucher_type=VoucherType.PAYMENT, fund=bank_head.fund,
+                        description='Benchmark posting',
+                    )
+                    JournalEntry.objects.create(
+                        voucher=voucher, budget_head=expense_head,
+                        description='Benchmark', debit=Decimal('1000.00'),
+                    )
+                    JournalEntry.objects.create(
+                        voucher=voucher, budget_head=bank_head,
+                        description='Benchmark', credit=Decimal('1000.00'),
+                    )
+                    voucher.post_voucher(self.user)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _auto_reconcile(self) -> None:
+        """Auto-reconcile the organization's busiest statement, then roll back."""
+        statement = (
+            BankStatement.objects
+            .filter(bank_account__organization=self.org)
+            .annotate(line_count=Count('lines'))
+            .order_by('-line_count')
+            .first()
+        )
+        if statement is None:
+            raise CommandError('No bank statement found for the benchmark organization.')
+        try:
+            with transaction.atomic():
+                ReconciliationEngine(statement).auto_reconcile()
+                raise Rollback
+        except Rollback:
+            pass
+
+    # ------------------------------------------------------------------
+    # Measurement and reporting
+    # ------------------------------------------------------------------
+
+    def _measure(self, benchmark: Callable[[], None], repeat: int, warmup: int) -> dict:
+        try:
+            for _ in range(warmup):
+                benchmark()
+
+            timings: List[float] = []
+            queries: List[int] = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as captured:
+                    start = time.perf_counter()
+                    benchmark()
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(captured))
+        except CommandError as exc:
+            return {'error': str(exc)}
+
+        ordered = sorted(timings)
+        return {
+            'runs': repeat,
+            'min_ms': round(ordered[0], 2),
+            'median_ms': round(statistics.median(ordered), 2),
+            'mean_ms': round(statistics.mean(ordered), 2),
+            'p95_ms': round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 2),
+            'max_ms': round(ordered[-1], 2),
+            'queries': max(queries),
+        }
+
+    def _meta(self, options: dict) -> dict:
+        return {
+            'timestamp': timezone.now().isoformat(),
+            'git_commit': self._git('rev-parse', 'HEAD'),
+            'git_branch': self._git('rev-parse', '--abbrev-ref', 'HEAD'),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'organization': self.org.ddo_code,
+            'fiscal_year': self.fiscal_year.year_name,
+            'repeat': options['repeat'],
+            'warmup': options['warmup'],
+            'dataset': {
+                'organizations': Organization.objects.filter(
+                    ddo_code__startswith=LOAD_DDO_PREFIX
+                ).count(),
+                'vouchers': Voucher.objects.filter(organization=self.org).count(),
+                'journal_entries': JournalEntry.objects.filter(
+                    voucher__organization=self.org
+                ).count(),
+            },
+        }
+
+    @staticmethod
+    def _git(*args) -> Optional[str]:
+        try:
+            return subprocess.run(
+                ['git', *args], cwd=settings.BASE_DIR, capture_output=True,
+                text=True, timeout=5, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _compare(self, results: dict, baseline_path: str, threshold: float) -> List[str]:
+        """Print median deltas against a baseline file; return regressed names."""
+        try:
+            with open(baseline_path) as handle:
+                baseline = json.load(handle)['benchmarks']
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'Could not read baseline {baseline_path}: {exc}')
+
+        regressions = []
+        self.stderr.write(f'\nComparison with {baseline_path} (median, threshold {threshold:.0f}%):')
+        for name, result in results.items():
+            before = baseline.get(name, {}).get('median_ms')
+            after = result.get('median_ms')
+            if not before or after is None:
+                self.stderr.write(f'  {name:<24} no baseline')
+                continue
+            change = (after - before) / before * 100
+            line = f'  {name:<24} {before:>10.2f} ms -> {after:>10.2f} ms  ({change:+.1f}%)'
+            if change > threshold:
+                regressions.append(name)
+                self.stderr.write(self.style.ERROR(line + '  REGRESSION'))
+            elif change < -threshold:
+                self.stderr.write(self.style.SUCCESS(line))
+            else:
+                self.stderr.write(line)
+        return regressions
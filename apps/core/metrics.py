@@ -0,0 +1,434 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Lightweight metrics registry (counters, histograms, gauges)
+             rendered in the Prometheus text exposition format.
+-------------------------------------------------------------------------
+
+Settings:
+    METRICS_MULTIPROC_DIR: Directory shared by all worker processes. When
+        set, each process writes its values to metrics_<pid>.json in that
+        directory and the /metrics view merges all files. Leave empty for
+        single-process (runserver) deployments.
+    METRICS_FLUSH_INTERVAL: Seconds between writes of a process's values to
+        its file (default 5). Values are also written at process exit and
+        just before the /metrics view renders.
+
+Multiprocess merging:
+    Counters and histograms are summed across processes, including exited
+    ones, so totals never go backwards when gunicorn recycles a worker.
+    Gauges are combined using the metric's multiprocess_mode ('sum', 'max'
+    or 'min'). Empty the directory when the service (re)starts; the systemd
+    unit does this by pointing it at its RuntimeDirectory.
+
+Usage:
+    from apps.core.metrics import VOUCHER_POSTS, VOUCHER_POST_SECONDS
+
+    VOUCHER_POSTS.inc(voucher_type='JV')
+    with VOUCHER_POST_SECONDS.time():
+        ...
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (suffix, ((label, value), ...)) -> value
+Samples = Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]
+
+
+class MetricsRegistry:
+    """
+    Holds metric definitions and the values recorded by this process.
+
+    Values are kept in a flat dict keyed by (metric, suffix, labels) so they
+    can be written to and merged from JSON files without per-type logic.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, 'Metric'] = {}
+        self._values: Dict[Tuple[str, str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._dirty = False
+        self._last_flush = 0.0
+        self._file_pid = None
+        self._file_name = ''
+
+    def register(self, metric: 'Metric') -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+
+    def add(self, name: str, suffix: str, labels: tuple, amount: float) -> None:
+        self.add_many([(name, suffix, labels, amount)])
+
+    def add_many(self, increments: Iterable[tuple]) -> None:
+        """Apply several (name, suffix, labels, amount) increments at once."""
+        with self._lock:
+            for name, suffix, labels, amount in increments:
+                key = (name, suffix, labels)
+                self._values[key] = self._values.get(key, 0.0) + amount
+            self._dirty = True
+        self.maybe_flush()
+
+    def set(self, name: str, suffix: str, labels: tuple, value: float) -> None:
+        with self._lock:
+            self._values[(name, suffix, labels)] = value
+            self._dirty = True
+        self.maybe_flush()
+
+    def get(self, name: str, suffix: str, labels: tuple) -> float:
+        """Value recorded by this process (used by tests and shell sessions)."""
+        with self._lock:
+            return self._values.get((name, suffix, labels), 0.0)
+
+    def reset(self) -> None:
+        """Clear all values recorded by this process (used by tests)."""
+        with self._lock:
+            self._values.clear()
+            self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Multiprocess file backing
+    # ------------------------------------------------------------------
+
+    def maybe_flush(self) -> None:
+        """Write this process's values to disk if the flush interval passed."""
+        if not multiproc_dir():
+            return
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Atomically write this process's values to its metrics file."""
+        directory = multiproc_dir()
+        if not directory:
+            return
+        with self._lock:
+            if not self._dirty:
+                self._last_flush = time.monotonic()
+                return
+            payload = {
+                'metrics': {
+                    name: [metric.type, metric.documentation, metric.multiprocess_mode]
+                    for name, metric in self._metrics.items()
+                },
+                'values': [
+                    [name, suffix, [list(pair) for pair in labels], value]
+                    for (name, suffix, labels), value in self._values.items()
+                ],
+            }
+            self._dirty = False
+            self._last_flush = time.monotonic()
+
+        path = os.path.join(directory, self._process_file_name())
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics_', suffix='.tmp')
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning("Could not write metrics file %s", path, exc_info=True)
+
+    def _process_file_name(self) -> str:
+        # Include the start time so a recycled PID never overwrites the
+        # totals of an earlier, exited worker.
+        pid = os.getpid()
+        if pid != self._file_pid:
+            self._file_pid = pid
+            self._file_name = f'metrics_{pid}_{int(time.time() * 1000)}.json'
+        return self._file_name
+
+    # ------------------------------------------------------------------
+    # Collection
+    # ------------------------------------------------------------------
+
+    def collect(self) -> Dict[str, Tuple[str, str, Samples]]:
+        """
+        Return {metric name: (type, help, samples)} for exposition, merged
+        across processes in multiprocess mode.
+        """
+        directory = multiproc_dir()
+        if directory:
+            self.flush()
+
+        with self._lock:
+            definitions: Dict[str, Tuple[str, str, str]] = {
+                name: (m.type, m.documentation, m.multiprocess_mode)
+                for name, m in self._metrics.items()
+            }
+            if not directory:
+                values = [(name, suffix, labels, value)
+                          for (name, suffix, labels), value in self._values.items()]
+                return _merge(definitions, [values])
+
+        per_process: List[list] = []
+        for file_name in sorted(os.listdir(directory)):
+            if not (file_name.startswith('metrics_') and file_name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(directory, file_name)) as handle:
+                    payload = json.load(handle)
+            except (OSError, ValueError):
+                logger.warning("Skipping unreadable metrics file %s", file_name)
+                continue
+            # Metrics defined only in modules this process never imported
+            for name, definition in payload.get('metrics', {}).items():
+                definitions.setdefault(name, tuple(definition))
+            per_process.append([
+                (name, suffix, tuple(tuple(pair) for pair in labels), value)
+                for name, suffix, labels, value in payload.get('values', [])
+            ])
+        return _merge(definitions, per_process)
+
+
+def _merge(definitions: Dict[str, Tuple[str, str, str]],
+           per_process: Iterable[list]) -> Dict[str, Tuple[str, str, Samples]]:
+    merged: Dict[str, Tuple[str, str, Samples]] = {
+        name: (metric_type, documentation, {})
+        for name, (metric_type, documentation, _mode) in definitions.items()
+    }
+    for values in per_process:
+        for name, suffix, labels, value in values:
+            if name not in merged:
+                continue
+            metric_type, _documentation, samples = merged[name]
+            key = (suffix, labels)
+            if key not in samples or metric_type != 'gauge':
+                samples[key] = samples.get(key, 0.0) + value
+                continue
+            mode = definitions[name][2]
+            if mode == 'max':
+                samples[key] = max(samples[key], value)
+            elif mode == 'min':
+                samples[key] = min(samples[key], value)
+            else:
+                samples[key] += value
+    return merged
+
+
+REGISTRY = MetricsRegistry()
+
+
+def multiproc_dir() -> str:
+    return getattr(settings, 'METRICS_MULTIPROC_DIR', '') or ''
+
+
+atexit.register(REGISTRY.flush)
+
+
+class Metric:
+    """Base class: a named metric with a fixed set of label names."""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 registry: MetricsRegistry = REGISTRY, multiprocess_mode: str = 'sum'):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.multiprocess_mode = multiprocess_mode
+        self.registry = registry
+        registry.register(self)
+
+    def _label_values(self, labels: dict) -> Tuple[Tuple[str, str], ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def get(self, suffix: str = '', **labels) -> float:
+        """Value of one sample in this process, e.g. get('_count', view='x')."""
+        le = labels.pop('le', None)
+        label_values = self._label_values(labels)
+        if le is not None:
+            label_values += (('le', _format_value(float(le)) if le != '+Inf' else le),)
+        return self.registry.get(self.name, suffix, label_values)
+
+
+class Counter(Metric):
+    """Monotonically increasing count (e.g. vouchers posted)."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError('Counters can only be incremented')
+        self.registry.add(self.name, '', self._label_values(labels), amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down (e.g. renders in progress)."""
+
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        self.registry.set(self.name, '', self._label_values(labels), value)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.registry.add(self.name, '', self._label_values(labels), amount)
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.registry.add(self.name, '', self._label_values(labels), -amount)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, plus their sum and count."""
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, **kwargs)
+
+    def observe(self, value: float, **labels) -> None:
+        label_values = self._label_values(labels)
+        increments = [
+            (self.name, '_bucket', label_values + (('le', _format_value(bound)),), 1)
+            for bound in self.buckets if value <= bound
+        ]
+        increments += [
+            (self.name, '_bucket', label_values + (('le', '+Inf'),), 1),
+            (self.name, '_sum', label_values, value),
+            (self.name, '_count', label_values, 1),
+        ]
+        self.registry.add_many(increments)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block (also usable as a decorator)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+# ============================================================================
+# Exposition
+# ============================================================================
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+_SUFFIX_ORDER = {'': 0, '_bucket': 0, '_sum': 1, '_count': 2}
+
+
+def _sample_sort_key(item):
+    (suffix, labels), _value = item
+    base = tuple(pair for pair in labels if pair[0] != 'le')
+    le = dict(labels).get('le')
+    le_value = float('inf') if le == '+Inf' else float(le) if le is not None else 0.0
+    return base, _SUFFIX_ORDER.get(suffix, 3), le_value
+
+
+def generate_latest(registry: Optional[MetricsRegistry] = None) -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    registry = registry or REGISTRY
+    lines = []
+    for name, (metric_type, documentation, samples) in sorted(registry.collect().items()):
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for (suffix, labels), value in sorted(samples.items(), key=_sample_sort_key):
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+            label_text = '{' + label_text + '}' if label_text else ''
+            lines.append(f'{name}{suffix}{label_text} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# ============================================================================
+# Application metrics
+# ============================================================================
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'cfms_http_request_duration_seconds', 'Wall time of HTTP requests per view.',
+    ['view'],
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    'cfms_http_request_queries', 'Database queries issued per HTTP request.',
+    ['view'], buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    'cfms_query_budget_exceeded_total', 'Requests that exceeded their query budget.',
+    ['view'],
+)
+
+VOUCHER_POSTS = Counter(
+    'cfms_voucher_posts_total', 'Vouchers posted to the General Ledger.',
+    ['voucher_type'],
+)
+VOUCHER_POST_SECONDS = Histogram(
+    'cfms_voucher_post_duration_seconds', 'Time taken by Voucher.post_voucher.',
+)
+ACCOUNT_BALANCE_UPDATE_SECONDS = Histogram(
+    'cfms_account_balance_update_duration_seconds',
+    'Time taken by AccountBalance.update_for_voucher.',
+)
+
+RECONCILIATION_SECONDS = Histogram(
+    'cfms_reconciliation_duration_seconds', 'Time taken by ReconciliationEngine.auto_reconcile.',
+)
+RECONCILIATION_MATCHES = Counter(
+    'cfms_reconciliation_matches_total', 'Statement lines matched by auto-reconciliation.',
+)
+
+CACHE_REQUESTS = Counter(
+    'cfms_cache_requests_total', 'Cache lookups by cache name and result (hit/miss).',
+    ['cache', 'result'],
+)
+
+PDF_RENDER_SECONDS = Histogram(
+    'cfms_pdf_render_duration_seconds', 'Time taken to render a PDF document.',
+    ['document'],
+)
+PDF_RENDERS_IN_PROGRESS = Gauge(
+    'cfms_pdf_renders_in_progress', 'PDF documents currently being rendered.',
+    ['document'],
+)
+
+
+@contextmanager
+def track_pdf_render(document: str):
+    """Time a PDF render and count it as in progress while it runs."""
+    with PDF_RENDERS_IN_PROGRESS.track_inprogress(document=document):
+        with PDF_RENDER_SECONDS.time(document=document):
+            yield
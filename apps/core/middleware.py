@@ -9,11 +9,156 @@ Description: Middleware for multi-tenancy enforcement. Injects the
              data isolation.
 -------------------------------------------------------------------------
 """
-from typing import Callable, Optional
+import logging
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Iterator, Optional
+from django.conf import settings
+from django.db import DatabaseError, connection as default_connection, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
 from django.http import HttpRequest, HttpResponse
 from django.utils.deprecation import MiddlewareMixin
 
 
+logger = logging.getLogger(__name__)
+
+
+@receiver(connection_created)
+def _reset_rls_tracking(sender, connection, **kwargs) -> None:
+    """A new database session starts without app.current_org_id."""
+    connection.rls_org_id = None
+
+
+def _rls_transaction_marker() -> None:
+    """On-commit no-op marking a transaction whose RLS variable is set."""
+
+
+def _set_rls_at_transaction_start(execute, sql, params, many, context):
+    """
+    Execute wrapper used with DATABASE_TRANSACTION_POOLING.
+
+    Before the first statement of each transaction, set the connection's
+    pending organization with SET LOCAL. A marker on-commit hook records
+    that it was set: Django drops the hook when the transaction commits or
+    rolls back, and when a savepoint rolls back (which also undoes the
+    SET LOCAL), so the next statement sets it again.
+    """
+    connection = context['connection']
+    org_id = getattr(connection, 'rls_transaction_org_id', None)
+    if (org_id is not None and connection.in_atomic_block and not any(
+            func is _rls_transaction_marker for _, func, _ in connection.run_on_commit)):
+        connection.on_commit(_rls_transaction_marker)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT set_config('app.current_org_id', %s, %s)", [str(org_id), True])
+        except DatabaseError:
+            logger.warning('Could not set app.current_org_id for RLS', exc_info=True)
+    return execute(sql, params, many, context)
+
+
+def set_rls_organization(org_id: int, connection=None) -> bool:
+    """
+    Set the PostgreSQL RLS session variable app.current_org_id.
+    
+    The value set on each connection is remembered, so persistent
+    connections (CONN_MAX_AGE) only pay the round-trip when the
+    organization changes. Inside a transaction the value is set
+    transaction-locally (SET LOCAL) and not remembered.
+    
+    With DATABASE_TRANSACTION_POOLING (e.g. PgBouncer in transaction mode)
+    session state cannot be relied on. The organization is then kept on
+    the connection and set with SET LOCAL at the start of every
+    transaction (see _set_rls_at_transaction_start); TenantMiddleware runs
+    each request in one. Statements run outside a transaction do not see
+    it.
+    
+    Args:
+        org_id: Organization ID, 0 for oversight (all organizations).
+        connection: Database connection (default: the default alias).
+    
+    Returns:
+        True if a statement was executed.
+    """
+    connection = connection or default_connection
+    if connection.vendor != 'postgresql':
+        return False
+    
+    pooled = getattr(settings, 'DATABASE_TRANSACTION_POOLING', False)
+    if pooled:
+        connection.rls_transaction_org_id = org_id
+        if _set_rls_at_transaction_start not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_set_rls_at_transaction_start)
+        if not connection.in_atomic_block:
+            return False
+        connection.on_commit(_rls_transaction_marker)
+    elif getattr(connection, 'rls_org_id', None) == org_id:
+        return False
+    
+    is_local = connection.in_atomic_block
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('app.current_org_id', %s, %s)", [str(org_id), is_local]
+            )
+    except DatabaseError:
+        logger.warning('Could not set app.current_org_id for RLS', exc_info=True)
+        return False
+    
+    if not is_local:
+        connection.rls_org_id = org_id
+    return True
+
+
+def clear_rls_organization(connection=None) -> None:
+    """
+    Unset app.current_org_id set by set_rls_organization on a connection.
+    
+    Used when a connection is scoped to an organization for only part of
+    a request (e.g. the reporting replica), so the next user of the
+    connection does not inherit it.
+    """
+    connection = connection or default_connection
+    if connection.vendor != 'postgresql':
+        return
+    
+    connection.rls_transaction_org_id = None
+    if getattr(connection, 'rls_org_id', None) is None:
+        return
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('app.current_org_id', %s, %s)", ['', False])
+    except DatabaseError:
+        logger.warning('Could not clear app.current_org_id for RLS', exc_info=True)
+        return
+    connection.rls_org_id = None
+
+
+def request_organization_id(request) -> Optional[int]:
+    """RLS organization of the request's user (0 for oversight), or None if anonymous."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return getattr(user, 'organization_id', None) or 0
+
+
+@contextmanager
+def rls_organization(org_id: int, connection) -> Iterator[None]:
+    """
+    Scope a connection other than the request's own to an organization.
+    
+    Sets app.current_org_id on entry and clears it on exit. Used for the
+    reporting replica and widget pool threads, whose connections
+    TenantMiddleware does not see. With DATABASE_TRANSACTION_POOLING the
+    block runs in a transaction on that connection.
+    """
+    with ExitStack() as stack:
+        if getattr(settings, 'DATABASE_TRANSACTION_POOLING', False) and connection.vendor == 'postgresql':
+            stack.enter_context(transaction.atomic(using=connection.alias))
+        set_rls_organization(org_id, connection)
+        stack.callback(clear_rls_organization, connection)
+        yield
+
+
 class TenantMiddleware(MiddlewareMixin):
     """
     Middleware to enforce multi-tenancy data isolation.
@@ -28,6 +173,21 @@ class TenantMiddleware(MiddlewareMixin):
         'apps.core.middleware.TenantMiddleware',
     """
     
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Run the request in one transaction under transaction pooling.
+        
+        With DATABASE_TRANSACTION_POOLING the RLS variable only lives for a
+        transaction, so the view, the lazy rendering of TemplateResponses
+        (querysets evaluated in templates), context processors and the
+        middleware below this one share a transaction that sets it first.
+        Streamed response bodies are produced after it ends.
+        """
+        if getattr(settings, 'DATABASE_TRANSACTION_POOLING', False) and default_connection.vendor == 'postgresql':
+            with transaction.atomic():
+                return super().__call__(request)
+        return super().__call__(request)
+    
     def process_request(self, request: HttpRequest) -> Optional[HttpResponse]:
         """
         Inject organization context into the request.
@@ -56,19 +216,22 @@ class TenantMiddleware(MiddlewareMixin):
                     request.is_oversight_user = True
             
             # Set PostgreSQL RLS session variable for database-level isolation
-            # This provides defense-in-depth security
-            from django.db import connection
-            org_id = user_org.id if user_org else 0
-            
-            try:
-                with connection.cursor() as cursor:
-                    cursor.execute("SET app.current_org_id = %s", [org_id])
-            except Exception:
-                # Gracefully handle if RLS is not enabled yet
-                pass
+            # This provides defense-in-depth security (skipped when the
+            # connection already carries this organization)
+            set_rls_organization(user_org.id if user_org else 0)
         
         return None
     
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """
+        Drop the organization kept for transaction pooling.
+        
+        The connection outlives the request; the next request's
+        transactions must not be scoped to this user's organization.
+        """
+        default_connection.rls_transaction_org_id = None
+        return response
+    
     def process_view(
         self, 
         request: HttpRequest, 
@@ -5,11 +5,11 @@ Client: Local Government Department, Khyber Pakhtunkhwa
 Team Lead: Jamil Shah
 Developers: Ali Asghar, Akhtar Munir and Zarif Khan
 Description: Reusable model mixins for audit logging, timestamps,
-             and multi-tenancy support.
+             field-change tracking and multi-tenancy support.
 -------------------------------------------------------------------------
 """
 import uuid
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, TYPE_CHECKING
 from django.db import models
 from django.conf import settings
 
@@ -112,6 +112,74 @@ class AuditLogMixin(TimeStampedMixin):
         self.save(*args, **kwargs)
 
 
+class FieldTrackerMixin(models.Model):
+    """
+    Abstract mixin that remembers the loaded values of tracked fields.
+    
+    Values are captured in from_db() and again after every save() or
+    refresh_from_db(), so save() can tell what changed without
+    re-reading the row. Foreign keys are tracked by attname (payer_id).
+    
+    Attributes:
+        tracked_fields: Attnames of the fields to track.
+    """
+    
+    tracked_fields: Tuple[str, ...] = ()
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields(instance.tracked_fields)
+        return instance
+    
+    def _tracked_attnames(self, fields: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        """Tracked attnames among fields (names or attnames); all if fields is None."""
+        if fields is None:
+            return self.tracked_fields
+        attnames: Set[str] = {self._meta.get_field(name).attname for name in fields}
+        return tuple(name for name in self.tracked_fields if name in attnames)
+    
+    def _snapshot_tracked_fields(self, attnames: Iterable[str]) -> None:
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        deferred = self.get_deferred_fields()
+        for name in attnames:
+            if name not in deferred:
+                loaded[name] = getattr(self, name)
+    
+    def get_loaded_value(self, name: str, default: Any = None) -> Any:
+        """Value of a tracked field as last loaded or saved."""
+        return self.__dict__.get('_loaded_values', {}).get(name, default)
+    
+    def get_field_changes(self, update_fields: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Any, Any]]:
+        """
+        Tracked fields changed since they were loaded or saved.
+        
+        Args:
+            update_fields: Limit to the fields a save() will write.
+            
+        Returns:
+            Dictionary of attname to (old value, new value). Fields never
+            loaded (new or deferred) are not reported.
+        """
+        loaded = self.__dict__.get('_loaded_values', {})
+        changes = {}
+        for name in self._tracked_attnames(update_fields):
+            if name in loaded and loaded[name] != getattr(self, name):
+                changes[name] = (loaded[name], getattr(self, name))
+        return changes
+    
+    def save(self, *args, **kwargs) -> None:
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields(self._tracked_attnames(kwargs.get('update_fields')))
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None) -> None:
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_tracked_fields(self._tracked_attnames(fields))
+
+
 class StatusMixin(models.Model):
     """
     Abstract mixin for models that follow a state machine workflow.
@@ -10,6 +10,7 @@ Description: Geographic and organizational models for TMAs including
 """
 from decimal import Decimal
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from apps.core.mixins import TimeStampedMixin, AuditLogMixin, StatusMixin
@@ -440,11 +441,23 @@ class Notification(TimeStampedMixin):
     def __str__(self) -> str:
         return f"{self.title} - {self.recipient.get_full_name()}"
     
+    def save(self, *args, **kwargs) -> None:
+        """Save and count a new unread notification in the recipient's badge."""
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        
+        if is_new and not self.is_read:
+            from apps.core.counters import CounterService
+            CounterService.notification_created(self.recipient_id)
+    
     def mark_as_read(self) -> None:
         """Mark this notification as read."""
         if not self.is_read:
             self.is_read = True
             self.save(update_fields=['is_read'])
+            
+            from apps.core.counters import CounterService
+            CounterService.notification_read(self.recipient_id)
     
     def get_badge_class(self) -> str:
         """Return Bootstrap badge class based on category."""
@@ -453,3 +466,86 @@ class Notification(TimeStampedMixin):
             NotificationCategory.SYSTEM: 'bg-info',
             NotificationCategory.ALERT: 'bg-danger',
         }.get(self.category, 'bg-secondary')
+
+
+class EmailStatus(models.TextChoices):
+    """
+    Delivery status of an outgoing email.
+    """
+    PENDING = 'PENDING', _('Pending')
+    SENT = 'SENT', _('Sent')
+    FAILED = 'FAILED', _('Failed')
+
+
+class EmailOutbox(TimeStampedMixin):
+    """
+    Transactional outbox for outgoing email.
+    
+    Emails are written in the same database transaction as the business
+    change that triggers them and delivered later by the `dispatch_emails`
+    command, so a slow or unavailable SMTP server never blocks a request.
+    
+    Attributes:
+        to: List of recipient addresses.
+        subject: Email subject.
+        body: Plain-text body.
+        from_email: Sender address (DEFAULT_FROM_EMAIL if blank).
+        status: PENDING until sent, FAILED after the last retry.
+        attempts: Number of delivery attempts made.
+        next_attempt_at: Earliest time of the next delivery attempt.
+        last_error: Error of the last failed attempt.
+        sent_at: When the email was delivered.
+    """
+    
+    to = models.JSONField(
+        default=list,
+        verbose_name=_('To'),
+        help_text=_('List of recipient email addresses.')
+    )
+    subject = models.CharField(
+        max_length=255,
+        verbose_name=_('Subject')
+    )
+    body = models.TextField(
+        verbose_name=_('Body')
+    )
+    from_email = models.CharField(
+        max_length=254,
+        blank=True,
+        verbose_name=_('From'),
+        help_text=_('Sender address. DEFAULT_FROM_EMAIL is used if blank.')
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=EmailStatus.choices,
+        default=EmailStatus.PENDING,
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name=_('Attempts')
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Next Attempt At')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last Error')
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Sent At')
+    )
+    
+    class Meta:
+        verbose_name = _('Outgoing Email')
+        verbose_name_plural = _('Email Outbox')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self) -> str:
+        return f"{self.subject} -> {', '.join(self.to)}"
@@ -0,0 +1,132 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Transactional email outbox. Emails are queued as EmailOutbox
+             rows inside the caller's transaction and delivered in batches
+             over one SMTP connection, with exponential backoff on failure.
+-------------------------------------------------------------------------
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.models import EmailOutbox, EmailStatus
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxService:
+    """Queue outgoing email and deliver it from a background dispatcher."""
+
+    @staticmethod
+    def enqueue(subject: str, body: str, to: List[str], from_email: str = '') -> Optional[EmailOutbox]:
+        """
+        Queue an email for delivery.
+
+        The row is written in the current transaction: if the triggering
+        change rolls back, the email is discarded with it.
+
+        Args:
+            subject: Email subject.
+            body: Plain-text body.
+            to: Recipient addresses; blank entries are dropped.
+            from_email: Sender (default: DEFAULT_FROM_EMAIL at send time).
+
+        Returns:
+            The queued EmailOutbox row, or None if there is no recipient.
+        """
+        to = [address for address in to if address]
+        if not to:
+            return None
+        return EmailOutbox.objects.create(
+            subject=subject, body=body, to=to, from_email=from_email
+        )
+
+    @staticmethod
+    def retry_delay(attempts: int) -> timedelta:
+        """Backoff before the next attempt: the base delay doubled per failed attempt."""
+        return timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+    @staticmethod
+    def dispatch(batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Send one batch of due emails over a single backend connection.
+
+        Due rows are locked with SKIP LOCKED where supported, so several
+        dispatchers can run side by side. A failed email is retried with
+        exponential backoff and marked FAILED after EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+        Returns:
+            Dict with the number of emails 'sent', 'retried' and 'failed'.
+        """
+        batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        result = {'sent': 0, 'retried': 0, 'failed': 0}
+
+        with transaction.atomic():
+            due = EmailOutbox.objects.filter(
+                status=EmailStatus.PENDING, next_attempt_at__lte=timezone.now()
+            ).order_by('next_attempt_at', 'pk')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            emails = list(due[:batch_size])
+            if not emails:
+                return result
+
+            backend = get_connection(fail_silently=False)
+            try:
+                backend.open()
+                connection_error = None
+            except Exception as e:
+                connection_error = e
+
+            try:
+                for email in emails:
+                    error = connection_error
+                    if error is None:
+                        try:
+                            EmailMessage(
+                                subject=email.subject,
+                                body=email.body,
+                                from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+                                to=email.to,
+                                connection=backend,
+                            ).send()
+                        except Exception as e:
+                            error = e
+
+                    email.attempts += 1
+                    email.updated_at = timezone.now()
+                    if error is None:
+                        email.status = EmailStatus.SENT
+                        email.sent_at = email.updated_at
+                        email.last_error = ''
+                        result['sent'] += 1
+                    elif email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                        email.status = EmailStatus.FAILED
+                        email.last_error = str(error)
+                        result['failed'] += 1
+                        logger.error(
+                            f"Giving up on email {email.pk} after {email.attempts} attempts: {error}"
+                        )
+                    else:
+                        email.next_attempt_at = email.updated_at + EmailOutboxService.retry_delay(email.attempts)
+                        email.last_error = str(error)
+                        result['retried'] += 1
+            finally:
+                if connection_error is None:
+                    backend.close()
+
+            EmailOutbox.objects.bulk_update(
+                emails, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at']
+            )
+
+        return result
@@ -8,10 +8,12 @@ Description: Core services for notification management and other
              shared business logic.
 -------------------------------------------------------------------------
 """
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List
 import logging
 
-from django.db import transaction
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
@@ -103,7 +105,7 @@ class NotificationService:
         Send the same notification to multiple recipients.
         
         Args:
-            recipients: List of CustomUser instances.
+            recipients: List or QuerySet of CustomUser instances (or user IDs).
             title: Short notification title.
             message: Detailed notification message.
             link: Optional URL to the document or page.
@@ -113,18 +115,102 @@ class NotificationService:
         Returns:
             List of created Notification instances.
         """
-        notifications = []
-        for recipient in recipients:
-            notification = NotificationService.send_notification(
-                recipient=recipient,
-                title=title,
-                message=message,
-                link=link,
-                category=category,
-                icon=icon
+        return NotificationService.fan_out(recipients, [{
+            'title': title,
+            'message': message,
+            'link': link,
+            'category': category,
+            'icon': icon,
+        }])
+    
+    @staticmethod
+    def fan_out(
+        recipients: Iterable,
+        notifications: List[Dict[str, Any]],
+        digest: Optional[Dict[str, Any]] = None
+    ) -> List[Notification]:
+        """
+        Deliver notification payloads to every recipient with bulk inserts.
+        
+        Recipients are resolved once, identical payloads are sent once and
+        rows are inserted in chunks of NOTIFICATION_BATCH_SIZE. When a digest
+        payload is given and more than NOTIFICATION_DIGEST_THRESHOLD payloads
+        remain, each recipient gets the digest instead of the individual
+        notifications.
+        
+        Args:
+            recipients: CustomUser instances, user IDs or a user QuerySet.
+            notifications: Payload dicts with 'title' and 'message' and
+                optional 'link', 'category' and 'icon'.
+            digest: Optional payload summarizing the notifications.
+        
+        Returns:
+            List of created Notification instances.
+        
+        Example:
+            >>> NotificationService.fan_out(
+            ...     officers,
+            ...     [{'title': 'Overdue Payment Alert', 'message': '...'} for demand in demands],
+            ...     digest={'title': 'Overdue Payment Alert',
+            ...             'message': f'{len(demands)} demands became overdue today.'},
+            ... )
+        """
+        from apps.core.counters import CounterService
+        
+        recipient_ids = NotificationService._resolve_recipient_ids(recipients)
+        payloads = list({
+            NotificationService._payload_key(payload): payload for payload in notifications
+        }.values())
+        if digest and len(payloads) > settings.NOTIFICATION_DIGEST_THRESHOLD:
+            payloads = [digest]
+        
+        rows = [
+            Notification(
+                recipient_id=recipient_id,
+                title=payload['title'],
+                message=payload['message'],
+                link=payload.get('link', ''),
+                category=payload.get('category', NotificationCategory.WORKFLOW),
+                icon=payload.get('icon', 'bi-bell'),
+            )
+            for recipient_id in recipient_ids
+            for payload in payloads
+        ]
+        if not rows:
+            return []
+        
+        try:
+            with transaction.atomic():
+                created = Notification.objects.bulk_create(
+                    rows, batch_size=settings.NOTIFICATION_BATCH_SIZE
+                )
+        except DatabaseError as e:
+            logger.error(
+                f"Failed to send {len(rows)} notifications",
+                exc_info=True,
+                extra={'recipient_ids': recipient_ids, 'error': str(e)}
             )
-            notifications.append(notification)
-        return notifications
+            return []
+        
+        # bulk_create bypasses Notification.save(), so the badge counters
+        # of the recipients are recomputed on their next read.
+        CounterService.reset_unread(recipient_ids)
+        return created
+    
+    @staticmethod
+    def _resolve_recipient_ids(recipients: Iterable) -> List[int]:
+        """Distinct recipient IDs in order, with a single query for a QuerySet."""
+        if isinstance(recipients, QuerySet):
+            recipients = recipients.values_list('pk', flat=True)
+        ids = (getattr(recipient, 'pk', recipient) for recipient in recipients)
+        return list(dict.fromkeys(pk for pk in ids if pk is not None))
+    
+    @staticmethod
+    def _payload_key(payload: Dict[str, Any]) -> tuple:
+        return (
+            str(payload['title']), str(payload['message']), payload.get('link', ''),
+            payload.get('category', NotificationCategory.WORKFLOW), payload.get('icon', 'bi-bell'),
+        )
     
     @staticmethod
     def get_unread_count(user) -> int:
@@ -136,6 +222,10 @@ class NotificationService:
         
         Returns:
             Count of unread notifications.
+        
+        Note:
+            Exact database count. Page badges read the cached counter
+            instead (CounterService.get_counts).
         """
         return Notification.objects.filter(
             recipient=user,
@@ -174,10 +264,14 @@ class NotificationService:
         Returns:
             Number of notifications marked as read.
         """
-        return Notification.objects.filter(
+        from apps.core.counters import CounterService
+        
+        updated = Notification.objects.filter(
             recipient=user,
             is_read=False
         ).update(is_read=True)
+        CounterService.reset_unread([user.pk])
+        return updated
     
     @staticmethod
     @transaction.atomic
@@ -194,10 +288,14 @@ class NotificationService:
         from django.utils import timezone
         from datetime import timedelta
         
+        from apps.core.counters import CounterService
+        
         cutoff_date = timezone.now() - timedelta(days=days)
-        count, _ = Notification.objects.filter(
-            created_at__lt=cutoff_date
-        ).delete()
+        old_notifications = Notification.objects.filter(created_at__lt=cutoff_date)
+        CounterService.reset_unread(
+            old_notifications.filter(is_read=False).values_list('recipient_id', flat=True).distinct()
+        )
+        count, _ = old_notifications.delete()
         return count
 
 
@@ -0,0 +1,291 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Shared test data for tests that need posted transactions in
+             one or more TMAs. Rows are created with the ORM and posted
+             through the model workflows (RevenueDemand.post,
+             RevenueCollection.post, Payment.post, Voucher.post_voucher),
+             so balances, dashboard facts, cash summaries and audit rows
+             are maintained by the same hooks as in production.
+-------------------------------------------------------------------------
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Optional
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.budgeting.models import BudgetAllocation, FiscalYear
+from apps.core.models import BankAccount, Division, District, Organization, Tehsil
+from apps.expenditure.models import Bill, BillLine, BillStatus, Payee, Payment
+from apps.finance.models import (
+    AccountType, BudgetHead, Fund, FunctionCode, JournalEntry, MajorHead, MinorHead,
+    NAMHead, Voucher, VoucherType,
+)
+from apps.revenue.models import DemandStatus, Payer, RevenueCollection, RevenueDemand
+
+
+# (NAM code, name, account type, system code)
+TEST_CHART = [
+    ('A01101', 'Basic Pay of Officers', AccountType.EXPENDITURE, None),
+    ('A03303', 'Electricity', AccountType.EXPENDITURE, None),
+    ('A03901', 'Stationery', AccountType.EXPENDITURE, None),
+    ('C01440', 'Urban Immovable Property Tax', AccountType.REVENUE, None),
+    ('C03801', 'Rent of Immovable Property', AccountType.REVENUE, None),
+    ('C03804', 'Licence Fee', AccountType.REVENUE, None),
+    ('F01101', 'Cash at Bank', AccountType.ASSET, None),
+    ('F02601', 'Accounts Receivable', AccountType.ASSET, 'AR'),
+    ('G01101', 'Accounts Payable', AccountType.LIABILITY, 'AP'),
+    ('G01204', 'Income Tax Payable', AccountType.LIABILITY, 'TAX_IT'),
+]
+
+# Demand status cycle: posted, partially collected, fully collected
+DEMAND_CYCLE = [DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+
+# Bill status cycle; bills are taken through the workflow to their status
+BILL_CYCLE = [BillStatus.SUBMITTED, BillStatus.VERIFIED, BillStatus.APPROVED, BillStatus.PAID]
+
+
+def create_fiscal_year(year_name: Optional[str] = '2024-25') -> FiscalYear:
+    """The named fiscal year ('2024-25'), or the one containing today when None."""
+    if year_name is None:
+        today = timezone.now().date()
+        start_year = today.year if today.month >= 7 else today.year - 1
+        year_name = f'{start_year}-{str(start_year + 1)[2:]}'
+    start_year = int(year_name[:4])
+    return FiscalYear.objects.create(
+        year_name=year_name, start_date=date(start_year, 7, 1), end_date=date(start_year + 1, 6, 30)
+    )
+
+
+def create_chart() -> SimpleNamespace:
+    """
+    A compact chart of accounts with the AR and AP system heads.
+
+    Returns:
+        Namespace with fund, expenditure and revenue (lists of heads),
+        cash, receivable, payable and income_tax.
+    """
+    fund = Fund.objects.create(code='GEN', name='General Fund')
+    function = FunctionCode.objects.create(code='AD', name='Administration')
+
+    chart = SimpleNamespace(fund=fund, expenditure=[], revenue=[])
+    for code, name, account_type, system_code in TEST_CHART:
+        major, _ = MajorHead.objects.get_or_create(code=code[:3], defaults={'name': f'Major Head {code[:3]}'})
+        minor, _ = MinorHead.objects.get_or_create(
+            code=code[:4], defaults={'name': f'Minor Head {code[:4]}', 'major': major}
+        )
+        nam_head = NAMHead.objects.create(
+            code=code, name=name, minor=minor, account_type=account_type, system_code=system_code
+        )
+        head = BudgetHead.objects.create(fund=fund, function=function, nam_head=nam_head)
+        if account_type == AccountType.EXPENDITURE:
+            chart.expenditure.append(head)
+        elif account_type == AccountType.REVENUE:
+            chart.revenue.append(head)
+        else:
+            name = {None: 'cash', 'AR': 'receivable', 'AP': 'payable', 'TAX_IT': 'income_tax'}[system_code]
+            setattr(chart, name, head)
+    return chart
+
+
+def create_poster():
+    """Provincial user that posts the test transactions."""
+    return get_user_model().objects.create_user(
+        cnic='10000-0000000-1', email='poster@example.com', password='pass'
+    )
+
+
+def create_tma(number: int, chart: SimpleNamespace) -> Organization:
+    """TMA number N in the test district, with one bank account."""
+    division, _ = Division.objects.get_or_create(name='Test Division', defaults={'code': 'TD'})
+    district, _ = District.objects.get_or_create(
+        name='Test District', defaults={'division': division, 'code': 'TD-D'}
+    )
+    tehsil, _ = Tehsil.objects.get_or_create(name='Test Tehsil', district=district, defaults={'code': 'TD-T'})
+    org = Organization.objects.create(name=f'Test TMA {number:03d}', ddo_code=f'TMA-{number:03d}', tehsil=tehsil)
+    BankAccount.objects.create(
+        organization=org, bank_name='National Bank of Pakistan', account_number=f'TMA-{number:03d}-0001',
+        title=f'{org.name} Local Fund', gl_code=chart.cash,
+    )
+    return org
+
+
+def _last_date(fiscal_year: FiscalYear) -> date:
+    """Transactions are dated up to today within the fiscal year."""
+    last = min(fiscal_year.end_date, timezone.now().date())
+    return last if last >= fiscal_year.start_date else fiscal_year.end_date
+
+
+def _day(fiscal_year: FiscalYear, offset: int) -> date:
+    """A date spread deterministically over the elapsed fiscal year."""
+    span = (_last_date(fiscal_year) - fiscal_year.start_date).days + 1
+    return fiscal_year.start_date + timedelta(days=offset % span)
+
+
+def create_revenue(org: Organization, fiscal_year: FiscalYear, chart: SimpleNamespace, user,
+                   demands: int = 10) -> List[RevenueDemand]:
+    """
+    Posted demands cycling POSTED / PARTIAL / PAID, with the collections
+    that put them in that status. One payer for every three demands.
+    """
+    number = int(org.ddo_code[-3:])
+    bank_account = BankAccount.objects.get(organization=org)
+    payers = [
+        Payer.objects.create(organization=org, name=f'Payer {index + 1:03d}', created_by=user)
+        for index in range(max(1, demands // 3))
+    ]
+
+    created = []
+    for index in range(demands):
+        issue_date = _day(fiscal_year, index * 11 + number)
+        demand = RevenueDemand.objects.create(
+            organization=org, fiscal_year=fiscal_year, payer=payers[index % len(payers)],
+            budget_head=chart.revenue[index % len(chart.revenue)],
+            challan_no=f'CH-{number:03d}-{index + 1:05d}', issue_date=issue_date,
+            due_date=issue_date + timedelta(days=30),
+            amount=Decimal(1000 + 250 * ((index * 7 + number * 3) % 40)),
+            period_description=f'Period {index + 1}', created_by=user,
+        )
+        demand.post(user)
+
+        status = DEMAND_CYCLE[index % len(DEMAND_CYCLE)]
+        if status != DemandStatus.POSTED:
+            received = demand.amount
+            if status == DemandStatus.PARTIAL:
+                received = (demand.amount * Decimal('0.40')).quantize(Decimal('0.01'))
+            collection = RevenueCollection.objects.create(
+                organization=org, demand=demand, bank_account=bank_account,
+                receipt_date=min(issue_date + timedelta(days=(index * 5) % 45), _last_date(fiscal_year)),
+                receipt_no=f'RCPT-{number:03d}-{index + 1:05d}', amount_received=received,
+                created_by=user,
+            )
+            collection.post(user)
+        created.append(demand)
+    return created
+
+
+def create_bills(org: Organization, fiscal_year: FiscalYear, chart: SimpleNamespace, user,
+                 bills: int = 4) -> List[Bill]:
+    """
+    Bills split over two expense heads with BillLines, taken through the
+    workflow to SUBMITTED / VERIFIED / APPROVED / PAID in turn. Approval
+    is charged to a released allocation of every expense head; PAID
+    bills are paid by cheque through Payment.post.
+    """
+    number = int(org.ddo_code[-3:])
+    bank_account = BankAccount.objects.get(organization=org)
+    payee = Payee.objects.create(organization=org, name=f'Supplier {number:03d}')
+    for head in chart.expenditure:
+        BudgetAllocation.objects.create(
+            organization=org, fiscal_year=fiscal_year, budget_head=head,
+            original_allocation=Decimal('5000000.00'), revised_allocation=Decimal('5000000.00'),
+            released_amount=Decimal('5000000.00'),
+        )
+
+    created = []
+    for index in range(bills):
+        gross = Decimal(20000 + 5000 * ((index * 3 + number) % 10))
+        bill = Bill.objects.create(
+            organization=org, fiscal_year=fiscal_year, payee=payee, fund=chart.fund,
+            bill_date=_day(fiscal_year, index * 13 + number), bill_number=f'BILL-{number:03d}-{index + 1:04d}',
+            description=f'Test bill {index + 1}', gross_amount=gross,
+            income_tax_amount=(gross * Decimal('0.045')).quantize(Decimal('0.01')), created_by=user,
+        )
+        first = (gross * Decimal('0.60')).quantize(Decimal('0.01'))
+        BillLine.objects.bulk_create([
+            BillLine(bill=bill, budget_head=chart.expenditure[index % len(chart.expenditure)],
+                     description='Goods', amount=first),
+            BillLine(bill=bill, budget_head=chart.expenditure[(index + 1) % len(chart.expenditure)],
+                     description='Services', amount=gross - first),
+        ])
+
+        status = BILL_CYCLE[index % len(BILL_CYCLE)]
+        bill.submit(user)
+        if status != BillStatus.SUBMITTED:
+            bill.pre_audit(user)
+            bill.verify(user)
+        if status in (BillStatus.APPROVED, BillStatus.PAID):
+            bill.approve(user)
+        if status == BillStatus.PAID:
+            payment = Payment.objects.create(
+                organization=org, bill=bill, bank_account=bank_account,
+                cheque_number=f'{number:03d}{index + 1:04d}', cheque_date=bill.bill_date,
+                amount=bill.net_amount, created_by=user,
+            )
+            payment.post(user)
+        created.append(bill)
+    return created
+
+
+def post_expenditure(org: Organization, fiscal_year: FiscalYear, chart: SimpleNamespace, user,
+                     amount: Decimal, day: date, head: Optional[BudgetHead] = None) -> Voucher:
+    """A posted payment voucher: Dr expense head, Cr bank."""
+    head = head or chart.expenditure[0]
+    bank_head = BankAccount.objects.get(organization=org).gl_code
+    count = Voucher.objects.filter(organization=org, fiscal_year=fiscal_year, voucher_no__startswith='PV-EXP-').count()
+    voucher = Voucher.objects.create(
+        organization=org, fiscal_year=fiscal_year, voucher_no=f'PV-EXP-{count + 1:04d}', date=day,
+        voucher_type=VoucherType.PAYMENT, fund=chart.fund, description=f'{head.name} expenditure',
+        created_by=user,
+    )
+    JournalEntry.objects.create(voucher=voucher, budget_head=head, description=head.name, debit=amount)
+    JournalEntry.objects.create(voucher=voucher, budget_head=bank_head, description='Bank', credit=amount)
+    voucher.post_voucher(user)
+    return voucher
+
+
+def create_tma_data(number: int, fiscal_year: FiscalYear, chart: SimpleNamespace, user,
+                    demands: int = 10, bills: int = 4, vouchers: int = 2) -> Organization:
+    """A TMA with posted revenue, bills and expenditure vouchers."""
+    org = create_tma(number, chart)
+    create_revenue(org, fiscal_year, chart, user, demands)
+    create_bills(org, fiscal_year, chart, user, bills)
+    for index in range(vouchers):
+        post_expenditure(
+            org, fiscal_year, chart, user, Decimal(15000 * number * (index + 1)),
+            _day(fiscal_year, index * 17 + number), chart.expenditure[index % len(chart.expenditure)],
+        )
+    return org
+
+
+class TmaTestDataMixin:
+    """
+    setUpTestData for TestCases that need posted transactions in TMAs.
+
+    Builds the fiscal year, the chart, a posting user and `tma_count`
+    TMAs once per class. On-commit callbacks run as if each workflow had
+    committed, so audit rows and cached counters behave as in production.
+    A TransactionTestCase calls create_test_data() from setUp instead.
+
+    Attributes set: fiscal_year, chart, poster, orgs and org (the first).
+    """
+
+    fiscal_year_name: Optional[str] = '2024-25'
+    tma_count = 1
+    demand_count = 10
+    bill_count = 4
+    voucher_count = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.create_test_data()
+
+    @classmethod
+    def create_test_data(cls):
+        cls.fiscal_year = create_fiscal_year(cls.fiscal_year_name)
+        cls.chart = create_chart()
+        cls.poster = create_poster()
+        cls.orgs = [
+            create_tma_data(number, cls.fiscal_year, cls.chart, cls.poster,
+                            cls.demand_count, cls.bill_count, cls.voucher_count)
+            for number in range(1, cls.tma_count + 1)
+        ]
+        cls.org = cls.orgs[0]
@@ -0,0 +1,126 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the field-change tracker and the buffered
+             audit-trail writer.
+-------------------------------------------------------------------------
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.audit import AuditWriter
+from apps.core.testing import TmaTestDataMixin
+from apps.finance.models import Voucher, VoucherAuditLog
+from apps.revenue.models import RevenueDemand
+
+
+class FieldTrackerTests(TmaTestDataMixin, TestCase):
+    """Loaded values are remembered without another query."""
+
+    demand_count = 5
+    bill_count = 0
+
+    def test_changes_since_load_and_save(self):
+        demand = RevenueDemand.objects.filter(organization=self.org).first()
+        self.assertEqual(demand.get_field_changes(), {})
+
+        old_due = demand.due_date
+        demand.due_date = old_due + timedelta(days=10)
+        self.assertEqual(demand.get_field_changes(), {'due_date': (old_due, demand.due_date)})
+        self.assertEqual(demand.get_field_changes(update_fields=['status']), {})
+
+        demand.save()
+        self.assertEqual(demand.get_field_changes(), {})
+        self.assertEqual(demand.get_loaded_value('due_date'), old_due + timedelta(days=10))
+
+        # Fields left out of update_fields keep their loaded value
+        demand.due_date = old_due
+        demand.save(update_fields=['description', 'updated_at'])
+        self.assertIn('due_date', demand.get_field_changes())
+        demand.refresh_from_db()
+        self.assertEqual(demand.get_field_changes(), {})
+
+    def test_deferred_fields_are_not_reported(self):
+        demand = RevenueDemand.objects.only('id', 'status').filter(organization=self.org).first()
+        self.assertIsNone(demand.get_loaded_value('amount'))
+        self.assertEqual(demand.get_field_changes(), {})
+
+    def test_save_does_not_reread_the_row(self):
+        demand = RevenueDemand.objects.filter(organization=self.org).first()
+        demand.description = 'Updated'
+        with CaptureQueriesContext(connection) as queries:
+            demand.save()
+        table = RevenueDemand._meta.db_table
+        self.assertFalse([
+            q['sql'] for q in queries
+            if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']
+        ])
+
+
+class AuditWriterTests(TmaTestDataMixin, TestCase):
+    """Audit rows are inserted in bulk when the transaction commits."""
+
+    demand_count = 1
+    bill_count = 0
+    voucher_count = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.vouchers = list(Voucher.objects.filter(voucher_no__startswith='PV-EXP-'))
+
+    def log(self, voucher, reason=''):
+        return VoucherAuditLog(voucher=voucher, voucher_no=voucher.voucher_no, action='EDIT', reason=reason)
+
+    def test_entries_wait_for_commit_and_insert_once(self):
+        VoucherAuditLog.objects.all().delete()
+        with self.captureOnCommitCallbacks() as callbacks:
+            for voucher in self.vouchers:
+                AuditWriter.add(self.log(voucher))
+            self.assertFalse(VoucherAuditLog.objects.exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+        inserts = [q for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(VoucherAuditLog.objects.count(), len(self.vouchers))
+
+    def test_rolled_back_savepoint_entries_are_dropped(self):
+        VoucherAuditLog.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            AuditWriter.add(self.log(self.vouchers[0], 'kept'))
+            try:
+                with transaction.atomic():
+                    AuditWriter.add(self.log(self.vouchers[1], 'rolled back'))
+                    raise ValueError
+            except ValueError:
+                pass
+            with transaction.atomic():
+                AuditWriter.add(self.log(self.vouchers[2], 'released'))
+
+        self.assertEqual(
+            sorted(VoucherAuditLog.objects.values_list('reason', flat=True)), ['kept', 'released']
+        )
+
+        # A new transaction starts a new buffer
+        with self.captureOnCommitCallbacks(execute=True):
+            AuditWriter.add(self.log(self.vouchers[0], 'next'))
+        self.assertEqual(VoucherAuditLog.objects.count(), 3)
+
+    def test_post_and_edit_are_logged(self):
+        voucher = self.vouchers[0]
+        self.assertEqual(list(voucher.audit_logs.values_list('action', flat=True)), ['POST'])
+        with self.captureOnCommitCallbacks(execute=True):
+            voucher.description = 'Corrected narration'
+            voucher.save()
+        self.assertEqual(
+            list(voucher.audit_logs.filter(action='EDIT').values_list('action', 'reason')),
+            [('EDIT', 'Changed: description')]
+        )
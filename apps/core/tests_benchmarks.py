@@ -0,0 +1,134 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the load dataset generator and benchmark runner.
+-------------------------------------------------------------------------
+"""
+import json
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from apps.budgeting.models import FiscalYear
+from apps.core.models import Organization
+from apps.finance.models import AccountBalance, BankStatementLine, JournalEntry, Voucher
+from apps.revenue.models import RevenueDemand
+
+
+class GenerateLoadDatasetTests(TestCase):
+    """Small, deterministic dataset generation."""
+
+    def setUp(self):
+        self.fy = FiscalYear.objects.create(
+            year_name='2024-25', start_date=date(2024, 7, 1), end_date=date(2025, 6, 30)
+        )
+
+    def _generate(self, **options):
+        defaults = {'tmas': 2, 'vouchers': 20, 'lines': 3, 'demands': 10,
+                    'bills': 5, 'properties': 4, 'fiscal_year': '2024-25'}
+        defaults.update(options)
+        call_command('generate_load_dataset', stdout=StringIO(), **defaults)
+
+    def test_generates_balanced_posted_vouchers(self):
+        self._generate()
+
+        orgs = Organization.objects.filter(ddo_code__startswith='LOAD-')
+        self.assertEqual(orgs.count(), 2)
+        self.assertEqual(Voucher.objects.filter(organization__in=orgs, is_posted=True).count(), 40)
+        self.assertEqual(JournalEntry.objects.filter(voucher__organization__in=orgs).count(), 120)
+        self.assertEqual(RevenueDemand.objects.filter(organization__in=orgs).count(), 20)
+
+        totals = JournalEntry.objects.filter(fiscal_year=self.fy).aggregate(
+            dr=Sum('debit'), cr=Sum('credit')
+        )
+        self.assertEqual(totals['dr'], totals['cr'])
+
+    def test_account_balances_match_journal(self):
+        self._generate(tmas=1)
+        balances = AccountBalance.objects.aggregate(dr=Sum('total_debit'), cr=Sum('total_credit'))
+        journal = JournalEntry.objects.aggregate(dr=Sum('debit'), cr=Sum('credit'))
+        self.assertEqual(balances['dr'], journal['dr'])
+        self.assertEqual(balances['cr'], journal['cr'])
+
+    def test_same_seed_produces_same_data(self):
+        self._generate(tmas=1)
+        first = list(Voucher.objects.order_by('voucher_no').values_list('public_id', 'date'))
+        first_total = JournalEntry.objects.aggregate(total=Sum('debit'))['total']
+
+        call_command('generate_load_dataset', clear=True, stdout=StringIO())
+        self.assertFalse(Voucher.objects.exists())
+
+        self._generate(tmas=1)
+        second = list(Voucher.objects.order_by('voucher_no').values_list('public_id', 'date'))
+        self.assertEqual(first, second)
+        self.assertEqual(JournalEntry.objects.aggregate(total=Sum('debit'))['total'], first_total)
+
+    def test_statement_lines_mirror_cleared_cheques(self):
+        self._generate(tmas=1, vouchers=60)
+        self.assertTrue(BankStatementLine.objects.exists())
+        matchable = BankStatementLine.objects.exclude(description='BANK CHARGES')
+        for line in matchable:
+            self.assertTrue(JournalEntry.objects.filter(instrument_no=line.ref_no).exists())
+
+
+class RunBenchmarksTests(TestCase):
+    """The benchmark runner writes comparable JSON results."""
+
+    def setUp(self):
+        FiscalYear.objects.create(
+            year_name='2024-25', start_date=date(2024, 7, 1), end_date=date(2025, 6, 30)
+        )
+        call_command(
+            'generate_load_dataset', tmas=1, vouchers=20, lines=3, demands=5, bills=5,
+            properties=2, fiscal_year='2024-25', stdout=StringIO(),
+        )
+        handle, self.output = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, self.output)
+
+    def _run(self, *only, **options):
+        call_command(
+            'run_benchmarks', '--only', *only, fiscal_year='2024-25', repeat=2, warmup=0,
+            posting_batch=3, output=self.output, stdout=StringIO(), stderr=StringIO(), **options
+        )
+        with open(self.output) as handle:
+            return json.load(handle)
+
+    def test_results_are_written_as_json(self):
+        report = self._run('trial_balance', 'voucher_posting', 'reconciliation')
+
+        self.assertEqual(report['meta']['organization'], 'LOAD-001')
+        self.assertEqual(report['meta']['dataset']['vouchers'], 20)
+        for name in ('trial_balance', 'voucher_posting', 'reconciliation'):
+            result = report['benchmarks'][name]
+            self.assertNotIn('error', result, result.get('error'))
+            self.assertEqual(result['runs'], 2)
+            self.assertLessEqual(result['min_ms'], result['max_ms'])
+        self.assertIn('vouchers_per_second', report['benchmarks']['voucher_posting'])
+
+    def test_posting_and_reconciliation_leave_data_unchanged(self):
+        vouchers = Voucher.objects.count()
+        reconciled = BankStatementLine.objects.filter(is_reconciled=True).count()
+        self._run('voucher_posting', 'reconciliation')
+        self.assertEqual(Voucher.objects.count(), vouchers)
+        self.assertEqual(BankStatementLine.objects.filter(is_reconciled=True).count(), reconciled)
+
+    def test_compare_flags_regressions(self):
+        baseline = self._run('trial_balance')
+        baseline['benchmarks']['trial_balance']['median_ms'] = Decimal('0.001')
+        baseline_path = self.output + '.baseline'
+        with open(baseline_path, 'w') as handle:
+            json.dump(baseline, handle, default=float)
+        self.addCleanup(os.remove, baseline_path)
+
+        with self.assertRaisesMessage(Exception, 'Performance regression in: trial_balance'):
+            self._run('trial_balance', compare=baseline_path, fail_on_regression=True)
@@ -0,0 +1,114 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the cached sidebar and notification badge counters.
+-------------------------------------------------------------------------
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from apps.core.context_processors import notifications, sidebar_counts
+from apps.core.counters import CounterService
+from apps.core.models import Notification
+from apps.core.services import NotificationService
+from apps.core.testing import TmaTestDataMixin
+from apps.expenditure.models import Bill, BillStatus
+from apps.revenue.models import DemandStatus, RevenueDemand
+
+
+class CounterServiceTests(TmaTestDataMixin, TestCase):
+    """Badge counters are cached, event-maintained and recomputable."""
+
+    bill_count = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_user(
+            cnic='77777-7777777-7', email='counters@example.com', password='pass',
+            organization=cls.org,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _render_counts(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        return {**notifications(request), **sidebar_counts(request)}
+
+    def _expected(self):
+        return {
+            'unread_count': Notification.objects.filter(recipient=self.user, is_read=False).count(),
+            'pending_bills_count': Bill.objects.filter(
+                organization=self.org, status=BillStatus.SUBMITTED
+            ).count(),
+            'overdue_demands_count': RevenueDemand.objects.filter(
+                organization=self.org,
+                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
+                due_date__lt=timezone.now().date(),
+            ).count(),
+        }
+
+    def test_context_processors_read_cache_without_queries(self):
+        self.assertEqual(self._render_counts(), self._expected())
+
+        with self.assertNumQueries(0):
+            counts = self._render_counts()
+        self.assertEqual(counts, self._expected())
+
+    def test_notification_events_adjust_unread_count(self):
+        self._render_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = NotificationService.send_notification(self.user, 'Bill pending', 'Review')
+            NotificationService.send_notification(self.user, 'Bill pending', 'Review')
+        self.assertEqual(self._render_counts()['unread_count'], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.mark_as_read()
+        self.assertEqual(self._render_counts()['unread_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationService.mark_all_as_read(self.user)
+        self.assertEqual(self._render_counts()['unread_count'], 0)
+
+    def test_bill_and_demand_transitions_adjust_org_counts(self):
+        before = self._render_counts()
+        bill = Bill.objects.filter(organization=self.org).exclude(status=BillStatus.SUBMITTED).first()
+        Bill.objects.filter(pk=bill.pk).update(status=BillStatus.DRAFT)
+        bill.refresh_from_db()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bill.submit(self.user)
+        self.assertEqual(self._render_counts()['pending_bills_count'],
+                         before['pending_bills_count'] + 1)
+
+        demand = RevenueDemand.objects.filter(
+            organization=self.org, status=DemandStatus.POSTED, due_date__lt=timezone.now().date()
+        ).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            demand.due_date = timezone.now().date() + timedelta(days=30)
+            demand.save()
+        counts = self._render_counts()
+        self.assertEqual(counts['overdue_demands_count'], before['overdue_demands_count'] - 1)
+        self.assertEqual(counts, self._expected())
+
+    def test_recompute_corrects_drift(self):
+        self._render_counts()
+        cache.set(CounterService.pending_bills_key(self.org.id), 99)
+
+        call_command('recompute_counters', stdout=StringIO())
+
+        with self.assertNumQueries(0):
+            counts = self._render_counts()
+        self.assertEqual(counts, self._expected())
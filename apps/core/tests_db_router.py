@@ -0,0 +1,150 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Unit tests for the reporting read-replica router.
+-------------------------------------------------------------------------
+"""
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.core import db_routers
+from apps.core.db_routers import (
+    LAST_WRITE_SESSION_KEY, REPORTING_DB_ALIAS,
+    ReadYourWritesMiddleware, ReportingRouter,
+    reporting_database, should_use_reporting_db,
+)
+from apps.core.models import Division
+
+
+HAS_REPORTING_DB = REPORTING_DB_ALIAS in settings.DATABASES
+
+
+class FakeSession(dict):
+    """Minimal dict-backed stand-in for request.session."""
+
+
+@override_settings(REPORTING_DB_MAX_LAG_SECONDS=30, REPORTING_DB_READ_YOUR_WRITES_SECONDS=60)
+class ReportingRouterDecisionTests(SimpleTestCase):
+    """Routing decisions with the replica alias and lag check patched."""
+
+    def setUp(self):
+        self.router = ReportingRouter()
+        self.request = RequestFactory().get('/reports/')
+        self.request.session = FakeSession()
+
+        patcher = mock.patch.object(db_routers, 'reporting_alias_configured', return_value=True)
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+        self.lag = mock.patch.object(db_routers, 'replica_lag_seconds', return_value=0.5)
+        self.addCleanup(self.lag.stop)
+        self.lag.start()
+
+    def test_reads_outside_scope_use_default_routing(self):
+        self.assertIsNone(self.router.db_for_read(Division))
+
+    def test_reads_inside_scope_use_replica(self):
+        with reporting_database(self.request):
+            self.assertEqual(self.router.db_for_read(Division), REPORTING_DB_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Division))
+
+    def test_writes_always_use_primary(self):
+        with reporting_database(self.request):
+            self.assertEqual(self.router.db_for_write(Division), 'default')
+
+    def test_no_migrations_on_replica(self):
+        self.assertFalse(self.router.allow_migrate(REPORTING_DB_ALIAS, 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+    def test_recent_write_keeps_session_on_primary(self):
+        self.request.session[LAST_WRITE_SESSION_KEY] = time.time()
+        self.assertFalse(should_use_reporting_db(self.request))
+
+    def test_expired_write_window_allows_replica(self):
+        self.request.session[LAST_WRITE_SESSION_KEY] = time.time() - 120
+        self.assertTrue(should_use_reporting_db(self.request))
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.lag.stop()
+        with mock.patch.object(db_routers, 'replica_lag_seconds', return_value=45.0):
+            self.assertFalse(should_use_reporting_db(self.request))
+        self.lag.start()
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        self.lag.stop()
+        with mock.patch.object(db_routers, 'replica_lag_seconds', return_value=None):
+            self.assertFalse(should_use_reporting_db(self.request))
+        self.lag.start()
+
+    def test_scope_sets_and_clears_replica_organization(self):
+        replica = object()
+        self.request.user = mock.Mock(is_authenticated=True, organization_id=7)
+        with mock.patch.object(db_routers, 'connections', {REPORTING_DB_ALIAS: replica}), \
+                mock.patch('apps.core.middleware.set_rls_organization') as set_organization, \
+                mock.patch('apps.core.middleware.clear_rls_organization') as clear_organization:
+            with reporting_database(self.request):
+                set_organization.assert_called_once_with(7, replica)
+                with reporting_database(self.request):
+                    pass
+                clear_organization.assert_not_called()
+            clear_organization.assert_called_once_with(replica)
+
+            # Oversight users see every organization, as on the primary
+            self.request.user.organization_id = None
+            with reporting_database(self.request):
+                set_organization.assert_called_with(0, replica)
+
+    def test_primary_fallback_leaves_replica_organization_alone(self):
+        self.request.user = mock.Mock(is_authenticated=True, organization_id=7)
+        self.request.session[LAST_WRITE_SESSION_KEY] = time.time()
+        with mock.patch('apps.core.middleware.set_rls_organization') as set_organization:
+            with reporting_database(self.request):
+                pass
+        set_organization.assert_not_called()
+
+    def test_write_request_marks_session(self):
+        request = RequestFactory().post('/finance/vouchers/1/post/')
+        request.session = FakeSession()
+        ReadYourWritesMiddleware(lambda r: HttpResponse(status=302))(request)
+        self.assertIn(LAST_WRITE_SESSION_KEY, request.session)
+
+    def test_read_and_failed_requests_do_not_mark_session(self):
+        for request, status in (
+            (RequestFactory().get('/reports/'), 200),
+            (RequestFactory().post('/finance/vouchers/1/post/'), 400),
+        ):
+            request.session = FakeSession()
+            ReadYourWritesMiddleware(lambda r, s=status: HttpResponse(status=s))(request)
+            self.assertNotIn(LAST_WRITE_SESSION_KEY, request.session)
+
+
+class ReportingRouterUnconfiguredTests(SimpleTestCase):
+    """Without a replica alias everything stays on the primary."""
+
+    def test_scope_is_noop_without_alias(self):
+        with mock.patch.object(db_routers, 'reporting_alias_configured', return_value=False):
+            with reporting_database():
+                self.assertIsNone(ReportingRouter().db_for_read(Division))
+
+
+@skipUnless(HAS_REPORTING_DB, 'No reporting database configured')
+class ReportingDatabaseIntegrationTests(TestCase):
+    """Queries inside a reporting scope hit the replica connection."""
+
+    databases = {'default', REPORTING_DB_ALIAS} if HAS_REPORTING_DB else {'default'}
+
+    def test_queries_are_sent_to_replica(self):
+        with mock.patch.object(db_routers, 'replica_lag_seconds', return_value=0.0):
+            with CaptureQueriesContext(connections[REPORTING_DB_ALIAS]) as replica_queries:
+                with reporting_database():
+                    list(Division.objects.all())
+        self.assertEqual(len(replica_queries), 1)
@@ -0,0 +1,93 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Unit tests for per-request query/latency instrumentation.
+-------------------------------------------------------------------------
+"""
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import ResolverMatch
+
+from apps.core.instrumentation import (
+    RequestInstrumentationMiddleware, get_view_stats, normalize_sql,
+    reset_view_stats, sql_fingerprint,
+)
+from apps.core.models import Division
+
+
+def _n_plus_one_view(request):
+    """Issue one query per division, the classic N+1 pattern."""
+    for pk in (1, 2, 3):
+        Division.objects.filter(pk=pk).first()
+    return HttpResponse('ok')
+
+
+class SqlFingerprintTests(SimpleTestCase):
+    """Queries of the same shape share a fingerprint."""
+
+    def test_literals_are_normalized(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 5 AND name = 'x'"),
+            "SELECT * FROM t WHERE id = ? AND name = ?",
+        )
+
+    def test_in_lists_of_any_length_match(self):
+        self.assertEqual(
+            sql_fingerprint('SELECT * FROM t WHERE id IN (%s, %s)'),
+            sql_fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+
+class RequestInstrumentationMiddlewareTests(TestCase):
+    """Middleware records per-view stats and enforces query budgets."""
+
+    def setUp(self):
+        reset_view_stats()
+        self.addCleanup(reset_view_stats)
+        self.middleware = RequestInstrumentationMiddleware(self._get_response)
+
+    def _get_response(self, request):
+        request.resolver_match = ResolverMatch(
+            _n_plus_one_view, (), {}, url_name='n_plus_one', namespaces=['tests']
+        )
+        return _n_plus_one_view(request)
+
+    def test_profile_line_reports_queries_and_duplicates(self):
+        with self.assertLogs('apps.core.instrumentation', level='INFO') as logs:
+            self.middleware(RequestFactory().get('/n-plus-one/'))
+
+        payload = json.loads(logs.records[0].getMessage().split(' ', 1)[1])
+        self.assertEqual(payload['view'], 'tests:n_plus_one')
+        self.assertEqual(payload['queries'], 3)
+        self.assertEqual(payload['duplicate_queries'], 2)
+        self.assertEqual(payload['top_duplicates'][0]['count'], 3)
+
+    def test_stats_are_accumulated_per_view(self):
+        with self.assertLogs('apps.core.instrumentation', level='INFO'):
+            self.middleware(RequestFactory().get('/n-plus-one/'))
+            self.middleware(RequestFactory().get('/n-plus-one/'))
+
+        stats = get_view_stats()['tests:n_plus_one']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['queries']['sum'], 6)
+        self.assertEqual(stats['latency_ms']['count'], 2)
+
+    @override_settings(QUERY_BUDGETS={'tests:n_plus_one': 2})
+    def test_budget_exceeded_logs_warning(self):
+        with self.assertLogs('apps.core.instrumentation', level='WARNING') as logs:
+            self.middleware(RequestFactory().get('/n-plus-one/'))
+
+        self.assertIn('Query budget exceeded for tests:n_plus_one', logs.output[0])
+        self.assertEqual(get_view_stats()['tests:n_plus_one']['budget_exceeded'], 1)
+
+    @override_settings(QUERY_BUDGETS={'*': 10})
+    def test_within_default_budget_no_warning(self):
+        with self.assertLogs('apps.core.instrumentation', level='INFO') as logs:
+            self.middleware(RequestFactory().get('/n-plus-one/'))
+
+        self.assertFalse([r for r in logs.records if r.levelname == 'WARNING'])
@@ -0,0 +1,154 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Unit tests for the metrics registry and /metrics endpoint.
+-------------------------------------------------------------------------
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from apps.core.instrumentation import record_request
+from apps.core.metrics import (
+    HTTP_REQUEST_SECONDS, Counter, Gauge, Histogram, MetricsRegistry, generate_latest,
+)
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    """Metric types and the text exposition format."""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_with_labels(self):
+        posts = Counter('test_posts_total', 'Posts.', ['kind'], registry=self.registry)
+        posts.inc(kind='JV')
+        posts.inc(2, kind='JV')
+        self.assertEqual(posts.get(kind='JV'), 3)
+        self.assertIn('test_posts_total{kind="JV"} 3', generate_latest(self.registry))
+
+    def test_counter_rejects_negative_and_wrong_labels(self):
+        posts = Counter('test_posts_total', 'Posts.', ['kind'], registry=self.registry)
+        with self.assertRaises(ValueError):
+            posts.inc(-1, kind='JV')
+        with self.assertRaises(ValueError):
+            posts.inc(type='JV')
+
+    def test_duplicate_registration_is_rejected(self):
+        Counter('test_dup_total', 'Dup.', registry=self.registry)
+        with self.assertRaises(ValueError):
+            Counter('test_dup_total', 'Dup.', registry=self.registry)
+
+    def test_histogram_buckets_are_cumulative(self):
+        latency = Histogram('test_seconds', 'Latency.', buckets=(0.1, 1), registry=self.registry)
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        output = generate_latest(self.registry)
+        self.assertIn('# TYPE test_seconds histogram', output)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', output)
+        self.assertIn('test_seconds_bucket{le="1"} 2', output)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', output)
+        self.assertIn('test_seconds_sum 5.55', output)
+        self.assertIn('test_seconds_count 3', output)
+        # Buckets are rendered in ascending order
+        self.assertLess(output.index('le="0.1"'), output.index('le="+Inf"'))
+
+    def test_gauge_tracks_in_progress(self):
+        active = Gauge('test_active', 'Active.', registry=self.registry)
+        with active.track_inprogress():
+            self.assertEqual(active.get(), 1)
+        self.assertEqual(active.get(), 0)
+
+    def test_label_values_are_escaped(self):
+        posts = Counter('test_posts_total', 'Posts.', ['kind'], registry=self.registry)
+        posts.inc(kind='a"b\\c')
+        self.assertIn('kind="a\\"b\\\\c"', generate_latest(self.registry))
+
+
+class MetricsMultiprocessTests(SimpleTestCase):
+    """Values of all worker processes are merged from the shared directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.registry = MetricsRegistry()
+        self.posts = Counter('test_posts_total', 'Posts.', ['kind'], registry=self.registry)
+        self.peak = Gauge('test_peak', 'Peak.', registry=self.registry, multiprocess_mode='max')
+
+    def _write_other_worker(self, values):
+        with open(os.path.join(self.directory, 'metrics_99999_1.json'), 'w') as handle:
+            json.dump({
+                'metrics': {
+                    'test_posts_total': ['counter', 'Posts.', 'sum'],
+                    'test_peak': ['gauge', 'Peak.', 'max'],
+                },
+                'values': values,
+            }, handle)
+
+    def test_counters_are_summed_and_gauges_use_mode(self):
+        self._write_other_worker([
+            ['test_posts_total', '', [['kind', 'JV']], 4],
+            ['test_peak', '', [], 10],
+        ])
+        with override_settings(METRICS_MULTIPROC_DIR=self.directory):
+            self.posts.inc(kind='JV')
+            self.peak.set(3)
+            output = generate_latest(self.registry)
+
+        self.assertIn('test_posts_total{kind="JV"} 5', output)
+        self.assertIn('test_peak 10', output)
+
+    def test_flush_writes_process_file(self):
+        with override_settings(METRICS_MULTIPROC_DIR=self.directory):
+            self.posts.inc(kind='JV')
+            self.registry.flush()
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_unreadable_file_is_skipped(self):
+        with open(os.path.join(self.directory, 'metrics_1_1.json'), 'w') as handle:
+            handle.write('{not json')
+        with override_settings(METRICS_MULTIPROC_DIR=self.directory):
+            self.posts.inc(kind='JV')
+            with self.assertLogs('apps.core.metrics', level='WARNING'):
+                output = generate_latest(self.registry)
+        self.assertIn('test_posts_total{kind="JV"} 1', output)
+
+
+class MetricsViewTests(TestCase):
+    """The endpoint is restricted to superusers."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.superuser = User.objects.create_superuser(
+            cnic='11111-1111111-1', email='admin@example.com', password='pass'
+        )
+        self.user = User.objects.create_user(
+            cnic='22222-2222222-2', email='user@example.com', password='pass'
+        )
+
+    def test_superuser_gets_exposition(self):
+        record_request('tests:metrics', 12.0, 3, 1.0, False)
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('cfms_http_request_duration_seconds_count{view="tests:metrics"}',
+                      response.content.decode())
+        self.assertGreaterEqual(HTTP_REQUEST_SECONDS.get('_count', view='tests:metrics'), 1)
+
+    def test_regular_user_is_forbidden(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_anonymous_user_is_redirected(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
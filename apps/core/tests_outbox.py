@@ -0,0 +1,91 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the transactional email outbox and its dispatcher.
+-------------------------------------------------------------------------
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.core.models import EmailOutbox, EmailStatus
+from apps.core.outbox import EmailOutboxService
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connections and rejects @fail.test addresses."""
+
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(address.endswith('@fail.test') for address in message.to):
+                raise ConnectionError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='apps.core.tests_outbox.CountingBackend',
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_RETRY_DELAY=60,
+)
+class EmailOutboxTests(TestCase):
+    """Emails are queued transactionally and sent in batches with retries."""
+
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_enqueue_rolls_back_with_transaction(self):
+        try:
+            with transaction.atomic():
+                EmailOutboxService.enqueue('Demand', 'Body', ['payer@example.com'])
+                raise RuntimeError('demand save failed')
+        except RuntimeError:
+            pass
+
+        self.assertFalse(EmailOutbox.objects.exists())
+        self.assertIsNone(EmailOutboxService.enqueue('Demand', 'Body', ['']))
+
+    def test_dispatch_sends_batch_over_one_connection(self):
+        for i in range(3):
+            EmailOutboxService.enqueue(f'Receipt {i}', 'Body', [f'payer{i}@example.com'])
+
+        result = EmailOutboxService.dispatch(batch_size=2)
+        self.assertEqual(result, {'sent': 2, 'retried': 0, 'failed': 0})
+        self.assertEqual(CountingBackend.opened, 1)
+
+        call_command('dispatch_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailStatus.SENT).exists())
+
+    def test_failed_email_backs_off_then_gives_up(self):
+        email = EmailOutboxService.enqueue('Overdue', 'Body', ['payer@fail.test'])
+
+        self.assertEqual(EmailOutboxService.dispatch()['retried'], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailStatus.PENDING)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('550', email.last_error)
+
+        # Not due yet
+        self.assertEqual(EmailOutboxService.dispatch(), {'sent': 0, 'retried': 0, 'failed': 0})
+
+        EmailOutbox.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(EmailOutboxService.dispatch()['failed'], 1)
+        email.refresh_from_db()
+        self.assertEqual(email.status, EmailStatus.FAILED)
+        self.assertEqual(email.attempts, 2)
+        self.assertEqual(mail.outbox, [])
@@ -0,0 +1,263 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Unit tests for the connection-aware RLS session variable
+             set by TenantMiddleware.
+-------------------------------------------------------------------------
+"""
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import path
+from django.views.generic import ListView
+
+from apps.core.middleware import (
+    TenantMiddleware, _set_rls_at_transaction_start, clear_rls_organization, set_rls_organization
+)
+from apps.core.models import Organization
+from apps.revenue.models import Payer
+
+
+class UnfilteredPayerListView(ListView):
+    """Lists every payer; only RLS keeps other organizations out."""
+
+    queryset = Payer.objects.order_by('name')
+
+    def render_to_response(self, context, **response_kwargs):
+        # Rendered lazily, after the view returns
+        template = engines['django'].from_string(
+            '{% for payer in object_list %}{{ payer.name }};{% endfor %}'
+        )
+        return self.response_class(self.request, template, context)
+
+
+urlpatterns = [path('rls-payers/', UnfilteredPayerListView.as_view())]
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql, params):
+        if self.connection.fail:
+            raise DatabaseError('unrecognized configuration parameter')
+        self.connection.executed.append((sql, params))
+
+
+class FakeConnection:
+    """A PostgreSQL-like connection recording executed statements."""
+
+    vendor = 'postgresql'
+
+    def __init__(self):
+        self.in_atomic_block = False
+        self.fail = False
+        self.executed = []
+        self.execute_wrappers = []
+        self.run_on_commit = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def on_commit(self, func, robust=False):
+        self.run_on_commit.append((set(), func, robust))
+
+    def rollback(self):
+        self.run_on_commit = []
+
+    def query(self):
+        """Run a statement through the transaction-start wrapper."""
+        return _set_rls_at_transaction_start(
+            lambda *args: 'result', 'SELECT 1', None, False, {'connection': self}
+        )
+
+
+class SetRlsOrganizationTests(SimpleTestCase):
+    """The variable is only sent when the connection's value changes."""
+
+    def setUp(self):
+        self.connection = FakeConnection()
+        connection_created.send(sender=FakeConnection, connection=self.connection)
+
+    def test_redundant_set_is_skipped_on_reused_connection(self):
+        self.assertTrue(set_rls_organization(5, self.connection))
+        self.assertFalse(set_rls_organization(5, self.connection))
+        self.assertTrue(set_rls_organization(7, self.connection))
+        self.assertTrue(set_rls_organization(5, self.connection))
+
+        self.assertEqual([params[0] for _, params in self.connection.executed], ['5', '7', '5'])
+        self.assertTrue(all(params[1] is False for _, params in self.connection.executed))
+
+    def test_new_connection_is_set_again(self):
+        set_rls_organization(5, self.connection)
+        connection_created.send(sender=FakeConnection, connection=self.connection)
+
+        self.assertTrue(set_rls_organization(5, self.connection))
+
+    def test_transaction_uses_local_value_and_keeps_session_value(self):
+        set_rls_organization(5, self.connection)
+        self.connection.in_atomic_block = True
+
+        self.assertTrue(set_rls_organization(7, self.connection))
+        self.assertEqual(self.connection.executed[-1][1], ['7', True])
+
+        self.connection.in_atomic_block = False
+        self.assertFalse(set_rls_organization(5, self.connection))
+
+    @override_settings(DATABASE_TRANSACTION_POOLING=True)
+    def test_transaction_pooling_sets_local_value_every_time(self):
+        self.assertFalse(set_rls_organization(5, self.connection))
+
+        self.connection.in_atomic_block = True
+        self.assertTrue(set_rls_organization(5, self.connection))
+        self.assertTrue(set_rls_organization(5, self.connection))
+        self.assertEqual(len(self.connection.executed), 2)
+
+    @override_settings(DATABASE_TRANSACTION_POOLING=True)
+    def test_transaction_pooling_sets_value_at_transaction_start(self):
+        self.assertFalse(set_rls_organization(5, self.connection))
+        self.assertFalse(set_rls_organization(5, self.connection))
+        self.assertEqual(self.connection.execute_wrappers, [_set_rls_at_transaction_start])
+
+        self.assertEqual(self.connection.query(), 'result')
+        self.assertEqual(self.connection.executed, [])
+
+        self.connection.in_atomic_block = True
+        self.connection.query()
+        self.connection.query()
+        self.assertEqual(self.connection.executed[-1][1], ['5', True])
+        self.assertEqual(len(self.connection.executed), 1)
+
+        # The next transaction sets it again
+        self.connection.rollback()
+        self.connection.query()
+        self.assertEqual(len(self.connection.executed), 2)
+
+    def test_clear_unsets_value_once(self):
+        set_rls_organization(5, self.connection)
+        clear_rls_organization(self.connection)
+        clear_rls_organization(self.connection)
+
+        self.assertEqual(len(self.connection.executed), 2)
+        self.assertEqual(self.connection.executed[-1][1], ['', False])
+        self.assertTrue(set_rls_organization(5, self.connection))
+
+    def test_failure_is_logged_and_not_remembered(self):
+        self.connection.fail = True
+        with self.assertLogs('apps.core.middleware', level='WARNING'):
+            self.assertFalse(set_rls_organization(5, self.connection))
+
+        self.connection.fail = False
+        self.assertTrue(set_rls_organization(5, self.connection))
+
+    def test_other_databases_are_skipped(self):
+        self.connection.vendor = 'sqlite'
+        self.assertFalse(set_rls_organization(5, self.connection))
+        self.assertEqual(self.connection.executed, [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'RLS session variables require PostgreSQL')
+class TenantMiddlewareConnectionReuseTests(TransactionTestCase):
+    """Requests of different organizations on one persistent connection."""
+
+    def _current_org_id(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('app.current_org_id', true)")
+            return cursor.fetchone()[0]
+
+    def _request_as(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        TenantMiddleware(lambda request: None).process_request(request)
+        return request
+
+    def test_each_request_sees_its_own_organization(self):
+        first = Organization.objects.create(name='First TMA', org_type='TMA')
+        second = Organization.objects.create(name='Second TMA', org_type='TMA')
+        User = get_user_model()
+        first_user = User.objects.create_user(
+            cnic='88888-8888888-1', email='first@example.com', password='pass', organization=first
+        )
+        second_user = User.objects.create_user(
+            cnic='88888-8888888-2', email='second@example.com', password='pass', organization=second
+        )
+        oversight = User.objects.create_user(
+            cnic='88888-8888888-3', email='lcb@example.com', password='pass'
+        )
+
+        for user, expected in [(first_user, first.id), (second_user, second.id),
+                               (first_user, first.id), (first_user, first.id),
+                               (oversight, 0)]:
+            self._request_as(user)
+            self.assertEqual(self._current_org_id(), str(expected))
+
+    @override_settings(DATABASE_TRANSACTION_POOLING=True)
+    def test_transaction_pooling_sets_organization_in_each_transaction(self):
+        self.addCleanup(connection.execute_wrappers.remove, _set_rls_at_transaction_start)
+        organization = Organization.objects.create(name='Pooled TMA', org_type='TMA')
+        user = get_user_model().objects.create_user(
+            cnic='88888-8888888-4', email='pooled@example.com', password='pass', organization=organization
+        )
+
+        request = self._request_as(user)
+        for _ in range(2):
+            with transaction.atomic():
+                self.assertEqual(self._current_org_id(), str(organization.id))
+
+        TenantMiddleware(lambda request: None).process_response(request, None)
+        self.assertIsNone(connection.rls_transaction_org_id)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'RLS session variables require PostgreSQL')
+@override_settings(DATABASE_TRANSACTION_POOLING=True, ROOT_URLCONF=__name__)
+class TransactionPoolingRequestTests(TransactionTestCase):
+    """Under pooling the whole request, template rendering included, is scoped."""
+
+    def setUp(self):
+        table = connection.ops.quote_name(Payer._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+            cursor.execute(f'ALTER TABLE {table} FORCE ROW LEVEL SECURITY')
+            cursor.execute(
+                f"CREATE POLICY org_isolation_policy ON {table} FOR ALL USING ("
+                f"organization_id = COALESCE(NULLIF(current_setting('app.current_org_id', TRUE), '')::integer, 0) "
+                f"OR COALESCE(NULLIF(current_setting('app.current_org_id', TRUE), '')::integer, 0) = 0)"
+            )
+            # No organization carried over from session-level tests
+            cursor.execute("SELECT set_config('app.current_org_id', '', false)")
+        connection.rls_org_id = None
+        self.addCleanup(self._drop_policy, table)
+
+    def _drop_policy(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP POLICY org_isolation_policy ON {table}')
+            cursor.execute(f'ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY')
+            cursor.execute(f'ALTER TABLE {table} DISABLE ROW LEVEL SECURITY')
+        if _set_rls_at_transaction_start in connection.execute_wrappers:
+            connection.execute_wrappers.remove(_set_rls_at_transaction_start)
+
+    def test_list_template_only_shows_own_organization(self):
+        own = Organization.objects.create(name='Own TMA', org_type='TMA')
+        other = Organization.objects.create(name='Other TMA', org_type='TMA')
+        Payer.objects.create(organization=own, name='Own Payer')
+        Payer.objects.create(organization=other, name='Other Payer')
+        self.client.force_login(get_user_model().objects.create_user(
+            cnic='88888-8888888-5', email='own@example.com', password='pass', organization=own
+        ))
+
+        response = self.client.get('/rls-payers/')
+        self.assertContains(response, 'Own Payer;')
+        self.assertNotContains(response, 'Other Payer')
@@ -16,10 +16,13 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.views.decorators.cache import never_cache
 from django.template.loader import render_to_string
 from django.db.models import Q
 
 from apps.users.permissions import AdminRequiredMixin
+from apps.core.metrics import CONTENT_TYPE, generate_latest
 from apps.core.models import BankAccount, Notification, NotificationCategory
 from apps.core.services import NotificationService
 from apps.finance.models import BudgetHead, AccountType
@@ -152,6 +155,25 @@ def notification_mark_all_read_view(request):
     return response
 
 
+# =====================================================================
+# METRICS
+# =====================================================================
+
+
+@never_cache
+@login_required
+def metrics_view(request):
+    """
+    Application metrics in the Prometheus text exposition format.
+
+    Restricted to superusers; merges the values of all worker processes
+    when METRICS_MULTIPROC_DIR is configured.
+    """
+    if not request.user.is_superuser:
+        raise PermissionDenied
+    return HttpResponse(generate_latest(), content_type=CONTENT_TYPE)
+
+
 # =====================================================================
 # BANK ACCOUNT VIEWS
 # =====================================================================
@@ -16,7 +16,3 @@ class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dashboard'
     verbose_name = 'Executive Dashboard'
-    
-    def ready(self) -> None:
-        """Import signals when app is ready."""
-        import apps.dashboard.signals  # noqa
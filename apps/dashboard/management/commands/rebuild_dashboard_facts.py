@@ -0,0 +1,66 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to rebuild the TmaDailyFact and
+             DailyCashSummary tables from posted vouchers, demands,
+             collections, bills and payments.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py rebuild_dashboard_facts
+    python manage.py rebuild_dashboard_facts --fiscal-year 2025-26
+    python manage.py rebuild_dashboard_facts --organization 12
+
+Facts are maintained on every posting; run this once after deploying the
+table, and after bulk imports or data fixes that bypass the workflows.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.budgeting.models import FiscalYear
+from apps.core.models import Organization
+from apps.dashboard.services_cash import DailyCashService
+from apps.dashboard.services_facts import TmaFactService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the pre-aggregated dashboard facts from the source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            action='append',
+            help='Organization ID to rebuild (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--fiscal-year',
+            type=str,
+            help='Fiscal year name (e.g., "2025-26", default: all)'
+        )
+
+    def handle(self, *args, **options):
+        organization_ids = options['organization']
+        if organization_ids:
+            found = set(Organization.objects.filter(id__in=organization_ids).values_list('id', flat=True))
+            missing = sorted(set(organization_ids) - found)
+            if missing:
+                raise CommandError(f"Organization(s) not found: {', '.join(map(str, missing))}")
+
+        fiscal_year_ids = None
+        start = end = None
+        if options['fiscal_year']:
+            try:
+                fiscal_year = FiscalYear.objects.get(year_name=options['fiscal_year'])
+            except FiscalYear.DoesNotExist:
+                raise CommandError(f"Fiscal year '{options['fiscal_year']}' not found")
+            fiscal_year_ids = [fiscal_year.id]
+            start, end = fiscal_year.start_date, fiscal_year.end_date
+
+        rows = TmaFactService.rebuild(organization_ids or None, fiscal_year_ids)
+        cash_rows = DailyCashService.rebuild(organization_ids or None, start, end)
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt {rows} daily fact rows"))
+        self.stdout.write(self.style.SUCCESS(f"✓ Rebuilt {cash_rows} daily cash summary rows"))
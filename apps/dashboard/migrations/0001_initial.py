@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:23
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('budgeting', '0028_alter_budgetallocation_options'),
+        ('core', '0007_organization_enforce_department_isolation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TmaDailyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('expenditure', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Expenditure')),
+                ('salary_expenditure', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Salary Expenditure')),
+                ('cash_receipts', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Cash Receipts')),
+                ('cash_payments', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Cash Payments')),
+                ('vouchers_posted', models.IntegerField(default=0, verbose_name='Vouchers Posted')),
+                ('revenue_demand', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Revenue Demand')),
+                ('demands_posted', models.IntegerField(default=0, verbose_name='Demands Posted')),
+                ('revenue_collection', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Revenue Collection')),
+                ('collections_posted', models.IntegerField(default=0, verbose_name='Collections Posted')),
+                ('liabilities_incurred', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Liabilities Incurred')),
+                ('bills_approved', models.IntegerField(default=0, verbose_name='Bills Approved')),
+                ('liabilities_cleared', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Liabilities Cleared')),
+                ('bills_paid', models.IntegerField(default=0, verbose_name='Bills Paid')),
+                ('last_updated', models.DateTimeField(auto_now=True, verbose_name='Last Updated')),
+                ('fiscal_year', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='daily_facts', to='budgeting.fiscalyear', verbose_name='Fiscal Year')),
+                ('organization', models.ForeignKey(blank=True, help_text='The TMA/Organization that owns this record.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_records', to='core.organization', verbose_name='Organization')),
+            ],
+            options={
+                'verbose_name': 'TMA Daily Fact',
+                'verbose_name_plural': 'TMA Daily Facts',
+                'indexes': [models.Index(fields=['fiscal_year', 'organization'], name='dashboard_t_fiscal__0b1505_idx'), models.Index(fields=['organization', 'date'], name='dashboard_t_organiz_489835_idx')],
+                'unique_together': {('organization', 'fiscal_year', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:57
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emailoutbox'),
+        ('dashboard', '0001_initial'),
+        ('finance', '0037_partition_journalentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCashSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('collections_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Collections Amount')),
+                ('collections_count', models.IntegerField(default=0, verbose_name='Collections Count')),
+                ('payments_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15, verbose_name='Payments Amount')),
+                ('payments_count', models.IntegerField(default=0, verbose_name='Payments Count')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='Closed At')),
+                ('last_updated', models.DateTimeField(auto_now=True, verbose_name='Last Updated')),
+                ('bank_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='daily_cash_summaries', to='core.bankaccount', verbose_name='Bank Account')),
+                ('budget_head', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='daily_cash_summaries', to='finance.budgethead', verbose_name='Budget Head')),
+                ('closed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='closed_cash_days', to=settings.AUTH_USER_MODEL, verbose_name='Closed By')),
+                ('organization', models.ForeignKey(blank=True, help_text='The TMA/Organization that owns this record.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='%(class)s_records', to='core.organization', verbose_name='Organization')),
+            ],
+            options={
+                'verbose_name': 'Daily Cash Summary',
+                'verbose_name_plural': 'Daily Cash Summaries',
+                'indexes': [models.Index(fields=['organization', 'date'], name='dashboard_d_organiz_87b600_idx')],
+                'unique_together': {('organization', 'bank_account', 'date', 'budget_head')},
+            },
+        ),
+    ]
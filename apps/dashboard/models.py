@@ -1,3 +1,227 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Pre-aggregated dashboard facts and daily cash summaries
+             maintained from posting, collection and bill events.
+-------------------------------------------------------------------------
+"""
+from decimal import Decimal
+
+from django.conf import settings
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.mixins import TenantAwareMixin
+
+
+class TmaDailyFact(TenantAwareMixin):
+    """
+    Daily KPI totals for one TMA and fiscal year.
+
+    Every amount is the net movement of that day, so dashboard totals are
+    a single SUM over the fact rows instead of scans of journal entries,
+    demands, collections and bills. Rows are maintained incrementally by
+    TmaFactService when vouchers, demands, collections, bills and payments
+    are posted, and can be rebuilt with `manage.py rebuild_dashboard_facts`.
+
+    Attributes:
+        organization: The TMA/Organization (from TenantAwareMixin)
+        fiscal_year: Fiscal year the movements belong to
+        date: Business date of the movements
+        expenditure: Net debits to expenditure heads
+        salary_expenditure: Net debits to salary heads (A01*)
+        cash_receipts: Debits to the organization's bank GL heads
+        cash_payments: Credits to the organization's bank GL heads
+        revenue_demand: Amount of demands posted
+        revenue_collection: Amount of collections posted
+        liabilities_incurred: Net amount of bills approved
+        liabilities_cleared: Amount of bill payments posted
+    """
+
+    fiscal_year = models.ForeignKey(
+        'budgeting.FiscalYear',
+        on_delete=models.PROTECT,
+        related_name='daily_facts',
+        verbose_name=_('Fiscal Year')
+    )
+    date = models.DateField(verbose_name=_('Date'))
+
+    # Ledger movements
+    expenditure = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Expenditure')
+    )
+    salary_expenditure = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Salary Expenditure')
+    )
+    cash_receipts = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Cash Receipts')
+    )
+    cash_payments = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Cash Payments')
+    )
+    vouchers_posted = models.IntegerField(
+        default=0,
+        verbose_name=_('Vouchers Posted')
+    )
+
+    # Revenue
+    revenue_demand = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Revenue Demand')
+    )
+    demands_posted = models.IntegerField(
+        default=0,
+        verbose_name=_('Demands Posted')
+    )
+    revenue_collection = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Revenue Collection')
+    )
+    collections_posted = models.IntegerField(
+        default=0,
+        verbose_name=_('Collections Posted')
+    )
+
+    # Liabilities
+    liabilities_incurred = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Liabilities Incurred')
+    )
+    bills_approved = models.IntegerField(
+        default=0,
+        verbose_name=_('Bills Approved')
+    )
+    liabilities_cleared = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Liabilities Cleared')
+    )
+    bills_paid = models.IntegerField(
+        default=0,
+        verbose_name=_('Bills Paid')
+    )
+
+    last_updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('Last Updated')
+    )
+
+    class Meta:
+        verbose_name = _('TMA Daily Fact')
+        verbose_name_plural = _('TMA Daily Facts')
+        unique_together = ['organization', 'fiscal_year', 'date']
+        indexes = [
+            models.Index(fields=['fiscal_year', 'organization']),
+            models.Index(fields=['organization', 'date']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.organization_id} - {self.date}"
+
+
+class DailyCashSummary(TenantAwareMixin):
+    """
+    Posted collections and payments of one day, bank account and head.
+
+    Maintained by DailyCashService when collections and payments are
+    posted (or cancelled), and recomputed for the day when the cashier
+    closes it. Month-to-date cash figures are a SUM over at most a
+    month of rows per account and head; a closed day's report is read
+    straight from these rows.
+
+    Attributes:
+        organization: The TMA/Organization (from TenantAwareMixin)
+        bank_account: Bank account the cash moved through
+        date: Receipt date (collections) or cheque date (payments)
+        budget_head: Revenue head of the demand or expense head of the bill
+        collections_amount: Principal of collections posted
+        payments_amount: Amount of payments posted
+        closed_at: When the cashier closed the day (null while open)
+        closed_by: Cashier who closed the day
+    """
+
+    bank_account = models.ForeignKey(
+        'core.BankAccount',
+        on_delete=models.PROTECT,
+        related_name='daily_cash_summaries',
+        verbose_name=_('Bank Account')
+    )
+    date = models.DateField(verbose_name=_('Date'))
+    budget_head = models.ForeignKey(
+        'finance.BudgetHead',
+        on_delete=models.PROTECT,
+        related_name='daily_cash_summaries',
+        verbose_name=_('Budget Head')
+    )
+
+    collections_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Collections Amount')
+    )
+    collections_count = models.IntegerField(
+        default=0,
+        verbose_name=_('Collections Count')
+    )
+    payments_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name=_('Payments Amount')
+    )
+    payments_count = models.IntegerField(
+        default=0,
+        verbose_name=_('Payments Count')
+    )
+
+    closed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Closed At')
+    )
+    closed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='closed_cash_days',
+        verbose_name=_('Closed By')
+    )
+    last_updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('Last Updated')
+    )
+
+    class Meta:
+        verbose_name = _('Daily Cash Summary')
+        verbose_name_plural = _('Daily Cash Summaries')
+        unique_together = ['organization', 'bank_account', 'date', 'budget_head']
+        indexes = [
+            models.Index(fields=['organization', 'date']),
+        ]
 
-# Create your models here.
+    def __str__(self) -> str:
+        return f"{self.organization_id} - {self.bank_account_id} - {self.date}"
@@ -10,16 +10,14 @@ Description: Dashboard service layer for aggregating financial metrics.
 """
 from decimal import Decimal
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
-from django.db.models import Sum, Q, Count, F, Case, When, CharField, Value
+from django.db.models import Sum, Q, F, Case, When, CharField, Value
 from django.db.models.functions import Concat
-from django.utils import timezone
 
 from apps.budgeting.models import BudgetAllocation, FiscalYear
-from apps.revenue.models import RevenueDemand, RevenueCollection, DemandStatus, CollectionStatus
-from apps.expenditure.models import Bill
 from apps.core.models import BankAccount, Organization
-from apps.finance.models import JournalEntry, AccountType, BudgetHead
+from apps.dashboard.models import TmaDailyFact
+from apps.dashboard.services_facts import TmaFactService
+from apps.finance.models import AccountBalance, AccountType
 
 
 class DashboardService:
@@ -27,7 +25,9 @@ class DashboardService:
     Service class for dashboard data aggregation.
     
     Provides methods to calculate KPIs and generate chart data
-    for the Executive Dashboard.
+    for the Executive Dashboard. Revenue, cash and liability figures come
+    from pre-aggregated tables (TmaDailyFact, AccountBalance), so every
+    method issues a fixed number of queries.
     """
     
     @staticmethod
@@ -118,47 +118,22 @@ class DashboardService:
                 - recovery_percent: Collection/Demand percentage
                 - monthly_trend: List of monthly collection data for last 6 months
         """
-        # Base querysets
-        demands = RevenueDemand.objects.filter(
-            fiscal_year=fiscal_year,
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
-        )
-        collections = RevenueCollection.objects.filter(
-            demand__fiscal_year=fiscal_year,
-            status=CollectionStatus.POSTED
-        )
+        facts = TmaDailyFact.objects.filter(fiscal_year=fiscal_year)
         
         if organization:
-            demands = demands.filter(organization=organization)
-            collections = collections.filter(organization=organization)
+            facts = facts.filter(organization=organization)
         
-        # Aggregates
-        demand_total = demands.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        collection_total = collections.aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+        # Aggregates (pre-aggregated daily facts)
+        totals = TmaFactService.get_totals(facts)
+        demand_total = totals['revenue_demand']
+        collection_total = totals['revenue_collection']
         
         recovery_percent = Decimal('0.00')
         if demand_total > Decimal('0.00'):
             recovery_percent = (collection_total / demand_total * 100).quantize(Decimal('0.01'))
         
         # Monthly trend for last 6 months
-        from django.db.models.functions import TruncMonth
-        
-        six_months_ago = timezone.now() - timedelta(days=180)
-        monthly_collections = collections.filter(
-            receipt_date__gte=six_months_ago
-        ).annotate(
-            month=TruncMonth('receipt_date')
-        ).values('month').annotate(
-            amount=Sum('amount_received')
-        ).order_by('month')
-        
-        monthly_trend = [
-            {
-                'month': item['month'].strftime('%Y-%m') if item['month'] else '',
-                'amount': float(item['amount'])
-            }
-            for item in monthly_collections
-        ]
+        monthly_trend = TmaFactService.get_monthly_collections(facts, months=6)
         
         return {
             'total_demand': demand_total,
@@ -186,13 +161,27 @@ class DashboardService:
         if organization:
             accounts_qs = accounts_qs.filter(organization=organization)
         
+        accounts = list(accounts_qs.order_by('title'))
+        
+        # GL balances of all accounts in one grouped query over the
+        # AccountBalance summary table (instead of one query per account)
+        balances = {
+            (row['organization_id'], row['budget_head_id']): row['balance']
+            for row in AccountBalance.objects.filter(
+                budget_head_id__in=[account.gl_code_id for account in accounts],
+                organization_id__in={account.organization_id for account in accounts},
+            ).values('organization_id', 'budget_head_id').annotate(
+                balance=Sum(F('total_debit') - F('total_credit'))
+            ).order_by()
+        }
+        
         accounts_data = []
         total_cash = Decimal('0.00')
         
-        for account in accounts_qs:
-            # Calculate current balance from GL
-            # Calculate current balance using model method (safe & filtered)
-            current_balance = account.get_balance()
+        for account in accounts:
+            current_balance = balances.get(
+                (account.organization_id, account.gl_code_id), Decimal('0.00')
+            )
             
             accounts_data.append({
                 'title': account.title,
@@ -221,19 +210,12 @@ class DashboardService:
                 - count: Number of approved but unpaid bills
                 - total_amount: Total amount of pending liabilities
         """
-        bills = Bill.objects.filter(status='APPROVED')
-        
-        if organization:
-            bills = bills.filter(organization=organization)
-        
-        aggregates = bills.aggregate(
-            count=Count('id'),
-            total_amount=Sum('net_amount')
-        )
+        organization_ids = [organization.id] if organization else None
+        outstanding = TmaFactService.get_outstanding(organization_ids)
         
         return {
-            'count': aggregates['count'] or 0,
-            'total_amount': aggregates['total_amount'] or Decimal('0.00'),
+            'count': outstanding['liabilities_count'],
+            'total_amount': outstanding['liabilities'],
         }
     
     @staticmethod
@@ -253,18 +235,17 @@ class DashboardService:
         Returns:
             List of dictionaries with head name and amount spent.
         """
-        # Get expenditure journal entries
-        entries = JournalEntry.objects.filter(
-            voucher__fiscal_year=fiscal_year,
-            voucher__is_posted=True,
-            debit__gt=0  # Expenditure is debited
+        # Monthly expenditure balances (maintained on posting)
+        entries = AccountBalance.objects.filter(
+            fiscal_year=fiscal_year,
+            total_debit__gt=0  # Expenditure is debited
         ).filter(
             Q(budget_head__nam_head__account_type=AccountType.EXPENDITURE) |
             Q(budget_head__sub_head__nam_head__account_type=AccountType.EXPENDITURE)
         )
         
         if organization:
-            entries = entries.filter(voucher__organization=organization)
+            entries = entries.filter(organization=organization)
         
         # Annotate with code and name from either nam_head or sub_head
         entries_with_code = entries.annotate(
@@ -297,7 +278,7 @@ class DashboardService:
             'head_name',
             'head_code'
         ).annotate(
-            total_spent=Sum('debit')
+            total_spent=Sum('total_debit')
         ).order_by('-total_spent')[:limit]
         
         return [
@@ -0,0 +1,310 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Maintenance and reads of the DailyCashSummary table.
+             Collection and payment postings apply their deltas
+             incrementally; closing a day recomputes it from the source
+             rows and stamps it closed.
+-------------------------------------------------------------------------
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.dashboard.models import DailyCashSummary
+
+
+AMOUNT_FIELDS = ('collections_amount', 'payments_amount')
+COUNT_FIELDS = ('collections_count', 'payments_count')
+SUMMARY_FIELDS = AMOUNT_FIELDS + COUNT_FIELDS
+
+ZERO = Decimal('0.00')
+
+
+def _sum(expression, **kwargs) -> Coalesce:
+    """SUM of an amount expression, 0.00 instead of NULL."""
+    return Coalesce(Sum(expression, **kwargs), Value(ZERO), output_field=DecimalField())
+
+
+def _payment_shares(amount: Decimal, lines: Iterable[Tuple[int, Decimal]],
+                    legacy_head_id: Optional[int] = None) -> List[Tuple[int, Decimal, int]]:
+    """
+    Split a payment over the expense heads of its bill.
+
+    The amount is shared pro rata to the bill lines, the rounding
+    remainder going to the last head; the cheque is counted once, on the
+    head with the largest share. Bills without lines fall back to the
+    legacy Bill.budget_head.
+
+    Args:
+        amount: Payment amount.
+        lines: (budget head ID, line amount) pairs of the bill, in line order.
+        legacy_head_id: Bill.budget_head_id.
+
+    Returns:
+        (budget head ID, amount, count) per head.
+    """
+    by_head: Dict[int, Decimal] = {}
+    for head_id, line_amount in lines:
+        by_head[head_id] = by_head.get(head_id, ZERO) + line_amount
+    total = sum(by_head.values(), ZERO)
+    if total <= 0:
+        return [(legacy_head_id, amount, 1)] if legacy_head_id else []
+
+    shares, remaining = [], amount
+    for position, (head_id, line_amount) in enumerate(by_head.items(), start=1):
+        share = remaining if position == len(by_head) else (amount * line_amount / total).quantize(ZERO)
+        remaining -= share
+        shares.append([head_id, share, 0])
+    max(shares, key=lambda item: by_head[item[0]])[2] = 1
+    return [tuple(share) for share in shares if share[1] or share[2]]
+
+
+class DailyCashService:
+    """
+    Service class for the cashier's daily cash summaries.
+
+    The record_* methods are called from the collection and payment
+    posting workflows inside their transactions, like TmaFactService.
+    """
+
+    @staticmethod
+    def record(organization_id: int, bank_account_id: int, budget_head_id: int,
+               day: date, **deltas) -> None:
+        """
+        Add deltas to the summary row of one account, head and day.
+
+        Uses an UPDATE with F() expressions so concurrent postings never
+        lose increments; the row is created on first use.
+
+        Args:
+            organization_id: The organization (TMA) ID.
+            bank_account_id: The bank account ID.
+            budget_head_id: The revenue or expense head ID.
+            day: Receipt or cheque date.
+            **deltas: Summary field name -> amount or count to add.
+        """
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas or not organization_id or not bank_account_id or not budget_head_id:
+            return
+
+        unknown = set(deltas) - set(SUMMARY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown cash summary fields: {', '.join(sorted(unknown))}")
+
+        rows = DailyCashSummary.objects.filter(
+            organization_id=organization_id, bank_account_id=bank_account_id,
+            budget_head_id=budget_head_id, date=day
+        )
+        changes = {name: F(name) + value for name, value in deltas.items()}
+        changes['last_updated'] = timezone.now()
+
+        if rows.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                DailyCashSummary.objects.create(
+                    organization_id=organization_id,
+                    bank_account_id=bank_account_id,
+                    budget_head_id=budget_head_id,
+                    date=day,
+                    **deltas
+                )
+        except IntegrityError:
+            # Another transaction created the row first
+            rows.update(**changes)
+
+    @staticmethod
+    def record_collection(collection, sign: int = 1) -> None:
+        """Apply a posted collection; sign=-1 when it is cancelled."""
+        DailyCashService.record(
+            collection.organization_id, collection.bank_account_id,
+            collection.demand.budget_head_id, collection.receipt_date,
+            collections_amount=collection.amount_received * sign, collections_count=sign
+        )
+
+    @staticmethod
+    def record_payment(payment, sign: int = 1) -> None:
+        """Apply a posted payment, split over the expense heads of its bill lines."""
+        lines = payment.bill.lines.order_by('pk').values_list('budget_head_id', 'amount')
+        for budget_head_id, amount, count in _payment_shares(
+            payment.amount, lines, payment.bill.budget_head_id
+        ):
+            DailyCashService.record(
+                payment.organization_id, payment.bank_account_id,
+                budget_head_id, payment.cheque_date,
+                payments_amount=amount * sign, payments_count=count * sign
+            )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_today_and_month(organization, today: date) -> Dict[str, Decimal]:
+        """
+        Today's and month-to-date collections and payments (one query).
+
+        Returns:
+            Dict with collections_today, collections_month_to_date,
+            payments_today and payments_month_to_date.
+        """
+        month_start = date(today.year, today.month, 1)
+        return DailyCashSummary.objects.filter(
+            organization=organization, date__gte=month_start, date__lte=today
+        ).aggregate(
+            collections_today=_sum('collections_amount', filter=Q(date=today)),
+            collections_month_to_date=_sum('collections_amount'),
+            payments_today=_sum('payments_amount', filter=Q(date=today)),
+            payments_month_to_date=_sum('payments_amount'),
+        )
+
+    @staticmethod
+    def get_day_report(organization, day: date) -> Dict[str, Any]:
+        """
+        Cash report of one day by bank account and head.
+
+        Returns:
+            Dict with rows (bank account, head and amounts), totals,
+            closed_at and closed_by (None while the day is open).
+        """
+        rows = list(
+            DailyCashSummary.objects.filter(
+                organization=organization, date=day
+            ).select_related(
+                'bank_account', 'budget_head__nam_head', 'budget_head__sub_head__nam_head', 'closed_by'
+            ).order_by('bank_account__title', 'budget_head__nam_head__code', 'budget_head__sub_head__sub_code')
+        )
+        totals = {name: sum((getattr(row, name) for row in rows), ZERO) for name in AMOUNT_FIELDS}
+        totals.update({name: sum(getattr(row, name) for row in rows) for name in COUNT_FIELDS})
+        totals['net'] = totals['collections_amount'] - totals['payments_amount']
+        closed = next((row for row in rows if row.closed_at), None)
+        return {
+            'date': day,
+            'rows': rows,
+            'totals': totals,
+            'closed_at': closed.closed_at if closed else None,
+            'closed_by': closed.closed_by if closed else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Close and rebuild
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    @transaction.atomic
+    def close_day(organization, day: date, user) -> int:
+        """
+        Close a cashier day.
+
+        The day's rows are recomputed from the posted collections and
+        payments, then stamped with the closing user and time.
+
+        Returns:
+            Number of summary rows for the day.
+        """
+        DailyCashService.rebuild([organization.pk], start=day, end=day)
+        return DailyCashSummary.objects.filter(organization=organization, date=day).update(
+            closed_at=timezone.now(), closed_by=user
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(organization_ids: Optional[List[int]] = None,
+                start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """
+        Recompute the summaries from the source tables.
+
+        Collections are summed with a grouped query; payments are split
+        over their bill lines like record_payment(). Existing rows in
+        scope are replaced; days already closed keep their closing stamp.
+
+        Args:
+            organization_ids: Restrict to these organizations (None for all).
+            start: First date to rebuild (None for no lower bound).
+            end: Last date to rebuild (None for no upper bound).
+
+        Returns:
+            Number of summary rows written.
+        """
+        from apps.expenditure.models import BillLine, Payment
+        from apps.revenue.models import CollectionStatus, RevenueCollection
+
+        def scoped(queryset, day):
+            if organization_ids is not None:
+                queryset = queryset.filter(organization_id__in=organization_ids)
+            if start is not None:
+                queryset = queryset.filter(**{f'{day}__gte': start})
+            if end is not None:
+                queryset = queryset.filter(**{f'{day}__lte': end})
+            return queryset
+
+        summaries = defaultdict(dict)
+
+        def collect(rows, head, day):
+            for row in rows:
+                key = (row.pop('organization_id'), row.pop('bank_account_id'), row.pop(head), row.pop(day))
+                summaries[key].update(row)
+
+        collect(
+            scoped(
+                RevenueCollection.objects.filter(status=CollectionStatus.POSTED), 'receipt_date'
+            ).values(
+                'organization_id', 'bank_account_id', 'demand__budget_head_id', 'receipt_date'
+            ).annotate(
+                collections_amount=Sum('amount_received'), collections_count=Count('id')
+            ).order_by(),
+            'demand__budget_head_id', 'receipt_date',
+        )
+
+        payments = scoped(Payment.objects.filter(is_posted=True), 'cheque_date')
+        bill_lines = defaultdict(list)
+        for bill_id, budget_head_id, amount in BillLine.objects.filter(
+            bill_id__in=payments.values('bill_id')
+        ).order_by('pk').values_list('bill_id', 'budget_head_id', 'amount'):
+            bill_lines[bill_id].append((budget_head_id, amount))
+
+        posted = payments.values_list(
+            'organization_id', 'bank_account_id', 'cheque_date', 'amount', 'bill_id', 'bill__budget_head_id'
+        )
+        for organization_id, bank_account_id, day, payment_amount, bill_id, legacy_head_id in posted.iterator():
+            shares = _payment_shares(payment_amount, bill_lines[bill_id], legacy_head_id)
+            for budget_head_id, amount, count in shares:
+                values = summaries[(organization_id, bank_account_id, budget_head_id, day)]
+                values['payments_amount'] = values.get('payments_amount', ZERO) + amount
+                values['payments_count'] = values.get('payments_count', 0) + count
+
+        existing = scoped(DailyCashSummary.objects.all(), 'date')
+        closures = {
+            (row['organization_id'], row['date']): (row['closed_at'], row['closed_by_id'])
+            for row in existing.filter(closed_at__isnull=False).values(
+                'organization_id', 'date', 'closed_at', 'closed_by_id'
+            )
+        }
+
+        rows = []
+        for (organization_id, bank_account_id, budget_head_id, day), values in summaries.items():
+            if not (organization_id and bank_account_id and budget_head_id):
+                continue
+            closed_at, closed_by_id = closures.get((organization_id, day), (None, None))
+            rows.append(DailyCashSummary(
+                organization_id=organization_id,
+                bank_account_id=bank_account_id,
+                budget_head_id=budget_head_id,
+                date=day,
+                closed_at=closed_at,
+                closed_by_id=closed_by_id,
+                **values
+            ))
+        existing.delete()
+        DailyCashSummary.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
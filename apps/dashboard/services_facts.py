@@ -0,0 +1,325 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Maintenance and reads of the TmaDailyFact table. Posting,
+             collection and bill events apply their deltas incrementally;
+             rebuild() recomputes the facts from the source tables.
+-------------------------------------------------------------------------
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Count, DecimalField, Exists, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.dashboard.models import TmaDailyFact
+
+
+AMOUNT_FIELDS = (
+    'expenditure', 'salary_expenditure', 'cash_receipts', 'cash_payments',
+    'revenue_demand', 'revenue_collection', 'liabilities_incurred', 'liabilities_cleared',
+)
+COUNT_FIELDS = (
+    'vouchers_posted', 'demands_posted', 'collections_posted', 'bills_approved', 'bills_paid',
+)
+FACT_FIELDS = AMOUNT_FIELDS + COUNT_FIELDS
+
+ZERO = Decimal('0.00')
+
+
+def _sum(expression, **kwargs) -> Coalesce:
+    """SUM of an amount expression, 0.00 instead of NULL."""
+    return Coalesce(Sum(expression, **kwargs), Value(ZERO), output_field=DecimalField())
+
+
+def _ledger_aggregates() -> Dict[str, Any]:
+    """
+    Conditional aggregates mapping journal entries to the ledger facts.
+
+    Expenditure is the net debit to EXP heads (reversals subtract); cash is
+    the movement on the GL heads of the organization's bank accounts.
+    """
+    from apps.core.models import BankAccount
+    from apps.finance.models import AccountType
+
+    expenditure = (
+        Q(budget_head__nam_head__account_type=AccountType.EXPENDITURE) |
+        Q(budget_head__sub_head__nam_head__account_type=AccountType.EXPENDITURE)
+    )
+    salary = expenditure & (
+        Q(budget_head__nam_head__code__startswith='A01') |
+        Q(budget_head__sub_head__nam_head__code__startswith='A01')
+    )
+    bank = Q(Exists(BankAccount.objects.filter(
+        organization_id=OuterRef('voucher__organization_id'),
+        gl_code_id=OuterRef('budget_head_id'),
+    )))
+    return {
+        'expenditure': _sum(F('debit') - F('credit'), filter=expenditure),
+        'salary_expenditure': _sum(F('debit') - F('credit'), filter=salary),
+        'cash_receipts': _sum('debit', filter=bank),
+        'cash_payments': _sum('credit', filter=bank),
+    }
+
+
+class TmaFactService:
+    """
+    Service class for the pre-aggregated dashboard facts.
+
+    The record_* methods are called from the posting workflows inside
+    their transactions, so a fact row always agrees with the committed
+    source data. Dashboard reads SUM the rows of one fiscal year, which
+    costs the same regardless of how many vouchers were posted.
+    """
+
+    @staticmethod
+    def record(organization_id: int, fiscal_year_id: int, day: date, **deltas) -> None:
+        """
+        Add deltas to the fact row of one organization, fiscal year and day.
+
+        Uses an UPDATE with F() expressions so concurrent postings on the
+        same day never lose increments; the row is created on first use.
+
+        Args:
+            organization_id: The organization (TMA) ID.
+            fiscal_year_id: The fiscal year ID.
+            day: Business date of the event.
+            **deltas: Fact field name -> amount or count to add.
+        """
+        deltas = {name: value for name, value in deltas.items() if value}
+        if not deltas or not organization_id or not fiscal_year_id:
+            return
+
+        unknown = set(deltas) - set(FACT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fact fields: {', '.join(sorted(unknown))}")
+
+        facts = TmaDailyFact.objects.filter(
+            organization_id=organization_id, fiscal_year_id=fiscal_year_id, date=day
+        )
+        changes = {name: F(name) + value for name, value in deltas.items()}
+        changes['last_updated'] = timezone.now()
+
+        if facts.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                TmaDailyFact.objects.create(
+                    organization_id=organization_id,
+                    fiscal_year_id=fiscal_year_id,
+                    date=day,
+                    **deltas
+                )
+        except IntegrityError:
+            # Another transaction created the row first
+            facts.update(**changes)
+
+    @staticmethod
+    def record_voucher(voucher) -> None:
+        """Apply the ledger movements of a posted (or reversal) voucher."""
+        from apps.finance.models import JournalEntry
+
+        totals = JournalEntry.objects.filter(voucher=voucher).aggregate(**_ledger_aggregates())
+        TmaFactService.record(
+            voucher.organization_id, voucher.fiscal_year_id, voucher.date,
+            vouchers_posted=1, **totals
+        )
+
+    @staticmethod
+    def record_demand(demand, sign: int = 1) -> None:
+        """Apply a posted demand; sign=-1 when a posted demand is cancelled."""
+        TmaFactService.record(
+            demand.organization_id, demand.fiscal_year_id, demand.issue_date,
+            revenue_demand=demand.amount * sign, demands_posted=sign
+        )
+
+    @staticmethod
+    def record_collection(collection, sign: int = 1) -> None:
+        """Apply a posted collection; sign=-1 when it is cancelled."""
+        TmaFactService.record(
+            collection.organization_id, collection.demand.fiscal_year_id, collection.receipt_date,
+            revenue_collection=collection.amount_received * sign, collections_posted=sign
+        )
+
+    @staticmethod
+    def record_bill_approved(bill) -> None:
+        """Apply an approved bill as a new liability."""
+        TmaFactService.record(
+            bill.organization_id, bill.fiscal_year_id, timezone.localdate(bill.approved_at),
+            liabilities_incurred=bill.net_amount, bills_approved=1
+        )
+
+    @staticmethod
+    def record_payment(payment) -> None:
+        """Apply a posted payment as a cleared liability."""
+        TmaFactService.record(
+            payment.organization_id, payment.bill.fiscal_year_id, payment.cheque_date,
+            liabilities_cleared=payment.amount, bills_paid=1
+        )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_totals(facts: QuerySet) -> Dict[str, Any]:
+        """Sum every fact field over a TmaDailyFact queryset (one query)."""
+        aggregates = {name: _sum(name) for name in AMOUNT_FIELDS}
+        aggregates.update({
+            name: Coalesce(Sum(name), Value(0), output_field=IntegerField())
+            for name in COUNT_FIELDS
+        })
+        return facts.aggregate(**aggregates)
+
+    @staticmethod
+    def get_outstanding(organization_ids: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Cash in bank and unpaid liabilities, accumulated over all fiscal years.
+
+        Args:
+            organization_ids: IDs (list or subquery) to restrict to; None for all.
+        """
+        facts = TmaDailyFact.objects.all()
+        if organization_ids is not None:
+            facts = facts.filter(organization_id__in=organization_ids)
+        return facts.aggregate(
+            cash=_sum(F('cash_receipts') - F('cash_payments')),
+            liabilities=_sum(F('liabilities_incurred') - F('liabilities_cleared')),
+            liabilities_count=Coalesce(
+                Sum(F('bills_approved') - F('bills_paid')), Value(0), output_field=IntegerField()
+            ),
+        )
+
+    @staticmethod
+    def get_monthly_collections(facts: QuerySet, months: int = 6) -> List[Dict[str, Any]]:
+        """Collections per month for the last `months` months."""
+        since = timezone.localdate() - timedelta(days=30 * months)
+        rows = facts.filter(date__gte=since).exclude(revenue_collection=0).annotate(
+            month=TruncMonth('date')
+        ).values('month').annotate(
+            amount=Sum('revenue_collection')
+        ).order_by('month')
+        return [
+            {
+                'month': row['month'].strftime('%Y-%m') if row['month'] else '',
+                'amount': float(row['amount']),
+            }
+            for row in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(organization_ids: Optional[List[int]] = None,
+                fiscal_year_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute the facts from the source tables with grouped queries.
+
+        Existing facts in scope are deleted and replaced, so the rebuild is
+        safe to run repeatedly (e.g. after a bulk import or a restore).
+
+        Args:
+            organization_ids: Restrict to these organizations (None for all).
+            fiscal_year_ids: Restrict to these fiscal years (None for all).
+
+        Returns:
+            Number of fact rows written.
+        """
+        from apps.expenditure.models import Bill, BillStatus, Payment
+        from apps.finance.models import JournalEntry
+        from apps.revenue.models import (
+            CollectionStatus, DemandStatus, RevenueCollection, RevenueDemand,
+        )
+
+        def scoped(queryset, organization='organization_id', fiscal_year='fiscal_year_id'):
+            if organization_ids is not None:
+                queryset = queryset.filter(**{f'{organization}__in': organization_ids})
+            if fiscal_year_ids is not None:
+                queryset = queryset.filter(**{f'{fiscal_year}__in': fiscal_year_ids})
+            return queryset
+
+        facts = defaultdict(dict)
+
+        def collect(rows, organization, fiscal_year, day):
+            for row in rows:
+                key = (row.pop(organization), row.pop(fiscal_year), row.pop(day))
+                facts[key].update(row)
+
+        collect(
+            scoped(
+                JournalEntry.objects.filter(voucher__is_posted=True),
+                organization='voucher__organization_id',
+            ).values('voucher__organization_id', 'fiscal_year_id', 'voucher__date').annotate(
+                vouchers_posted=Count('voucher_id', distinct=True), **_ledger_aggregates()
+            ).order_by(),
+            'voucher__organization_id', 'fiscal_year_id', 'voucher__date',
+        )
+        collect(
+            scoped(RevenueDemand.objects.filter(
+                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+            )).values('organization_id', 'fiscal_year_id', 'issue_date').annotate(
+                revenue_demand=Sum('amount'), demands_posted=Count('id')
+            ).order_by(),
+            'organization_id', 'fiscal_year_id', 'issue_date',
+        )
+        collect(
+            scoped(
+                RevenueCollection.objects.filter(status=CollectionStatus.POSTED),
+                fiscal_year='demand__fiscal_year_id',
+            ).values('organization_id', 'demand__fiscal_year_id', 'receipt_date').annotate(
+                revenue_collection=Sum('amount_received'), collections_posted=Count('id')
+            ).order_by(),
+            'organization_id', 'demand__fiscal_year_id', 'receipt_date',
+        )
+        # Bills loaded without workflow timestamps fall back to the bill date
+        bills = scoped(Bill.objects.filter(status__in=[BillStatus.APPROVED, BillStatus.PAID]))
+        approved_on = Coalesce(TruncDate('approved_at'), F('bill_date'))
+        collect(
+            bills.annotate(approved_on=approved_on).values(
+                'organization_id', 'fiscal_year_id', 'approved_on'
+            ).annotate(
+                liabilities_incurred=Sum('net_amount'), bills_approved=Count('id')
+            ).order_by(),
+            'organization_id', 'fiscal_year_id', 'approved_on',
+        )
+        paid_on = Coalesce(
+            Subquery(Payment.objects.filter(
+                bill_id=OuterRef('pk'), is_posted=True
+            ).order_by('-cheque_date').values('cheque_date')[:1]),
+            approved_on,
+        )
+        collect(
+            bills.filter(status=BillStatus.PAID).annotate(paid_on=paid_on).values(
+                'organization_id', 'fiscal_year_id', 'paid_on'
+            ).annotate(
+                liabilities_cleared=Sum('net_amount'), bills_paid=Count('id')
+            ).order_by(),
+            'organization_id', 'fiscal_year_id', 'paid_on',
+        )
+
+        rows = [
+            TmaDailyFact(
+                organization_id=organization_id,
+                fiscal_year_id=fiscal_year_id,
+                date=day,
+                **values
+            )
+            for (organization_id, fiscal_year_id, day), values in facts.items()
+            if organization_id and fiscal_year_id
+        ]
+        scoped(TmaDailyFact.objects.all()).delete()
+        TmaDailyFact.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
@@ -10,14 +10,13 @@ Description: Provincial analytics service for LCB Dashboard.
 """
 from decimal import Decimal
 from typing import Dict, List, Optional, Any
-from django.db.models import Sum, Q, Count, F, Case, When, DecimalField
-from django.db.models.functions import Coalesce
+from django.db.models import Sum, Q
 
 from apps.budgeting.models import BudgetAllocation, FiscalYear
-from apps.revenue.models import RevenueDemand, RevenueCollection, DemandStatus, CollectionStatus
-from apps.expenditure.models import Bill
-from apps.core.models import BankAccount, Organization, Division, District
-from apps.finance.models import JournalEntry, AccountType, BudgetHead
+from apps.core.models import Organization, Division, District
+from apps.finance.models import JournalEntry, AccountType
+from apps.dashboard.models import TmaDailyFact
+from apps.dashboard.services_facts import TmaFactService
 
 
 class ProvincialAnalyticsService:
@@ -25,9 +24,58 @@ class ProvincialAnalyticsService:
     Service class for provincial-level dashboard analytics.
     
     Aggregates data across all TMAs to provide macro-level insights
-    for LCB Officers and Provincial Administrators.
+    for LCB Officers and Provincial Administrators. Per-TMA figures are
+    computed with one GROUP BY organization_id query per source table and
+    merged in memory, so the query count does not grow with the number
+    of TMAs in the province.
     """
     
+    @staticmethod
+    def get_organizations(
+        division: Optional[Division] = None,
+        district: Optional[District] = None
+    ):
+        """
+        Active TMAs/Towns, optionally restricted to a division or district.
+        
+        Args:
+            division: Optional division filter.
+            district: Optional district filter.
+            
+        Returns:
+            Organization queryset.
+        """
+        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
+        
+        if district:
+            orgs = orgs.filter(tehsil__district=district)
+        elif division:
+            orgs = orgs.filter(tehsil__district__division=division)
+        
+        return orgs
+    
+    @staticmethod
+    def _facts_by_organization(fiscal_year: FiscalYear, orgs, *fields: str) -> Dict[int, Dict[str, Decimal]]:
+        """
+        Sum daily fact fields per organization in a single grouped query.
+        
+        Args:
+            fiscal_year: The fiscal year to analyze.
+            orgs: Organization queryset to restrict to.
+            *fields: TmaDailyFact amount fields to sum.
+            
+        Returns:
+            Mapping of organization ID to {field: total}.
+        """
+        rows = TmaDailyFact.objects.filter(
+            fiscal_year=fiscal_year,
+            organization_id__in=orgs.values('id')
+        ).values('organization_id').annotate(
+            **{field: Sum(field) for field in fields}
+        ).order_by()
+        
+        return {row.pop('organization_id'): row for row in rows}
+    
     @staticmethod
     def get_provincial_totals(
         fiscal_year: FiscalYear,
@@ -54,12 +102,7 @@ class ProvincialAnalyticsService:
                 - total_liabilities: Sum of pending bills
         """
         # Build organization filter
-        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
-        
-        if district:
-            orgs = orgs.filter(tehsil__district=district)
-        elif division:
-            orgs = orgs.filter(tehsil__district__division=division)
+        orgs = ProvincialAnalyticsService.get_organizations(division, district)
         
         org_ids = list(orgs.values_list('id', flat=True))
         
@@ -79,52 +122,20 @@ class ProvincialAnalyticsService:
         if total_budget > Decimal('0.00'):
             utilization_percent = (total_utilization / total_budget * 100).quantize(Decimal('0.01'))
         
-        # Revenue totals
-        demand_total = RevenueDemand.objects.filter(
+        # Revenue, cash and liabilities from the pre-aggregated daily facts
+        revenue = TmaFactService.get_totals(TmaDailyFact.objects.filter(
             fiscal_year=fiscal_year,
-            organization_id__in=org_ids,
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        
-        collection_total = RevenueCollection.objects.filter(
-            demand__fiscal_year=fiscal_year,
-            demand__organization_id__in=org_ids,
-            status=CollectionStatus.POSTED
-        ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+            organization_id__in=org_ids
+        ))
+        demand_total = revenue['revenue_demand']
+        collection_total = revenue['revenue_collection']
         
         recovery_percent = Decimal('0.00')
         if demand_total > Decimal('0.00'):
             recovery_percent = (collection_total / demand_total * 100).quantize(Decimal('0.01'))
         
-        # Cash position (sum of all bank balances)
-        accounts = BankAccount.objects.filter(
-            is_active=True,
-            organization_id__in=org_ids
-        )
-        
-        total_cash = Decimal('0.00')
-        for account in accounts:
-            gl_entries = JournalEntry.objects.filter(
-                budget_head=account.gl_code,
-                voucher__is_posted=True,
-                voucher__organization_id__in=org_ids
-            ).aggregate(
-                total_debit=Sum('debit'),
-                total_credit=Sum('credit')
-            )
-            
-            debit_total = gl_entries['total_debit'] or Decimal('0.00')
-            credit_total = gl_entries['total_credit'] or Decimal('0.00')
-            total_cash += (debit_total - credit_total)
-        
-        # Pending liabilities
-        liabilities = Bill.objects.filter(
-            status='APPROVED',
-            organization_id__in=org_ids
-        ).aggregate(
-            count=Count('id'),
-            total_amount=Sum('net_amount')
-        )
+        # Cash position and pending liabilities accumulate across fiscal years
+        outstanding = TmaFactService.get_outstanding(org_ids)
         
         return {
             'total_budget': total_budget,
@@ -133,9 +144,9 @@ class ProvincialAnalyticsService:
             'total_demand': demand_total,
             'total_collection': collection_total,
             'recovery_percent': recovery_percent,
-            'total_cash': total_cash,
-            'total_liabilities': liabilities['total_amount'] or Decimal('0.00'),
-            'liabilities_count': liabilities['count'] or 0,
+            'total_cash': outstanding['cash'],
+            'total_liabilities': outstanding['liabilities'],
+            'liabilities_count': outstanding['liabilities_count'],
             'tma_count': len(org_ids),
         }
     
@@ -157,35 +168,26 @@ class ProvincialAnalyticsService:
             Dictionary with 'top_performers' and 'laggards' lists.
         """
         # Build organization filter
-        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
+        orgs = ProvincialAnalyticsService.get_organizations(division, district)
         
-        if district:
-            orgs = orgs.filter(tehsil__district=district)
-        elif division:
-            orgs = orgs.filter(tehsil__district__division=division)
+        # Aggregate revenue data per TMA (one grouped query)
+        revenue = ProvincialAnalyticsService._facts_by_organization(
+            fiscal_year, orgs, 'revenue_demand', 'revenue_collection'
+        )
         
-        # Aggregate revenue data per TMA
         tma_performance = []
         
-        for org in orgs:
-            demand_total = RevenueDemand.objects.filter(
-                fiscal_year=fiscal_year,
-                organization=org,
-                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-            
-            collection_total = RevenueCollection.objects.filter(
-                demand__fiscal_year=fiscal_year,
-                demand__organization=org,
-                status=CollectionStatus.POSTED
-            ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+        for org_id, name in orgs.values_list('id', 'name'):
+            totals = revenue.get(org_id, {})
+            demand_total = totals.get('revenue_demand') or Decimal('0.00')
+            collection_total = totals.get('revenue_collection') or Decimal('0.00')
             
             recovery_percent = Decimal('0.00')
             if demand_total > Decimal('0.00'):
                 recovery_percent = (collection_total / demand_total * 100).quantize(Decimal('0.01'))
             
             tma_performance.append({
-                'name': org.name,
+                'name': name,
                 'demand': demand_total,
                 'collection': collection_total,
                 'recovery_percent': float(recovery_percent),
@@ -217,57 +219,40 @@ class ProvincialAnalyticsService:
             List of expense categories with amounts for pie chart.
         """
         # Build organization filter
-        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
-        
-        if district:
-            orgs = orgs.filter(tehsil__district=district)
-        elif division:
-            orgs = orgs.filter(tehsil__district__division=division)
-        
-        org_ids = list(orgs.values_list('id', flat=True))
+        orgs = ProvincialAnalyticsService.get_organizations(division, district)
         
         # Aggregate by major object code
         entries = JournalEntry.objects.filter(
-            voucher__fiscal_year=fiscal_year,
+            fiscal_year=fiscal_year,
             voucher__is_posted=True,
-            voucher__organization_id__in=org_ids,
+            voucher__organization_id__in=orgs.values('id'),
             debit__gt=0
         ).filter(
             Q(budget_head__nam_head__isnull=False, budget_head__nam_head__account_type=AccountType.EXPENDITURE) |
             Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__account_type=AccountType.EXPENDITURE)
         )
         
-        # Employee Related (A01)
-        employee_total = entries.filter(
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A01') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A01')
-        ).aggregate(total=Sum('debit'))['total'] or Decimal('0.00')
-        
-        # Operating Expenses (A03)
-        operating_total = entries.filter(
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A03') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A03')
-        ).aggregate(total=Sum('debit'))['total'] or Decimal('0.00')
-        
-        # Assets/Development (A09, A12)
-        development_total = entries.filter(
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A09') |
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A12') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A09') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A12')
-        ).aggregate(total=Sum('debit'))['total'] or Decimal('0.00')
-        
-        # Other (everything else)
-        other_total = entries.exclude(
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A01') |
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A03') |
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A09') |
-            Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith='A12') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A01') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A03') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A09') |
-            Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith='A12')
-        ).aggregate(total=Sum('debit'))['total'] or Decimal('0.00')
+        def object_codes(*prefixes: str) -> Q:
+            condition = Q()
+            for prefix in prefixes:
+                condition |= (
+                    Q(budget_head__nam_head__isnull=False, budget_head__nam_head__code__startswith=prefix) |
+                    Q(budget_head__sub_head__isnull=False, budget_head__sub_head__nam_head__code__startswith=prefix)
+                )
+            return condition
+        
+        # All categories in a single pass over the entries
+        totals = entries.aggregate(
+            employee=Sum('debit', filter=object_codes('A01')),           # Employee Related
+            operating=Sum('debit', filter=object_codes('A03')),          # Operating Expenses
+            development=Sum('debit', filter=object_codes('A09', 'A12')), # Assets/Development
+            other=Sum('debit', filter=~object_codes('A01', 'A03', 'A09', 'A12')),
+        )
+        
+        employee_total = totals['employee'] or Decimal('0.00')
+        operating_total = totals['operating'] or Decimal('0.00')
+        development_total = totals['development'] or Decimal('0.00')
+        other_total = totals['other'] or Decimal('0.00')
         
         return [
             {
@@ -310,37 +295,24 @@ class ProvincialAnalyticsService:
             List of TMAs in deficit with amounts.
         """
         # Build organization filter
-        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
+        orgs = ProvincialAnalyticsService.get_organizations(division, district)
         
-        if district:
-            orgs = orgs.filter(tehsil__district=district)
-        elif division:
-            orgs = orgs.filter(tehsil__district__division=division)
+        # Expenditure and revenue per TMA (one grouped query)
+        totals = ProvincialAnalyticsService._facts_by_organization(
+            fiscal_year, orgs, 'expenditure', 'revenue_collection'
+        )
         
         deficit_tmas = []
         
-        for org in orgs:
-            # Total expenditure
-            expenditure = JournalEntry.objects.filter(
-                voucher__fiscal_year=fiscal_year,
-                voucher__is_posted=True,
-                voucher__organization=org,
-                budget_head__global_head__account_type=AccountType.EXPENDITURE,
-                debit__gt=0
-            ).aggregate(total=Sum('debit'))['total'] or Decimal('0.00')
-            
-            # Total revenue
-            revenue = RevenueCollection.objects.filter(
-                demand__fiscal_year=fiscal_year,
-                demand__organization=org,
-                status=CollectionStatus.POSTED
-            ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+        for org_id, name in orgs.values_list('id', 'name'):
+            expenditure = totals.get(org_id, {}).get('expenditure') or Decimal('0.00')
+            revenue = totals.get(org_id, {}).get('revenue_collection') or Decimal('0.00')
             
             deficit = expenditure - revenue
             
             if deficit > Decimal('0.00'):
                 deficit_tmas.append({
-                    'name': org.name,
+                    'name': name,
                     'expenditure': expenditure,
                     'revenue': revenue,
                     'deficit': deficit,
@@ -371,33 +343,33 @@ class ProvincialAnalyticsService:
             List of TMAs with low utilization.
         """
         # Build organization filter
-        orgs = Organization.objects.filter(is_active=True, org_type__in=['TMA', 'TOWN'])
+        orgs = ProvincialAnalyticsService.get_organizations(division, district)
         
-        if district:
-            orgs = orgs.filter(tehsil__district=district)
-        elif division:
-            orgs = orgs.filter(tehsil__district__division=division)
-        
-        low_utilization_tmas = []
-        
-        for org in orgs:
-            totals = BudgetAllocation.objects.filter(
+        # Budget and spending per TMA (one grouped query)
+        allocations = {
+            row['organization_id']: row
+            for row in BudgetAllocation.objects.filter(
                 fiscal_year=fiscal_year,
-                organization=org
-            ).aggregate(
+                organization_id__in=orgs.values('id')
+            ).values('organization_id').annotate(
                 total_budget=Sum('revised_allocation'),
                 total_spent=Sum('spent_amount')
-            )
-            
-            total_budget = totals['total_budget'] or Decimal('0.00')
-            total_spent = totals['total_spent'] or Decimal('0.00')
+            ).order_by()
+        }
+        
+        low_utilization_tmas = []
+        
+        for org_id, name in orgs.values_list('id', 'name'):
+            totals = allocations.get(org_id, {})
+            total_budget = totals.get('total_budget') or Decimal('0.00')
+            total_spent = totals.get('total_spent') or Decimal('0.00')
             
             if total_budget > Decimal('0.00'):
                 utilization_pct = (total_spent / total_budget * 100).quantize(Decimal('0.01'))
                 
                 if utilization_pct < threshold:
                     low_utilization_tmas.append({
-                        'name': org.name,
+                        'name': name,
                         'budget': total_budget,
                         'spent': total_spent,
                         'utilization_pct': float(utilization_pct),
@@ -0,0 +1,147 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Per-organization workspace snapshot. The counters of the
+             role workspaces are read with one conditional aggregate per
+             model (posted cash from the daily cash summaries) and cached
+             briefly; bill, payment, demand and collection changes
+             invalidate the snapshot.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+ZERO = Decimal('0.00')
+
+
+def _sum(expression, **kwargs) -> Coalesce:
+    """SUM of an amount expression, 0.00 instead of NULL."""
+    return Coalesce(Sum(expression, **kwargs), Value(ZERO), output_field=DecimalField())
+
+
+class WorkspaceSnapshotService:
+    """Counters shared by the Finance, Audit, Revenue and PAO workspaces."""
+
+    @staticmethod
+    def cache_key(organization_id: int) -> str:
+        return f"workspace_snapshot_{organization_id}"
+
+    @staticmethod
+    def invalidate(organization_id: int) -> None:
+        """
+        Drop an organization's snapshot once the current transaction commits.
+
+        Called from the save() of Bill, Payment, RevenueDemand and
+        RevenueCollection, which every status transition goes through.
+        """
+        if organization_id:
+            key = WorkspaceSnapshotService.cache_key(organization_id)
+            transaction.on_commit(lambda: cache.delete(key))
+
+    @staticmethod
+    def get_snapshot(organization, fiscal_year) -> Dict[str, Any]:
+        """
+        Return the workspace counters of an organization, cached.
+
+        The snapshot is recomputed when missing, when it belongs to another
+        fiscal year or when it was taken on an earlier day (today and
+        month-to-date figures).
+        """
+        key = WorkspaceSnapshotService.cache_key(organization.id)
+        today = timezone.now().date()
+
+        snapshot = cache.get(key)
+        if snapshot and snapshot['fiscal_year_id'] == fiscal_year.id and snapshot['as_of'] == today:
+            return snapshot
+
+        snapshot = WorkspaceSnapshotService.compute(organization, fiscal_year, today)
+        cache.set(key, snapshot, settings.WORKSPACE_SNAPSHOT_TIMEOUT)
+        return snapshot
+
+    @staticmethod
+    def compute(organization, fiscal_year, today: date) -> Dict[str, Any]:
+        """Compute the snapshot with one query per model."""
+        from apps.budgeting.models import BudgetAllocation
+        from apps.dashboard.services_cash import DailyCashService
+        from apps.expenditure.models import Bill, BillStatus, Payment
+        from apps.revenue.models import CollectionStatus, DemandStatus, RevenueCollection, RevenueDemand
+
+        month_start = date(today.year, today.month, 1)
+
+        bills = Bill.objects.filter(
+            organization=organization, fiscal_year=fiscal_year
+        ).aggregate(
+            submitted=Count('id', filter=Q(status=BillStatus.SUBMITTED)),
+            audited=Count('id', filter=Q(status=BillStatus.AUDITED)),
+            verified=Count('id', filter=Q(status=BillStatus.VERIFIED)),
+            approved=Count('id', filter=Q(status=BillStatus.APPROVED)),
+            rejected=Count('id', filter=Q(status=BillStatus.REJECTED)),
+            audited_total=Count('id', filter=Q(status__in=[BillStatus.APPROVED, BillStatus.PAID])),
+            approved_amount=_sum('net_amount', filter=Q(status=BillStatus.APPROVED)),
+            monthly_expenditure=_sum('net_amount', filter=Q(
+                status__in=[BillStatus.APPROVED, BillStatus.PAID], bill_date__gte=month_start
+            )),
+        )
+
+        # Posted cash comes from the daily cash summaries; only the draft
+        # (pending) payments and collections are read from the source rows
+        cash = DailyCashService.get_today_and_month(organization, today)
+
+        payments = Payment.objects.filter(
+            organization=organization, bill__fiscal_year=fiscal_year, is_posted=False
+        ).aggregate(
+            pending=Count('id'),
+            pending_amount=_sum('amount'),
+        )
+        payments.update(today=cash['payments_today'], month_to_date=cash['payments_month_to_date'])
+
+        collections = RevenueCollection.objects.filter(
+            organization=organization, demand__fiscal_year=fiscal_year, status=CollectionStatus.DRAFT
+        ).aggregate(
+            unreconciled=Count('id'),
+            unreconciled_amount=_sum('amount_received'),
+        )
+        collections.update(today=cash['collections_today'], month_to_date=cash['collections_month_to_date'])
+
+        demands = RevenueDemand.objects.filter(
+            organization=organization,
+            fiscal_year=fiscal_year,
+            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
+        ).annotate(
+            total_collected=_sum('collections__amount_received',
+                                 filter=Q(collections__status=CollectionStatus.POSTED)),
+        ).aggregate(
+            outstanding=Count('id'),
+            outstanding_amount=_sum(F('amount') - F('total_collected')),
+        )
+
+        budget = BudgetAllocation.objects.filter(
+            organization=organization, fiscal_year=fiscal_year
+        ).aggregate(
+            allocation_count=Count('id'),
+            total_revised=_sum('revised_allocation'),
+            total_released=_sum('released_amount'),
+            total_spent=_sum('spent_amount'),
+        )
+
+        return {
+            'fiscal_year_id': fiscal_year.id,
+            'as_of': today,
+            'bills': bills,
+            'payments': payments,
+            'collections': collections,
+            'demands': demands,
+            'budget': budget,
+        }
@@ -0,0 +1,43 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Template tag rendering a dashboard widget slot.
+-------------------------------------------------------------------------
+"""
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def dashboard_widget(context, name: str, css_class: str = '') -> str:
+    """
+    Render the slot of one dashboard widget.
+
+    Pages rendered with ?render=full already carry the widget HTML in
+    context['widgets']; otherwise the slot shows a placeholder that htmx
+    replaces with the widget fragment once the page shell has loaded.
+
+    Usage: {% dashboard_widget 'budget_summary' 'col-md-6 col-lg-3' %}
+    """
+    rendered = context.get('widgets', {}).get(name)
+    if rendered is not None:
+        return format_html('<div class="{}" id="widget-{}">{}</div>', css_class, name, mark_safe(rendered))
+
+    url = reverse('dashboard:widget', args=[context['widget_scope'], name])
+    if context.get('widget_query'):
+        url = f"{url}?{context['widget_query']}"
+
+    return format_html(
+        '<div class="{}" id="widget-{}" hx-get="{}" hx-trigger="load" hx-swap="innerHTML">'
+        '<div class="card h-100"><div class="card-body text-center text-muted py-4">'
+        '<span class="spinner-border spinner-border-sm me-2" role="status"></span>Loading...'
+        '</div></div></div>',
+        css_class, name, url,
+    )
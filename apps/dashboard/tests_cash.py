@@ -0,0 +1,155 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the DailyCashSummary table, the cashier day close
+             and the month-to-date reads built on it.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.testing import TmaTestDataMixin
+from apps.dashboard.models import DailyCashSummary
+from apps.dashboard.services_cash import SUMMARY_FIELDS, DailyCashService
+from apps.expenditure.models import Bill, BillStatus, Payment
+from apps.revenue.models import CollectionStatus, RevenueCollection
+
+
+class DailyCashSummaryTests(TmaTestDataMixin, TestCase):
+    """Cash summaries agree with the posted collections and payments."""
+
+    demand_count = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser(
+            cnic='55555-5555555-5', email='cash@example.com', password='pass'
+        )
+        cls.user.organization = cls.org
+        cls.user.save()
+        cls.collection = RevenueCollection.objects.filter(
+            organization=cls.org, status=CollectionStatus.POSTED
+        ).select_related('demand').first()
+
+    def _snapshot(self):
+        return {
+            (row['bank_account_id'], row['budget_head_id'], row['date']): row
+            for row in DailyCashSummary.objects.values('bank_account_id', 'budget_head_id', 'date', *SUMMARY_FIELDS)
+        }
+
+    def test_posted_summaries_match_collections(self):
+        total = DailyCashSummary.objects.filter(organization=self.org).aggregate(total=Sum('collections_amount'))
+        self.assertEqual(
+            total['total'],
+            RevenueCollection.objects.filter(
+                organization=self.org, status=CollectionStatus.POSTED
+            ).aggregate(total=Sum('amount_received'))['total'],
+        )
+
+    def test_incremental_updates_match_rebuild(self):
+        RevenueCollection.objects.filter(pk=self.collection.pk).update(status=CollectionStatus.CANCELLED)
+        DailyCashService.record_collection(self.collection, sign=-1)
+        incremental = self._snapshot()
+
+        call_command('rebuild_dashboard_facts', fiscal_year='2024-25', stdout=StringIO())
+        rebuilt = self._snapshot()
+        # A row emptied by the cancellation is simply absent after a rebuild
+        self.assertEqual(
+            {key: row for key, row in incremental.items() if any(row[name] for name in SUMMARY_FIELDS)},
+            rebuilt,
+        )
+
+        with self.assertRaises(ValueError):
+            DailyCashService.record(self.org.id, self.collection.bank_account_id,
+                                    self.collection.demand.budget_head_id, date(2025, 1, 2), unknown=1)
+
+    def test_payment_is_split_over_bill_line_heads(self):
+        bill = Bill.objects.get(organization=self.org, status=BillStatus.APPROVED)
+        self.assertIsNone(bill.budget_head_id)
+        goods, services = bill.lines.order_by('pk')
+        day = self.fiscal_year.end_date
+        before = self._snapshot()
+
+        payment = Payment.objects.create(
+            organization=self.org, bill=bill, bank_account=self.collection.bank_account,
+            cheque_number='9000001', cheque_date=day, amount=bill.net_amount, created_by=self.user,
+        )
+        payment.post(self.user)
+
+        after = self._snapshot()
+        goods_share = (bill.net_amount * goods.amount / bill.gross_amount).quantize(Decimal('0.01'))
+        for line, amount, count in [(goods, goods_share, 1), (services, bill.net_amount - goods_share, 0)]:
+            key = (payment.bank_account_id, line.budget_head_id, day)
+            old = before.get(key, {'payments_amount': Decimal('0.00'), 'payments_count': 0})
+            self.assertEqual(after[key]['payments_amount'] - old['payments_amount'], amount)
+            self.assertEqual(after[key]['payments_count'] - old['payments_count'], count)
+
+        self.assertEqual(DailyCashService.get_today_and_month(self.org, day)['payments_today'], bill.net_amount)
+
+        DailyCashService.rebuild([self.org.id])
+        self.assertEqual(self._snapshot(), after)
+
+    def test_month_to_date_is_one_query(self):
+        day = self.collection.receipt_date
+        with self.assertNumQueries(1):
+            cash = DailyCashService.get_today_and_month(self.org, day)
+
+        posted = RevenueCollection.objects.filter(organization=self.org, status=CollectionStatus.POSTED)
+        self.assertEqual(
+            cash['collections_today'],
+            posted.filter(receipt_date=day).aggregate(total=Sum('amount_received'))['total'],
+        )
+        self.assertEqual(
+            cash['collections_month_to_date'],
+            posted.filter(
+                receipt_date__gte=day.replace(day=1), receipt_date__lte=day
+            ).aggregate(total=Sum('amount_received'))['total'],
+        )
+
+    def test_close_day_stamps_rows_and_survives_rebuild(self):
+        day = self.collection.receipt_date
+        closed = DailyCashService.close_day(self.org, day, self.user)
+        self.assertGreater(closed, 0)
+
+        DailyCashService.rebuild([self.org.id])
+        report = DailyCashService.get_day_report(self.org, day)
+        self.assertEqual(report['closed_by'], self.user)
+        self.assertEqual(
+            report['totals']['net'],
+            report['totals']['collections_amount'] - report['totals']['payments_amount'],
+        )
+        self.assertGreaterEqual(report['totals']['collections_amount'], self.collection.amount_received)
+
+    def test_close_view(self):
+        self.client.force_login(self.user)
+        url = reverse('dashboard:daily_cash_close')
+        day = self.collection.receipt_date.isoformat()
+
+        response = self.client.get(url, {'date': day})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['report']['closed_at'])
+
+        response = self.client.post(url, {'date': day})
+        self.assertRedirects(response, f'{url}?date={day}')
+        self.assertFalse(DailyCashSummary.objects.filter(
+            organization=self.org, date=self.collection.receipt_date, closed_at__isnull=True
+        ).exists())
+
+        self.assertEqual(self.client.get(url, {'date': 'not-a-date'}).status_code, 404)
+
+        clerk = get_user_model().objects.create_user(
+            cnic='55555-5555555-6', email='clerk@example.com', password='pass', organization=self.org
+        )
+        self.client.force_login(clerk)
+        self.assertEqual(self.client.get(url).status_code, 403)
@@ -0,0 +1,178 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the TmaDailyFact table, its incremental maintenance
+             and the dashboard reads built on it.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from apps.core.models import BankAccount
+from apps.core.testing import TmaTestDataMixin
+from apps.dashboard.models import TmaDailyFact
+from apps.dashboard.services import DashboardService
+from apps.dashboard.services_facts import FACT_FIELDS, TmaFactService
+from apps.expenditure.models import Bill, BillStatus
+from apps.finance.models import AccountType, BudgetHead, JournalEntry, Voucher, VoucherType
+from apps.revenue.models import CollectionStatus, DemandStatus, RevenueCollection, RevenueDemand
+
+
+class TmaDailyFactTestMixin(TmaTestDataMixin):
+    """Posted transactions in two TMAs."""
+
+    tma_count = 2
+    demand_count = 12
+    bill_count = 8
+    voucher_count = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser(
+            cnic='33333-3333333-3', email='facts@example.com', password='pass'
+        )
+
+    def _snapshot(self):
+        return {
+            (fact['organization_id'], fact['date']): fact
+            for fact in TmaDailyFact.objects.values('organization_id', 'date', *FACT_FIELDS)
+        }
+
+
+class RebuildTests(TmaDailyFactTestMixin, TestCase):
+    """The rebuild reproduces the source tables."""
+
+    def test_facts_match_source_tables(self):
+        call_command('rebuild_dashboard_facts', stdout=StringIO())
+        facts = TmaFactService.get_totals(TmaDailyFact.objects.filter(fiscal_year=self.fiscal_year))
+
+        demands = RevenueDemand.objects.filter(
+            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+        ).aggregate(total=Sum('amount'))['total']
+        collections = RevenueCollection.objects.filter(
+            status=CollectionStatus.POSTED
+        ).aggregate(total=Sum('amount_received'))['total']
+        expenditure = JournalEntry.objects.filter(
+            budget_head__nam_head__account_type=AccountType.EXPENDITURE
+        ).aggregate(total=Sum(F('debit') - F('credit')))['total']
+
+        self.assertEqual(facts['revenue_demand'], demands)
+        self.assertEqual(facts['revenue_collection'], collections)
+        self.assertEqual(facts['expenditure'], expenditure)
+        self.assertEqual(facts['vouchers_posted'], Voucher.objects.count())
+
+        outstanding = TmaFactService.get_outstanding()
+        cash = sum(account.get_balance() for account in BankAccount.objects.all())
+        self.assertEqual(outstanding['cash'], cash)
+        pending = Bill.objects.filter(status=BillStatus.APPROVED)
+        self.assertEqual(outstanding['liabilities_count'], pending.count())
+        self.assertEqual(
+            outstanding['liabilities'],
+            pending.aggregate(total=Sum('net_amount'))['total'] or Decimal('0.00'),
+        )
+
+    def test_rebuild_is_idempotent_and_scoped(self):
+        call_command('rebuild_dashboard_facts', stdout=StringIO())
+        before = self._snapshot()
+
+        call_command('rebuild_dashboard_facts', organization=[self.org.id],
+                     fiscal_year='2024-25', stdout=StringIO())
+        self.assertEqual(self._snapshot(), before)
+
+    def test_unknown_fiscal_year_is_rejected(self):
+        with self.assertRaisesMessage(Exception, "Fiscal year '1999-00' not found"):
+            call_command('rebuild_dashboard_facts', fiscal_year='1999-00', stdout=StringIO())
+
+
+class IncrementalUpdateTests(TmaDailyFactTestMixin, TestCase):
+    """Posting events keep the facts equal to a full rebuild."""
+
+    def _post_payment_voucher(self, amount):
+        expense_head = BudgetHead.objects.filter(
+            nam_head__account_type=AccountType.EXPENDITURE
+        ).first()
+        bank_head = BankAccount.objects.get(organization=self.org).gl_code
+        voucher = Voucher.objects.create(
+            organization=self.org, fiscal_year=self.fiscal_year, voucher_no='PV-FACT-0001',
+            date=date(2024, 8, 15), voucher_type=VoucherType.PAYMENT,
+            fund=expense_head.fund, description='Fact test',
+        )
+        JournalEntry.objects.create(voucher=voucher, budget_head=expense_head,
+                                    description='Expense', debit=amount)
+        JournalEntry.objects.create(voucher=voucher, budget_head=bank_head,
+                                    description='Bank', credit=amount)
+        voucher.post_voucher(self.user)
+        return voucher
+
+    def test_voucher_posting_updates_fact_row(self):
+        self._post_payment_voucher(Decimal('1500.00'))
+
+        fact = TmaDailyFact.objects.filter(organization=self.org, date=date(2024, 8, 15)).first()
+        incremental = self._snapshot()
+        TmaFactService.rebuild()
+        self.assertEqual(self._snapshot(), incremental)
+        self.assertGreaterEqual(fact.expenditure, Decimal('1500.00'))
+        self.assertGreaterEqual(fact.cash_payments, Decimal('1500.00'))
+
+    def test_reversal_nets_out(self):
+        before = TmaFactService.get_totals(TmaDailyFact.objects.filter(organization=self.org))
+        voucher = self._post_payment_voucher(Decimal('900.00'))
+        voucher.unpost_voucher(self.user, reason='Entered twice')
+
+        after = TmaFactService.get_totals(TmaDailyFact.objects.filter(organization=self.org))
+        self.assertEqual(after['expenditure'], before['expenditure'])
+        self.assertEqual(after['cash_payments'] - after['cash_receipts'],
+                         before['cash_payments'] - before['cash_receipts'])
+        self.assertEqual(after['vouchers_posted'], before['vouchers_posted'] + 2)
+
+    def test_record_adds_to_existing_row(self):
+        TmaFactService.record(self.org.id, self.fiscal_year.id, date(2025, 1, 2), revenue_collection=Decimal('10'))
+        TmaFactService.record(self.org.id, self.fiscal_year.id, date(2025, 1, 2), revenue_collection=Decimal('5'),
+                              collections_posted=1)
+        fact = TmaDailyFact.objects.get(organization=self.org, fiscal_year=self.fiscal_year, date=date(2025, 1, 2))
+        self.assertEqual(fact.revenue_collection, Decimal('15.00') + self._posted(date(2025, 1, 2)))
+        with self.assertRaises(ValueError):
+            TmaFactService.record(self.org.id, self.fiscal_year.id, date(2025, 1, 2), unknown=1)
+
+    def _posted(self, day):
+        return RevenueCollection.objects.filter(
+            organization=self.org, receipt_date=day, status=CollectionStatus.POSTED
+        ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+
+
+class DashboardReadTests(TmaDailyFactTestMixin, TestCase):
+    """Dashboard metrics cost a fixed number of queries."""
+
+    def test_revenue_summary_and_liabilities_use_constant_queries(self):
+        with self.assertNumQueries(2):
+            summary = DashboardService.get_revenue_summary(self.fiscal_year, self.org)
+        with self.assertNumQueries(1):
+            liabilities = DashboardService.get_pending_liabilities()
+
+        self.assertEqual(
+            summary['total_demand'],
+            RevenueDemand.objects.filter(
+                organization=self.org,
+                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID],
+            ).aggregate(total=Sum('amount'))['total'],
+        )
+        self.assertEqual(liabilities['count'], Bill.objects.filter(status=BillStatus.APPROVED).count())
+
+    def test_cash_position_matches_ledger(self):
+        with self.assertNumQueries(2):
+            position = DashboardService.get_cash_position()
+        self.assertEqual(len(position['accounts']), 2)
+        self.assertEqual(
+            position['total_cash'],
+            sum(account.get_balance() for account in BankAccount.objects.all()),
+        )
@@ -0,0 +1,117 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the grouped provincial analytics queries.
+-------------------------------------------------------------------------
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F, Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.budgeting.models import BudgetAllocation
+from apps.core.models import Organization
+from apps.core.testing import TmaTestDataMixin, create_tma_data
+from apps.dashboard.services_provincial import ProvincialAnalyticsService
+from apps.finance.models import AccountType, JournalEntry
+from apps.revenue.models import CollectionStatus, DemandStatus, RevenueCollection, RevenueDemand
+
+
+# Queries for one provincial dashboard load, independent of the TMA count
+PROVINCIAL_DASHBOARD_QUERIES = 11
+
+
+class ProvincialAnalyticsTests(TmaTestDataMixin, TestCase):
+    """Per-TMA analytics use grouped queries."""
+
+    tma_count = 2
+    demand_count = 8
+    voucher_count = 3
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls._allocate()
+
+    @classmethod
+    def _allocate(cls):
+        """Every expense allocation of the Nth TMA has N x 2% spent."""
+        for index, org in enumerate(Organization.objects.order_by('ddo_code'), start=1):
+            BudgetAllocation.objects.filter(organization=org, fiscal_year=cls.fiscal_year).update(
+                revised_allocation=Decimal('100000.00'), spent_amount=Decimal('2000.00') * index
+            )
+
+    def _load_dashboard(self):
+        service = ProvincialAnalyticsService
+        service.get_provincial_totals(self.fiscal_year)
+        service.get_tma_performance_ranking(self.fiscal_year)
+        service.get_expense_composition(self.fiscal_year)
+        service.get_deficit_tmas(self.fiscal_year)
+        service.get_low_utilization_tmas(self.fiscal_year, Decimal('10.00'))
+
+    def test_query_count_does_not_grow_with_tmas(self):
+        with self.assertNumQueries(PROVINCIAL_DASHBOARD_QUERIES):
+            self._load_dashboard()
+
+        for number in range(self.tma_count + 1, 7):
+            create_tma_data(number, self.fiscal_year, self.chart, self.poster, self.demand_count,
+                            self.bill_count, self.voucher_count)
+        self._allocate()
+        self.assertEqual(Organization.objects.count(), 6)
+
+        with CaptureQueriesContext(connection) as queries:
+            self._load_dashboard()
+        self.assertEqual(len(queries), PROVINCIAL_DASHBOARD_QUERIES)
+
+    def test_ranking_matches_source_tables(self):
+        ranking = ProvincialAnalyticsService.get_tma_performance_ranking(self.fiscal_year)
+
+        for row in ranking['top_performers']:
+            org = Organization.objects.get(name=row['name'])
+            demand = RevenueDemand.objects.filter(
+                organization=org,
+                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID],
+            ).aggregate(total=Sum('amount'))['total']
+            collection = RevenueCollection.objects.filter(
+                organization=org, status=CollectionStatus.POSTED
+            ).aggregate(total=Sum('amount_received'))['total']
+            self.assertEqual(row['demand'], demand)
+            self.assertEqual(row['collection'], collection)
+
+        percents = [row['recovery_percent'] for row in ranking['top_performers']]
+        self.assertEqual(percents, sorted(percents, reverse=True))
+
+    def test_deficit_uses_net_expenditure(self):
+        deficits = {row['name']: row for row in ProvincialAnalyticsService.get_deficit_tmas(self.fiscal_year)}
+
+        for org in Organization.objects.all():
+            expenditure = JournalEntry.objects.filter(
+                voucher__organization=org,
+                budget_head__nam_head__account_type=AccountType.EXPENDITURE,
+            ).aggregate(total=Sum(F('debit') - F('credit')))['total']
+            collection = RevenueCollection.objects.filter(
+                organization=org, status=CollectionStatus.POSTED
+            ).aggregate(total=Sum('amount_received'))['total']
+            if expenditure > collection:
+                self.assertEqual(deficits[org.name]['deficit'], expenditure - collection)
+            else:
+                self.assertNotIn(org.name, deficits)
+
+    def test_low_utilization_filters_and_sorts(self):
+        rows = ProvincialAnalyticsService.get_low_utilization_tmas(self.fiscal_year, Decimal('3.00'))
+        self.assertEqual([row['utilization_pct'] for row in rows], [2.0])
+
+        rows = ProvincialAnalyticsService.get_low_utilization_tmas(self.fiscal_year, Decimal('10.00'))
+        self.assertEqual([row['utilization_pct'] for row in rows], [2.0, 4.0])
+
+    def test_division_filter_excludes_other_tmas(self):
+        Organization.objects.create(name='Outside TMA', ddo_code='OUT-01')
+        district = self.org.tehsil.district
+
+        totals = ProvincialAnalyticsService.get_provincial_totals(self.fiscal_year, district=district)
+        self.assertEqual(totals['tma_count'], 2)
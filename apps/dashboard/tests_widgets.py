@@ -0,0 +1,134 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the lazily loaded, independently cached dashboard
+             widgets.
+-------------------------------------------------------------------------
+"""
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.core.models import Organization
+from apps.core.testing import TmaTestDataMixin
+from apps.dashboard.widgets import EXECUTIVE, PROVINCIAL, WIDGETS, compute_widgets, get_widget_data
+
+
+class DashboardWidgetTestMixin(TmaTestDataMixin):
+    """The current fiscal year, two TMAs and a provincial super admin."""
+
+    fiscal_year_name = None
+    tma_count = 2
+    demand_count = 6
+    bill_count = 3
+
+    @classmethod
+    def create_test_data(cls):
+        super().create_test_data()
+        cls.admin = get_user_model().objects.create_superuser(
+            cnic='44444-4444444-4', email='widgets@example.com', password='pass'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def _widget_url(self, scope, name):
+        return reverse('dashboard:widget', args=[scope, name])
+
+
+class DashboardWidgetViewTests(DashboardWidgetTestMixin, TestCase):
+    """Each widget is its own fragment endpoint with its own cache entry."""
+
+    def test_shell_renders_lazy_slots(self):
+        response = self.client.get(reverse('dashboard:index'))
+
+        self.assertEqual(response.status_code, 200)
+        for name in WIDGETS[EXECUTIVE]:
+            self.assertContains(response, f'hx-get="{self._widget_url(EXECUTIVE, name)}"')
+
+    def test_widget_fragment_is_cached(self):
+        url = self._widget_url(EXECUTIVE, 'revenue_summary')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Revenue Recovery')
+        self.assertNotContains(response, '<html')
+
+        with self.assertNumQueries(0):
+            data = get_widget_data(EXECUTIVE, 'revenue_summary', self.fiscal_year, None)
+        self.assertTrue(data['from_cache'])
+
+        refreshed = get_widget_data(EXECUTIVE, 'revenue_summary', self.fiscal_year, None, refresh=True)
+        self.assertFalse(refreshed['from_cache'])
+        self.assertEqual(refreshed['revenue_summary'], data['revenue_summary'])
+
+    def test_full_render_includes_every_widget(self):
+        with override_settings(DASHBOARD_WIDGET_WORKERS=1):
+            response = self.client.get(reverse('dashboard:provincial'), {'render': 'full'})
+
+        self.assertEqual(response.status_code, 200)
+        for name in WIDGETS[PROVINCIAL]:
+            self.assertContains(response, f'id="widget-{name}"')
+            self.assertNotContains(response, self._widget_url(PROVINCIAL, name))
+        self.assertContains(response, 'Revenue Recovery Leaderboard')
+
+    def test_provincial_widget_filters_are_forwarded(self):
+        district = self.org.tehsil.district
+        response = self.client.get(reverse('dashboard:provincial'), {'district': district.id})
+
+        self.assertContains(
+            response, f'{self._widget_url(PROVINCIAL, "provincial_totals")}?district={district.id}'
+        )
+
+    def test_provincial_widget_requires_provincial_access(self):
+        user = get_user_model().objects.create_user(
+            cnic='55555-5555555-5', email='clerk@example.com', password='pass',
+            organization=Organization.objects.first(),
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(self._widget_url(PROVINCIAL, 'rankings'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_widget_is_404(self):
+        response = self.client.get(self._widget_url(EXECUTIVE, 'rankings'))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentWidgetTests(DashboardWidgetTestMixin, TransactionTestCase):
+    """The thread pool returns the same data as a serial computation."""
+
+    def setUp(self):
+        self.create_test_data()
+        super().setUp()
+
+    def test_pool_matches_serial(self):
+        with override_settings(DASHBOARD_WIDGET_WORKERS=1):
+            serial = compute_widgets(PROVINCIAL, self.fiscal_year, None, None, refresh=True)
+        pooled = compute_widgets(PROVINCIAL, self.fiscal_year, None, None, refresh=True)
+
+        self.assertEqual(pooled, serial)
+
+    @override_settings(DASHBOARD_WIDGET_WORKERS=4)
+    def test_pool_threads_are_scoped_to_the_organization(self):
+        calls = []
+
+        def record(org_id, connection):
+            calls.append((org_id, connection.alias, threading.current_thread().name))
+            return False
+
+        with mock.patch('apps.core.middleware.set_rls_organization', side_effect=record):
+            compute_widgets(PROVINCIAL, self.fiscal_year, None, None, refresh=True, organization_id=self.org.pk)
+
+        self.assertEqual(len(calls), len(WIDGETS[PROVINCIAL]))
+        for org_id, alias, thread_name in calls:
+            self.assertEqual((org_id, alias), (self.org.pk, 'default'))
+            self.assertTrue(thread_name.startswith('dashboard-widget'))
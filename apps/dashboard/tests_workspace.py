@@ -0,0 +1,85 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the cached role workspace snapshot.
+-------------------------------------------------------------------------
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.testing import TmaTestDataMixin
+from apps.dashboard.services_workspace import WorkspaceSnapshotService
+from apps.expenditure.models import Bill, BillStatus
+from apps.revenue.models import CollectionStatus, RevenueCollection
+
+
+class WorkspaceSnapshotTests(TmaTestDataMixin, TestCase):
+    """Workspace counters come from one cached query per model."""
+
+    fiscal_year_name = None
+    bill_count = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = get_user_model().objects.create_superuser(
+            cnic='66666-6666666-6', email='workspace@example.com', password='pass'
+        )
+        cls.user.organization = cls.org
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_snapshot_matches_source_tables(self):
+        with self.assertNumQueries(6):
+            snapshot = WorkspaceSnapshotService.get_snapshot(self.org, self.fiscal_year)
+
+        bills = Bill.objects.filter(organization=self.org, fiscal_year=self.fiscal_year)
+        self.assertEqual(snapshot['bills']['approved'], bills.filter(status=BillStatus.APPROVED).count())
+        self.assertEqual(
+            snapshot['bills']['audited_total'],
+            bills.filter(status__in=[BillStatus.APPROVED, BillStatus.PAID]).count(),
+        )
+        self.assertEqual(
+            snapshot['collections']['month_to_date'],
+            RevenueCollection.objects.filter(
+                organization=self.org, demand__fiscal_year=self.fiscal_year, status=CollectionStatus.POSTED,
+                receipt_date__gte=timezone.now().date().replace(day=1),
+            ).aggregate(total=Sum('amount_received'))['total'] or 0,
+        )
+
+        with self.assertNumQueries(0):
+            WorkspaceSnapshotService.get_snapshot(self.org, self.fiscal_year)
+
+    def test_bill_transition_invalidates_snapshot(self):
+        before = WorkspaceSnapshotService.get_snapshot(self.org, self.fiscal_year)
+        bill = Bill.objects.filter(organization=self.org, status=BillStatus.APPROVED).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bill.status = BillStatus.REJECTED
+            bill.save(update_fields=['status', 'updated_at'])
+
+        after = WorkspaceSnapshotService.get_snapshot(self.org, self.fiscal_year)
+        self.assertEqual(after['bills']['approved'], before['bills']['approved'] - 1)
+        self.assertEqual(after['bills']['rejected'], before['bills']['rejected'] + 1)
+
+    def test_workspaces_render_from_snapshot(self):
+        for url_name in ['workspace_audit', 'workspace_revenue', 'workspace_pao']:
+            response = self.client.get(reverse(f'dashboard:{url_name}'))
+            self.assertEqual(response.status_code, 200, url_name)
+
+        response = self.client.get(reverse('dashboard:workspace_revenue'))
+        self.assertEqual(
+            response.context['approved_bills_count'],
+            Bill.objects.filter(organization=self.org, status=BillStatus.APPROVED).count(),
+        )
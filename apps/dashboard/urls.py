@@ -11,10 +11,12 @@ from django.urls import path
 from apps.dashboard.views import (
     ExecutiveDashboardView,
     ProvincialDashboardView,
+    DashboardWidgetView,
     DashboardRedirectView,
     FinanceWorkspaceView,
     AuditWorkspaceView,
     RevenueWorkspaceView,
+    DailyCashCloseView,
     PAOWorkspaceView,
     EBaldiaDashboardView,
     ComingSoonView,
@@ -32,9 +34,13 @@ urlpatterns = [
     path('provincial/', ProvincialDashboardView.as_view(), name='provincial'),
     path('workspace/', DashboardRedirectView.as_view(), name='workspace_redirect'),
     
+    # Dashboard panels, loaded lazily by the page shells
+    path('widgets/<str:scope>/<str:name>/', DashboardWidgetView.as_view(), name='widget'),
+    
     # Role-Specific Workspaces
     path('workspace/finance/', FinanceWorkspaceView.as_view(), name='workspace_finance'),
     path('workspace/audit/', AuditWorkspaceView.as_view(), name='workspace_audit'),
     path('workspace/revenue/', RevenueWorkspaceView.as_view(), name='workspace_revenue'),
+    path('workspace/revenue/cash-close/', DailyCashCloseView.as_view(), name='daily_cash_close'),
     path('workspace/pao/', PAOWorkspaceView.as_view(), name='workspace_pao'),
 ]
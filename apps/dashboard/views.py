@@ -4,31 +4,124 @@ System: KP-CFMS (Computerized Financial Management System)
 Client: Local Government Department, Khyber Pakhtunkhwa
 Team Lead: Jamil Shah
 Developers: Ali Asghar, Akhtar Munir and Zarif Khan
-Description: Dashboard views with caching for performance optimization
-             and role-based workspaces.
+Description: Dashboard views with per-widget caching for performance
+             optimization and role-based workspaces.
 -------------------------------------------------------------------------
 """
+from datetime import date
 from decimal import Decimal
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlencode
+from django.views import View
 from django.views.generic import TemplateView, RedirectView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
 from django.utils import timezone
 from django.shortcuts import redirect
 from django.urls import reverse
 
 from apps.budgeting.models import FiscalYear
 from apps.core.models import Organization
-from apps.dashboard.services import DashboardService
+from apps.core.db_routers import ReportingDatabaseMixin, reporting_database
+from apps.core.middleware import request_organization_id
+from apps.dashboard.services_workspace import WorkspaceSnapshotService
+from apps.dashboard.widgets import (
+    EXECUTIVE, PROVINCIAL, compute_widgets, get_widget, get_widget_data, render_widget,
+)
 
 
-class ExecutiveDashboardView(LoginRequiredMixin, TemplateView):
+class ExecutiveScopeMixin:
+    """Resolves the organization and fiscal year shown on the executive dashboard."""
+    
+    def get_executive_scope(self) -> Tuple[Optional[Organization], Optional[FiscalYear]]:
+        """
+        TMO/Accountant users see their organization; LCB/Admin users
+        without an organization see the provincial summary (None).
+        """
+        organization = self.request.user.organization
+        
+        # Current operating fiscal year (global, same for the provincial view)
+        return organization, FiscalYear.get_current_operating_year()
+
+
+class ProvincialScopeMixin:
+    """Resolves access, geographic filters and fiscal year of the provincial dashboard."""
+    
+    @staticmethod
+    def has_provincial_access(user) -> bool:
+        """Provincial analytics are restricted to LCB Officers and Super Admins."""
+        return user.is_lcb_officer() or user.is_super_admin()
+    
+    def get_provincial_filters(self) -> Tuple[Optional['Division'], Optional['District']]:
+        """Division/district from the query string (district implies its division)."""
+        from apps.core.models import Division, District
+        
+        division_id = self.request.GET.get('division')
+        district_id = self.request.GET.get('district')
+        
+        division = None
+        district = None
+        
+        if district_id:
+            try:
+                district = District.objects.select_related('division').get(id=district_id)
+                division = district.division  # Auto-set division from district
+            except (District.DoesNotExist, ValueError):
+                pass
+        elif division_id:
+            try:
+                division = Division.objects.get(id=division_id)
+            except (Division.DoesNotExist, ValueError):
+                pass
+        
+        return division, district
+    
+    @staticmethod
+    def get_provincial_fiscal_year() -> Optional[FiscalYear]:
+        """The fiscal year covering today."""
+        return FiscalYear.get_current_operating_year()
+
+
+class DashboardWidgetsMixin:
+    """
+    Page shell with one slot per widget.
+    
+    By default each slot is loaded lazily from DashboardWidgetView after
+    the shell renders. With ?render=full all widgets are computed
+    concurrently on the widget thread pool and rendered into the page.
+    """
+    
+    def get_widget_context(self, scope: str, fiscal_year: FiscalYear, *args,
+                           refresh: bool = False, query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        context = {
+            'widget_scope': scope,
+            'widget_query': urlencode({key: value for key, value in (query or {}).items() if value}),
+            'widgets': {},
+            'from_cache': False,
+        }
+        
+        if self.request.GET.get('render') == 'full':
+            data = compute_widgets(
+                scope, fiscal_year, *args, refresh=refresh,
+                organization_id=request_organization_id(self.request),
+            )
+            context['widgets'] = {
+                name: render_widget(scope, name, values, self.request)
+                for name, values in data.items()
+            }
+            context['from_cache'] = all(values['from_cache'] for values in data.values())
+        
+        return context
+
+
+class ExecutiveDashboardView(LoginRequiredMixin, ExecutiveScopeMixin, DashboardWidgetsMixin, TemplateView):
     """
     Executive Dashboard view with KPIs and analytics.
     
     Features:
     - Role-based data filtering (TMO sees org data, LCB sees provincial)
-    - 15-minute caching for performance
+    - Panels load independently, each with its own cache and TTL
     - Chart.js visualizations
     - Auto-redirects LCB officers to provincial dashboard
     """
@@ -51,111 +144,36 @@ class ExecutiveDashboardView(LoginRequiredMixin, TemplateView):
         return super().dispatch(request, *args, **kwargs)
     
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
-        """Build dashboard context with cached data."""
+        """Build the dashboard shell (and the widgets for ?render=full)."""
         context = super().get_context_data(**kwargs)
         
-        user = self.request.user
+        organization, fiscal_year = self.get_executive_scope()
         
-        # Determine organization context
-        if user.organization:
+        if organization:
             # TMO/Accountant: Show their organization only
-            organization = user.organization
             context['is_provincial_view'] = False
             context['organization'] = organization
         else:
             # LCB/Admin: Show provincial summary
-            organization = None
             context['is_provincial_view'] = True
             context['all_organizations'] = Organization.objects.filter(
                 is_active=True,
                 org_type__in=['TMA', 'TOWN']
             ).order_by('name')
         
-        # Get current operating fiscal year
-        if organization:
-            fiscal_year = FiscalYear.get_current_operating_year()
-        else:
-            # For provincial view, get any active fiscal year
-            fiscal_year = FiscalYear.objects.filter(
-                start_date__lte=timezone.now().date(),
-                end_date__gte=timezone.now().date()
-            ).first()
-        
         if not fiscal_year:
             # No active fiscal year, show empty dashboard
             context['no_fiscal_year'] = True
             return context
         
         context['fiscal_year'] = fiscal_year
-        
-        # Build cache key
-        org_id = organization.id if organization else 'provincial'
-        cache_key = f'dashboard_stats_{org_id}_{fiscal_year.id}'
-        
-        # Try to get from cache
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            context.update(cached_data)
-            context['from_cache'] = True
-        else:
-            # Calculate fresh data
-            dashboard_data = self._calculate_dashboard_data(fiscal_year, organization)
-            
-            # Cache for 15 minutes (900 seconds)
-            cache.set(cache_key, dashboard_data, 900)
-            
-            context.update(dashboard_data)
-            context['from_cache'] = False
+        context.update(self.get_widget_context(EXECUTIVE, fiscal_year, organization))
         
         return context
-    
-    def _calculate_dashboard_data(
-        self,
-        fiscal_year: FiscalYear,
-        organization: Optional[Organization]
-    ) -> Dict[str, Any]:
-        """
-        Calculate all dashboard metrics.
-        
-        Args:
-            fiscal_year: The fiscal year to analyze.
-            organization: The organization (None for provincial).
-            
-        Returns:
-            Dictionary with all dashboard data.
-        """
-        service = DashboardService()
-        
-        # Budget Summary
-        budget_summary = service.get_budget_summary(fiscal_year, organization)
-        
-        # Revenue Summary
-        revenue_summary = service.get_revenue_summary(fiscal_year, organization)
-        
-        # Cash Position
-        cash_position = service.get_cash_position(organization)
-        
-        # Pending Liabilities
-        pending_liabilities = service.get_pending_liabilities(organization)
-        
-        # Top Expenditure Heads (for chart)
-        top_expenditure = service.get_top_expenditure_heads(fiscal_year, organization, limit=5)
-        
-        # Budget Alerts (heads near exhaustion)
-        budget_alerts = service.get_budget_alerts(fiscal_year, organization)
-        
-        return {
-            'budget_summary': budget_summary,
-            'revenue_summary': revenue_summary,
-            'cash_position': cash_position,
-            'pending_liabilities': pending_liabilities,
-            'top_expenditure': top_expenditure,
-            'budget_alerts': budget_alerts,
-        }
 
 
-class ProvincialDashboardView(LoginRequiredMixin, TemplateView):
+class ProvincialDashboardView(LoginRequiredMixin, ProvincialScopeMixin, DashboardWidgetsMixin,
+                              ReportingDatabaseMixin, TemplateView):
     """
     Provincial (LCB) Dashboard for macro-level analytics.
     
@@ -163,8 +181,9 @@ class ProvincialDashboardView(LoginRequiredMixin, TemplateView):
     - Strict access control (LCB_OFFICER, SUPER_ADMIN only)
     - Cross-TMA aggregation
     - Geographic filtering (Division/District)
-    - 1-hour caching with manual refresh
+    - Per-widget caching (filters included in the keys) with manual refresh
     - Performance rankings and alerts
+    - Reads from the reporting replica when configured
     """
     
     template_name = 'dashboard/provincial_index.html'
@@ -175,128 +194,82 @@ class ProvincialDashboardView(LoginRequiredMixin, TemplateView):
         if not request.user.is_authenticated:
             return super().dispatch(request, *args, **kwargs)
         
-        user = request.user
-        
         # Check if user has LCB/Admin access
-        if not (user.is_lcb_officer() or user.is_super_admin()):
+        if not self.has_provincial_access(request.user):
             from django.contrib import messages
-            from django.shortcuts import redirect
             messages.error(request, 'Access Denied: Provincial Dashboard requires LCB Officer or Super Admin role.')
             return redirect('dashboard:index')
         
         return super().dispatch(request, *args, **kwargs)
     
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
-        """Build provincial dashboard context with cached data."""
+        """Build the provincial dashboard shell (and the widgets for ?render=full)."""
         context = super().get_context_data(**kwargs)
         
         from apps.core.models import Division, District
         
-        # Get filter parameters
-        division_id = self.request.GET.get('division')
-        district_id = self.request.GET.get('district')
+        division, district = self.get_provincial_filters()
         force_refresh = self.request.GET.get('refresh') == '1'
         
-        division = None
-        district = None
-        
-        if district_id:
-            try:
-                district = District.objects.get(id=district_id)
-                division = district.division  # Auto-set division from district
-            except District.DoesNotExist:
-                pass
-        elif division_id:
-            try:
-                division = Division.objects.get(id=division_id)
-            except Division.DoesNotExist:
-                pass
-        
         # Add filter options to context
         context['divisions'] = Division.objects.all().order_by('name')
         context['districts'] = District.objects.all().order_by('name')
         context['selected_division'] = division
         context['selected_district'] = district
         
-        # Get current fiscal year
-        fiscal_year = FiscalYear.objects.filter(
-            start_date__lte=timezone.now().date(),
-            end_date__gte=timezone.now().date()
-        ).first()
+        fiscal_year = self.get_provincial_fiscal_year()
         
         if not fiscal_year:
             context['no_fiscal_year'] = True
             return context
         
         context['fiscal_year'] = fiscal_year
-        
-        # Build cache key based on filters
-        filter_key = f"{division.id if division else 'all'}_{district.id if district else 'all'}"
-        cache_key = f'provincial_stats_{fiscal_year.id}_{filter_key}'
-        
-        # Check cache (unless force refresh)
-        if not force_refresh:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                context.update(cached_data)
-                context['from_cache'] = True
-                return context
-        
-        # Calculate fresh data
-        provincial_data = self._calculate_provincial_data(fiscal_year, division, district)
-        
-        # Cache for 1 hour (3600 seconds)
-        cache.set(cache_key, provincial_data, 3600)
-        
-        context.update(provincial_data)
-        context['from_cache'] = False
+        context.update(self.get_widget_context(
+            PROVINCIAL, fiscal_year, division, district,
+            refresh=force_refresh,
+            query={
+                'division': division.id if division and not district else None,
+                'district': district.id if district else None,
+                'refresh': '1' if force_refresh else None,
+            },
+        ))
         
         return context
+
+
+class DashboardWidgetView(LoginRequiredMixin, ExecutiveScopeMixin, ProvincialScopeMixin, View):
+    """
+    HTML fragment of one dashboard widget, loaded by the page shell.
     
-    def _calculate_provincial_data(
-        self,
-        fiscal_year: FiscalYear,
-        division: Optional['Division'] = None,
-        district: Optional['District'] = None
-    ) -> Dict[str, Any]:
-        """
-        Calculate all provincial dashboard metrics.
-        
-        Args:
-            fiscal_year: The fiscal year to analyze.
-            division: Optional division filter.
-            district: Optional district filter.
-            
-        Returns:
-            Dictionary with all provincial dashboard data.
-        """
-        from apps.dashboard.services_provincial import ProvincialAnalyticsService
-        
-        service = ProvincialAnalyticsService()
-        
-        # Provincial totals
-        provincial_totals = service.get_provincial_totals(fiscal_year, division, district)
-        
-        # TMA performance ranking
-        performance_ranking = service.get_tma_performance_ranking(fiscal_year, division, district)
-        
-        # Expense composition
-        expense_composition = service.get_expense_composition(fiscal_year, division, district)
-        
-        # Deficit TMAs
-        deficit_tmas = service.get_deficit_tmas(fiscal_year, division, district)
+    Executive widgets are scoped to the user's organization (provincial
+    summary for users without one); provincial widgets require LCB/Admin
+    access, honour the division/district filters and read from the
+    reporting replica when configured.
+    """
+    
+    def get(self, request, scope: str, name: str) -> HttpResponse:
+        if get_widget(scope, name) is None:
+            raise Http404('Unknown dashboard widget.')
         
-        # Low utilization TMAs
-        low_utilization_tmas = service.get_low_utilization_tmas(fiscal_year, Decimal('10.00'), division, district)
+        refresh = request.GET.get('refresh') == '1'
         
-        return {
-            'provincial_totals': provincial_totals,
-            'top_performers': performance_ranking['top_performers'],
-            'laggards': performance_ranking['laggards'],
-            'expense_composition': expense_composition,
-            'deficit_tmas': deficit_tmas,
-            'low_utilization_tmas': low_utilization_tmas,
-        }
+        if scope == PROVINCIAL:
+            if not self.has_provincial_access(request.user):
+                raise PermissionDenied
+            
+            with reporting_database(request):
+                fiscal_year = self.get_provincial_fiscal_year()
+                if not fiscal_year:
+                    return HttpResponse('')
+                division, district = self.get_provincial_filters()
+                data = get_widget_data(scope, name, fiscal_year, division, district, refresh=refresh)
+                return HttpResponse(render_widget(scope, name, data, request))
+        
+        organization, fiscal_year = self.get_executive_scope()
+        if not fiscal_year:
+            return HttpResponse('')
+        data = get_widget_data(scope, name, fiscal_year, organization, refresh=refresh)
+        return HttpResponse(render_widget(scope, name, data, request))
 
 
 # =====================================================================
@@ -384,7 +357,6 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
         
         # Import here to avoid circular imports
         from apps.expenditure.models import Bill, BillStatus
-        from apps.budgeting.models import BudgetAllocation
         from django.db.models import Sum, Q
         
         # Action Queue: Bills awaiting action based on user role
@@ -397,7 +369,7 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
                 organization=organization,
                 fiscal_year=fiscal_year,
                 status=BillStatus.SUBMITTED
-            ).select_related('payee').prefetch_related('lines__budget_head__global_head').order_by('-bill_date')[:10]
+            ).select_related('payee').prefetch_related('lines__budget_head__nam_head').order_by('-bill_date')[:10]
             context['workspace_role'] = 'Finance Officer'
             context['workspace_action'] = 'Pre-Audit'
             
@@ -407,7 +379,7 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
                 organization=organization,
                 fiscal_year=fiscal_year,
                 status=BillStatus.AUDITED
-            ).select_related('payee').prefetch_related('lines__budget_head__global_head').order_by('-bill_date')[:10]
+            ).select_related('payee').prefetch_related('lines__budget_head__nam_head').order_by('-bill_date')[:10]
             context['workspace_role'] = 'TO Finance'
             context['workspace_action'] = 'Verify'
             
@@ -417,32 +389,28 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
                 organization=organization,
                 fiscal_year=fiscal_year,
                 status__in=[BillStatus.SUBMITTED, BillStatus.AUDITED]
-            ).select_related('payee').prefetch_related('lines__budget_head__global_head').order_by('-bill_date')[:10]
+            ).select_related('payee').prefetch_related('lines__budget_head__nam_head').order_by('-bill_date')[:10]
             context['workspace_role'] = 'Finance'
             context['workspace_action'] = 'Review'
         
         context['pending_bills'] = pending_bills
-        context['pending_bills_count'] = pending_bills.count()
         
-        # Budget Utilization Metrics
-        budget_allocations = BudgetAllocation.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year
-        )
-        
-        # Count of allocations for this org/FY
-        allocation_count = budget_allocations.count()
+        # Counters: one conditional aggregate per model, cached per org
+        snapshot = WorkspaceSnapshotService.get_snapshot(organization, fiscal_year)
+        bills = snapshot['bills']
+        budget = snapshot['budget']
         
-        # Get comprehensive budget metrics
-        budget_totals = budget_allocations.aggregate(
-            total_revised=Sum('revised_allocation'),
-            total_released=Sum('released_amount'),
-            total_spent=Sum('spent_amount')
-        )
+        if user.has_any_role(['FINANCE_OFFICER']):
+            context['pending_bills_count'] = bills['submitted']
+        elif user.has_any_role(['TOF', 'ACCOUNTANT']):
+            context['pending_bills_count'] = bills['audited']
+        else:
+            context['pending_bills_count'] = bills['submitted'] + bills['audited']
         
-        total_revised = budget_totals['total_revised'] or Decimal('0.00')
-        total_released = budget_totals['total_released'] or Decimal('0.00')
-        total_spent = budget_totals['total_spent'] or Decimal('0.00')
+        # Budget Utilization Metrics
+        total_revised = budget['total_revised']
+        total_released = budget['total_released']
+        total_spent = budget['total_spent']
         
         # Available = Released - Spent (funds available for spending)
         available = total_released - total_spent
@@ -456,17 +424,13 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
             'total_spent': total_spent,
             'available': available,
             'utilization_rate': utilization_rate,
-            'allocation_count': allocation_count,
+            'allocation_count': budget['allocation_count'],
         }
         
         # Pending Liabilities = Approved bills (AP) + Tax liabilities (withheld taxes)
         
         # 1. Bills with status APPROVED = Accounts Payable (AP) liabilities
-        pending_bills_total = Bill.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status=BillStatus.APPROVED  # Approved but not yet paid
-        ).aggregate(total=Sum('net_amount'))['total'] or Decimal('0.00')
+        pending_bills_total = bills['approved_amount']
         
         # 2. Tax Liabilities = Credit balances in tax-related liability accounts
         # When bills are approved, taxes are withheld and credited to tax liability accounts
@@ -476,7 +440,7 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
         
         tax_liability_heads = BudgetHead.objects.filter(
             is_active=True,
-            global_head__system_code__in=[
+            nam_head__system_code__in=[
                 SystemCode.TAX_IT,      # Income Tax Payable
                 SystemCode.TAX_GST,     # GST/Sales Tax Payable
                 SystemCode.CLEARING_IT, # Income Tax Withheld (clearing)
@@ -487,14 +451,14 @@ class FinanceWorkspaceView(LoginRequiredMixin, TemplateView):
                 Sum('journal_entries__debit',
                     filter=Q(journal_entries__voucher__is_posted=True,
                             journal_entries__voucher__organization=organization,
-                            journal_entries__voucher__fiscal_year=fiscal_year)),
+                            journal_entries__fiscal_year=fiscal_year)),
                 Decimal('0.00')
             ),
             total_credit=Coalesce(
                 Sum('journal_entries__credit',
                     filter=Q(journal_entries__voucher__is_posted=True,
                             journal_entries__voucher__organization=organization,
-                            journal_entries__voucher__fiscal_year=fiscal_year)),
+                            journal_entries__fiscal_year=fiscal_year)),
                 Decimal('0.00')
             )
         )
@@ -541,7 +505,6 @@ class AuditWorkspaceView(LoginRequiredMixin, TemplateView):
         context['organization'] = organization
         
         from apps.expenditure.models import Bill, BillStatus
-        from django.db.models import Sum
         
         # Action Queue: Bills marked for audit (if status exists)
         # Note: MARKED_FOR_AUDIT status will be added in next task
@@ -551,26 +514,16 @@ class AuditWorkspaceView(LoginRequiredMixin, TemplateView):
             status__in=[BillStatus.SUBMITTED]  # Will add MARKED_FOR_AUDIT
         ).select_related('payee', 'budget_head', 'submitted_by').order_by('-bill_date')[:15]
         
+        bills = WorkspaceSnapshotService.get_snapshot(organization, fiscal_year)['bills']
+        
         context['audit_bills'] = audit_bills
-        context['audit_bills_count'] = audit_bills.count()
+        context['audit_bills_count'] = bills['submitted']
         
         # Audit Statistics
-        total_audited = Bill.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status__in=[BillStatus.APPROVED, BillStatus.PAID]
-        ).count()
-        
-        total_rejected = Bill.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status=BillStatus.REJECTED
-        ).count()
-        
         context['audit_stats'] = {
-            'total_audited': total_audited,
-            'total_rejected': total_rejected,
-            'pending_audit': audit_bills.count(),
+            'total_audited': bills['audited_total'],
+            'total_rejected': bills['rejected'],
+            'pending_audit': bills['submitted'],
         }
         
         return context
@@ -606,34 +559,17 @@ class RevenueWorkspaceView(LoginRequiredMixin, TemplateView):
         context['fiscal_year'] = fiscal_year
         context['organization'] = organization
         
-        from apps.revenue.models import RevenueDemand, RevenueCollection, DemandStatus, CollectionStatus
-        from django.db.models import Sum, Q
-        from django.db.models import Sum, Q, F, Count
-        from django.db.models.functions import Coalesce
-        from datetime import date
-        
-        today = timezone.now().date()
-        month_start = date(today.year, today.month, 1)
-        
-        # Today's Collections (Posted only - Accrual basis)
-        today_collections = RevenueCollection.objects.filter(
-            organization=organization,
-            demand__fiscal_year=fiscal_year,
-            receipt_date=today,
-            status=CollectionStatus.POSTED
-        ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+        from apps.revenue.models import RevenueDemand, DemandStatus
+        from apps.expenditure.models import Bill, BillStatus
         
-        context['today_collections'] = today_collections
+        snapshot = WorkspaceSnapshotService.get_snapshot(organization, fiscal_year)
+        collections = snapshot['collections']
+        payments = snapshot['payments']
+        demands = snapshot['demands']
         
-        # Month-to-Date Collections (Posted only - Accrual basis)
-        mtd_collections = RevenueCollection.objects.filter(
-            organization=organization,
-            demand__fiscal_year=fiscal_year,
-            receipt_date__gte=month_start,
-            status=CollectionStatus.POSTED
-        ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
-        
-        context['mtd_collections'] = mtd_collections
+        # Collections (Posted only - Accrual basis)
+        context['today_collections'] = collections['today']
+        context['mtd_collections'] = collections['month_to_date']
         
         # Outstanding Demands
         outstanding_demands = RevenueDemand.objects.filter(
@@ -643,77 +579,24 @@ class RevenueWorkspaceView(LoginRequiredMixin, TemplateView):
         ).select_related('payer', 'budget_head').order_by('due_date')[:10]
         
         context['outstanding_demands'] = outstanding_demands
-        context['outstanding_demands_count'] = outstanding_demands.count()
+        context['outstanding_demands_count'] = demands['outstanding']
         
         # Total Outstanding Amount (All demands, accounting for partial payments)
-        total_outstanding = RevenueDemand.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL]
-        ).annotate(
-            total_collected=Coalesce(
-                Sum('collections__amount_received', 
-                    filter=Q(collections__status=CollectionStatus.POSTED)),
-                Decimal('0.00')
-            )
-        ).aggregate(
-            total=Sum(F('amount') - F('total_collected'))
-        )['total'] or Decimal('0.00')
-        
-        context['total_outstanding'] = total_outstanding
+        context['total_outstanding'] = demands['outstanding_amount']
         
         # Unreconciled Collections (not posted to GL)
-        unreconciled_data = RevenueCollection.objects.filter(
-            organization=organization,
-            demand__fiscal_year=fiscal_year,
-            status=CollectionStatus.DRAFT
-        ).aggregate(
-            count=Count('id'),
-            total=Sum('amount_received')
-        )
-        
-        context['unreconciled_collections'] = unreconciled_data['count'] or 0
-        context['unreconciled_amount'] = unreconciled_data['total'] or Decimal('0.00')
+        context['unreconciled_collections'] = collections['unreconciled']
+        context['unreconciled_amount'] = collections['unreconciled_amount']
         
         # Expenditure Metrics (Cashier handles both collections and payments)
-        from apps.expenditure.models import Payment
-        
-        # Today's Payments (Posted only)
-        today_payments = Payment.objects.filter(
-            organization=organization,
-            bill__fiscal_year=fiscal_year,
-            cheque_date=today,
-            is_posted=True
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        
-        context['today_payments'] = today_payments
-        
-        # Month-to-Date Payments (Posted only)
-        mtd_payments = Payment.objects.filter(
-            organization=organization,
-            bill__fiscal_year=fiscal_year,
-            cheque_date__gte=month_start,
-            is_posted=True
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        
-        context['mtd_payments'] = mtd_payments
+        context['today_payments'] = payments['today']
+        context['mtd_payments'] = payments['month_to_date']
         
         # Pending Payments (Draft status - not posted)
-        pending_payments_data = Payment.objects.filter(
-            organization=organization,
-            bill__fiscal_year=fiscal_year,
-            is_posted=False
-        ).aggregate(
-            count=Count('id'),
-            total=Sum('amount')
-        )
-        
-        context['pending_payments'] = pending_payments_data['count'] or 0
-        context['pending_payments_amount'] = pending_payments_data['total'] or Decimal('0.00')
+        context['pending_payments'] = payments['pending']
+        context['pending_payments_amount'] = payments['pending_amount']
         
         # Bills Awaiting Payment (Approved but not yet paid)
-        from apps.expenditure.models import Bill, BillStatus
-        
         approved_bills = Bill.objects.filter(
             organization=organization,
             fiscal_year=fiscal_year,
@@ -721,11 +604,59 @@ class RevenueWorkspaceView(LoginRequiredMixin, TemplateView):
         ).select_related('payee', 'approved_by').order_by('-approved_at')[:10]
         
         context['approved_bills'] = approved_bills
-        context['approved_bills_count'] = approved_bills.count()
+        context['approved_bills_count'] = snapshot['bills']['approved']
         
         return context
 
 
+class DailyCashCloseView(LoginRequiredMixin, TemplateView):
+    """
+    Cashier daily cash close.
+    
+    GET shows the printable cash report of a day (?date=YYYY-MM-DD,
+    default today) by bank account and head; POST closes the day.
+    """
+    
+    template_name = 'dashboard/daily_cash_close.html'
+    
+    def dispatch(self, request, *args, **kwargs):
+        user = request.user
+        if user.is_authenticated and not (user.organization and user.can_record_payments()):
+            raise PermissionDenied("Only cashiers of a TMA can close the cash day.")
+        return super().dispatch(request, *args, **kwargs)
+    
+    def get_day(self):
+        value = self.request.POST.get('date') or self.request.GET.get('date')
+        if not value:
+            return timezone.localdate()
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise Http404("Invalid date")
+    
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        from apps.dashboard.services_cash import DailyCashService
+        
+        day = self.get_day()
+        context['organization'] = self.request.user.organization
+        context['report'] = DailyCashService.get_day_report(self.request.user.organization, day)
+        context['can_close'] = day <= timezone.localdate()
+        return context
+    
+    def post(self, request, *args, **kwargs):
+        from django.contrib import messages
+        from apps.dashboard.services_cash import DailyCashService
+        
+        day = self.get_day()
+        if day > timezone.localdate():
+            messages.error(request, 'A future day cannot be closed.')
+        else:
+            DailyCashService.close_day(request.user.organization, day, request.user)
+            messages.success(request, f'Cash day {day:%d-%m-%Y} closed.')
+        return redirect(f"{reverse('dashboard:daily_cash_close')}?{urlencode({'date': day.isoformat()})}")
+
+
 class PAOWorkspaceView(LoginRequiredMixin, TemplateView):
     """
     PAO / TMO Workspace (Sanctioning Authority).
@@ -759,7 +690,6 @@ class PAOWorkspaceView(LoginRequiredMixin, TemplateView):
         from apps.expenditure.models import Bill, BillStatus
         from apps.budgeting.models import BudgetAllocation
         from django.db.models import Sum
-        from datetime import date
         
         # Action Queue: Bills ready for final approval
         # (After audit, waiting for TMO approval)
@@ -769,21 +699,13 @@ class PAOWorkspaceView(LoginRequiredMixin, TemplateView):
             status=BillStatus.VERIFIED 
         ).select_related('payee', 'budget_head', 'submitted_by').order_by('-bill_date')[:10]
         
+        snapshot = WorkspaceSnapshotService.get_snapshot(organization, fiscal_year)
+        
         context['approval_queue'] = approval_queue
-        context['approval_queue_count'] = approval_queue.count()
+        context['approval_queue_count'] = snapshot['bills']['verified']
         
         # Monthly Expenditure Summary
-        today = timezone.now().date()
-        month_start = date(today.year, today.month, 1)
-        
-        monthly_expenditure = Bill.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status__in=[BillStatus.APPROVED, BillStatus.PAID],
-            bill_date__gte=month_start
-        ).aggregate(total=Sum('net_amount'))['total'] or Decimal('0.00')
-        
-        context['monthly_expenditure'] = monthly_expenditure
+        context['monthly_expenditure'] = snapshot['bills']['monthly_expenditure']
         
         # Budget Performance
         budget_allocations = BudgetAllocation.objects.filter(
@@ -791,13 +713,8 @@ class PAOWorkspaceView(LoginRequiredMixin, TemplateView):
             fiscal_year=fiscal_year
         )
         
-        total_budget = budget_allocations.aggregate(
-            total=Sum('revised_allocation')
-        )['total'] or Decimal('0.00')
-        
-        total_spent = budget_allocations.aggregate(
-            total=Sum('spent_amount')
-        )['total'] or Decimal('0.00')
+        total_budget = snapshot['budget']['total_revised']
+        total_spent = snapshot['budget']['total_spent']
         
         context['budget_performance'] = {
             'total_budget': total_budget,
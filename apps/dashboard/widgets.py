@@ -0,0 +1,253 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Dashboard widget registry. Each panel of the executive and
+             provincial dashboards is computed, cached and rendered on
+             its own, either as a lazily loaded fragment or concurrently
+             on a thread pool for a full server-side page.
+-------------------------------------------------------------------------
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.template.loader import render_to_string
+
+from apps.dashboard.services import DashboardService
+from apps.dashboard.services_facts import TmaFactService
+from apps.dashboard.services_provincial import ProvincialAnalyticsService
+from apps.dashboard.models import TmaDailyFact
+
+EXECUTIVE = 'executive'
+PROVINCIAL = 'provincial'
+
+
+@dataclass(frozen=True)
+class DashboardWidget:
+    """A dashboard panel with its own data function, template and cache TTL."""
+    name: str
+    template: str
+    timeout: int
+    compute: Callable[..., Dict[str, Any]]
+
+
+# ---------------------------------------------------------------------
+# Executive dashboard panels: compute(fiscal_year, organization)
+# ---------------------------------------------------------------------
+
+def _budget_summary(fiscal_year, organization) -> Dict[str, Any]:
+    return {'budget_summary': DashboardService.get_budget_summary(fiscal_year, organization)}
+
+
+def _revenue_summary(fiscal_year, organization) -> Dict[str, Any]:
+    return {'revenue_summary': DashboardService.get_revenue_summary(fiscal_year, organization)}
+
+
+def _revenue_trend(fiscal_year, organization) -> Dict[str, Any]:
+    facts = TmaDailyFact.objects.filter(fiscal_year=fiscal_year)
+    if organization:
+        facts = facts.filter(organization=organization)
+    return {'monthly_trend': TmaFactService.get_monthly_collections(facts, months=6)}
+
+
+def _cash_position(fiscal_year, organization) -> Dict[str, Any]:
+    return {'cash_position': DashboardService.get_cash_position(organization)}
+
+
+def _pending_liabilities(fiscal_year, organization) -> Dict[str, Any]:
+    return {'pending_liabilities': DashboardService.get_pending_liabilities(organization)}
+
+
+def _top_expenditure(fiscal_year, organization) -> Dict[str, Any]:
+    return {'top_expenditure': DashboardService.get_top_expenditure_heads(fiscal_year, organization, limit=5)}
+
+
+def _budget_alerts(fiscal_year, organization) -> Dict[str, Any]:
+    return {'budget_alerts': DashboardService.get_budget_alerts(fiscal_year, organization)}
+
+
+# ---------------------------------------------------------------------
+# Provincial dashboard panels: compute(fiscal_year, division, district)
+# ---------------------------------------------------------------------
+
+def _provincial_totals(fiscal_year, division, district) -> Dict[str, Any]:
+    return {'provincial_totals': ProvincialAnalyticsService.get_provincial_totals(fiscal_year, division, district)}
+
+
+def _rankings(fiscal_year, division, district) -> Dict[str, Any]:
+    ranking = ProvincialAnalyticsService.get_tma_performance_ranking(fiscal_year, division, district)
+    return {'top_performers': ranking['top_performers'], 'laggards': ranking['laggards']}
+
+
+def _expense_composition(fiscal_year, division, district) -> Dict[str, Any]:
+    return {'expense_composition': ProvincialAnalyticsService.get_expense_composition(fiscal_year, division, district)}
+
+
+def _deficit_tmas(fiscal_year, division, district) -> Dict[str, Any]:
+    return {'deficit_tmas': ProvincialAnalyticsService.get_deficit_tmas(fiscal_year, division, district)}
+
+
+def _low_utilization_tmas(fiscal_year, division, district) -> Dict[str, Any]:
+    return {'low_utilization_tmas': ProvincialAnalyticsService.get_low_utilization_tmas(
+        fiscal_year, Decimal('10.00'), division, district
+    )}
+
+
+def _widgets(*widgets: DashboardWidget) -> Dict[str, DashboardWidget]:
+    return {widget.name: widget for widget in widgets}
+
+
+# Figures read from the daily facts are cheap and change with every
+# posting, so they get short TTLs; rankings and compositions move slowly.
+WIDGETS: Dict[str, Dict[str, DashboardWidget]] = {
+    EXECUTIVE: _widgets(
+        DashboardWidget('budget_summary', 'dashboard/widgets/budget_summary.html', 900, _budget_summary),
+        DashboardWidget('revenue_summary', 'dashboard/widgets/revenue_summary.html', 120, _revenue_summary),
+        DashboardWidget('cash_position', 'dashboard/widgets/cash_position.html', 120, _cash_position),
+        DashboardWidget('pending_liabilities', 'dashboard/widgets/pending_liabilities.html', 120,
+                        _pending_liabilities),
+        DashboardWidget('top_expenditure', 'dashboard/widgets/top_expenditure.html', 900, _top_expenditure),
+        DashboardWidget('revenue_trend', 'dashboard/widgets/revenue_trend.html', 900, _revenue_trend),
+        DashboardWidget('budget_alerts', 'dashboard/widgets/budget_alerts.html', 900, _budget_alerts),
+        DashboardWidget('bank_accounts', 'dashboard/widgets/bank_accounts.html', 120, _cash_position),
+    ),
+    PROVINCIAL: _widgets(
+        DashboardWidget('provincial_totals', 'dashboard/widgets/provincial_totals.html', 300,
+                        _provincial_totals),
+        DashboardWidget('rankings', 'dashboard/widgets/rankings.html', 3600, _rankings),
+        DashboardWidget('expense_composition', 'dashboard/widgets/expense_composition.html', 3600,
+                        _expense_composition),
+        DashboardWidget('deficit_tmas', 'dashboard/widgets/deficit_tmas.html', 3600, _deficit_tmas),
+        DashboardWidget('low_utilization_tmas', 'dashboard/widgets/low_utilization_tmas.html', 3600,
+                        _low_utilization_tmas),
+    ),
+}
+
+
+def get_widget(scope: str, name: str) -> Optional[DashboardWidget]:
+    """Look up a widget by scope ('executive'/'provincial') and name."""
+    return WIDGETS.get(scope, {}).get(name)
+
+
+def widget_cache_key(scope: str, name: str, fiscal_year, *args) -> str:
+    """
+    Cache key of one widget for one fiscal year and filter combination.
+
+    Args:
+        scope: Widget scope.
+        name: Widget name.
+        fiscal_year: The fiscal year.
+        *args: Filters passed to compute (organization / division, district).
+    """
+    parts = [str(getattr(arg, 'pk', None) or 'all') for arg in args]
+    return f"dashboard_widget_{scope}_{name}_{fiscal_year.pk}_{'_'.join(parts)}"
+
+
+def get_widget_data(scope: str, name: str, fiscal_year, *args,
+                    refresh: bool = False) -> Dict[str, Any]:
+    """
+    Return a widget's data from its cache, computing it on a miss.
+
+    Returns:
+        The widget context, plus 'from_cache' telling whether it was cached.
+    """
+    widget = WIDGETS[scope][name]
+    key = widget_cache_key(scope, name, fiscal_year, *args)
+
+    data = None if refresh else cache.get(key)
+    if data is not None:
+        return {**data, 'from_cache': True}
+
+    data = widget.compute(fiscal_year, *args)
+    cache.set(key, data, widget.timeout)
+    return {**data, 'from_cache': False}
+
+
+def render_widget(scope: str, name: str, data: Dict[str, Any], request=None) -> str:
+    """Render a widget's fragment template with its data."""
+    widget = WIDGETS[scope][name]
+    return render_to_string(widget.template, {**data, 'widget': widget}, request=request)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool shared by all requests (bounded concurrency)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DASHBOARD_WIDGET_WORKERS,
+                thread_name_prefix='dashboard-widget',
+            )
+        return _executor
+
+
+def _run_in_worker(organization_id: Optional[int], function: Callable, *args, **kwargs):
+    """
+    Run a widget in a pool thread.
+
+    The thread has its own database connections, which TenantMiddleware
+    never saw, so the organization is set on each connection the widget
+    reads from (RLS) and the connections are closed afterwards.
+    """
+    from apps.core.db_routers import current_read_alias
+    from apps.core.middleware import rls_organization
+
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            if organization_id is not None:
+                for alias in sorted({DEFAULT_DB_ALIAS, current_read_alias()}):
+                    stack.enter_context(rls_organization(organization_id, connections[alias]))
+            return function(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+def compute_widgets(scope: str, fiscal_year, *args, names: Optional[Iterable[str]] = None,
+                    refresh: bool = False, organization_id: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute several widgets of a scope, concurrently when a pool is enabled.
+
+    Each widget runs in a copy of the caller's context, so context-local
+    state such as the reporting-database scope carries over to the pool.
+
+    Args:
+        scope: Widget scope.
+        fiscal_year: The fiscal year.
+        *args: Filters passed to compute.
+        names: Widgets to compute (default: all of the scope).
+        refresh: Bypass (and overwrite) the widget caches.
+        organization_id: RLS organization of the requesting user (0 for
+                         oversight), set on the pool threads' connections.
+
+    Returns:
+        Mapping of widget name to its data.
+    """
+    names = list(names or WIDGETS[scope])
+
+    if settings.DASHBOARD_WIDGET_WORKERS <= 1 or len(names) <= 1:
+        return {name: get_widget_data(scope, name, fiscal_year, *args, refresh=refresh) for name in names}
+
+    executor = _get_executor()
+    futures = {
+        name: executor.submit(
+            contextvars.copy_context().run, _run_in_worker, organization_id, get_widget_data,
+            scope, name, fiscal_year, *args, refresh=refresh,
+        )
+        for name in names
+    }
+    return {name: future.result() for name, future in futures.items()}
@@ -17,7 +17,9 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
-from apps.core.mixins import AuditLogMixin, StatusMixin, TenantAwareMixin, TimeStampedMixin
+from apps.core.mixins import (
+    AuditLogMixin, FieldTrackerMixin, StatusMixin, TenantAwareMixin, TimeStampedMixin
+)
 from apps.core.exceptions import BudgetExceededException, WorkflowTransitionException
 
 if TYPE_CHECKING:
@@ -223,7 +225,7 @@ class BillLine(models.Model):
         return f"{self.budget_head.code} - {self.amount}"
 
 
-class Bill(AuditLogMixin, TenantAwareMixin):
+class Bill(AuditLogMixin, TenantAwareMixin, FieldTrackerMixin):
     """
     Bill/Invoice representing a liability to be paid.
     
@@ -479,6 +481,8 @@ class Bill(AuditLogMixin, TenantAwareMixin):
         help_text=_('GL voucher recording the liability.')
     )
     
+    tracked_fields = ('status',)
+    
     class Meta:
         verbose_name = _('Bill')
         verbose_name_plural = _('Bills')
@@ -540,7 +544,18 @@ class Bill(AuditLogMixin, TenantAwareMixin):
             self.net_amount = self.gross_amount - self.tax_amount
         
         self.clean()
+        is_new = self.pk is None
+        changes = {} if is_new else self.get_field_changes(kwargs.get('update_fields'))
         super().save(*args, **kwargs)
+        
+        from apps.dashboard.services_workspace import WorkspaceSnapshotService
+        WorkspaceSnapshotService.invalidate(self.organization_id)
+        
+        # Submitted-bills badge follows every status transition
+        if is_new or 'status' in changes:
+            from apps.core.counters import CounterService
+            old_status = None if is_new else changes['status'][0]
+            CounterService.bill_status_changed(self.organization_id, old_status, self.status)
     
     def submit(self, user: 'CustomUser') -> None:
         """
@@ -853,6 +868,9 @@ class Bill(AuditLogMixin, TenantAwareMixin):
             'status', 'approved_at', 'approved_by', 
             'liability_voucher', 'updated_at'
         ])
+        
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_bill_approved(self)
     
     def _approve_salary_bill(self, user: 'CustomUser') -> None:
         """
@@ -1003,6 +1021,9 @@ class Bill(AuditLogMixin, TenantAwareMixin):
             'status', 'approved_at', 'approved_by',
             'liability_voucher', 'updated_at'
         ])
+        
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_bill_approved(self)
     
     def reject(self, user: 'CustomUser', reason: str) -> None:
         """
@@ -1130,6 +1151,13 @@ class Payment(AuditLogMixin, TenantAwareMixin):
                 'bill': _('Only APPROVED bills can be paid.')
             })
     
+    def save(self, *args, **kwargs) -> None:
+        """Save and invalidate the organization's workspace snapshot."""
+        super().save(*args, **kwargs)
+        
+        from apps.dashboard.services_workspace import WorkspaceSnapshotService
+        WorkspaceSnapshotService.invalidate(self.organization_id)
+    
     @transaction.atomic
     def post(self, user: 'CustomUser') -> None:
         """
@@ -1233,6 +1261,12 @@ class Payment(AuditLogMixin, TenantAwareMixin):
         # Update bill status to PAID
         self.bill.status = BillStatus.PAID
         self.bill.save(update_fields=['status', 'updated_at'])
+        
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_payment(self)
+        
+        from apps.dashboard.services_cash import DailyCashService
+        DailyCashService.record_payment(self)
  
 
 
@@ -0,0 +1,89 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to maintain the fiscal-year partitions of
+             the journal table (PostgreSQL only).
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py manage_journal_partitions
+    python manage.py manage_journal_partitions --next-year
+    python manage.py manage_journal_partitions --list
+
+Schedule with --next-year in cron ahead of 1 July so the coming fiscal
+year's partition exists before the first voucher is posted to it.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.budgeting.models import FiscalYear
+from apps.finance import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Create missing fiscal-year partitions for the journal table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--next-year',
+            action='store_true',
+            help='Create the fiscal year following the latest one (if missing) and its partition'
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List existing partitions with estimated row counts and exit'
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_partitioned():
+            raise CommandError(
+                'finance_journalentry is not partitioned. '
+                'Partitioning requires PostgreSQL and migration finance.0037.'
+            )
+
+        if options['list']:
+            self._list_partitions()
+            return
+
+        if options['next_year']:
+            self._ensure_next_fiscal_year()
+
+        created = 0
+        for fy in FiscalYear.objects.order_by('start_date'):
+            if partitioning.ensure_partition(fy.id):
+                created += 1
+                self.stdout.write(self.style.SUCCESS(
+                    f"  ✓ Created partition {partitioning.partition_name(fy.id)} for FY {fy.year_name}"
+                ))
+
+        self.stdout.write(self.style.SUCCESS(f"Partitions created: {created}"))
+
+    def _ensure_next_fiscal_year(self) -> None:
+        """Create the fiscal year after the latest one, if it does not exist."""
+        latest = FiscalYear.objects.order_by('-end_date').first()
+        if latest is None:
+            raise CommandError('No fiscal year exists to derive the next one from.')
+
+        start_date = latest.end_date + timedelta(days=1)
+        end_date = start_date.replace(year=start_date.year + 1) - timedelta(days=1)
+        year_name = f"{start_date.year}-{str(end_date.year)[-2:]}"
+
+        fy, created = FiscalYear.objects.get_or_create(
+            year_name=year_name,
+            defaults={'start_date': start_date, 'end_date': end_date}
+        )
+        if created:
+            self.stdout.write(self.style.SUCCESS(f"  ✓ Created fiscal year {fy.year_name}"))
+        else:
+            self.stdout.write(f"  • Fiscal year {fy.year_name} already exists")
+
+    def _list_partitions(self) -> None:
+        self.stdout.write(f"{'Partition':45} {'Bound':30} {'Rows (est.)':>12}")
+        self.stdout.write("-" * 90)
+        for name, bound, rows in partitioning.list_partitions():
+            self.stdout.write(f"{name:45} {bound:30} {rows:>12,}")
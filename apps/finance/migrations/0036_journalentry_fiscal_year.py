@@ -0,0 +1,41 @@
+"""
+Denormalize the voucher's fiscal year onto JournalEntry.
+
+fiscal_year_id becomes the partition key of the journal table on
+PostgreSQL (see 0037_partition_journalentry).
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_fiscal_year(apps, schema_editor):
+    """Copy voucher.fiscal_year_id onto every existing journal entry."""
+    JournalEntry = apps.get_model('finance', 'JournalEntry')
+    Voucher = apps.get_model('finance', 'Voucher')
+    JournalEntry.objects.filter(fiscal_year__isnull=True).update(
+        fiscal_year_id=models.Subquery(
+            Voucher.objects.filter(pk=models.OuterRef('voucher_id')).values('fiscal_year_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgeting', '0028_alter_budgetallocation_options'),
+        ('finance', '0035_populate_nam_system_codes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='fiscal_year',
+            field=models.ForeignKey(editable=False, help_text='Fiscal year of the parent voucher.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='journal_entries', to='budgeting.fiscalyear', verbose_name='Fiscal Year'),
+        ),
+        migrations.RunPython(backfill_fiscal_year, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='journalentry',
+            name='fiscal_year',
+            field=models.ForeignKey(editable=False, help_text='Fiscal year of the parent voucher.', on_delete=django.db.models.deletion.PROTECT, related_name='journal_entries', to='budgeting.fiscalyear', verbose_name='Fiscal Year'),
+        ),
+    ]
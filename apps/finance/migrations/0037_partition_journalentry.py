@@ -0,0 +1,30 @@
+"""
+Convert finance_journalentry into a PostgreSQL table LIST-partitioned by
+fiscal year. No-op on other database backends.
+
+The only foreign key pointing at the journal (BankStatementLine.matched_entry)
+loses its database constraint, because a partitioned table cannot carry a
+unique key on id alone. Django still applies on_delete=SET_NULL.
+"""
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.finance.partitioning import partition_journal_table, unpartition_journal_table
+
+
+class Migration(migrations.Migration):
+
+    atomic = True
+
+    dependencies = [
+        ('finance', '0036_journalentry_fiscal_year'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankstatementline',
+            name='matched_entry',
+            field=models.OneToOneField(blank=True, db_constraint=False, help_text='The GL journal entry this line is matched to.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bank_match', to='finance.journalentry', verbose_name='Matched Entry'),
+        ),
+        migrations.RunPython(partition_journal_table, unpartition_journal_table),
+    ]
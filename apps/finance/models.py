@@ -16,7 +16,11 @@ from django.conf import settings
 from django.core.validators import RegexValidator, MinValueValidator
 from django.utils.translation import gettext_lazy as _
 
-from apps.core.mixins import AuditLogMixin, StatusMixin, UUIDMixin, TimeStampedMixin, TenantAwareMixin
+from apps.core.audit import AuditWriter
+from apps.core.mixins import (
+    AuditLogMixin, FieldTrackerMixin, StatusMixin, UUIDMixin, TimeStampedMixin, TenantAwareMixin
+)
+from apps.core.metrics import ACCOUNT_BALANCE_UPDATE_SECONDS, VOUCHER_POSTS, VOUCHER_POST_SECONDS
 
 
 class AccountType(models.TextChoices):
@@ -1250,7 +1254,7 @@ class BudgetHead(AuditLogMixin, StatusMixin):
             voucher__organization=organization,
             voucher__is_posted=True,
             voucher__is_reversed=False,  # Exclude reversed vouchers
-            voucher__fiscal_year=fiscal_year,
+            fiscal_year=fiscal_year,
             credit__gt=0  # Credit = money out for expenditure
         ).aggregate(
             total=Sum('credit')
@@ -1312,7 +1316,7 @@ class BudgetHead(AuditLogMixin, StatusMixin):
             voucher__organization=organization,
             voucher__is_posted=True,
             voucher__is_reversed=False,
-            voucher__fiscal_year=fiscal_year,
+            fiscal_year=fiscal_year,
             credit__gt=0
         ).aggregate(
             total=Sum('credit')
@@ -1383,7 +1387,7 @@ class VoucherType(models.TextChoices):
     REVERSAL = 'REV', _('Reversal Voucher')
 
 
-class Voucher(AuditLogMixin, TenantAwareMixin):
+class Voucher(AuditLogMixin, TenantAwareMixin, FieldTrackerMixin):
     """
     Voucher header for double-entry transactions.
     
@@ -1509,6 +1513,9 @@ class Voucher(AuditLogMixin, TenantAwareMixin):
         help_text=_('Reason for reversal (required when reversing).')
     )
     
+    # Header fields whose edits are written to the audit log
+    tracked_fields = ('date', 'voucher_type', 'fund_id', 'payee', 'reference_no', 'description')
+    
     class Meta:
         verbose_name = _('Voucher')
         verbose_name_plural = _('Vouchers')
@@ -1530,6 +1537,20 @@ class Voucher(AuditLogMixin, TenantAwareMixin):
     def __str__(self) -> str:
         return f"{self.voucher_no} - {self.date}"
     
+    def save(self, *args, **kwargs) -> None:
+        """Save and log an EDIT entry when header fields of a saved voucher change."""
+        changes = {} if self.pk is None else self.get_field_changes(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+        
+        if changes:
+            AuditWriter.add(VoucherAuditLog(
+                voucher=self,
+                voucher_no=self.voucher_no,
+                action='EDIT',
+                user_id=self.updated_by_id,
+                reason=f"Changed: {', '.join(sorted(changes))}"
+            ))
+    
     def get_total_debit(self) -> Decimal:
         """Calculate total debit amount from all journal entries."""
         from django.db.models import Sum
@@ -1552,6 +1573,7 @@ class Voucher(AuditLogMixin, TenantAwareMixin):
         """Check if voucher can be posted."""
         return not self.is_posted and self.is_balanced()
     
+    @VOUCHER_POST_SECONDS.time()
     def post_voucher(self, user, reason='') -> None:
         """
         Post the voucher to the General Ledger.
@@ -1581,17 +1603,23 @@ class Voucher(AuditLogMixin, TenantAwareMixin):
         self.save(update_fields=['is_posted', 'posted_at', 'posted_by', 'updated_at'])
         
         # Create audit log entry
-        VoucherAuditLog.objects.create(
+        AuditWriter.add(VoucherAuditLog(
             voucher=self,
             voucher_no=self.voucher_no,
             action='POST',
             user=user,
             reason=reason
-        )
+        ))
         
         # Update account balances for performance optimization
         # This maintains the AccountBalance summary table
         AccountBalance.update_for_voucher(self)
+
+        # Maintain the pre-aggregated dashboard facts
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_voucher(self)
+
+        VOUCHER_POSTS.inc(voucher_type=self.voucher_type)
     
     def unpost_voucher(self, user, reason='') -> 'Voucher':
         """
@@ -1707,13 +1735,13 @@ class Voucher(AuditLogMixin, TenantAwareMixin):
             ])
             
             # Create audit log
-            VoucherAuditLog.objects.create(
+            AuditWriter.add(VoucherAuditLog(
                 voucher=self,
                 voucher_no=self.voucher_no,
                 action='UNPOST',
                 user=user,
                 reason=reason
-            )
+            ))
             
             return reversal_voucher
 
@@ -1820,6 +1848,16 @@ class JournalEntry(TimeStampedMixin):
         verbose_name=_('Budget Head'),
         help_text=_('GL account to post to.')
     )
+    # Denormalized from voucher.fiscal_year: partition key of the journal
+    # table on PostgreSQL (see apps.finance.partitioning).
+    fiscal_year = models.ForeignKey(
+        'budgeting.FiscalYear',
+        on_delete=models.PROTECT,
+        editable=False,
+        related_name='journal_entries',
+        verbose_name=_('Fiscal Year'),
+        help_text=_('Fiscal year of the parent voucher.')
+    )
     description = models.CharField(
         max_length=255,
         verbose_name=_('Description'),
@@ -1895,8 +1933,10 @@ class JournalEntry(TimeStampedMixin):
             )
     
     def save(self, *args, **kwargs) -> None:
-        """Override save to run validation."""
+        """Override save to run validation and copy the voucher's fiscal year."""
         self.clean()
+        if self.voucher_id and not self.fiscal_year_id:
+            self.fiscal_year_id = self.voucher.fiscal_year_id
         super().save(*args, **kwargs)
 
 
@@ -2383,6 +2423,9 @@ class BankStatementLine(TimeStampedMixin):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
+        # The partitioned journal has no single-column unique key on id,
+        # so SET_NULL is enforced by the ORM rather than the database.
+        db_constraint=False,
         related_name='bank_match',
         verbose_name=_('Matched Entry'),
         help_text=_('The GL journal entry this line is matched to.')
@@ -2602,7 +2645,7 @@ class AccountBalance(TenantAwareMixin):
         For Liability/Equity/Revenue accounts (credit-balance accounts):
             Closing Cr = Opening Cr + Total Cr - Total Dr
         """
-        account_type = self.budget_head.global_head.account_type
+        account_type = self.budget_head.account_type
         
         if account_type in ['AST', 'EXP']:
             # Debit balance accounts
@@ -2637,6 +2680,7 @@ class AccountBalance(TenantAwareMixin):
         return self.closing_balance_dr - self.closing_balance_cr
     
     @classmethod
+    @ACCOUNT_BALANCE_UPDATE_SECONDS.time()
     def update_for_voucher(cls, voucher: 'Voucher') -> None:
         """
         Update account balances when a voucher is posted or reversed.
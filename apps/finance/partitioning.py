@@ -0,0 +1,318 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: PostgreSQL declarative partitioning of the journal table
+             (finance_journalentry) by fiscal year.
+-------------------------------------------------------------------------
+
+The journal is LIST-partitioned on ``fiscal_year_id`` (copied from the
+voucher onto every JournalEntry). Each FiscalYear gets its own partition
+``finance_journalentry_fy<id>``; rows for a year without a partition land
+in ``finance_journalentry_default`` until ``ensure_partition`` moves them.
+
+Constraints of a partitioned table must include the partition key, so the
+primary key becomes ``(id, fiscal_year_id)`` and the ``public_id`` unique
+constraint becomes ``(public_id, fiscal_year_id)``. ``id`` is still drawn
+from a single sequence and stays unique across partitions.
+
+All helpers are no-ops on databases other than PostgreSQL.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from django.db import connection as default_connection
+
+
+JOURNAL_TABLE = 'finance_journalentry'
+PARTITION_KEY = 'fiscal_year_id'
+DEFAULT_PARTITION = f'{JOURNAL_TABLE}_default'
+
+
+def partition_name(fiscal_year_id: int) -> str:
+    """Return the partition table name for a fiscal year."""
+    return f'{JOURNAL_TABLE}_fy{int(fiscal_year_id)}'
+
+
+def is_supported(connection=None) -> bool:
+    """Check whether the connection supports declarative partitioning."""
+    connection = connection or default_connection
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(connection=None) -> bool:
+    """Check whether the journal table is currently partitioned."""
+    connection = connection or default_connection
+    if not is_supported(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [JOURNAL_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection=None) -> List[Tuple[str, str, int]]:
+    """
+    List the journal partitions.
+
+    Returns:
+        List of (partition name, bound expression, estimated row count).
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), "
+            "       GREATEST(c.reltuples, 0)::bigint "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND pg_table_is_visible(p.oid) "
+            "ORDER BY c.relname",
+            [JOURNAL_TABLE]
+        )
+        return [(name, bound, int(rows)) for name, bound, rows in cursor.fetchall()]
+
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+    return cursor.fetchone()[0]
+
+
+def ensure_partition(fiscal_year_id: int, connection=None) -> bool:
+    """
+    Create the partition for a fiscal year if it does not exist yet.
+
+    Rows already sitting in the default partition for this fiscal year are
+    moved into the new partition before it is attached, so this is safe to
+    run at any time (including after a year has started).
+
+    Args:
+        fiscal_year_id: Primary key of the FiscalYear.
+        connection: Database connection (defaults to 'default').
+
+    Returns:
+        True if a partition was created, False if it already existed or
+        the table is not partitioned.
+    """
+    from django.db import transaction
+
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return False
+
+    name = partition_name(fiscal_year_id)
+    qn = connection.ops.quote_name
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _table_exists(cursor, name):
+            return False
+
+        cursor.execute(
+            f"CREATE TABLE {qn(name)} (LIKE {qn(JOURNAL_TABLE)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        if _table_exists(cursor, DEFAULT_PARTITION):
+            cursor.execute(
+                f"INSERT INTO {qn(name)} SELECT * FROM {qn(DEFAULT_PARTITION)} "
+                f"WHERE {PARTITION_KEY} = %s",
+                [fiscal_year_id]
+            )
+            cursor.execute(
+                f"DELETE FROM {qn(DEFAULT_PARTITION)} WHERE {PARTITION_KEY} = %s",
+                [fiscal_year_id]
+            )
+        cursor.execute(
+            f"ALTER TABLE {qn(JOURNAL_TABLE)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES IN (%s)" % int(fiscal_year_id)
+        )
+    return True
+
+
+def _capture_definition(cursor, table: str) -> Tuple[list, list]:
+    """
+    Capture constraint and index definitions of a table so they can be
+    replayed against its replacement.
+
+    Returns:
+        (constraints, indexes) where constraints is a list of
+        (name, contype, definition) and indexes is a list of
+        (name, definition) for indexes not backing a constraint.
+    """
+    cursor.execute(
+        "SELECT con.conname, con.contype, pg_get_constraintdef(con.oid) "
+        "FROM pg_constraint con "
+        "JOIN pg_class c ON c.oid = con.conrelid "
+        "WHERE c.relname = %s AND pg_table_is_visible(c.oid) "
+        "ORDER BY con.conname",
+        [table]
+    )
+    constraints = cursor.fetchall()
+
+    cursor.execute(
+        "SELECT i.relname, pg_get_indexdef(i.oid) "
+        "FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "JOIN pg_class c ON c.oid = x.indrelid "
+        "WHERE c.relname = %s AND pg_table_is_visible(c.oid) "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = i.oid) "
+        "ORDER BY i.relname",
+        [table]
+    )
+    indexes = cursor.fetchall()
+    return constraints, indexes
+
+
+def _capture_row_security(cursor, table: str) -> Tuple[bool, bool, list]:
+    """
+    Capture the row-level security of a table (see
+    scripts/setup_row_level_security.sql).
+
+    Returns:
+        (enabled, forced, policies) where policies is a list of
+        (name, permissive, roles, command, using, with_check) rows of
+        pg_policies.
+    """
+    cursor.execute(
+        "SELECT c.relrowsecurity, c.relforcerowsecurity FROM pg_class c "
+        "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+        [table]
+    )
+    enabled, forced = cursor.fetchone()
+
+    cursor.execute(
+        "SELECT p.policyname, p.permissive, p.roles::text[], p.cmd, p.qual, p.with_check "
+        "FROM pg_policies p "
+        "WHERE p.tablename = %s AND p.schemaname = current_schema() "
+        "ORDER BY p.policyname",
+        [table]
+    )
+    return enabled, forced, cursor.fetchall()
+
+
+def _restore_row_security(cursor, qn, table: str, enabled: bool, forced: bool, policies: list) -> None:
+    """Re-apply row-level security captured by _capture_row_security to a table."""
+    if enabled:
+        cursor.execute(f"ALTER TABLE {qn(table)} ENABLE ROW LEVEL SECURITY")
+    if forced:
+        cursor.execute(f"ALTER TABLE {qn(table)} FORCE ROW LEVEL SECURITY")
+    for name, permissive, roles, command, using, with_check in policies:
+        roles = ', '.join('PUBLIC' if role == 'public' else qn(role) for role in roles)
+        definition = f"CREATE POLICY {qn(name)} ON {qn(table)} AS {permissive} FOR {command} TO {roles}"
+        if using:
+            definition += f" USING ({using})"
+        if with_check:
+            definition += f" WITH CHECK ({with_check})"
+        cursor.execute(definition)
+
+
+def _rebuild_journal_table(schema_editor, partitioned: bool, fiscal_year_ids: Optional[list] = None) -> None:
+    """
+    Rebuild finance_journalentry as a partitioned (or plain) table.
+
+    The existing table is renamed out of the way, a replacement is created
+    with the same columns, constraints and indexes (adjusted to include the
+    partition key where PostgreSQL requires it) and row-level security, the
+    rows are copied across and the old table is dropped.
+
+    Raises:
+        RuntimeError: If the old table had row-level security and the new
+            one does not, so the migration fails instead of exposing every
+            organization's journal lines.
+    """
+    qn = schema_editor.connection.ops.quote_name
+    old_table = f'{JOURNAL_TABLE}_old'
+
+    with schema_editor.connection.cursor() as cursor:
+        constraints, indexes = _capture_definition(cursor, JOURNAL_TABLE)
+        row_security = _capture_row_security(cursor, JOURNAL_TABLE)
+
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM %s" % qn(JOURNAL_TABLE))
+        max_id = cursor.fetchone()[0]
+
+        # Free up constraint/index names before recreating them on the new table.
+        for name, contype, _definition in constraints:
+            cursor.execute(f"ALTER TABLE {qn(JOURNAL_TABLE)} DROP CONSTRAINT {qn(name)}")
+        for name, _definition in indexes:
+            cursor.execute(f"DROP INDEX {qn(name)}")
+        cursor.execute(f"ALTER TABLE {qn(JOURNAL_TABLE)} RENAME TO {qn(old_table)}")
+
+        suffix = f" PARTITION BY LIST ({PARTITION_KEY})" if partitioned else ""
+        cursor.execute(
+            f"CREATE TABLE {qn(JOURNAL_TABLE)} (LIKE {qn(old_table)} INCLUDING DEFAULTS){suffix}"
+        )
+        # The id default is re-attached to a fresh sequence below.
+        cursor.execute(f"ALTER TABLE {qn(JOURNAL_TABLE)} ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"ALTER TABLE {qn(JOURNAL_TABLE)} ALTER COLUMN {PARTITION_KEY} SET NOT NULL")
+
+        if partitioned:
+            cursor.execute(
+                f"CREATE TABLE {qn(DEFAULT_PARTITION)} PARTITION OF {qn(JOURNAL_TABLE)} DEFAULT"
+            )
+            for fy_id in fiscal_year_ids or []:
+                cursor.execute(
+                    f"CREATE TABLE {qn(partition_name(fy_id))} PARTITION OF {qn(JOURNAL_TABLE)} "
+                    f"FOR VALUES IN (%s)" % int(fy_id)
+                )
+
+        cursor.execute(f"INSERT INTO {qn(JOURNAL_TABLE)} SELECT * FROM {qn(old_table)}")
+
+        # Policies belong to the old table and go with it
+        _restore_row_security(cursor, qn, JOURNAL_TABLE, *row_security)
+        restored = _capture_row_security(cursor, JOURNAL_TABLE)
+        if restored[:2] != row_security[:2] or len(restored[2]) != len(row_security[2]):
+            raise RuntimeError(
+                f"Row-level security of {JOURNAL_TABLE} was not carried over to the rebuilt table."
+            )
+
+        # Dropping the old table also drops its identity/serial sequence.
+        cursor.execute(f"DROP TABLE {qn(old_table)}")
+
+        seq = f'{JOURNAL_TABLE}_id_seq'
+        cursor.execute(f"CREATE SEQUENCE {qn(seq)} AS bigint OWNED BY {qn(JOURNAL_TABLE)}.id")
+        cursor.execute(
+            f"ALTER TABLE {qn(JOURNAL_TABLE)} ALTER COLUMN id SET DEFAULT nextval('{seq}'::regclass)"
+        )
+        cursor.execute("SELECT setval(%s, %s, %s)", [seq, max(max_id, 1), max_id > 0])
+
+        for name, contype, definition in constraints:
+            if contype in ('p', 'u'):
+                columns = re.search(r'\((.*)\)', definition).group(1)
+                columns = [c.strip() for c in columns.split(',') if c.strip() != PARTITION_KEY]
+                if partitioned:
+                    columns.append(PARTITION_KEY)
+                keyword = 'PRIMARY KEY' if contype == 'p' else 'UNIQUE'
+                definition = f"{keyword} ({', '.join(columns)})"
+            cursor.execute(
+                f"ALTER TABLE {qn(JOURNAL_TABLE)} ADD CONSTRAINT {qn(name)} {definition}"
+            )
+        for name, definition in indexes:
+            definition = re.sub(
+                r' ON (ONLY )?(\S+\.)?%s ' % re.escape(JOURNAL_TABLE),
+                f' ON {qn(JOURNAL_TABLE)} ',
+                definition
+            )
+            cursor.execute(definition)
+
+
+def partition_journal_table(apps, schema_editor) -> None:
+    """Migration operation: convert the journal into a partitioned table."""
+    if not is_supported(schema_editor.connection) or is_partitioned(schema_editor.connection):
+        return
+    FiscalYear = apps.get_model('budgeting', 'FiscalYear')
+    fiscal_year_ids = list(FiscalYear.objects.values_list('id', flat=True))
+    _rebuild_journal_table(schema_editor, partitioned=True, fiscal_year_ids=fiscal_year_ids)
+
+
+def unpartition_journal_table(apps, schema_editor) -> None:
+    """Migration operation: convert the journal back into a plain table."""
+    if not is_partitioned(schema_editor.connection):
+        return
+    _rebuild_journal_table(schema_editor, partitioned=False)
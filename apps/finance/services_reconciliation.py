@@ -16,6 +16,7 @@ from django.db import transaction
 from django.db.models import Sum, Q
 from django.utils import timezone
 
+from apps.core.metrics import RECONCILIATION_MATCHES, RECONCILIATION_SECONDS
 from apps.finance.models import (
     BankStatement, BankStatementLine, JournalEntry, BudgetHead
 )
@@ -93,6 +94,7 @@ class ReconciliationEngine:
             is_reconciled=False
         ).order_by('date', 'id'))
     
+    @RECONCILIATION_SECONDS.time()
     @transaction.atomic
     def auto_reconcile(self) -> ReconciliationResult:
         """
@@ -159,6 +161,8 @@ class ReconciliationEngine:
             self.statement.status = StatementStatus.RECONCILING
             self.statement.save(update_fields=['status', 'updated_at'])
         
+        RECONCILIATION_MATCHES.inc(len(matched_pairs))
+        
         return ReconciliationResult(
             matched_count=len(matched_pairs),
             unmatched_statement_lines=len(statement_lines) - len(matched_line_ids),
@@ -276,7 +280,7 @@ class ReconciliationEngine:
             budget_head=self.gl_code,
             voucher__is_posted=True,
             voucher__organization=self.bank_account.organization,
-            voucher__fiscal_year=self.statement.year
+            fiscal_year=self.statement.year
         )
         
         gl_totals = gl_entries.aggregate(
@@ -51,3 +51,18 @@ def invalidate_cache_on_allocation_change(sender, instance, **kwargs):
     # For Redis:
     # cache_pattern = f"cfms_smart_search_*_org:{instance.organization_id}_*"
     # cache.delete_pattern(cache_pattern)
+
+
+@receiver(post_save, sender='budgeting.FiscalYear')
+def create_journal_partition_for_fiscal_year(sender, instance, created, **kwargs):
+    """
+    Create the journal partition for a new fiscal year up front, so entries
+    never land in the default partition (PostgreSQL only).
+    """
+    if not created:
+        return
+
+    from apps.finance.partitioning import ensure_partition, partition_name
+
+    if ensure_partition(instance.id):
+        logger.info(f"Created journal partition {partition_name(instance.id)} for FY {instance.year_name}")
@@ -0,0 +1,160 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Description: Tests for fiscal-year partitioning of the journal table.
+             PostgreSQL-specific tests are skipped on other backends.
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from apps.budgeting.models import FiscalYear
+from apps.core.models import Organization
+from apps.finance import partitioning
+from apps.finance.models import (
+    AccountType, BudgetHead, Fund, FunctionCode, JournalEntry,
+    MajorHead, MinorHead, NAMHead, Voucher, VoucherType,
+)
+
+
+class JournalPartitionTestMixin:
+    """Shared fixtures: one organization, one fiscal year and a budget head."""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test TMA', ddo_code='PT-01')
+        self.fy = FiscalYear.objects.create(
+            year_name='2025-26',
+            start_date=date(2025, 7, 1),
+            end_date=date(2026, 6, 30),
+        )
+        self.fund = Fund.objects.create(code='GEN', name='General Fund')
+        self.function = FunctionCode.objects.create(code='AD', name='Administration')
+        major = MajorHead.objects.create(code='A03', name='Operating Expenses')
+        minor = MinorHead.objects.create(code='A033', name='Utilities', major=major)
+        nam_head = NAMHead.objects.create(
+            code='A03303', name='Electricity', minor=minor,
+            account_type=AccountType.EXPENDITURE
+        )
+        self.budget_head = BudgetHead.objects.create(
+            fund=self.fund, function=self.function, nam_head=nam_head
+        )
+
+    def _create_voucher(self, fiscal_year, voucher_no='JV-0001'):
+        voucher = Voucher.objects.create(
+            organization=self.org,
+            fiscal_year=fiscal_year,
+            voucher_no=voucher_no,
+            date=fiscal_year.start_date,
+            voucher_type=VoucherType.JOURNAL,
+            fund=self.fund,
+            description='Partition test',
+        )
+        JournalEntry.objects.create(
+            voucher=voucher, budget_head=self.budget_head,
+            description='Dr', debit=Decimal('100.00')
+        )
+        JournalEntry.objects.create(
+            voucher=voucher, budget_head=self.budget_head,
+            description='Cr', credit=Decimal('100.00')
+        )
+        return voucher
+
+
+class JournalEntryFiscalYearTests(JournalPartitionTestMixin, TestCase):
+    """The partition key is copied from the voucher on save."""
+
+    def test_fiscal_year_copied_from_voucher(self):
+        voucher = self._create_voucher(self.fy)
+        years = set(voucher.entries.values_list('fiscal_year_id', flat=True))
+        self.assertEqual(years, {self.fy.id})
+
+    def test_fiscal_year_filter_matches_voucher_filter(self):
+        self._create_voucher(self.fy)
+        self.assertEqual(
+            JournalEntry.objects.filter(fiscal_year=self.fy).count(),
+            JournalEntry.objects.filter(voucher__fiscal_year=self.fy).count(),
+        )
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Journal partitioning requires PostgreSQL')
+class JournalPartitioningPostgresTests(JournalPartitionTestMixin, TestCase):
+    """Partition maintenance against a real PostgreSQL database."""
+
+    def test_journal_table_is_partitioned(self):
+        self.assertTrue(partitioning.is_partitioned())
+
+    def test_new_fiscal_year_gets_partition(self):
+        names = [name for name, _bound, _rows in partitioning.list_partitions()]
+        self.assertIn(partitioning.partition_name(self.fy.id), names)
+
+    def test_entries_are_routed_to_fiscal_year_partition(self):
+        self._create_voucher(self.fy)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM %s' % connection.ops.quote_name(
+                    partitioning.partition_name(self.fy.id)
+                )
+            )
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_ensure_partition_moves_rows_out_of_default(self):
+        # Simulate a year created before its partition existed.
+        fy = FiscalYear.objects.create(
+            year_name='2026-27', start_date=date(2026, 7, 1), end_date=date(2027, 6, 30)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'ALTER TABLE %s DETACH PARTITION %s' % (
+                    partitioning.JOURNAL_TABLE, partitioning.partition_name(fy.id)
+                )
+            )
+            cursor.execute('DROP TABLE %s' % partitioning.partition_name(fy.id))
+
+        self._create_voucher(fy, voucher_no='JV-0002')
+        self.assertTrue(partitioning.ensure_partition(fy.id))
+        self.assertFalse(partitioning.ensure_partition(fy.id))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT COUNT(*) FROM %s WHERE fiscal_year_id = %%s' % partitioning.DEFAULT_PARTITION,
+                [fy.id]
+            )
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(JournalEntry.objects.filter(fiscal_year=fy).count(), 2)
+
+    def test_command_creates_next_fiscal_year(self):
+        call_command('manage_journal_partitions', '--next-year', stdout=StringIO())
+        next_fy = FiscalYear.objects.get(year_name='2026-27')
+        self.assertEqual(next_fy.start_date, date(2026, 7, 1))
+        self.assertEqual(next_fy.end_date, date(2027, 6, 30))
+        names = [name for name, _bound, _rows in partitioning.list_partitions()]
+        self.assertIn(partitioning.partition_name(next_fy.id), names)
+
+    def test_rebuild_keeps_row_level_security(self):
+        table = connection.ops.quote_name(partitioning.JOURNAL_TABLE)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+            cursor.execute(
+                f"CREATE POLICY org_isolation_policy ON {table} FOR ALL USING ("
+                f"fiscal_year_id = COALESCE(NULLIF(current_setting('app.current_org_id', TRUE), '')::integer, 0))"
+            )
+            before = partitioning._capture_row_security(cursor, partitioning.JOURNAL_TABLE)
+
+        with connection.schema_editor() as schema_editor:
+            partitioning.unpartition_journal_table(apps, schema_editor)
+            partitioning.partition_journal_table(apps, schema_editor)
+
+        self.assertTrue(partitioning.is_partitioned())
+        with connection.cursor() as cursor:
+            after = partitioning._capture_row_security(cursor, partitioning.JOURNAL_TABLE)
+        self.assertEqual(after, before)
+        self.assertTrue(after[0])
+        self.assertEqual([policy[0] for policy in after[2]], ['org_isolation_policy'])
@@ -29,6 +29,7 @@ from apps.finance.models import (
 )
 from apps.finance.forms import BudgetHeadForm, ChequeBookForm, ChequeLeafCancelForm, VoucherForm
 from apps.core.models import BankAccount
+from apps.core.metrics import CACHE_REQUESTS
 from apps.budgeting.models import FiscalYear, Department
 from django.views.generic import TemplateView
 
@@ -2069,9 +2070,11 @@ def load_budget_heads_options(request):
     cached_response = cache.get(cache_key)
     if cached_response:
         logger.debug(f"Cache HIT for {cache_key}")
+        CACHE_REQUESTS.inc(cache='budget_heads_options', result='hit')
         return cached_response
     
     logger.debug(f"Cache MISS for {cache_key}")
+    CACHE_REQUESTS.inc(cache='budget_heads_options', result='miss')
     department = None
     
     # Base queryset - all posting-allowed heads, exclude salary heads
@@ -2364,10 +2367,12 @@ def smart_budget_head_search_api(request):
     
     if cached_main_results:
         logger.debug(f"Cache HIT for smart_search: {cache_key}")
+        CACHE_REQUESTS.inc(cache='smart_search', result='hit')
         results = cached_main_results['results']
         pagination_info = cached_main_results['pagination']
     else:
         logger.debug(f"Cache MISS for smart_search: {cache_key}")
+        CACHE_REQUESTS.inc(cache='smart_search', result='miss')
         
         # Get current fiscal year
         fiscal_year = FiscalYear.get_current_operating_year()
@@ -17,6 +17,7 @@ from typing import Optional
 from django.template.loader import render_to_string
 from django.http import HttpResponse
 
+from apps.core.metrics import track_pdf_render
 from apps.core.models import BankAccount, Organization
 from apps.budgeting.models import FiscalYear
 from apps.finance.models import JournalEntry, BankStatement
@@ -116,7 +117,8 @@ def generate_cash_book_pdf(
         from weasyprint import HTML
         html_string = render_to_string('reporting/cash_book_pdf.html', context)
         html = HTML(string=html_string)
-        pdf_file = html.write_pdf()
+        with track_pdf_render('cash_book'):
+            pdf_file = html.write_pdf()
         
         response = HttpResponse(pdf_file, content_type='application/pdf')
         filename = f"cash_book_{bank_account.account_number}_{year}_{month:02d}.pdf"
@@ -162,7 +164,8 @@ def generate_brs_pdf(statement_id: int, organization: Organization) -> HttpRespo
         from weasyprint import HTML
         html_string = render_to_string('reporting/brs_pdf.html', context)
         html = HTML(string=html_string)
-        pdf_file = html.write_pdf()
+        with track_pdf_render('brs'):
+            pdf_file = html.write_pdf()
         
         response = HttpResponse(pdf_file, content_type='application/pdf')
         filename = f"brs_{statement.bank_account.account_number}_{statement.get_month_display()}_{statement.fiscal_year.code}.pdf"
@@ -16,11 +16,12 @@ from django.db.models import Sum, Q, F, Case, When, Value, DecimalField
 from django.db.models.functions import Coalesce
 
 from apps.core.mixins import TenantAwareMixin
+from apps.core.db_routers import ReportingDatabaseMixin
 from apps.finance.models import JournalEntry, BudgetHead, Voucher
 from apps.budgeting.models import FiscalYear
 
 
-class GeneralLedgerView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
+class GeneralLedgerView(LoginRequiredMixin, ReportingDatabaseMixin, TenantAwareMixin, TemplateView):
     """
     General Ledger Report.
     
@@ -134,7 +135,7 @@ class GeneralLedgerView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
         return context
 
 
-class TrialBalanceView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
+class TrialBalanceView(LoginRequiredMixin, ReportingDatabaseMixin, TenantAwareMixin, TemplateView):
     """
     Trial Balance Report.
     
@@ -228,7 +229,7 @@ class TrialBalanceView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
         return context
 
 
-class AccountStatementView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
+class AccountStatementView(LoginRequiredMixin, ReportingDatabaseMixin, TenantAwareMixin, TemplateView):
     """
     Account Statement Report.
     
@@ -325,7 +326,7 @@ class AccountStatementView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
         return context
 
 
-class PendingLiabilitiesView(LoginRequiredMixin, TenantAwareMixin, TemplateView):
+class PendingLiabilitiesView(LoginRequiredMixin, ReportingDatabaseMixin, TenantAwareMixin, TemplateView):
     """
     Pending Liabilities Report.
     
@@ -392,14 +393,14 @@ class PendingLiabilitiesView(LoginRequiredMixin, TenantAwareMixin, TemplateView)
                 Sum('journal_entries__debit',
                     filter=Q(journal_entries__voucher__is_posted=True,
                             journal_entries__voucher__organization=organization,
-                            journal_entries__voucher__fiscal_year=fiscal_year)),
+                            journal_entries__fiscal_year=fiscal_year)),
                 Decimal('0.00')
             ),
             total_credit=Coalesce(
                 Sum('journal_entries__credit',
                     filter=Q(journal_entries__voucher__is_posted=True,
                             journal_entries__voucher__organization=organization,
-                            journal_entries__voucher__fiscal_year=fiscal_year)),
+                            journal_entries__fiscal_year=fiscal_year)),
                 Decimal('0.00')
             )
         )
@@ -8,7 +8,8 @@ Description: Revenue Admin Configuration
 -------------------------------------------------------------------------
 """
 from django.contrib import admin
-from .models import Payer, RevenueDemand, RevenueCollection
+from django.utils.translation import gettext_lazy as _
+from .models import DemandNoticeBatch, NoticeBatchStatus, Payer, RevenueDemand, RevenueCollection
 
 
 @admin.register(Payer)
@@ -91,3 +92,31 @@ class RevenueCollectionAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
     )
+
+
+@admin.register(DemandNoticeBatch)
+class DemandNoticeBatchAdmin(admin.ModelAdmin):
+    """Admin configuration for demand notice batches (rendering monitoring)."""
+    
+    list_display = ('pk', 'organization', 'output_format', 'total_count', 'rendered_count',
+                    'status', 'created_by', 'created_at', 'completed_at')
+    list_filter = ('status', 'output_format', 'organization')
+    ordering = ('-created_at',)
+    exclude = ('demands',)
+    readonly_fields = (
+        'organization', 'output_format', 'status', 'total_count', 'rendered_count', 'file',
+        'error_message', 'started_at', 'completed_at', 'created_by', 'created_at', 'updated_at'
+    )
+    actions = ['requeue']
+    
+    def has_add_permission(self, request):
+        """Batches are queued from the demand list (DemandNoticeService.queue)."""
+        return False
+    
+    @admin.action(description=_('Queue selected batches for rendering again'))
+    def requeue(self, request, queryset):
+        """Reset failed or stuck batches to pending so the next run renders them."""
+        count = queryset.exclude(status=NoticeBatchStatus.PENDING).update(
+            status=NoticeBatchStatus.PENDING, rendered_count=0, error_message=''
+        )
+        self.message_user(request, f'{count} batch(es) queued for rendering.')
@@ -0,0 +1,42 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to recompute the stored collected and
+             outstanding amounts of revenue demands and payers.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py rebuild_revenue_balances
+    python manage.py rebuild_revenue_balances --org 12
+
+Collection posting and cancellation keep the balances current; run this
+after bulk imports or direct SQL fixes that bypass them.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Organization
+from apps.revenue.services import RevenueBalanceService
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored demand and payer balances from posted collections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Organization ID (default: all organizations)')
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['org']:
+            try:
+                organization = Organization.objects.get(pk=options['org'])
+            except Organization.DoesNotExist:
+                raise CommandError(f"Organization {options['org']} does not exist")
+
+        updated = RevenueBalanceService.rebuild(organization)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Rebuilt balances of {updated['demands']} demands and {updated['payers']} payers"
+        ))
@@ -0,0 +1,42 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to recompute the stored late payment
+             penalties of all open revenue demands.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py recompute_penalties
+    python manage.py recompute_penalties --org 12 --as-of 2025-06-30
+
+Schedule nightly so list pages and exports show current penalties.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Organization
+from apps.revenue.services import RevenuePenaltyService
+
+
+class Command(BaseCommand):
+    help = 'Recompute penalty_amount of POSTED/PARTIAL demands in a single UPDATE'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--org', type=int, help='Organization ID (default: all organizations)')
+        parser.add_argument('--as-of', type=date.fromisoformat, help='Penalty date, YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['org']:
+            try:
+                organization = Organization.objects.get(pk=options['org'])
+            except Organization.DoesNotExist:
+                raise CommandError(f"Organization {options['org']} does not exist")
+
+        updated = RevenuePenaltyService.recompute(organization, as_of_date=options['as_of'])
+
+        self.stdout.write(self.style.SUCCESS(f"✓ Updated penalties of {updated} demands"))
@@ -0,0 +1,86 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Management command to render queued demand notice batches
+             to PDF on a process pool.
+-------------------------------------------------------------------------
+
+Usage:
+    python manage.py render_demand_notices                 # render all pending batches, then exit
+    python manage.py render_demand_notices --batch 42      # render one batch
+    python manage.py render_demand_notices --loop --workers 8
+
+Run it from cron every minute, or as a long-running worker with --loop.
+Each pending batch is claimed by exactly one command. A batch left
+RUNNING by a command that died is claimed again once it has made no
+progress for NOTICE_BATCH_STALE_SECONDS.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.revenue.models import NoticeBatchStatus
+from apps.revenue.notices import DemandNoticeService
+
+
+class Command(BaseCommand):
+    help = 'Render queued demand notice batches to PDF'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch', type=int,
+            help='Render only this pending (or stale running) batch'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.NOTICE_RENDER_WORKERS,
+            help='Rendering processes (0 renders in this process)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.NOTICE_BATCH_CHUNK_SIZE,
+            help='Notices per worker task and per merged PDF'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling for new batches instead of exiting when none are pending'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to wait between polls when nothing is pending (with --loop)'
+        )
+
+    def handle(self, *args, **options):
+        totals = {'completed': 0, 'failed': 0, 'notices': 0}
+
+        try:
+            while True:
+                batch = DemandNoticeService.claim(options['batch'])
+                if batch is None:
+                    if not options['loop'] or options['batch']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+
+                self.stdout.write(f"Rendering batch #{batch.pk} ({batch.total_count} notices)...")
+                batch = DemandNoticeService.render_batch(
+                    batch, workers=options['workers'], chunk_size=options['chunk_size']
+                )
+                if batch.status == NoticeBatchStatus.COMPLETED:
+                    totals['completed'] += 1
+                    totals['notices'] += batch.rendered_count
+                else:
+                    totals['failed'] += 1
+                    self.stderr.write(f"  Batch #{batch.pk} failed: {batch.error_message}")
+
+                if options['batch']:
+                    break
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Rendered {totals['notices']} notices in {totals['completed']} batches "
+            f"({totals['failed']} failed)"
+        ))
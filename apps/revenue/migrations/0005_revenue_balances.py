@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:14
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_balances(apps, schema_editor):
+    """Compute the new balance columns from existing demands and collections."""
+    Payer = apps.get_model('revenue', 'Payer')
+    RevenueDemand = apps.get_model('revenue', 'RevenueDemand')
+    RevenueCollection = apps.get_model('revenue', 'RevenueCollection')
+
+    amount_field = models.DecimalField(max_digits=15, decimal_places=2)
+
+    def total(queryset, field, group_by):
+        return Coalesce(
+            Subquery(
+                queryset.values(group_by).annotate(total=Sum(field)).values('total')[:1],
+                output_field=amount_field,
+            ),
+            Value(Decimal('0.00'), output_field=amount_field),
+        )
+
+    posted = RevenueCollection.objects.filter(status='POSTED')
+
+    demand_collected = total(posted.filter(demand=OuterRef('pk')), 'amount_received', 'demand')
+    RevenueDemand.objects.update(
+        collected_amount=demand_collected,
+        outstanding_amount=F('amount') - demand_collected,
+    )
+
+    payer_demanded = total(
+        RevenueDemand.objects.filter(payer=OuterRef('pk'), status__in=['POSTED', 'PARTIAL', 'PAID']),
+        'amount', 'payer'
+    )
+    payer_collected = total(posted.filter(demand__payer=OuterRef('pk')), 'amount_received', 'demand__payer')
+    Payer.objects.update(
+        demanded_amount=payer_demanded,
+        collected_amount=payer_collected,
+        outstanding_amount=payer_demanded - payer_collected,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('revenue', '0004_add_penalty_waiver_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payer',
+            name='collected_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Running total of posted collections.', max_digits=15, verbose_name='Total Collected'),
+        ),
+        migrations.AddField(
+            model_name='payer',
+            name='demanded_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Running total of posted demands.', max_digits=15, verbose_name='Total Demanded'),
+        ),
+        migrations.AddField(
+            model_name='payer',
+            name='outstanding_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Running balance still to be collected.', max_digits=15, verbose_name='Outstanding Balance'),
+        ),
+        migrations.AddField(
+            model_name='revenuedemand',
+            name='collected_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Total of posted collections against this demand.', max_digits=15, verbose_name='Collected Amount'),
+        ),
+        migrations.AddField(
+            model_name='revenuedemand',
+            name='outstanding_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text='Principal still to be collected.', max_digits=15, verbose_name='Outstanding Amount'),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgeting', '0028_alter_budgetallocation_options'),
+        ('core', '0008_emailoutbox'),
+        ('finance', '0037_partition_journalentry'),
+        ('revenue', '0005_revenue_balances'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='revenuedemand',
+            index=models.Index(fields=['organization', 'status', 'issue_date'], name='revenue_rev_organiz_9af66a_idx'),
+        ),
+    ]
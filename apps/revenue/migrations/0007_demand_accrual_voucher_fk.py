@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0037_partition_journalentry'),
+        ('revenue', '0006_demand_aging_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='revenuedemand',
+            name='accrual_voucher',
+            field=models.ForeignKey(blank=True, help_text='GL voucher recording the receivable (shared by demands issued in a batch).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_demands', to='finance.voucher', verbose_name='Accrual Voucher'),
+        ),
+    ]
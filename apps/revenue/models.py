@@ -9,20 +9,23 @@ Description: Revenue models for Demand (Challan) and Collection (Receipt)
              Accounting for Accounts Receivable.
 -------------------------------------------------------------------------
 """
-from decimal import Decimal
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Dict, Any, Tuple, TYPE_CHECKING
 from django.db import models, transaction
-from django.db.models import Sum
 from django.core.validators import MinValueValidator, MaxValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
-from apps.core.mixins import AuditLogMixin, StatusMixin, TenantAwareMixin, TimeStampedMixin
+from apps.core.audit import AuditWriter
+from apps.core.mixins import (
+    AuditLogMixin, FieldTrackerMixin, StatusMixin, TenantAwareMixin, TimeStampedMixin
+)
 from apps.core.exceptions import WorkflowTransitionException
 
 if TYPE_CHECKING:
     from apps.users.models import CustomUser
+    from apps.finance.models import BudgetHead, Fund
 
 
 class DemandStatus(models.TextChoices):
@@ -55,6 +58,21 @@ class CollectionStatus(models.TextChoices):
     CANCELLED = 'CANCELLED', _('Cancelled')
 
 
+def _balance_update_fields(instance: models.Model, update_fields) -> Optional[list]:
+    """
+    Fields to write when saving an existing row that carries running balances.
+    
+    Balance columns are only changed with F() updates (RevenueBalanceService),
+    so a full save() of a possibly stale instance must not write them back.
+    """
+    if instance._state.adding or update_fields is not None:
+        return update_fields
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.BALANCE_FIELDS
+    ]
+
+
 class Payer(AuditLogMixin, StatusMixin, TenantAwareMixin):
     """
     Payer Registry - Citizens, Entities, or Organizations that pay revenue.
@@ -68,8 +86,14 @@ class Payer(AuditLogMixin, StatusMixin, TenantAwareMixin):
         contact_no: Phone number
         address: Full address
         is_active: Whether payer is active
+        demanded_amount: Running total of posted demands
+        collected_amount: Running total of posted collections
+        outstanding_amount: Running balance (demanded - collected)
     """
     
+    # Maintained by RevenueBalanceService; never written by save()
+    BALANCE_FIELDS = ('demanded_amount', 'collected_amount', 'outstanding_amount')
+    
     cnic_ntn_validator = RegexValidator(
         regex=r'^(\d{5}-\d{7}-\d{1}|\d{13}|\d{7}-\d{1})$',
         message=_('Enter a valid CNIC (XXXXX-XXXXXXX-X) or NTN (XXXXXXX-X).')
@@ -103,6 +127,30 @@ class Payer(AuditLogMixin, StatusMixin, TenantAwareMixin):
         verbose_name=_('Email'),
         help_text=_('Contact email address.')
     )
+    demanded_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name=_('Total Demanded'),
+        help_text=_('Running total of posted demands.')
+    )
+    collected_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name=_('Total Collected'),
+        help_text=_('Running total of posted collections.')
+    )
+    outstanding_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name=_('Outstanding Balance'),
+        help_text=_('Running balance still to be collected.')
+    )
     
     class Meta:
         verbose_name = _('Payer')
@@ -118,27 +166,25 @@ class Payer(AuditLogMixin, StatusMixin, TenantAwareMixin):
     def __str__(self) -> str:
         return self.name
     
+    def save(self, *args, **kwargs) -> None:
+        """Save without overwriting the running balances."""
+        kwargs['update_fields'] = _balance_update_fields(self, kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+    
     def get_total_demands(self) -> Decimal:
-        """Get total amount of all demands for this payer."""
-        result = self.demands.filter(
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
-        ).aggregate(total=Sum('amount'))
-        return result['total'] or Decimal('0.00')
+        """Get total amount of all posted demands for this payer."""
+        return self.demanded_amount
     
     def get_total_collections(self) -> Decimal:
         """Get total amount collected from this payer."""
-        result = RevenueCollection.objects.filter(
-            demand__payer=self,
-            status=CollectionStatus.POSTED
-        ).aggregate(total=Sum('amount_received'))
-        return result['total'] or Decimal('0.00')
+        return self.collected_amount
     
     def get_outstanding_balance(self) -> Decimal:
         """Get outstanding balance for this payer."""
-        return self.get_total_demands() - self.get_total_collections()
+        return self.outstanding_amount
 
 
-class RevenueDemand(AuditLogMixin, TenantAwareMixin):
+class RevenueDemand(AuditLogMixin, TenantAwareMixin, FieldTrackerMixin):
     """
     Revenue Demand (Challan/Receivable).
     
@@ -158,8 +204,13 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         period_description: Period covered (e.g., "Jan 2026 Rent")
         status: Current workflow status
         accrual_voucher: GL voucher recording the receivable
+        collected_amount: Total of posted collections
+        outstanding_amount: Principal still to be collected (amount - collected)
     """
     
+    # Maintained by RevenueBalanceService; never written by save()
+    BALANCE_FIELDS = ('collected_amount', 'outstanding_amount')
+    
     fiscal_year = models.ForeignKey(
         'budgeting.FiscalYear',
         on_delete=models.PROTECT,
@@ -315,15 +366,33 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         blank=True,
         verbose_name=_('Cancellation Reason')
     )
-    accrual_voucher = models.OneToOneField(
+    accrual_voucher = models.ForeignKey(
         'finance.Voucher',
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
-        related_name='revenue_demand',
+        related_name='revenue_demands',
         verbose_name=_('Accrual Voucher'),
-        help_text=_('GL voucher recording the receivable.')
+        help_text=_('GL voucher recording the receivable (shared by demands issued in a batch).')
+    )
+    collected_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name=_('Collected Amount'),
+        help_text=_('Total of posted collections against this demand.')
     )
+    outstanding_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        verbose_name=_('Outstanding Amount'),
+        help_text=_('Principal still to be collected.')
+    )
+    
+    tracked_fields = ('status', 'amount', 'due_date', 'payer_id', 'budget_head_id')
     
     class Meta:
         verbose_name = _('Revenue Demand')
@@ -339,6 +408,7 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
             models.Index(fields=['budget_head']),
             models.Index(fields=['posted_at']),
             models.Index(fields=['due_date']),
+            models.Index(fields=['organization', 'status', 'issue_date']),
         ]
     
     def __str__(self) -> str:
@@ -383,35 +453,82 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
     def save(self, *args, **kwargs) -> None:
         """Validate before saving and create audit trail."""
         is_new = self.pk is None
-        old_status = None
-        
-        if not is_new:
-            # Track status changes for audit
-            try:
-                old_instance = RevenueDemand.objects.get(pk=self.pk)
-                old_status = old_instance.status
-            except RevenueDemand.DoesNotExist:
-                pass
         
         self.clean()
+        if is_new:
+            self.collected_amount = Decimal('0.00')
+            self.outstanding_amount = self.amount
+        kwargs['update_fields'] = _balance_update_fields(self, kwargs.get('update_fields'))
+        
+        # Changes since the row was loaded (see FieldTrackerMixin)
+        changes = {} if is_new else self.get_field_changes(kwargs['update_fields'])
         super().save(*args, **kwargs)
         
+        if 'amount' in changes:
+            from apps.revenue.services import RevenueBalanceService
+            RevenueBalanceService.demand_amount_changed(self)
+        
+        from apps.dashboard.services_workspace import WorkspaceSnapshotService
+        WorkspaceSnapshotService.invalidate(self.organization_id)
+        
+        from apps.core.counters import CounterService
+        if is_new:
+            CounterService.demand_changed(
+                self.organization_id, None, None, self.status, self.due_date
+            )
+        else:
+            CounterService.demand_changed(
+                self.organization_id,
+                changes.get('status', (self.status,))[0],
+                changes.get('due_date', (self.due_date,))[0],
+                self.status, self.due_date
+            )
+        
         # Create audit trail entry
+        self._write_audit(is_new, changes)
         if is_new:
             # New demand created
             from apps.revenue.notifications import RevenueNotifications
             RevenueNotifications.notify_demand_created(self)
     
+    def _write_audit(self, is_new: bool, changes: Dict[str, Tuple[Any, Any]]) -> None:
+        """Queue a RevenueDemandAudit row for a creation or a tracked change."""
+        Action = RevenueDemandAudit.AuditAction
+        if is_new:
+            action, user_id = Action.CREATED, self.created_by_id
+        elif not changes:
+            return
+        elif 'status' in changes and self.status == DemandStatus.POSTED:
+            action, user_id = Action.POSTED, self.posted_by_id
+        elif 'status' in changes and self.status == DemandStatus.CANCELLED:
+            action, user_id = Action.CANCELLED, self.cancelled_by_id
+        else:
+            action, user_id = Action.UPDATED, None
+        
+        # changed_by is required; changes made by no known user are not audited
+        user_id = user_id or self.updated_by_id or self.created_by_id
+        if user_id is None:
+            return
+        
+        AuditWriter.add(RevenueDemandAudit(
+            demand=self,
+            action=action,
+            old_status=changes['status'][0] if 'status' in changes else ('' if is_new else self.status),
+            new_status=self.status,
+            changed_fields={
+                name: None if new is None else str(new) for name, (old, new) in changes.items()
+            },
+            changed_by_id=user_id,
+            remarks=self.cancellation_reason if action == Action.CANCELLED else '',
+        ))
+    
     def get_total_collected(self) -> Decimal:
         """Get total amount collected against this demand."""
-        result = self.collections.filter(
-            status=CollectionStatus.POSTED
-        ).aggregate(total=Sum('amount_received'))
-        return result['total'] or Decimal('0.00')
+        return self.collected_amount
     
     def get_outstanding_balance(self) -> Decimal:
         """Get remaining balance to be collected (principal only)."""
-        return self.amount - self.get_total_collected()
+        return self.outstanding_amount
     
     def get_days_overdue(self, as_of_date=None) -> int:
         """
@@ -441,6 +558,9 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         Formula: penalty = (principal × penalty_rate × penalty_days) / 100
         Where penalty_days = days_overdue - grace_period_days
         
+        Amounts are rounded half-up to match SQL ROUND() in
+        RevenuePenaltyService, which recomputes the stored penalties nightly.
+        
         Args:
             as_of_date: Date to calculate from (defaults to today)
             
@@ -466,11 +586,11 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         
         # Calculate penalty: (amount × rate × penalty_days) / 100
         penalty = (self.amount * self.penalty_rate * Decimal(str(penalty_days))) / Decimal('100')
-        penalty = penalty.quantize(Decimal('0.01'))
+        penalty = penalty.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         
         # Apply penalty cap
         max_penalty = (self.amount * self.max_penalty_percent) / Decimal('100')
-        max_penalty = max_penalty.quantize(Decimal('0.01'))
+        max_penalty = max_penalty.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         
         if penalty > max_penalty:
             penalty = max_penalty
@@ -561,14 +681,14 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         
         # Calculate max penalty
         max_penalty = (self.amount * self.max_penalty_percent) / Decimal('100')
-        max_penalty = max_penalty.quantize(Decimal('0.01'))
+        max_penalty = max_penalty.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         
         # Check if penalty is capped
         uncapped_penalty = Decimal('0.00')
         is_capped = False
         if penalty_days > 0 and self.apply_penalty and self.penalty_rate > 0:
             uncapped_penalty = (self.amount * self.penalty_rate * Decimal(str(penalty_days))) / Decimal('100')
-            uncapped_penalty = uncapped_penalty.quantize(Decimal('0.01'))
+            uncapped_penalty = uncapped_penalty.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
             is_capped = uncapped_penalty > max_penalty
         
         return {
@@ -588,6 +708,34 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
             'waiver_reason': self.waiver_reason,
         }
     
+    @staticmethod
+    def get_accrual_accounts() -> Tuple['BudgetHead', 'Fund']:
+        """
+        Resolve the Accounts Receivable system head and the default fund.
+        
+        Raises:
+            ValidationError: If the AR head or an active fund is missing.
+        """
+        from apps.finance.models import BudgetHead, Fund
+        
+        # Get the Accounts Receivable system head
+        ar_head = BudgetHead.objects.filter(
+            nam_head__system_code='AR'
+        ).first()
+        
+        if not ar_head:
+            raise ValidationError(
+                _('Accounts Receivable (AR) system head is not configured. '
+                  'Please run the seed command or configure it manually.')
+            )
+        
+        # Get default fund
+        fund = Fund.objects.filter(is_active=True).first()
+        if not fund:
+            raise ValidationError(_('No active fund found.'))
+        
+        return ar_head, fund
+    
     @transaction.atomic
     def post(self, user: 'CustomUser') -> None:
         """
@@ -604,36 +752,18 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
             WorkflowTransitionException: If demand is not in DRAFT status.
             ValidationError: If AR system head is not configured.
         """
-        from apps.finance.models import Voucher, VoucherType, JournalEntry, BudgetHead, Fund
+        from apps.finance.models import Voucher, VoucherType, JournalEntry
         
         if self.status != DemandStatus.DRAFT:
             raise WorkflowTransitionException(
                 _('Demand can only be posted from Draft status.')
             )
         
-        # Get the Accounts Receivable system head
-        ar_head = BudgetHead.objects.filter(
-            nam_head__system_code='AR'
-        ).first()
-        
-        if not ar_head:
-            raise ValidationError(
-                _('Accounts Receivable (AR) system head is not configured. '
-                  'Please run the seed command or configure it manually.')
-            )
-        
-        # Get default fund
-        fund = Fund.objects.filter(is_active=True).first()
-        if not fund:
-            raise ValidationError(_('No active fund found.'))
+        ar_head, fund = RevenueDemand.get_accrual_accounts()
         
-        # Generate voucher number
-        voucher_count = Voucher.objects.filter(
-            organization=self.organization,
-            fiscal_year=self.fiscal_year,
-            voucher_type=VoucherType.JOURNAL
-        ).count()
-        voucher_no = f"JV-{self.fiscal_year.year_name}-{voucher_count + 1:04d}"
+        # Generate voucher number (shares the numbering lock with batches)
+        from apps.revenue.services import next_journal_voucher_numbers
+        voucher_no = next_journal_voucher_numbers(self.organization, self.fiscal_year)[0]
         
         # Create the accrual voucher
         voucher = Voucher.objects.create(
@@ -676,6 +806,12 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
             'accrual_voucher', 'status', 'posted_at', 'posted_by', 'updated_at'
         ])
         
+        from apps.revenue.services import RevenueBalanceService
+        RevenueBalanceService.record_demand(self)
+        
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_demand(self)
+        
         # Log the posting
         from apps.revenue.logging import RevenueLogger
         RevenueLogger.log_demand_posted(self, user)
@@ -713,9 +849,16 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
                   'Please cancel the collections first.')
             )
         
-        # Unpost the accrual voucher if exists
+        # Reverse the accrual; a voucher shared with other demands of a
+        # batch is reversed for this demand's amount only
         if self.accrual_voucher and self.accrual_voucher.is_posted:
-            self.accrual_voucher.unpost_voucher()
+            if self.accrual_voucher.revenue_demands.exclude(pk=self.pk).exists():
+                from apps.revenue.services import DemandBatchService
+                DemandBatchService.reverse_accrual(self, user, reason)
+            else:
+                self.accrual_voucher.unpost_voucher(user, reason)
+        
+        was_posted = self.status in [DemandStatus.POSTED, DemandStatus.PARTIAL]
         
         self.status = DemandStatus.CANCELLED
         self.cancelled_at = timezone.now()
@@ -726,6 +869,13 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
             'cancellation_reason', 'updated_at'
         ])
         
+        if was_posted:
+            from apps.revenue.services import RevenueBalanceService
+            RevenueBalanceService.record_demand(self, sign=-1)
+            
+            from apps.dashboard.services_facts import TmaFactService
+            TmaFactService.record_demand(self, sign=-1)
+        
         # Log the cancellation
         from apps.revenue.logging import RevenueLogger
         RevenueLogger.log_demand_cancelled(self, user, reason)
@@ -735,7 +885,7 @@ class RevenueDemand(AuditLogMixin, TenantAwareMixin):
         RevenueNotifications.notify_demand_cancelled(self, reason)
 
 
-class RevenueCollection(AuditLogMixin, TenantAwareMixin):
+class RevenueCollection(AuditLogMixin, TenantAwareMixin, FieldTrackerMixin):
     """
     Revenue Collection (Receipt).
     
@@ -853,6 +1003,8 @@ class RevenueCollection(AuditLogMixin, TenantAwareMixin):
         help_text=_('GL voucher recording the receipt.')
     )
     
+    tracked_fields = ('status', 'amount_received', 'receipt_date', 'demand_id')
+    
     class Meta:
         verbose_name = _('Revenue Collection')
         verbose_name_plural = _('Revenue Collections')
@@ -882,10 +1034,8 @@ class RevenueCollection(AuditLogMixin, TenantAwareMixin):
         if self.demand and self.amount_received:
             outstanding = self.demand.get_outstanding_balance()
             # Allow for existing collection being edited
-            if self.pk:
-                existing = RevenueCollection.objects.filter(pk=self.pk).first()
-                if existing and existing.status == CollectionStatus.POSTED:
-                    outstanding += existing.amount_received
+            if self.pk and self.get_loaded_value('status') == CollectionStatus.POSTED:
+                outstanding += self.get_loaded_value('amount_received')
             
             if self.amount_received > outstanding:
                 raise ValidationError({
@@ -901,13 +1051,49 @@ class RevenueCollection(AuditLogMixin, TenantAwareMixin):
         if self.demand and not self.organization_id:
             self.organization = self.demand.organization
         self.clean()
+        changes = {} if is_new else self.get_field_changes(kwargs.get('update_fields'))
         super().save(*args, **kwargs)
         
+        from apps.dashboard.services_workspace import WorkspaceSnapshotService
+        WorkspaceSnapshotService.invalidate(self.organization_id)
+        
+        self._write_audit(is_new, changes)
+        
         # Notify about new collection
         if is_new:
             from apps.revenue.notifications import RevenueNotifications
             RevenueNotifications.notify_collection_received(self)
     
+    def _write_audit(self, is_new: bool, changes: Dict[str, Tuple[Any, Any]]) -> None:
+        """Queue a RevenueCollectionAudit row for a creation or a tracked change."""
+        Action = RevenueCollectionAudit.AuditAction
+        if is_new:
+            action, user_id = Action.CREATED, self.created_by_id
+        elif not changes:
+            return
+        elif 'status' in changes and self.status == CollectionStatus.POSTED:
+            action, user_id = Action.POSTED, self.posted_by_id
+        elif 'status' in changes and self.status == CollectionStatus.CANCELLED:
+            action, user_id = Action.CANCELLED, None
+        else:
+            action, user_id = Action.UPDATED, None
+        
+        # changed_by is required; changes made by no known user are not audited
+        user_id = user_id or self.updated_by_id or self.created_by_id
+        if user_id is None:
+            return
+        
+        AuditWriter.add(RevenueCollectionAudit(
+            collection=self,
+            action=action,
+            old_status=changes['status'][0] if 'status' in changes else ('' if is_new else self.status),
+            new_status=self.status,
+            changed_fields={
+                name: None if new is None else str(new) for name, (old, new) in changes.items()
+            },
+            changed_by_id=user_id,
+        ))
+    
     @transaction.atomic
     def post(self, user: 'CustomUser') -> None:
         """
@@ -1008,6 +1194,15 @@ class RevenueCollection(AuditLogMixin, TenantAwareMixin):
             'receipt_voucher', 'status', 'posted_at', 'posted_by', 'updated_at'
         ])
         
+        from apps.revenue.services import RevenueBalanceService
+        RevenueBalanceService.record_collection(self)
+        
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record_collection(self)
+        
+        from apps.dashboard.services_cash import DailyCashService
+        DailyCashService.record_collection(self)
+        
         # Update demand status based on total collected
         if self.demand.is_fully_paid():
             self.demand.status = DemandStatus.PAID
@@ -1042,10 +1237,23 @@ class RevenueCollection(AuditLogMixin, TenantAwareMixin):
         
         # Unpost the receipt voucher if exists
         if self.receipt_voucher and self.receipt_voucher.is_posted:
-            self.receipt_voucher.unpost_voucher()
+            self.receipt_voucher.unpost_voucher(user, reason)
+        
+        was_posted = self.status == CollectionStatus.POSTED
         
         self.status = CollectionStatus.CANCELLED
-        self.save(update_fields=['status', 'updated_at'])
+        self.updated_by = user
+        self.save(update_fields=['status', 'updated_by', 'updated_at'])
+        
+        if was_posted:
+            from apps.revenue.services import RevenueBalanceService
+            RevenueBalanceService.record_collection(self, sign=-1)
+            
+            from apps.dashboard.services_facts import TmaFactService
+            TmaFactService.record_collection(self, sign=-1)
+            
+            from apps.dashboard.services_cash import DailyCashService
+            DailyCashService.record_collection(self, sign=-1)
         
         # Update demand status - recalculate
         if self.demand.get_total_collected() <= Decimal('0.00'):
@@ -1246,3 +1454,119 @@ class RevenueCollectionAudit(TimeStampedMixin):
             f"{self.changed_by.get_full_name()} - "
             f"{self.changed_at.strftime('%Y-%m-%d %H:%M')}"
         )
+
+
+class NoticeBatchStatus(models.TextChoices):
+    """
+    Status of a demand notice batch.
+    
+    PENDING: Queued, waiting for `render_demand_notices`
+    RUNNING: Being rendered
+    COMPLETED: Rendered; the file is ready for download
+    FAILED: Rendering stopped with an error
+    """
+    PENDING = 'PENDING', _('Pending')
+    RUNNING = 'RUNNING', _('Running')
+    COMPLETED = 'COMPLETED', _('Completed')
+    FAILED = 'FAILED', _('Failed')
+
+
+class NoticeFormat(models.TextChoices):
+    """
+    Output of a demand notice batch.
+    
+    PDF: Notices merged into PDF files of NOTICE_BATCH_CHUNK_SIZE pages
+         (one PDF, or a ZIP of the parts for larger batches)
+    ZIP: One PDF per demand, named by challan number, in a ZIP archive
+    """
+    PDF = 'PDF', _('Merged PDF')
+    ZIP = 'ZIP', _('ZIP of PDFs (one per demand)')
+
+
+class DemandNoticeBatch(AuditLogMixin, TenantAwareMixin):
+    """
+    Batch of demand notices (challans) rendered to PDF in the background.
+    
+    Queued from the demand list for a billing cycle and rendered by the
+    `render_demand_notices` command on a process pool; rendered_count is
+    updated as chunks finish so the page can show progress.
+    
+    Attributes:
+        demands: The demands whose notices are printed.
+        output_format: Merged PDF or ZIP of single-notice PDFs.
+        status: PENDING, RUNNING, COMPLETED or FAILED.
+        total_count: Number of notices in the batch.
+        rendered_count: Notices rendered so far.
+        file: The generated PDF or ZIP.
+        error_message: Error of a failed run.
+        started_at: When rendering started.
+        completed_at: When rendering finished.
+    """
+    
+    demands = models.ManyToManyField(
+        RevenueDemand,
+        related_name='notice_batches',
+        verbose_name=_('Demands')
+    )
+    output_format = models.CharField(
+        max_length=5,
+        choices=NoticeFormat.choices,
+        default=NoticeFormat.PDF,
+        verbose_name=_('Output Format')
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=NoticeBatchStatus.choices,
+        default=NoticeBatchStatus.PENDING,
+        verbose_name=_('Status')
+    )
+    total_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Total Notices')
+    )
+    rendered_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Rendered Notices')
+    )
+    file = models.FileField(
+        upload_to='demand_notices/%Y/%m/',
+        blank=True,
+        verbose_name=_('File')
+    )
+    error_message = models.TextField(
+        blank=True,
+        verbose_name=_('Error Message')
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Started At')
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Completed At')
+    )
+    
+    class Meta:
+        verbose_name = _('Demand Notice Batch')
+        verbose_name_plural = _('Demand Notice Batches')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self) -> str:
+        return f"Notice batch #{self.pk} - {self.total_count} notices ({self.get_status_display()})"
+    
+    @property
+    def progress(self) -> int:
+        """Percentage of notices rendered."""
+        if not self.total_count:
+            return 100 if self.status == NoticeBatchStatus.COMPLETED else 0
+        return min(100, self.rendered_count * 100 // self.total_count)
+    
+    @property
+    def is_active(self) -> bool:
+        """Whether the batch is still queued or rendering."""
+        return self.status in (NoticeBatchStatus.PENDING, NoticeBatchStatus.RUNNING)
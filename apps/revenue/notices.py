@@ -0,0 +1,320 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Demand notice (challan) printing. A single notice is
+             rendered in the request; the notices of a billing cycle are
+             queued as a DemandNoticeBatch and rendered by the
+             `render_demand_notices` command on a process pool whose
+             workers parse the template and stylesheet once. Batches
+             left RUNNING by a render process that died are claimed
+             again once stale.
+-------------------------------------------------------------------------
+"""
+import importlib
+import logging
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.db.models import F, Q, QuerySet
+from django.template.loader import get_template, render_to_string
+from django.utils import timezone
+
+from apps.core.metrics import track_pdf_render
+from apps.revenue.models import DemandNoticeBatch, NoticeBatchStatus, NoticeFormat, RevenueDemand
+
+
+logger = logging.getLogger(__name__)
+
+NOTICE_TEMPLATE = 'revenue/notices/demand_notice.html'
+NOTICE_STYLESHEET = 'revenue/notices/demand_notice.css'
+
+# Parsed template, stylesheet and font configuration of this process,
+# set up once by _init_renderer (per pool worker, or in the caller)
+_renderer: Dict[str, Any] = {}
+
+
+def _init_renderer() -> None:
+    """Process pool initializer: parse the notice template and stylesheet."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        # Spawned rather than forked worker
+        django.setup()
+
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    font_config = FontConfiguration()
+    _renderer.update(
+        template=get_template(NOTICE_TEMPLATE),
+        stylesheet=CSS(string=render_to_string(NOTICE_STYLESHEET), font_config=font_config),
+        font_config=font_config,
+    )
+
+
+def _write_pdf(notices: List[Dict[str, Any]]) -> bytes:
+    """Render notices into one PDF with the process's parsed renderer."""
+    from weasyprint import HTML
+
+    if not _renderer:
+        _init_renderer()
+    html = _renderer['template'].render({'notices': notices})
+    return HTML(string=html).write_pdf(
+        stylesheets=[_renderer['stylesheet']], font_config=_renderer['font_config']
+    )
+
+
+def _render_chunk(notices: List[Dict[str, Any]], output_format: str) -> List[Tuple[Optional[str], bytes]]:
+    """
+    Worker task: render one chunk of notices.
+
+    Returns:
+        (file name, PDF) pairs: one per notice named by challan number for
+        ZIP output, or a single unnamed merged PDF.
+    """
+    if output_format == NoticeFormat.ZIP:
+        return [(f"{notice['challan_no']}.pdf", _write_pdf([notice])) for notice in notices]
+    return [(None, _write_pdf(notices))]
+
+
+class DemandNoticeService:
+    """Service class for printing demand notices singly and in batches."""
+
+    @staticmethod
+    def notice_queryset() -> QuerySet:
+        """Demands with everything a notice prints, in one query."""
+        return RevenueDemand.objects.select_related(
+            'organization', 'fiscal_year', 'payer',
+            'budget_head__nam_head', 'budget_head__sub_head__nam_head',
+        )
+
+    @staticmethod
+    def notice_context(demand: RevenueDemand, as_of: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Plain (picklable) values of one notice.
+
+        Args:
+            demand: Demand loaded with notice_queryset().
+            as_of: Date the penalty is calculated for (default: today).
+        """
+        as_of = as_of or timezone.now().date()
+        penalty = demand.calculate_penalty(as_of)
+        return {
+            'organization': demand.organization.name,
+            'challan_no': demand.challan_no,
+            'fiscal_year': demand.fiscal_year.year_name,
+            'payer_name': demand.payer.name,
+            'payer_cnic_ntn': demand.payer.cnic_ntn or '',
+            'payer_address': demand.payer.address or '',
+            'head_code': demand.budget_head.code,
+            'head_name': demand.budget_head.name,
+            'period_description': demand.period_description or '',
+            'description': demand.description or '',
+            'issue_date': demand.issue_date,
+            'due_date': demand.due_date,
+            'amount': demand.amount,
+            'collected_amount': demand.collected_amount,
+            'outstanding_amount': demand.outstanding_amount,
+            'penalty': penalty,
+            'total_due': demand.outstanding_amount + penalty,
+            'apply_penalty': demand.apply_penalty and not demand.penalty_waived,
+            'grace_period_days': demand.grace_period_days,
+            'as_of': as_of,
+        }
+
+    @staticmethod
+    def render_html(demand: RevenueDemand) -> str:
+        """Printable HTML of one notice, with the stylesheet inlined."""
+        return render_to_string(NOTICE_TEMPLATE, {
+            'notices': [DemandNoticeService.notice_context(demand)],
+            'inline_stylesheet': True,
+        })
+
+    @staticmethod
+    def render_pdf(demand: RevenueDemand) -> bytes:
+        """
+        PDF of one notice.
+
+        Raises:
+            ImportError, OSError: WeasyPrint or its system libraries are missing.
+        """
+        with track_pdf_render('demand_notice'):
+            return _write_pdf([DemandNoticeService.notice_context(demand)])
+
+    # ------------------------------------------------------------------
+    # Batches
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    @transaction.atomic
+    def queue(organization, demands: QuerySet, output_format: str, user) -> DemandNoticeBatch:
+        """
+        Queue the notices of the given demands for background rendering.
+
+        Args:
+            organization: The organization (TMA).
+            demands: Selected demands of the organization.
+            output_format: NoticeFormat value.
+            user: The requesting user.
+
+        Returns:
+            The PENDING DemandNoticeBatch.
+        """
+        demand_ids = list(demands.order_by().values_list('pk', flat=True))
+        batch = DemandNoticeBatch.objects.create(
+            organization=organization,
+            output_format=output_format,
+            total_count=len(demand_ids),
+            created_by=user,
+            updated_by=user,
+        )
+        DemandNoticeBatch.demands.through.objects.bulk_create([
+            DemandNoticeBatch.demands.through(demandnoticebatch_id=batch.pk, revenuedemand_id=demand_id)
+            for demand_id in demand_ids
+        ], batch_size=settings.EXPORT_CHUNK_SIZE)
+        return batch
+
+    @staticmethod
+    def claimable() -> Q:
+        """
+        Batches a command may claim: pending ones, and running ones whose
+        progress stopped for NOTICE_BATCH_STALE_SECONDS (the rendering
+        process died, e.g. killed for memory or by a deploy).
+
+        render_batch() touches updated_at after every chunk, so a live
+        render is not taken over while it makes progress.
+        """
+        stale_before = timezone.now() - timedelta(seconds=settings.NOTICE_BATCH_STALE_SECONDS)
+        return Q(status=NoticeBatchStatus.PENDING) | Q(
+            status=NoticeBatchStatus.RUNNING, updated_at__lt=stale_before
+        )
+
+    @staticmethod
+    def claim(batch_id: Optional[int] = None) -> Optional[DemandNoticeBatch]:
+        """
+        Mark the oldest claimable batch (or the given one) RUNNING.
+
+        The status change is a conditional UPDATE, so a batch is rendered
+        by one command even when several run at once. Stale running
+        batches are taken over and rendered again from the start.
+
+        Returns:
+            The claimed batch, or None if nothing is claimable.
+        """
+        claimable = DemandNoticeService.claimable()
+        pending = DemandNoticeBatch.objects.filter(claimable)
+        if batch_id is not None:
+            pending = pending.filter(pk=batch_id)
+
+        for pk in pending.order_by('created_at', 'pk').values_list('pk', flat=True)[:10]:
+            claimed = DemandNoticeBatch.objects.filter(claimable, pk=pk).update(
+                status=NoticeBatchStatus.RUNNING, started_at=timezone.now(),
+                rendered_count=0, error_message='', updated_at=timezone.now()
+            )
+            if claimed:
+                return DemandNoticeBatch.objects.get(pk=pk)
+        return None
+
+    @staticmethod
+    def _render_chunks(chunks: List[List[Dict[str, Any]]], output_format: str,
+                       workers: int) -> Iterator[Tuple[int, List[Tuple[Optional[str], bytes]]]]:
+        """Yield (chunk index, files) as chunks finish, on a pool when workers > 1."""
+        if workers <= 1 or len(chunks) <= 1:
+            for index, chunk in enumerate(chunks):
+                yield index, _render_chunk(chunk, output_format)
+            return
+
+        # Forked workers must not inherit open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_renderer) as pool:
+            futures = {
+                pool.submit(_render_chunk, chunk, output_format): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    @staticmethod
+    def render_batch(batch: DemandNoticeBatch, workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None) -> DemandNoticeBatch:
+        """
+        Render a claimed batch and store the result in batch.file.
+
+        Notice data is read in the calling process with one query; chunks
+        of notices are rendered by the pool and written to a spooled
+        archive as they finish, and rendered_count is updated per chunk.
+
+        Args:
+            batch: A RUNNING batch (see claim()).
+            workers: Rendering processes (default NOTICE_RENDER_WORKERS;
+                     0 or 1 renders in this process).
+            chunk_size: Notices per task and per merged PDF
+                        (default NOTICE_BATCH_CHUNK_SIZE).
+
+        Returns:
+            The batch, COMPLETED or FAILED.
+        """
+        workers = settings.NOTICE_RENDER_WORKERS if workers is None else workers
+        chunk_size = chunk_size or settings.NOTICE_BATCH_CHUNK_SIZE
+        progress = DemandNoticeBatch.objects.filter(pk=batch.pk)
+
+        try:
+            # Fail here rather than in every pool worker when WeasyPrint is missing
+            importlib.import_module('weasyprint')
+
+            as_of = timezone.now().date()
+            notices = [
+                DemandNoticeService.notice_context(demand, as_of)
+                for demand in DemandNoticeService.notice_queryset().filter(
+                    notice_batches=batch
+                ).order_by('challan_no')
+            ]
+            chunks = [notices[i:i + chunk_size] for i in range(0, len(notices), chunk_size)]
+            single_pdf = batch.output_format == NoticeFormat.PDF and len(chunks) == 1
+
+            with tempfile.TemporaryFile() as spool, track_pdf_render('demand_notice_batch'):
+                archive = None if single_pdf else zipfile.ZipFile(spool, 'w')
+                for index, files in DemandNoticeService._render_chunks(chunks, batch.output_format, workers):
+                    for name, pdf in files:
+                        if archive is None:
+                            spool.write(pdf)
+                        else:
+                            archive.writestr(name or f'notices_{index + 1:03d}.pdf', pdf)
+                    progress.update(
+                        rendered_count=F('rendered_count') + len(chunks[index]), updated_at=timezone.now()
+                    )
+                if archive is not None:
+                    archive.close()
+
+                spool.seek(0)
+                extension = 'pdf' if single_pdf else 'zip'
+                batch.file.save(f'demand_notices_{batch.pk}.{extension}', File(spool), save=False)
+
+            batch.status = NoticeBatchStatus.COMPLETED
+            batch.rendered_count = len(notices)
+            batch.error_message = ''
+        except ImportError as e:
+            logger.error(f"Notice batch {batch.pk}: PDF rendering is unavailable: {e}")
+            batch.status = NoticeBatchStatus.FAILED
+            batch.error_message = f'PDF rendering is unavailable (WeasyPrint): {e}'
+        except Exception as e:
+            logger.exception(f"Notice batch {batch.pk} failed")
+            batch.status = NoticeBatchStatus.FAILED
+            batch.error_message = str(e)
+
+        batch.completed_at = timezone.now()
+        batch.updated_at = batch.completed_at
+        fields = ['status', 'error_message', 'completed_at', 'updated_at', 'file']
+        if batch.status == NoticeBatchStatus.COMPLETED:
+            fields.append('rendered_count')
+        batch.save(update_fields=fields)
+        return batch
@@ -14,13 +14,12 @@ from decimal import Decimal
 from datetime import timedelta
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.core.mail import send_mail
-from django.conf import settings
 
 from apps.revenue.models import RevenueDemand, RevenueCollection, DemandStatus, CollectionStatus
 from apps.core.models import Organization
 from apps.core.services import NotificationService
 from apps.core.models import NotificationCategory
+from apps.core.outbox import EmailOutboxService
 
 
 class RevenueNotifications:
@@ -61,10 +60,40 @@ class RevenueNotifications:
                     f"created for {demand.payer.name}."
                 ),
                 link=f"/revenue/demands/{demand.pk}/",
-                category=NotificationCategory.INFO,
+                category=NotificationCategory.WORKFLOW,
                 icon='bi-receipt'
             )
     
+    @staticmethod
+    def notify_demand_batch_issued(organization: Organization, count: int, total: Decimal,
+                                   vouchers: List) -> int:
+        """
+        Send one notification for a batch of issued demands.
+        
+        Args:
+            organization: The issuing organization
+            count: Number of demands issued
+            total: Total amount of the batch
+            vouchers: The consolidated accrual vouchers
+            
+        Returns:
+            Number of notifications sent
+        """
+        notifications = NotificationService.fan_out(
+            RevenueNotifications._finance_officer_ids(organization),
+            [{
+                'title': _('Demand Batch Posted to GL'),
+                'message': _(
+                    f"{count} demands of Rs. {total:,.2f} have been issued and posted. "
+                    f"Vouchers: {', '.join(v.voucher_no for v in vouchers)}"
+                ),
+                'link': '/revenue/demands/',
+                'category': NotificationCategory.WORKFLOW,
+                'icon': 'bi-check-circle-fill',
+            }]
+        )
+        return len(notifications)
+    
     @staticmethod
     def notify_demand_posted(demand: RevenueDemand) -> None:
         """
@@ -124,7 +153,7 @@ class RevenueNotifications:
                     f"Outstanding: Rs. {outstanding:,.2f}"
                 ),
                 link=f"/revenue/collections/{collection.pk}/",
-                category=NotificationCategory.SUCCESS,
+                category=NotificationCategory.WORKFLOW,
                 icon='bi-cash-coin'
             )
     
@@ -187,7 +216,7 @@ class RevenueNotifications:
                     f"has been cancelled. Reason: {cancellation_reason}"
                 ),
                 link=f"/revenue/demands/{demand.pk}/",
-                category=NotificationCategory.WARNING,
+                category=NotificationCategory.ALERT,
                 icon='bi-x-circle'
             )
         
@@ -201,7 +230,7 @@ class RevenueNotifications:
                     f"has been cancelled. Reason: {cancellation_reason}"
                 ),
                 link=f"/revenue/demands/{demand.pk}/",
-                category=NotificationCategory.WARNING,
+                category=NotificationCategory.ALERT,
                 icon='bi-exclamation-triangle'
             )
     
@@ -232,17 +261,33 @@ class RevenueNotifications:
                     f"has been cancelled. {cancellation_reason}"
                 ),
                 link=f"/revenue/collections/{collection.pk}/",
-                category=NotificationCategory.WARNING,
+                category=NotificationCategory.ALERT,
                 icon='bi-x-circle'
             )
     
+    # Days past due on which overdue reminders are sent
+    OVERDUE_REMINDER_DAYS = [1, 7, 15, 30, 60, 90]
+    
+    @staticmethod
+    def _finance_officer_ids(organization: Organization) -> List[int]:
+        """IDs of the organization's active Finance Officers (one query)."""
+        from apps.users.models import RoleCode
+        
+        return list(organization.users.filter(
+            roles__code=RoleCode.FINANCE_OFFICER,
+            is_active=True
+        ).values_list('id', flat=True).distinct())
+    
     @staticmethod
     def notify_overdue_demands(organization: Organization) -> int:
         """
         Send reminders for overdue demands.
         
         This method should be called by a periodic task (e.g., daily cron job)
-        to notify about overdue payments.
+        to notify about overdue payments. Demands reaching a reminder day are
+        loaded in one query and fanned out to the Finance Officers with bulk
+        inserts; above the digest threshold each officer gets a single digest
+        notification instead.
         
         Args:
             organization: The organization to check
@@ -252,53 +297,58 @@ class RevenueNotifications:
         """
         today = timezone.now().date()
         
-        # Find overdue demands
+        # Overdue demands on a reminder day with a stored outstanding balance
         overdue_demands = RevenueDemand.objects.filter(
             organization=organization,
             status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
-            due_date__lt=today
-        ).select_related('payer', 'budget_head', 'budget_head__nam_head')
+            due_date__in=[
+                today - timedelta(days=days) for days in RevenueNotifications.OVERDUE_REMINDER_DAYS
+            ],
+            outstanding_amount__gt=0
+        ).select_related(
+            'organization', 'payer', 'budget_head', 'budget_head__nam_head'
+        ).order_by('due_date', 'challan_no')
         
-        notifications_sent = 0
+        reminders = []
+        total_outstanding = Decimal('0.00')
         
         for demand in overdue_demands:
             days_overdue = (today - demand.due_date).days
-            outstanding = demand.get_outstanding_balance()
-            
-            if outstanding <= 0:
-                continue
-            
-            # Send reminder at specific intervals: 1, 7, 15, 30, 60, 90 days
-            reminder_days = [1, 7, 15, 30, 60, 90]
-            if days_overdue not in reminder_days:
-                continue
-            
-            # Notify finance officers
-            finance_officers = organization.users.filter(
-                role='FINANCE_OFFICER',
-                is_active=True
-            )
-            
-            for officer in finance_officers:
-                NotificationService.send_notification(
-                    recipient=officer,
-                    title=_('Overdue Payment Alert'),
-                    message=_(
-                        f"Demand {demand.challan_no}: Rs. {outstanding:,.2f} "
-                        f"overdue by {days_overdue} days from {demand.payer.name}. "
-                        f"Due date was {demand.due_date.strftime('%Y-%m-%d')}."
-                    ),
-                    link=f"/revenue/demands/{demand.pk}/",
-                    category=NotificationCategory.WARNING,
-                    icon='bi-exclamation-triangle-fill'
-                )
-                notifications_sent += 1
+            outstanding = demand.outstanding_amount
+            total_outstanding += outstanding
+            reminders.append({
+                'title': _('Overdue Payment Alert'),
+                'message': (
+                    f"Demand {demand.challan_no}: Rs. {outstanding:,.2f} "
+                    f"overdue by {days_overdue} days from {demand.payer.name}. "
+                    f"Due date was {demand.due_date.strftime('%Y-%m-%d')}."
+                ),
+                'link': f"/revenue/demands/{demand.pk}/",
+                'category': NotificationCategory.ALERT,
+                'icon': 'bi-exclamation-triangle-fill',
+            })
             
             # Send email to payer if contact info available
             if demand.payer.email and days_overdue in [7, 30, 60]:
-                RevenueNotifications._send_overdue_email(demand, days_overdue)
+                RevenueNotifications._send_overdue_email(demand, days_overdue, outstanding)
         
-        return notifications_sent
+        digest = {
+            'title': _('Overdue Payment Alert'),
+            'message': (
+                f"{len(reminders)} demands became overdue for a reminder today. "
+                f"Outstanding: Rs. {total_outstanding:,.2f}."
+            ),
+            'link': f"/revenue/demands/?status={DemandStatus.POSTED}",
+            'category': NotificationCategory.ALERT,
+            'icon': 'bi-exclamation-triangle-fill',
+        }
+        
+        notifications = NotificationService.fan_out(
+            RevenueNotifications._finance_officer_ids(organization) if reminders else [],
+            reminders,
+            digest=digest
+        )
+        return len(notifications)
     
     @staticmethod
     def notify_payment_due_soon(organization: Organization, days_ahead: int = 7) -> int:
@@ -343,6 +393,7 @@ class RevenueNotifications:
     
     # =================================================================
     # Private helper methods for email notifications
+    # (queued in the EmailOutbox; delivered by `dispatch_emails`)
     # =================================================================
     
     @staticmethod
@@ -354,7 +405,7 @@ class RevenueNotifications:
             demand: The demand to notify about
             
         Returns:
-            True if email sent successfully
+            True if the email was queued successfully
         """
         try:
             subject = f"Revenue Demand - Challan {demand.challan_no}"
@@ -377,12 +428,10 @@ Thank you,
 {demand.organization.name}
             """
             
-            send_mail(
+            EmailOutboxService.enqueue(
                 subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[demand.payer.email],
-                fail_silently=True
+                body=message,
+                to=[demand.payer.email]
             )
             return True
         except Exception:
@@ -413,22 +462,25 @@ Thank you for your payment.
 {collection.organization.name}
             """
             
-            send_mail(
+            EmailOutboxService.enqueue(
                 subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[collection.demand.payer.email],
-                fail_silently=True
+                body=message,
+                to=[collection.demand.payer.email]
             )
             return True
         except Exception:
             return False
     
     @staticmethod
-    def _send_overdue_email(demand: RevenueDemand, days_overdue: int) -> bool:
+    def _send_overdue_email(
+        demand: RevenueDemand,
+        days_overdue: int,
+        outstanding: Optional[Decimal] = None
+    ) -> bool:
         """Send overdue payment email to payer."""
         try:
-            outstanding = demand.get_outstanding_balance()
+            if outstanding is None:
+                outstanding = demand.get_outstanding_balance()
             
             subject = f"Overdue Payment Notice - Challan {demand.challan_no}"
             message = f"""
@@ -453,12 +505,10 @@ Thank you,
 Finance Department
             """
             
-            send_mail(
+            EmailOutboxService.enqueue(
                 subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[demand.payer.email],
-                fail_silently=True
+                body=message,
+                to=[demand.payer.email]
             )
             return True
         except Exception:
@@ -488,12 +538,10 @@ Thank you,
 {demand.organization.name}
             """
             
-            send_mail(
+            EmailOutboxService.enqueue(
                 subject=subject,
-                message=message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[demand.payer.email],
-                fail_silently=True
+                body=message,
+                to=[demand.payer.email]
             )
             return True
         except Exception:
@@ -11,8 +11,12 @@ Description: Revenue reporting and analytics functions for management
 from decimal import Decimal
 from typing import Dict, List, Tuple, Optional, Any
 from datetime import date, timedelta
-from django.db.models import Sum, Count, Q, F, Avg, Max, Min, Case, When, DecimalField, Value
-from django.db.models.functions import Coalesce, TruncMonth
+from django.db import connections
+from django.db.models import (
+    Sum, Count, Q, F, Avg, Max, Min, Case, When, DecimalField, IntegerField, Value,
+    OuterRef, QuerySet, Subquery, Aggregate, DateField, FloatField, Window
+)
+from django.db.models.functions import Coalesce, Floor, RowNumber, TruncMonth
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -22,6 +26,199 @@ from apps.revenue.models import (
 )
 from apps.core.models import Organization
 from apps.budgeting.models import FiscalYear
+from apps.revenue.services import DaysBetween
+
+
+# Aging buckets: (key, label, min days, max days) since the issue date
+AGING_BUCKETS = [
+    ('current', _('Current (0-30 days)'), None, 30),
+    ('31_60', _('31-60 Days'), 31, 60),
+    ('61_90', _('61-90 Days'), 61, 90),
+    ('over_90', _('Over 90 Days'), 91, None),
+]
+
+# Detail rows fetched per expanded aging bucket
+AGING_PAGE_SIZE = 50
+
+# Sort keys accepted by the payer-wise summary
+PAYER_SUMMARY_SORTS = {
+    'name': 'name',
+    'demanded': 'total_demanded',
+    'collected': 'total_collected',
+    'outstanding': 'outstanding',
+}
+
+# Days-to-collect histogram: (key, label, min days, max days) from issue
+# date to the first posted receipt
+DAYS_TO_COLLECT_BUCKETS = [
+    ('0_7', _('0-7 Days'), None, 7),
+    ('8_15', _('8-15 Days'), 8, 15),
+    ('16_30', _('16-30 Days'), 16, 30),
+    ('31_60', _('31-60 Days'), 31, 60),
+    ('61_90', _('61-90 Days'), 61, 90),
+    ('over_90', _('Over 90 Days'), 91, None),
+]
+
+# Days-to-collect percentiles: (result key, fraction)
+DAYS_TO_COLLECT_PERCENTILES = [
+    ('median_days', 0.5),
+    ('p90_days', 0.9),
+]
+
+# Output type of money subqueries and conditional sums
+AMOUNT_FIELD = DecimalField(max_digits=15, decimal_places=2)
+
+
+def _subquery_sum(queryset: QuerySet, field: str, group_by: str) -> Coalesce:
+    """Sum of field over a correlated queryset, zero when it is empty."""
+    return Coalesce(
+        Subquery(
+            queryset.values(group_by).annotate(total=Sum(field)).values('total')[:1],
+            output_field=AMOUNT_FIELD,
+        ),
+        Value(Decimal('0.00'), output_field=AMOUNT_FIELD),
+    )
+
+
+def _subquery_count(queryset: QuerySet, group_by: str) -> Coalesce:
+    """Row count of a correlated queryset, zero when it is empty."""
+    return Coalesce(
+        Subquery(
+            queryset.values(group_by).annotate(total=Count('pk')).values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+class PercentileCont(Aggregate):
+    """
+    Continuous (interpolated) percentile of an expression.
+
+    Compiles to PostgreSQL's ordered-set aggregate percentile_cont();
+    other backends use _window_percentiles() instead.
+    """
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction: float, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def _days_to_collect(
+    organization: Optional[Organization],
+    fiscal_year: FiscalYear
+) -> QuerySet:
+    """
+    Paid demands annotated with first_receipt (earliest posted receipt)
+    and days (issue date to first_receipt). All TMAs if no organization.
+    """
+    first_receipt = RevenueCollection.objects.filter(
+        demand=OuterRef('pk'),
+        status=CollectionStatus.POSTED
+    ).values('demand').annotate(first=Min('receipt_date')).values('first')[:1]
+
+    demands = RevenueDemand.objects.filter(fiscal_year=fiscal_year, status=DemandStatus.PAID)
+    if organization is not None:
+        demands = demands.filter(organization=organization)
+    return demands.annotate(
+        first_receipt=Subquery(first_receipt, output_field=DateField())
+    ).filter(
+        first_receipt__isnull=False
+    ).annotate(
+        days=DaysBetween('first_receipt', 'issue_date')
+    )
+
+
+def _days_range(min_days: Optional[int], max_days: Optional[int]) -> Q:
+    """Condition on the days annotation for one histogram bucket."""
+    condition = Q()
+    if min_days is not None:
+        condition &= Q(days__gte=min_days)
+    if max_days is not None:
+        condition &= Q(days__lte=max_days)
+    return condition
+
+
+def _days_aggregates(queryset: QuerySet) -> Dict[str, Aggregate]:
+    """
+    Aggregates over a _days_to_collect() queryset: count, average,
+    on-time count, histogram buckets and (on PostgreSQL) percentiles.
+    """
+    aggregates = {
+        'count': Count('id'),
+        'avg_days': Avg('days'),
+        'on_time': Count('id', filter=Q(first_receipt__lte=F('due_date'))),
+    }
+    for key, label, min_days, max_days in DAYS_TO_COLLECT_BUCKETS:
+        aggregates[f'bucket_{key}'] = Count('id', filter=_days_range(min_days, max_days))
+    if connections[queryset.db].vendor == 'postgresql':
+        for key, fraction in DAYS_TO_COLLECT_PERCENTILES:
+            aggregates[key] = PercentileCont('days', fraction)
+    return aggregates
+
+
+def _window_percentiles(queryset: QuerySet, group_by: Tuple[str, ...] = ()) -> Dict[tuple, Dict[str, float]]:
+    """
+    DAYS_TO_COLLECT_PERCENTILES per group for backends without
+    percentile_cont.
+
+    Rows are ranked by days within each group and only the two rows
+    either side of each percentile position are fetched, so this is a
+    single query whatever the volume. Values are interpolated the way
+    percentile_cont does.
+    """
+    partition = [F(field) for field in group_by] or None
+    ranked = queryset.annotate(
+        position=Window(RowNumber(), partition_by=partition, order_by=F('days').asc()),
+        rows=Window(Count('id'), partition_by=partition),
+    )
+    wanted = Q()
+    for key, fraction in DAYS_TO_COLLECT_PERCENTILES:
+        lower = Floor((F('rows') - 1) * Value(fraction)) + 1
+        wanted |= Q(position=lower) | Q(position=lower + 1)
+
+    ranked_days: Dict[tuple, Dict[int, int]] = {}
+    sizes: Dict[tuple, int] = {}
+    for row in ranked.filter(wanted).values(*group_by, 'position', 'rows', 'days'):
+        group = tuple(row[field] for field in group_by)
+        ranked_days.setdefault(group, {})[row['position']] = row['days']
+        sizes[group] = row['rows']
+
+    results = {}
+    for group, days in ranked_days.items():
+        results[group] = {}
+        for key, fraction in DAYS_TO_COLLECT_PERCENTILES:
+            rank = (sizes[group] - 1) * fraction
+            lower = int(rank)
+            low_value = days[lower + 1]
+            high_value = days.get(lower + 2, low_value)
+            results[group][key] = low_value + (rank - lower) * (high_value - low_value)
+    return results
+
+
+def _days_summary(row: Dict[str, Any], percentiles: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Shape a _days_aggregates() row into rounded metrics and a histogram."""
+    count = row['count'] or 0
+    on_time = row['on_time'] or 0
+    percentiles = percentiles if percentiles is not None else row
+    summary = {
+        'count': count,
+        'avg_days': round(row['avg_days'] or 0, 1),
+        'on_time': on_time,
+        'late': count - on_time,
+        'on_time_rate': round(on_time / count * 100, 2) if count else Decimal('0'),
+        'histogram': [
+            {'key': key, 'label': label, 'count': row[f'bucket_{key}']}
+            for key, label, min_days, max_days in DAYS_TO_COLLECT_BUCKETS
+        ],
+    }
+    for key, fraction in DAYS_TO_COLLECT_PERCENTILES:
+        value = percentiles.get(key)
+        summary[key] = round(value, 1) if value is not None else None
+    return summary
 
 
 class RevenueReports:
@@ -36,9 +233,38 @@ class RevenueReports:
     - Trend analysis
     """
     
+    @staticmethod
+    def _open_receivables(
+        organization: Optional[Organization],
+        fiscal_year: Optional[FiscalYear] = None
+    ):
+        """Posted/partial demands with an outstanding balance (all TMAs if no organization)."""
+        demands = RevenueDemand.objects.filter(
+            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
+            outstanding_amount__gt=0
+        )
+        if organization is not None:
+            demands = demands.filter(organization=organization)
+        if fiscal_year:
+            demands = demands.filter(fiscal_year=fiscal_year)
+        return demands
+    
+    @staticmethod
+    def _aging_bucket_filter(bucket: str, as_of_date: date) -> Q:
+        """Issue-date range of an aging bucket relative to as_of_date."""
+        for key, label, min_days, max_days in AGING_BUCKETS:
+            if key == bucket:
+                condition = Q()
+                if min_days is not None:
+                    condition &= Q(issue_date__lte=as_of_date - timedelta(days=min_days))
+                if max_days is not None:
+                    condition &= Q(issue_date__gte=as_of_date - timedelta(days=max_days))
+                return condition
+        raise ValueError(f"Unknown aging bucket: {bucket}")
+    
     @staticmethod
     def outstanding_receivables_aging(
-        organization: Organization,
+        organization: Optional[Organization],
         as_of_date: Optional[date] = None,
         fiscal_year: Optional[FiscalYear] = None
     ) -> Dict[str, Any]:
@@ -51,8 +277,12 @@ class RevenueReports:
         - 61-90 days
         - Over 90 days
         
+        Bucket totals and counts come from a single conditional aggregate
+        over the stored outstanding amounts; detail rows are fetched per
+        bucket with aging_bucket_demands().
+        
         Args:
-            organization: The organization to report on
+            organization: The organization to report on (None for province-wide)
             as_of_date: Reference date for aging (default: today)
             fiscal_year: Optional fiscal year filter
             
@@ -62,70 +292,108 @@ class RevenueReports:
         if not as_of_date:
             as_of_date = timezone.now().date()
         
-        # Base queryset - demands with outstanding balances
-        demands = RevenueDemand.objects.filter(
-            organization=organization,
-            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL]
-        ).select_related(
-            'payer',
-            'budget_head',
-            'budget_head__nam_head',
-            'fiscal_year'
-        )
+        zero = Value(Decimal('0.00'), output_field=AMOUNT_FIELD)
         
-        if fiscal_year:
-            demands = demands.filter(fiscal_year=fiscal_year)
+        aggregates = {}
+        for key, label, min_days, max_days in AGING_BUCKETS:
+            condition = RevenueReports._aging_bucket_filter(key, as_of_date)
+            aggregates[f'{key}_total'] = Coalesce(
+                Sum(Case(When(condition, then=F('outstanding_amount')), output_field=AMOUNT_FIELD)),
+                zero
+            )
+            aggregates[f'{key}_count'] = Coalesce(
+                Sum(Case(When(condition, then=Value(1)), default=Value(0))),
+                Value(0)
+            )
+        
+        totals = RevenueReports._open_receivables(organization, fiscal_year).aggregate(**aggregates)
         
-        # Initialize aging buckets
         aging_buckets = {
-            'current': {'demands': [], 'total': Decimal('0'), 'count': 0},
-            '31_60': {'demands': [], 'total': Decimal('0'), 'count': 0},
-            '61_90': {'demands': [], 'total': Decimal('0'), 'count': 0},
-            'over_90': {'demands': [], 'total': Decimal('0'), 'count': 0},
+            key: {
+                'key': key,
+                'label': label,
+                'total': totals[f'{key}_total'],
+                'count': totals[f'{key}_count'],
+            }
+            for key, label, min_days, max_days in AGING_BUCKETS
         }
         
-        grand_total = Decimal('0')
-        
-        for demand in demands:
-            outstanding = demand.get_outstanding_balance()
-            if outstanding > 0:
-                days = (as_of_date - demand.issue_date).days
-                
-                # Determine bucket
-                if days <= 30:
-                    bucket = 'current'
-                elif days <= 60:
-                    bucket = '31_60'
-                elif days <= 90:
-                    bucket = '61_90'
-                else:
-                    bucket = 'over_90'
-                
-                # Add to bucket
-                aging_buckets[bucket]['demands'].append({
-                    'demand': demand,
-                    'challan_no': demand.challan_no,
-                    'payer_name': demand.payer.name,
-                    'budget_head': demand.budget_head.nam_head.name,
-                    'issue_date': demand.issue_date,
-                    'due_date': demand.due_date,
-                    'amount': demand.amount,
-                    'outstanding': outstanding,
-                    'days_outstanding': days
-                })
-                aging_buckets[bucket]['total'] += outstanding
-                aging_buckets[bucket]['count'] += 1
-                grand_total += outstanding
-        
         return {
             'as_of_date': as_of_date,
             'organization': organization,
             'fiscal_year': fiscal_year,
             'buckets': aging_buckets,
-            'grand_total': grand_total,
+            'grand_total': sum((b['total'] for b in aging_buckets.values()), Decimal('0.00')),
             'total_count': sum(b['count'] for b in aging_buckets.values())
         }
     
+    @staticmethod
+    def aging_bucket_demands(
+        organization: Optional[Organization],
+        bucket: str,
+        as_of_date: Optional[date] = None,
+        fiscal_year: Optional[FiscalYear] = None,
+        after: Optional[Tuple[date, int]] = None,
+        limit: int = AGING_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Outstanding demands of one aging bucket, oldest first.
+        
+        Uses keyset pagination on (issue_date, id) so deep pages cost the
+        same as the first one.
+        
+        Args:
+            organization: The organization to report on (None for province-wide)
+            bucket: Aging bucket key ('current', '31_60', '61_90', 'over_90')
+            as_of_date: Reference date for aging (default: today)
+            fiscal_year: Optional fiscal year filter
+            after: (issue_date, id) of the last row of the previous page
+            limit: Page size
+            
+        Returns:
+            Dictionary with 'demands' rows and the 'next' cursor (None on the last page)
+        """
+        if not as_of_date:
+            as_of_date = timezone.now().date()
+        
+        demands = RevenueReports._open_receivables(organization, fiscal_year).filter(
+            RevenueReports._aging_bucket_filter(bucket, as_of_date)
+        )
+        if after:
+            after_date, after_id = after
+            demands = demands.filter(
+                Q(issue_date__gt=after_date) | Q(issue_date=after_date, id__gt=after_id)
+            )
+        
+        rows = list(
+            demands.order_by('issue_date', 'id').values(
+                'id', 'challan_no', 'issue_date', 'due_date', 'amount', 'outstanding_amount',
+                'payer__name', 'budget_head__nam_head__name', 'organization__name'
+            )[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return {
+            'bucket': bucket,
+            'demands': [
+                {
+                    'id': row['id'],
+                    'challan_no': row['challan_no'],
+                    'payer_name': row['payer__name'],
+                    'budget_head': row['budget_head__nam_head__name'],
+                    'organization': row['organization__name'],
+                    'issue_date': row['issue_date'],
+                    'due_date': row['due_date'],
+                    'amount': row['amount'],
+                    'outstanding': row['outstanding_amount'],
+                    'days_outstanding': (as_of_date - row['issue_date']).days,
+                }
+                for row in rows
+            ],
+            'next': (rows[-1]['issue_date'], rows[-1]['id']) if has_more else None,
+        }
+    
     @staticmethod
     def revenue_by_head_summary(
         organization: Organization,
@@ -137,7 +405,8 @@ class RevenueReports:
         Revenue summary by budget head.
         
         Shows total demanded, collected, and outstanding for each
-        revenue budget head.
+        revenue budget head. Collections are joined in as correlated
+        subqueries, so the report is a single grouped query.
         
         Args:
             organization: The organization to report on
@@ -160,6 +429,21 @@ class RevenueReports:
         if end_date:
             demand_filter &= Q(issue_date__lte=end_date)
         
+        # Collections of the head being grouped
+        collection_filter = Q(
+            demand__organization=organization,
+            demand__fiscal_year=fiscal_year,
+            demand__budget_head=OuterRef('budget_head'),
+            status=CollectionStatus.POSTED
+        )
+        
+        if start_date:
+            collection_filter &= Q(receipt_date__gte=start_date)
+        if end_date:
+            collection_filter &= Q(receipt_date__lte=end_date)
+        
+        collections = RevenueCollection.objects.filter(collection_filter)
+        
         # Aggregate by budget head
         summary = RevenueDemand.objects.filter(
             demand_filter
@@ -167,39 +451,17 @@ class RevenueReports:
             'budget_head',
             'budget_head__nam_head__code',
             'budget_head__nam_head__name',
-            'budget_head__sub_code'
+            'budget_head__sub_head__sub_code'
         ).annotate(
             total_demanded=Coalesce(Sum('amount'), Decimal('0')),
-            demand_count=Count('id')
+            demand_count=Count('id'),
+            total_collected=_subquery_sum(collections, 'amount_received', 'demand__budget_head'),
+            collection_count=_subquery_count(collections, 'demand__budget_head'),
         ).order_by('-total_demanded')
         
-        # Add collection data for each head
         result = []
         for item in summary:
-            budget_head_id = item['budget_head']
-            
-            # Get collections for this budget head
-            collection_filter = Q(
-                demand__organization=organization,
-                demand__fiscal_year=fiscal_year,
-                demand__budget_head_id=budget_head_id,
-                status=CollectionStatus.POSTED
-            )
-            
-            if start_date:
-                collection_filter &= Q(receipt_date__gte=start_date)
-            if end_date:
-                collection_filter &= Q(receipt_date__lte=end_date)
-            
-            collections = RevenueCollection.objects.filter(
-                collection_filter
-            ).aggregate(
-                total=Coalesce(Sum('amount_received'), Decimal('0')),
-                count=Count('id')
-            )
-            
-            total_collected = collections['total']
-            collection_count = collections['count']
+            total_collected = item['total_collected']
             outstanding = item['total_demanded'] - total_collected
             collection_rate = (
                 (total_collected / item['total_demanded'] * 100)
@@ -210,11 +472,11 @@ class RevenueReports:
             result.append({
                 'head_code': item['budget_head__nam_head__code'],
                 'head_name': item['budget_head__nam_head__name'],
-                'sub_code': item['budget_head__sub_code'],
+                'sub_code': item['budget_head__sub_head__sub_code'],
                 'total_demanded': item['total_demanded'],
                 'demand_count': item['demand_count'],
                 'total_collected': total_collected,
-                'collection_count': collection_count,
+                'collection_count': item['collection_count'],
                 'outstanding': outstanding,
                 'collection_rate': round(collection_rate, 2)
             })
@@ -225,78 +487,71 @@ class RevenueReports:
     def payer_wise_summary(
         organization: Organization,
         fiscal_year: Optional[FiscalYear] = None,
-        include_inactive: bool = False
-    ) -> List[Dict[str, Any]]:
+        include_inactive: bool = False,
+        sort: str = '-outstanding'
+    ) -> QuerySet:
         """
         Payer-wise revenue summary.
         
         Shows total demands, collections, and outstanding for each payer.
+        Without a fiscal year the stored payer balances are used; with one,
+        the totals are correlated subqueries. Either way the result is a
+        lazy queryset, so callers can paginate it in the database.
         
         Args:
             organization: The organization to report on
             fiscal_year: Optional fiscal year filter
             include_inactive: Include inactive payers
+            sort: One of PAYER_SUMMARY_SORTS, '-' prefixed for descending
             
         Returns:
-            List of dictionaries with payer summaries
+            Queryset of dictionaries with payer summaries
         """
         payer_filter = Q(organization=organization)
         if not include_inactive:
             payer_filter &= Q(is_active=True)
         
-        payers = Payer.objects.filter(payer_filter).select_related('organization')
-        
-        result = []
-        for payer in payers:
-            # Get demands
-            demand_filter = Q(payer=payer, status__in=[
-                DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID
-            ])
-            if fiscal_year:
-                demand_filter &= Q(fiscal_year=fiscal_year)
-            
-            demand_stats = RevenueDemand.objects.filter(demand_filter).aggregate(
-                total_demanded=Coalesce(Sum('amount'), Decimal('0')),
-                demand_count=Count('id')
-            )
-            
-            # Get collections
-            collection_filter = Q(
-                demand__payer=payer,
-                status=CollectionStatus.POSTED
-            )
-            if fiscal_year:
-                collection_filter &= Q(demand__fiscal_year=fiscal_year)
-            
-            collection_stats = RevenueCollection.objects.filter(
-                collection_filter
-            ).aggregate(
-                total_collected=Coalesce(Sum('amount_received'), Decimal('0')),
-                collection_count=Count('id')
-            )
-            
-            total_demanded = demand_stats['total_demanded']
-            total_collected = collection_stats['total_collected']
-            outstanding = total_demanded - total_collected
-            
-            # Only include payers with transactions
-            if total_demanded > 0:
-                result.append({
-                    'payer_id': payer.id,
-                    'payer_name': payer.name,
-                    'cnic_ntn': payer.cnic_ntn,
-                    'contact_no': payer.contact_no,
-                    'total_demanded': total_demanded,
-                    'demand_count': demand_stats['demand_count'],
-                    'total_collected': total_collected,
-                    'collection_count': collection_stats['collection_count'],
-                    'outstanding': outstanding,
-                    'is_active': payer.is_active
-                })
+        demands = RevenueDemand.objects.filter(
+            payer=OuterRef('pk'),
+            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+        )
+        collections = RevenueCollection.objects.filter(
+            demand__payer=OuterRef('pk'),
+            status=CollectionStatus.POSTED
+        )
         
-        # Sort by outstanding (highest first)
-        result.sort(key=lambda x: x['outstanding'], reverse=True)
-        return result
+        if fiscal_year:
+            demands = demands.filter(fiscal_year=fiscal_year)
+            collections = collections.filter(demand__fiscal_year=fiscal_year)
+            totals = {
+                'total_demanded': _subquery_sum(demands, 'amount', 'payer'),
+                'total_collected': _subquery_sum(collections, 'amount_received', 'demand__payer'),
+            }
+        else:
+            totals = {
+                'total_demanded': F('demanded_amount'),
+                'total_collected': F('collected_amount'),
+            }
+        
+        descending = sort.startswith('-')
+        order_field = PAYER_SUMMARY_SORTS.get(sort.lstrip('-'), 'outstanding')
+        
+        # Only include payers with transactions
+        return Payer.objects.filter(payer_filter).annotate(
+            **totals
+        ).filter(
+            total_demanded__gt=0
+        ).annotate(
+            outstanding=F('total_demanded') - F('total_collected'),
+            demand_count=_subquery_count(demands, 'payer'),
+            collection_count=_subquery_count(collections, 'demand__payer'),
+        ).order_by(
+            f"{'-' if descending else ''}{order_field}", 'id'
+        ).values(
+            'total_demanded', 'demand_count', 'total_collected', 'collection_count',
+            'outstanding', 'cnic_ntn', 'contact_no', 'is_active',
+            payer_id=F('id'), payer_name=F('name'),
+        )
     
     @staticmethod
     def collection_efficiency_report(
@@ -308,10 +563,14 @@ class RevenueReports:
         
         Calculates:
         - Overall collection rate
-        - Average days to collect
+        - Average, median and 90th percentile days to collect
+        - Days-to-collect histogram, overall and by month and head
         - On-time vs late collections
         - Monthly collection trends
         
+        Every figure is aggregated in the database; the number of
+        queries does not depend on the number of demands.
+        
         Args:
             organization: The organization to report on
             fiscal_year: Fiscal year to analyze
@@ -348,37 +607,36 @@ class RevenueReports:
             else Decimal('0')
         )
         
-        # Average days to collect
-        paid_demands = RevenueDemand.objects.filter(
-            organization=organization,
-            fiscal_year=fiscal_year,
-            status=DemandStatus.PAID
-        ).select_related('fiscal_year')
-        
-        days_to_collect = []
-        on_time_count = 0
-        late_count = 0
-        
-        for demand in paid_demands:
-            # Get first collection date
-            first_collection = demand.collections.filter(
-                status=CollectionStatus.POSTED
-            ).order_by('receipt_date').first()
-            
-            if first_collection:
-                days = (first_collection.receipt_date - demand.issue_date).days
-                days_to_collect.append(days)
-                
-                if first_collection.receipt_date <= demand.due_date:
-                    on_time_count += 1
-                else:
-                    late_count += 1
-        
-        avg_days_to_collect = (
-            sum(days_to_collect) / len(days_to_collect)
-            if days_to_collect else 0
+        # Days to collect: issue date to first posted receipt of paid demands
+        paid = _days_to_collect(organization, fiscal_year)
+        days = paid.aggregate(**_days_aggregates(paid))
+        by_month_head = list(
+            paid.annotate(
+                month=TruncMonth('issue_date')
+            ).values(
+                'month',
+                'budget_head',
+                'budget_head__nam_head__code',
+                'budget_head__nam_head__name'
+            ).annotate(
+                **_days_aggregates(paid)
+            ).order_by('month', 'budget_head__nam_head__code')
         )
         
+        if connections[paid.db].vendor == 'postgresql':
+            overall = _days_summary(days)
+            distribution = [dict(row, **_days_summary(row)) for row in by_month_head]
+        else:
+            overall = _days_summary(days, _window_percentiles(paid).get((), {}))
+            group_by = ('month', 'budget_head')
+            percentiles = _window_percentiles(
+                paid.annotate(month=TruncMonth('issue_date')), group_by
+            )
+            distribution = [
+                dict(row, **_days_summary(row, percentiles.get(tuple(row[f] for f in group_by), {})))
+                for row in by_month_head
+            ]
+        
         # Monthly trend
         monthly_trend = RevenueCollection.objects.filter(
             demand__organization=organization,
@@ -399,17 +657,50 @@ class RevenueReports:
             'collection_count': collections['collection_count'],
             'outstanding': outstanding,
             'collection_rate': round(collection_rate, 2),
-            'avg_days_to_collect': round(avg_days_to_collect, 1),
-            'on_time_collections': on_time_count,
-            'late_collections': late_count,
-            'on_time_rate': (
-                round((on_time_count / (on_time_count + late_count) * 100), 2)
-                if (on_time_count + late_count) > 0
-                else Decimal('0')
-            ),
+            'avg_days_to_collect': overall['avg_days'],
+            'median_days_to_collect': overall['median_days'],
+            'p90_days_to_collect': overall['p90_days'],
+            'on_time_collections': overall['on_time'],
+            'late_collections': overall['late'],
+            'on_time_rate': overall['on_time_rate'],
+            'days_histogram': overall['histogram'],
+            'days_by_month_head': distribution,
             'monthly_trend': list(monthly_trend)
         }
     
+    @staticmethod
+    def days_to_collect_by_tma(fiscal_year: FiscalYear) -> List[Dict[str, Any]]:
+        """
+        Provincial comparison of days to collect across TMAs.
+        
+        One grouped query (plus one ranking query on backends without
+        percentile_cont), however many TMAs or demands there are.
+        
+        Args:
+            fiscal_year: Fiscal year to analyze
+            
+        Returns:
+            List of per-TMA metrics, fastest collectors first
+        """
+        paid = _days_to_collect(None, fiscal_year)
+        rows = list(
+            paid.values(
+                'organization',
+                'organization__name'
+            ).annotate(
+                **_days_aggregates(paid)
+            ).order_by('avg_days', 'organization__name')
+        )
+        
+        if connections[paid.db].vendor == 'postgresql':
+            return [dict(row, **_days_summary(row)) for row in rows]
+        
+        percentiles = _window_percentiles(paid, ('organization',))
+        return [
+            dict(row, **_days_summary(row, percentiles.get((row['organization'],), {})))
+            for row in rows
+        ]
+    
     @staticmethod
     def overdue_demands_report(
         organization: Organization,
@@ -433,7 +724,8 @@ class RevenueReports:
         overdue_demands = RevenueDemand.objects.filter(
             organization=organization,
             status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL],
-            due_date__lt=as_of_date
+            due_date__lt=as_of_date,
+            outstanding_amount__gt=0
         ).select_related(
             'payer',
             'budget_head',
@@ -445,7 +737,7 @@ class RevenueReports:
         total_overdue_amount = Decimal('0')
         
         for demand in overdue_demands:
-            outstanding = demand.get_outstanding_balance()
+            outstanding = demand.outstanding_amount
             if outstanding > 0:
                 days_overdue = (as_of_date - demand.due_date).days
                 
@@ -459,7 +751,7 @@ class RevenueReports:
                     'due_date': demand.due_date,
                     'days_overdue': days_overdue,
                     'total_amount': demand.amount,
-                    'collected': demand.get_total_collected(),
+                    'collected': demand.collected_amount,
                     'outstanding': outstanding
                 })
                 total_overdue_amount += outstanding
@@ -0,0 +1,591 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Running balances of revenue demands and payers. Demand and
+             collection postings adjust the stored collected/outstanding
+             amounts with F() updates; rebuild() recomputes them from the
+             source rows for backfill and drift correction. Late payment
+             penalties of the open demand book are recomputed in one UPDATE,
+             and demand cycles are issued in batches with consolidated
+             accrual vouchers.
+-------------------------------------------------------------------------
+"""
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import (
+    Case, DateField, DecimalField, F, Func, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Least, Length, Round
+from django.db.models.lookups import LessThanOrEqual
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from apps.core.audit import AuditWriter
+from apps.core.models import Organization
+from apps.revenue.models import (
+    CollectionStatus, DemandStatus, Payer, RevenueCollection, RevenueDemand, RevenueDemandAudit
+)
+
+
+# Demand statuses counted in a payer's demanded total
+BILLED_STATUSES = [DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+
+# Demand statuses that accrue late payment penalty
+OPEN_STATUSES = [DemandStatus.POSTED, DemandStatus.PARTIAL]
+
+AMOUNT_FIELD = DecimalField(max_digits=15, decimal_places=2)
+
+logger = logging.getLogger('revenue')
+
+
+def _subquery_total(queryset, field: str, group_by: str) -> Coalesce:
+    """Sum of field over a correlated queryset, zero when it is empty."""
+    return Coalesce(
+        Subquery(
+            queryset.values(group_by).annotate(total=Sum(field)).values('total')[:1],
+            output_field=AMOUNT_FIELD,
+        ),
+        Value(Decimal('0.00'), output_field=AMOUNT_FIELD),
+    )
+
+
+class DaysBetween(Func):
+    """Whole days from the start date to the end date (end - start)."""
+
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(julianday(%(expressions)s) AS INTEGER)',
+            arg_joiner=') - julianday(',
+            **extra_context
+        )
+
+
+class RevenueBalanceService:
+    """Maintain the denormalized balances of RevenueDemand and Payer."""
+
+    @staticmethod
+    def record_demand(demand: RevenueDemand, sign: int = 1) -> None:
+        """Add a posted demand to its payer's balance; sign=-1 when it is cancelled."""
+        amount = demand.amount * sign
+        Payer.objects.filter(pk=demand.payer_id).update(
+            demanded_amount=F('demanded_amount') + amount,
+            outstanding_amount=F('outstanding_amount') + amount,
+        )
+
+    @staticmethod
+    def record_collection(collection: RevenueCollection, sign: int = 1) -> None:
+        """
+        Apply a posted collection to its demand and payer; sign=-1 when it is cancelled.
+
+        The in-memory demand is refreshed so status decisions that follow
+        in the same transaction see the new balance.
+        """
+        amount = collection.amount_received * sign
+        demand = collection.demand
+        RevenueDemand.objects.filter(pk=demand.pk).update(
+            collected_amount=F('collected_amount') + amount,
+            outstanding_amount=F('outstanding_amount') - amount,
+        )
+        Payer.objects.filter(pk=demand.payer_id).update(
+            collected_amount=F('collected_amount') + amount,
+            outstanding_amount=F('outstanding_amount') - amount,
+        )
+        demand.refresh_from_db(fields=list(RevenueDemand.BALANCE_FIELDS))
+
+    @staticmethod
+    def demand_amount_changed(demand: RevenueDemand) -> None:
+        """Recompute a demand's outstanding amount after its principal was edited."""
+        RevenueDemand.objects.filter(pk=demand.pk).update(
+            outstanding_amount=F('amount') - F('collected_amount')
+        )
+        demand.refresh_from_db(fields=list(RevenueDemand.BALANCE_FIELDS))
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(organization: Optional[Organization] = None) -> Dict[str, int]:
+        """
+        Recompute all stored balances from demands and posted collections.
+
+        Args:
+            organization: Limit the rebuild to one organization (default: all).
+
+        Returns:
+            Number of 'demands' and 'payers' updated.
+        """
+        total = _subquery_total
+        posted_collections = RevenueCollection.objects.filter(status=CollectionStatus.POSTED)
+
+        demands = RevenueDemand.objects.all()
+        payers = Payer.objects.all()
+        if organization is not None:
+            demands = demands.filter(organization=organization)
+            payers = payers.filter(organization=organization)
+
+        demand_collected = total(posted_collections.filter(demand=OuterRef('pk')), 'amount_received', 'demand')
+        demand_count = demands.update(
+            collected_amount=demand_collected,
+            outstanding_amount=F('amount') - demand_collected,
+        )
+
+        payer_demanded = total(
+            RevenueDemand.objects.filter(payer=OuterRef('pk'), status__in=BILLED_STATUSES),
+            'amount', 'payer'
+        )
+        payer_collected = total(
+            posted_collections.filter(demand__payer=OuterRef('pk')), 'amount_received', 'demand__payer'
+        )
+        payer_count = payers.update(
+            demanded_amount=payer_demanded,
+            collected_amount=payer_collected,
+            outstanding_amount=payer_demanded - payer_collected,
+        )
+
+        return {'demands': demand_count, 'payers': payer_count}
+
+
+class RevenuePenaltyService:
+    """Recompute stored late payment penalties of the open demand book."""
+
+    @staticmethod
+    def penalty_expression(as_of_date: date):
+        """
+        SQL form of RevenueDemand.calculate_penalty() as of a date.
+
+        Waived, disabled and zero-rate demands get no penalty; otherwise
+        (amount x rate x days past the grace period) / 100, rounded to
+        paisa and capped at max_penalty_percent of the amount.
+        """
+        zero = Value(Decimal('0.00'), output_field=AMOUNT_FIELD)
+
+        penalty_days = DaysBetween(
+            Value(as_of_date, output_field=DateField()), F('due_date')
+        ) - F('grace_period_days')
+        penalty = Round(
+            F('amount') * F('penalty_rate') * penalty_days / Value(Decimal('100')),
+            2, output_field=AMOUNT_FIELD
+        )
+        max_penalty = Round(
+            F('amount') * F('max_penalty_percent') / Value(Decimal('100')),
+            2, output_field=AMOUNT_FIELD
+        )
+
+        return Case(
+            When(penalty_waived=True, then=zero),
+            When(apply_penalty=False, then=zero),
+            When(penalty_rate__lte=0, then=zero),
+            When(LessThanOrEqual(penalty_days, 0), then=zero),
+            default=Least(penalty, max_penalty),
+            output_field=AMOUNT_FIELD,
+        )
+
+    @staticmethod
+    def recompute(organization: Optional[Organization] = None, as_of_date: Optional[date] = None) -> int:
+        """
+        Refresh penalty_amount of every POSTED/PARTIAL demand in one UPDATE.
+
+        Only rows whose penalty changed are written.
+
+        Args:
+            organization: Limit to one organization (default: all).
+            as_of_date: Date the penalty accrues to (default: today).
+
+        Returns:
+            Number of demands updated.
+        """
+        if not as_of_date:
+            as_of_date = timezone.now().date()
+
+        demands = RevenueDemand.objects.filter(status__in=OPEN_STATUSES)
+        if organization is not None:
+            demands = demands.filter(organization=organization)
+
+        penalty = RevenuePenaltyService.penalty_expression(as_of_date)
+        return demands.filter(~Q(penalty_amount=penalty)).update(
+            penalty_amount=penalty, updated_at=timezone.now()
+        )
+
+
+def lock_numbering(organization: Organization) -> None:
+    """
+    Serialize challan and voucher numbering of an organization.
+
+    Locks the organization row until the current transaction ends, so
+    concurrent demand entries and batches of one TMA take numbers one
+    after another. Call inside the transaction that uses the numbers.
+    """
+    list(Organization.objects.select_for_update().filter(pk=organization.pk).values_list('pk', flat=True))
+
+
+def next_challan_counter(organization: Organization, fiscal_year) -> int:
+    """
+    Next free challan counter of an organization's fiscal year.
+
+    Takes the numbering lock (see lock_numbering), so call inside the
+    transaction that creates the new challans. Challans are compared by
+    length first, so CH-...-10000 follows CH-...-9999.
+    """
+    lock_numbering(organization)
+    last_challan = RevenueDemand.objects.filter(
+        organization=organization,
+        fiscal_year=fiscal_year,
+        challan_no__startswith=f"CH-{fiscal_year.year_name}-"
+    ).order_by(Length('challan_no').desc(), '-challan_no').values_list('challan_no', flat=True).first()
+
+    # Parse CH-2025-26-0001 → get 0001 → increment
+    if last_challan:
+        try:
+            return int(last_challan.split('-')[-1]) + 1
+        except (ValueError, IndexError):
+            return 1
+    return 1
+
+
+def next_journal_voucher_numbers(organization: Organization, fiscal_year, count: int = 1) -> List[str]:
+    """
+    Numbers for the next `count` journal vouchers of an organization's fiscal year.
+
+    Takes the numbering lock (see lock_numbering), so call inside the
+    transaction that creates the vouchers.
+    """
+    from apps.finance.models import Voucher, VoucherType
+
+    lock_numbering(organization)
+    voucher_count = Voucher.objects.filter(
+        organization=organization,
+        fiscal_year=fiscal_year,
+        voucher_type=VoucherType.JOURNAL
+    ).count()
+    return [
+        f"JV-{fiscal_year.year_name}-{voucher_count + i:04d}"
+        for i in range(1, count + 1)
+    ]
+
+
+class DemandBatchService:
+    """
+    Issue a cycle of demands (rent, fees) in one transaction.
+
+    Demands are inserted with bulk_create and posted through one
+    consolidated accrual voucher per revenue head (or per batch)
+    instead of one voucher per demand:
+        Dr Accounts Receivable = total of the head
+        Cr Revenue Head        = total of the head
+    """
+
+    # Demand terms copied from a template demand
+    TEMPLATE_FIELDS = (
+        'budget_head', 'amount', 'apply_penalty', 'penalty_rate',
+        'grace_period_days', 'max_penalty_percent', 'period_description', 'description',
+    )
+
+    @staticmethod
+    def from_template(template: RevenueDemand, payers: Iterable[Payer], user, issue_date: date,
+                      due_date: date, **overrides) -> Dict[str, Any]:
+        """
+        Issue a copy of a template demand to each payer.
+
+        Args:
+            template: Demand whose head, amount and penalty terms are copied.
+            payers: Payers to bill.
+            user: The user issuing the demands.
+            issue_date: Issue date of the new demands.
+            due_date: Due date of the new demands.
+            overrides: Demand fields replacing the template's values.
+        """
+        terms = {name: getattr(template, name) for name in DemandBatchService.TEMPLATE_FIELDS}
+        terms.update(overrides)
+        budget_head = terms.pop('budget_head')
+        amount = terms.pop('amount')
+
+        lines = [
+            {'payer': payer, 'budget_head': budget_head, 'amount': amount}
+            for payer in payers
+        ]
+        return DemandBatchService.issue(
+            template.organization, template.fiscal_year, lines, user, issue_date, due_date, **terms
+        )
+
+    @staticmethod
+    def from_leases(leases: Iterable, budget_head, fiscal_year, user, issue_date: date,
+                    due_date: date, **terms) -> Dict[str, Any]:
+        """
+        Issue the monthly rent demand of each property lease to its tenant.
+
+        Args:
+            leases: PropertyLease rows of one organization.
+            budget_head: Rent revenue head.
+            fiscal_year: Fiscal year of the new demands.
+            user: The user issuing the demands.
+            issue_date: Issue date of the new demands.
+            due_date: Due date of the new demands.
+            terms: Other demand fields (period_description, penalty terms).
+        """
+        leases = [lease for lease in leases if lease.monthly_rent > 0]
+        if not leases:
+            return {'demands': [], 'vouchers': [], 'total': Decimal('0.00')}
+
+        lines = [
+            {
+                'payer_id': lease.tenant_id,
+                'budget_head': budget_head,
+                'amount': lease.monthly_rent,
+                'description': f"Lease {lease.lease_number}",
+            }
+            for lease in leases
+        ]
+        return DemandBatchService.issue(
+            leases[0].organization, fiscal_year, lines, user, issue_date, due_date, **terms
+        )
+
+    @staticmethod
+    def validate(fiscal_year, lines: List[Dict[str, Any]], issue_date: date, due_date: date) -> None:
+        """
+        Apply the RevenueDemand.clean() rules to a batch before it is inserted.
+
+        bulk_create does not call clean(); the dates are checked once, and
+        heads and payers once per distinct row, so the cost does not grow
+        with the number of lines.
+
+        Raises:
+            ValidationError: On the first rule a line breaks.
+        """
+        from apps.finance.models import AccountType, BudgetHead
+
+        if any(line['amount'] <= 0 for line in lines):
+            raise ValidationError({'amount': _('Every demand in a batch must have a positive amount.')})
+        if due_date < issue_date:
+            raise ValidationError({'due_date': _('Due date cannot be before issue date.')})
+        if not (fiscal_year.start_date <= issue_date <= fiscal_year.end_date):
+            raise ValidationError({
+                'issue_date': _('Issue date must be within fiscal year %(year)s.') % {'year': fiscal_year.year_name}
+            })
+
+        head_ids = {line['budget_head'].pk for line in lines}
+        invalid_heads = [
+            head.code for head in BudgetHead.objects.filter(pk__in=head_ids).select_related(
+                'nam_head', 'sub_head__nam_head'
+            )
+            if head.account_type != AccountType.REVENUE
+        ]
+        if invalid_heads:
+            raise ValidationError({
+                'budget_head': _('Budget head must be a Revenue account type: %(heads)s.') % {
+                    'heads': ', '.join(sorted(invalid_heads))
+                }
+            })
+
+        payer_ids = {line['payer'].pk if 'payer' in line else line['payer_id'] for line in lines}
+        inactive_payers = list(
+            Payer.objects.filter(pk__in=payer_ids, is_active=False).order_by('name').values_list('name', flat=True)
+        )
+        if inactive_payers:
+            raise ValidationError({
+                'payer': _('Cannot create demand for inactive payer: %(payers)s.') % {
+                    'payers': ', '.join(inactive_payers)
+                }
+            })
+
+    @staticmethod
+    @transaction.atomic
+    def issue(organization: Organization, fiscal_year, lines: List[Dict[str, Any]], user,
+              issue_date: date, due_date: date, per_head: bool = True, **terms) -> Dict[str, Any]:
+        """
+        Create and post a batch of demands.
+
+        Args:
+            organization: Organization issuing the demands.
+            fiscal_year: Fiscal year of the demands.
+            lines: One dict per demand with 'payer' or 'payer_id', 'budget_head'
+                and 'amount', and optionally 'description'.
+            user: The user issuing the demands.
+            issue_date: Issue date (also the voucher date).
+            due_date: Due date.
+            per_head: One voucher per revenue head (default) or one for the batch.
+            terms: Other demand fields applied to every line.
+
+        Returns:
+            Dict with the created 'demands', the posted 'vouchers' and the 'total'.
+
+        Raises:
+            ValidationError: If a line breaks a demand rule (see validate()),
+                or the AR head or an active fund is not configured.
+        """
+        from apps.finance.models import JournalEntry, Voucher, VoucherType
+
+        if not lines:
+            return {'demands': [], 'vouchers': [], 'total': Decimal('0.00')}
+        DemandBatchService.validate(fiscal_year, lines, issue_date, due_date)
+
+        ar_head, fund = RevenueDemand.get_accrual_accounts()
+
+        # Group the lines into vouchers
+        groups = defaultdict(list)
+        for line in lines:
+            groups[line['budget_head'].pk if per_head else None].append(line)
+
+        now = timezone.now()
+        voucher_numbers = next_journal_voucher_numbers(organization, fiscal_year, len(groups))
+        vouchers, entries = [], []
+        for voucher_no, group in zip(voucher_numbers, groups.values()):
+            heads = defaultdict(Decimal)
+            for line in group:
+                heads[line['budget_head']] += line['amount']
+            total = sum(heads.values(), Decimal('0.00'))
+
+            voucher = Voucher.objects.create(
+                organization=organization,
+                voucher_no=voucher_no,
+                fiscal_year=fiscal_year,
+                date=issue_date,
+                voucher_type=VoucherType.JOURNAL,
+                fund=fund,
+                created_by=user,
+                description=f"Revenue Accrual: batch of {len(group)} demands ({issue_date:%b %Y})"
+            )
+            vouchers.append(voucher)
+
+            # Debit: Accounts Receivable
+            entries.append(JournalEntry(
+                voucher=voucher, fiscal_year=fiscal_year, budget_head=ar_head,
+                description=f"AR - {len(group)} demands - {terms.get('period_description', '')}",
+                debit=total, credit=Decimal('0.00')
+            ))
+            # Credit: Revenue Heads
+            for budget_head, amount in heads.items():
+                entries.append(JournalEntry(
+                    voucher=voucher, fiscal_year=fiscal_year, budget_head=budget_head,
+                    description=f"Revenue - {budget_head.name}",
+                    debit=Decimal('0.00'), credit=amount
+                ))
+
+            for line in group:
+                line['voucher'] = voucher
+
+        JournalEntry.objects.bulk_create(entries)
+        for voucher in vouchers:
+            voucher.post_voucher(user)
+
+        counter = next_challan_counter(organization, fiscal_year)
+        demands = RevenueDemand.objects.bulk_create([
+            RevenueDemand(
+                organization=organization,
+                fiscal_year=fiscal_year,
+                payer_id=line['payer'].pk if 'payer' in line else line['payer_id'],
+                budget_head=line['budget_head'],
+                challan_no=f"CH-{fiscal_year.year_name}-{counter + i:04d}",
+                issue_date=issue_date,
+                due_date=due_date,
+                amount=line['amount'],
+                outstanding_amount=line['amount'],
+                status=DemandStatus.POSTED,
+                posted_at=now,
+                posted_by=user,
+                created_by=user,
+                accrual_voucher=line['voucher'],
+                **{'description': line.get('description', ''), **terms}
+            )
+            for i, line in enumerate(lines)
+        ], batch_size=500)
+        for demand in demands:
+            AuditWriter.add(RevenueDemandAudit(
+                demand=demand,
+                action=RevenueDemandAudit.AuditAction.POSTED,
+                new_status=demand.status,
+                changed_by=user,
+                remarks='Issued in batch',
+            ))
+
+        # Payer balances, one UPDATE for the whole batch
+        batch_demands = RevenueDemand.objects.filter(accrual_voucher__in=vouchers, payer=OuterRef('pk'))
+        issued = _subquery_total(batch_demands, 'amount', 'payer')
+        Payer.objects.filter(
+            pk__in={demand.payer_id for demand in demands}
+        ).update(
+            demanded_amount=F('demanded_amount') + issued,
+            outstanding_amount=F('outstanding_amount') + issued,
+        )
+
+        total = sum((demand.amount for demand in demands), Decimal('0.00'))
+        from apps.dashboard.services_facts import TmaFactService
+        TmaFactService.record(
+            organization.pk, fiscal_year.pk, issue_date,
+            revenue_demand=total, demands_posted=len(demands)
+        )
+
+        # What RevenueDemand.save() does per demand, once for the batch
+        from apps.dashboard.services_workspace import WorkspaceSnapshotService
+        WorkspaceSnapshotService.invalidate(organization.pk)
+        from apps.core.counters import CounterService
+        CounterService.demand_changed(
+            organization.pk, None, None, DemandStatus.POSTED, due_date, count=len(demands)
+        )
+
+        logger.info(
+            f"Demand batch issued: {len(demands)} demands | Amount: Rs {total} | "
+            f"Vouchers: {', '.join(v.voucher_no for v in vouchers)} | Issued by: {user.username}",
+            extra={
+                'demand_count': len(demands),
+                'amount': str(total),
+                'voucher_ids': [v.pk for v in vouchers],
+                'user_id': user.id,
+                'organization': organization.name
+            }
+        )
+
+        from apps.revenue.notifications import RevenueNotifications
+        RevenueNotifications.notify_demand_batch_issued(organization, len(demands), total, vouchers)
+
+        return {'demands': demands, 'vouchers': vouchers, 'total': total}
+
+    @staticmethod
+    def reverse_accrual(demand: RevenueDemand, user, reason: str):
+        """
+        Reverse one demand's share of a consolidated accrual voucher.
+
+        Posts a journal voucher that debits the revenue head and credits
+        Accounts Receivable for the demand amount.
+        """
+        from apps.finance.models import JournalEntry, Voucher, VoucherType
+
+        ar_head, fund = RevenueDemand.get_accrual_accounts()
+        voucher = Voucher.objects.create(
+            organization=demand.organization,
+            voucher_no=next_journal_voucher_numbers(demand.organization, demand.fiscal_year)[0],
+            fiscal_year=demand.fiscal_year,
+            date=timezone.now().date(),
+            voucher_type=VoucherType.JOURNAL,
+            fund=fund,
+            created_by=user,
+            description=(
+                f"Accrual Reversal: {demand.challan_no} "
+                f"({demand.accrual_voucher.voucher_no}) - {reason}"
+            )
+        )
+        JournalEntry.objects.bulk_create([
+            JournalEntry(
+                voucher=voucher, fiscal_year=demand.fiscal_year, budget_head=demand.budget_head,
+                description=f"Revenue reversal - {demand.challan_no}",
+                debit=demand.amount, credit=Decimal('0.00')
+            ),
+            JournalEntry(
+                voucher=voucher, fiscal_year=demand.fiscal_year, budget_head=ar_head,
+                description=f"AR reversal - {demand.payer.name}",
+                debit=Decimal('0.00'), credit=demand.amount
+            ),
+        ])
+        voucher.post_voucher(user, reason)
+        return voucher
@@ -0,0 +1,93 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for the SQL-bucketed receivables aging report
+-------------------------------------------------------------------------
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import DemandStatus, RevenueDemand
+from apps.revenue.reports import RevenueReports
+
+
+class ReceivablesAgingTest(TmaTestDataMixin, TestCase):
+    """Aging totals come from one aggregate; details are paged per bucket"""
+
+    AS_OF = date(2025, 6, 30)
+
+    tma_count = 2
+    demand_count = 15
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for i, demand in enumerate(RevenueDemand.objects.order_by('pk')):
+            RevenueDemand.objects.filter(pk=demand.pk).update(
+                issue_date=cls.AS_OF - timedelta(days=(i * 9) % 130)
+            )
+
+    def expected_buckets(self, organization=None):
+        buckets = {key: [Decimal('0.00'), 0] for key in ('current', '31_60', '61_90', 'over_90')}
+        demands = RevenueDemand.objects.filter(
+            status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL], outstanding_amount__gt=0
+        )
+        if organization:
+            demands = demands.filter(organization=organization)
+        for demand in demands:
+            days = (self.AS_OF - demand.issue_date).days
+            key = 'current' if days <= 30 else '31_60' if days <= 60 else '61_90' if days <= 90 else 'over_90'
+            buckets[key][0] += demand.outstanding_amount
+            buckets[key][1] += 1
+        return buckets
+
+    def test_bucket_totals_in_one_query(self):
+        org = self.orgs[0]
+        with self.assertNumQueries(1):
+            report = RevenueReports.outstanding_receivables_aging(org, as_of_date=self.AS_OF)
+
+        expected = self.expected_buckets(org)
+        for key, (total, count) in expected.items():
+            self.assertEqual(report['buckets'][key]['total'], total)
+            self.assertEqual(report['buckets'][key]['count'], count)
+        self.assertEqual(report['total_count'], sum(count for _, count in expected.values()))
+
+    def test_province_wide_aging_covers_all_tmas(self):
+        report = RevenueReports.outstanding_receivables_aging(None, as_of_date=self.AS_OF)
+        per_org = [
+            RevenueReports.outstanding_receivables_aging(org, as_of_date=self.AS_OF)
+            for org in self.orgs
+        ]
+        self.assertEqual(report['grand_total'], sum(r['grand_total'] for r in per_org))
+        self.assertEqual(report['total_count'], sum(r['total_count'] for r in per_org))
+
+    def test_bucket_details_keyset_pagination(self):
+        org = self.orgs[0]
+        report = RevenueReports.outstanding_receivables_aging(org, as_of_date=self.AS_OF)
+        bucket = max(report['buckets'].values(), key=lambda b: b['count'])
+
+        seen, after = [], None
+        while True:
+            page = RevenueReports.aging_bucket_demands(
+                org, bucket['key'], as_of_date=self.AS_OF, after=after, limit=2
+            )
+            seen.extend(row['id'] for row in page['demands'])
+            if not page['next']:
+                break
+            after = page['next']
+
+        self.assertEqual(len(seen), bucket['count'])
+        self.assertEqual(len(set(seen)), len(seen))
+        self.assertEqual(
+            sum(RevenueDemand.objects.get(pk=pk).outstanding_amount for pk in seen), bucket['total']
+        )
+
+    def test_unknown_bucket_rejected(self):
+        with self.assertRaises(ValueError):
+            RevenueReports.aging_bucket_demands(self.orgs[0], 'over_365')
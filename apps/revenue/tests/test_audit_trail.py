@@ -0,0 +1,65 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for the demand audit trail written on commit
+-------------------------------------------------------------------------
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import DemandStatus, Payer, RevenueDemand, RevenueDemandAudit
+from apps.revenue.services import DemandBatchService
+
+User = get_user_model()
+Action = RevenueDemandAudit.AuditAction
+
+
+class DemandAuditTrailTest(TmaTestDataMixin, TestCase):
+    """Tracked demand changes leave one audit row each, attributed to the actor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            cnic='88888-8888888-8', email='audit@example.com', password='pass', organization=cls.org
+        )
+
+    def test_batch_issue_and_cancel_are_audited(self):
+        template = RevenueDemand.objects.filter(organization=self.org).first()
+        payers = list(Payer.objects.filter(organization=self.org)[:3])
+        with self.captureOnCommitCallbacks(execute=True):
+            result = DemandBatchService.from_template(
+                template, payers, self.user,
+                issue_date=date(2025, 3, 1), due_date=date(2025, 3, 31)
+            )
+        audits = RevenueDemandAudit.objects.filter(demand__in=result['demands'])
+        self.assertEqual(audits.filter(action=Action.POSTED, changed_by=self.user).count(), len(payers))
+
+        demand = RevenueDemand.objects.get(pk=result['demands'][0].pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            demand.cancel(self.user, 'Issued in error')
+        cancelled = demand.audit_trail.get(action=Action.CANCELLED)
+        self.assertEqual(
+            (cancelled.old_status, cancelled.new_status, cancelled.remarks),
+            (DemandStatus.POSTED, DemandStatus.CANCELLED, 'Issued in error')
+        )
+        self.assertEqual(cancelled.changed_fields, {'status': DemandStatus.CANCELLED})
+
+    def test_untracked_and_rolled_back_changes_are_not_audited(self):
+        demand = RevenueDemand.objects.filter(organization=self.org).first()
+        demand.updated_by = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            demand.description = 'Narration only'
+            demand.save()
+            demand.due_date = demand.due_date + timedelta(days=7)
+            demand.save()
+        self.assertEqual(
+            list(demand.audit_trail.filter(action=Action.UPDATED).values_list('action', 'changed_fields')),
+            [(Action.UPDATED, {'due_date': str(demand.due_date)})]
+        )
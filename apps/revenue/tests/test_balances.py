@@ -0,0 +1,89 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for stored demand and payer balances
+-------------------------------------------------------------------------
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import (
+    CollectionStatus, DemandStatus, Payer, RevenueCollection, RevenueDemand
+)
+from apps.revenue.services import RevenueBalanceService
+
+
+class RevenueBalanceTest(TmaTestDataMixin, TestCase):
+    """Balances are adjusted in place and match a rebuild from source rows"""
+
+    demand_count = 20
+
+    def assertBalancesMatchSource(self):
+        for demand in RevenueDemand.objects.filter(organization=self.org):
+            collected = demand.collections.filter(status=CollectionStatus.POSTED).aggregate(
+                total=Sum('amount_received'))['total'] or Decimal('0.00')
+            self.assertEqual(demand.collected_amount, collected)
+            self.assertEqual(demand.outstanding_amount, demand.amount - collected)
+
+        for payer in Payer.objects.filter(organization=self.org):
+            demanded = payer.demands.filter(
+                status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+            ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+            collected = RevenueCollection.objects.filter(
+                demand__payer=payer, status=CollectionStatus.POSTED
+            ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+            self.assertEqual(payer.demanded_amount, demanded)
+            self.assertEqual(payer.collected_amount, collected)
+            self.assertEqual(payer.outstanding_amount, demanded - collected)
+
+    def test_posted_balances_match_source(self):
+        self.assertBalancesMatchSource()
+
+    def test_collection_posting_and_cancel_adjust_balances(self):
+        collection = RevenueCollection.objects.filter(
+            organization=self.org, status=CollectionStatus.POSTED
+        ).select_related('demand').first()
+        demand = collection.demand
+
+        RevenueCollection.objects.filter(pk=collection.pk).update(status=CollectionStatus.CANCELLED)
+        RevenueBalanceService.record_collection(collection, sign=-1)
+        self.assertEqual(demand.collected_amount, RevenueDemand.objects.get(pk=demand.pk).collected_amount)
+        self.assertBalancesMatchSource()
+
+        RevenueCollection.objects.filter(pk=collection.pk).update(status=CollectionStatus.POSTED)
+        RevenueBalanceService.record_collection(collection)
+        self.assertBalancesMatchSource()
+
+    def test_full_save_does_not_overwrite_balances(self):
+        demand = RevenueDemand.objects.filter(
+            organization=self.org, status=DemandStatus.PARTIAL
+        ).select_related('payer').first()
+        stale = RevenueDemand.objects.get(pk=demand.pk)
+        stale_payer = Payer.objects.get(pk=demand.payer_id)
+
+        RevenueDemand.objects.filter(pk=demand.pk).update(collected_amount=Decimal('1.00'))
+        Payer.objects.filter(pk=demand.payer_id).update(collected_amount=Decimal('1.00'))
+        stale.description = 'Edited'
+        stale.save()
+        stale_payer.address = 'Edited'
+        stale_payer.save()
+
+        self.assertEqual(RevenueDemand.objects.get(pk=demand.pk).collected_amount, Decimal('1.00'))
+        self.assertEqual(Payer.objects.get(pk=demand.payer_id).collected_amount, Decimal('1.00'))
+
+    def test_rebuild_command_corrects_drift(self):
+        RevenueDemand.objects.filter(organization=self.org).update(
+            collected_amount=Decimal('0.00'), outstanding_amount=Decimal('0.00')
+        )
+        Payer.objects.filter(organization=self.org).update(outstanding_amount=Decimal('0.00'))
+
+        call_command('rebuild_revenue_balances', org=self.org.pk, stdout=StringIO())
+        self.assertBalancesMatchSource()
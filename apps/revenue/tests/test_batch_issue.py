@@ -0,0 +1,189 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for batch demand issuance with consolidated
+             accrual vouchers
+-------------------------------------------------------------------------
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.counters import CounterService
+from apps.core.testing import TmaTestDataMixin
+from apps.dashboard.services_workspace import WorkspaceSnapshotService
+from apps.finance.models import Voucher
+from apps.property.models import PropertyLease
+from apps.revenue.models import DemandStatus, Payer, RevenueDemand
+from apps.revenue.services import DemandBatchService, next_challan_counter
+
+User = get_user_model()
+
+
+class DemandBatchIssueTest(TmaTestDataMixin, TestCase):
+    """A demand cycle is inserted in bulk and posted through one voucher per head"""
+
+    demand_count = 15
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            cnic='55555-5555555-5', email='batch@example.com', password='pass', organization=cls.org
+        )
+        cls.heads = cls.chart.revenue[:2]
+        cls.payers = list(Payer.objects.filter(organization=cls.org).order_by('pk'))
+        cls.template = RevenueDemand.objects.filter(organization=cls.org).first()
+
+    def issue(self, payers, per_head=True, heads=None, amount=Decimal('1500.00'),
+              issue_date=date(2025, 1, 1), due_date=date(2025, 1, 31)):
+        heads = heads or self.heads
+        lines = [
+            {'payer': payer, 'budget_head': heads[i % len(heads)], 'amount': amount}
+            for i, payer in enumerate(payers)
+        ]
+        return DemandBatchService.issue(
+            self.org, self.fiscal_year, lines, self.user,
+            issue_date=issue_date, due_date=due_date,
+            per_head=per_head, period_description='Jan 2025 Rent'
+        )
+
+    def test_one_balanced_voucher_per_head(self):
+        result = self.issue(self.payers)
+
+        self.assertEqual(len(result['vouchers']), 2)
+        self.assertEqual(len(result['demands']), len(self.payers))
+        self.assertEqual(result['total'], Decimal('1500.00') * len(self.payers))
+        for voucher in result['vouchers']:
+            self.assertTrue(voucher.is_posted)
+            self.assertTrue(voucher.is_balanced())
+            self.assertEqual(
+                voucher.get_total_debit(),
+                voucher.revenue_demands.aggregate(total=Sum('amount'))['total']
+            )
+
+        demands = RevenueDemand.objects.filter(accrual_voucher__in=result['vouchers'])
+        self.assertEqual(demands.filter(status=DemandStatus.POSTED).count(), len(self.payers))
+        self.assertEqual(demands.values('challan_no').distinct().count(), len(self.payers))
+        self.assertFalse(demands.exclude(outstanding_amount=Decimal('1500.00')).exists())
+
+        single = self.issue(self.payers[:3], per_head=False)
+        self.assertEqual(len(single['vouchers']), 1)
+        self.assertEqual(single['vouchers'][0].entries.count(), 3)
+
+    def test_queries_do_not_grow_with_batch_size(self):
+        self.issue(self.payers[:2])
+        with CaptureQueriesContext(connection) as small:
+            self.issue(self.payers[:4])
+        with CaptureQueriesContext(connection) as large:
+            self.issue(self.payers)
+        self.assertEqual(len(small), len(large))
+
+    def test_lines_follow_the_demand_rules(self):
+        inactive = self.payers[-1]
+        Payer.objects.filter(pk=inactive.pk).update(is_active=False)
+        invalid = {
+            'payer': {'payers': self.payers},
+            'budget_head': {'payers': self.payers[:2], 'heads': [self.heads[0], self.chart.expenditure[0]]},
+            'amount': {'payers': self.payers[:2], 'amount': Decimal('0.00')},
+            'due_date': {'payers': self.payers[:2], 'due_date': date(2024, 12, 31)},
+            'issue_date': {'payers': self.payers[:2], 'issue_date': date(2025, 7, 1),
+                           'due_date': date(2025, 7, 31)},
+        }
+        demands = RevenueDemand.objects.count()
+        for field, kwargs in invalid.items():
+            with self.subTest(field=field), self.assertRaises(ValidationError) as raised:
+                self.issue(**kwargs)
+            self.assertIn(field, raised.exception.message_dict)
+            if field == 'payer':
+                self.assertIn(inactive.name, raised.exception.message_dict['payer'][0])
+        self.assertEqual(RevenueDemand.objects.count(), demands)
+
+    def test_snapshot_and_overdue_counter_follow_the_batch(self):
+        overdue_key = CounterService.overdue_demands_key(self.org.pk)
+        snapshot_key = WorkspaceSnapshotService.cache_key(self.org.pk)
+        cache.set(overdue_key, 5)
+        cache.set(snapshot_key, {'cached': True})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.issue(self.payers[:4])
+
+        # The due date has passed: every new demand is overdue
+        self.assertEqual(cache.get(overdue_key), 9)
+        self.assertIsNone(cache.get(snapshot_key))
+
+    def test_challan_counter_is_numeric(self):
+        result = self.issue(self.payers[:2])
+        prefix = f"CH-{self.fiscal_year.year_name}-"
+        first, second = result['demands']
+        RevenueDemand.objects.filter(pk=first.pk).update(challan_no=f"{prefix}9999")
+        RevenueDemand.objects.filter(pk=second.pk).update(challan_no=f"{prefix}10000")
+
+        with transaction.atomic():
+            self.assertEqual(next_challan_counter(self.org, self.fiscal_year), 10001)
+        challans = [demand.challan_no for demand in self.issue(self.payers[:2])['demands']]
+        self.assertEqual(challans, [f"{prefix}10001", f"{prefix}10002"])
+
+    def test_posted_demand_continues_the_journal_voucher_series(self):
+        vouchers = self.issue(self.payers[:2])['vouchers']
+        demand = RevenueDemand.objects.create(
+            organization=self.org, fiscal_year=self.fiscal_year, payer=self.payers[0],
+            budget_head=self.heads[0], challan_no='CH-MANUAL-1', issue_date=date(2025, 1, 1),
+            due_date=date(2025, 1, 31), amount=Decimal('500.00'), created_by=self.user,
+        )
+        demand.post(self.user)
+
+        numbers = sorted(
+            Voucher.objects.filter(organization=self.org, voucher_no__startswith='JV-')
+            .values_list('voucher_no', flat=True)
+        )
+        self.assertEqual(len(numbers), len(set(numbers)))
+        self.assertNotIn(demand.accrual_voucher.voucher_no, [v.voucher_no for v in vouchers])
+
+    def test_payer_balances_and_lease_source(self):
+        payer = self.payers[0]
+        before = Payer.objects.get(pk=payer.pk)
+        leases = [
+            PropertyLease(organization=self.org, tenant=payer, lease_number='LEASE-T-1',
+                          monthly_rent=Decimal('2500.00')),
+            PropertyLease(organization=self.org, tenant=payer, lease_number='LEASE-T-2',
+                          monthly_rent=Decimal('0.00')),
+        ]
+        result = DemandBatchService.from_leases(
+            leases, self.heads[0], self.fiscal_year, self.user,
+            issue_date=date(2025, 2, 1), due_date=date(2025, 2, 28)
+        )
+
+        self.assertEqual(len(result['demands']), 1)
+        self.assertEqual(result['demands'][0].description, 'Lease LEASE-T-1')
+        after = Payer.objects.get(pk=payer.pk)
+        self.assertEqual(after.demanded_amount, before.demanded_amount + Decimal('2500.00'))
+        self.assertEqual(after.outstanding_amount, before.outstanding_amount + Decimal('2500.00'))
+
+    def test_cancel_reverses_only_its_share(self):
+        result = DemandBatchService.from_template(
+            self.template, self.payers[:3], self.user,
+            issue_date=date(2025, 3, 1), due_date=date(2025, 3, 31)
+        )
+        voucher = result['vouchers'][0]
+        demand = RevenueDemand.objects.get(pk=result['demands'][0].pk)
+        self.assertEqual(demand.amount, self.template.amount)
+
+        demand.cancel(self.user, 'Issued in error')
+
+        voucher.refresh_from_db()
+        self.assertTrue(voucher.is_posted)
+        reversal = Voucher.objects.get(organization=self.org, description__startswith='Accrual Reversal')
+        self.assertIn(demand.challan_no, reversal.description)
+        self.assertEqual(reversal.get_total_debit(), demand.amount)
+        self.assertEqual(RevenueDemand.objects.get(pk=demand.pk).status, DemandStatus.CANCELLED)
@@ -0,0 +1,140 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for the SQL days-to-collect statistics
+-------------------------------------------------------------------------
+"""
+import random
+import statistics
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.core.models import Organization
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import CollectionStatus, DemandStatus, RevenueCollection, RevenueDemand
+from apps.revenue.reports import DAYS_TO_COLLECT_BUCKETS, RevenueReports
+
+User = get_user_model()
+
+
+def percentile(values, fraction):
+    """Reference percentile_cont: linear interpolation between ranks."""
+    values = sorted(values)
+    rank = (len(values) - 1) * fraction
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (rank - lower) * (values[upper] - values[lower])
+
+
+class DaysToCollectTest(TmaTestDataMixin, TestCase):
+    """Efficiency statistics match a Python pass over the paid demands"""
+
+    tma_count = 2
+    demand_count = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.spread_receipts(random.Random(2025))
+
+    @classmethod
+    def spread_receipts(cls, rng):
+        """Mark demands with a posted collection paid and scatter the receipt dates."""
+        for collection in RevenueCollection.objects.select_related('demand'):
+            demand = collection.demand
+            RevenueCollection.objects.filter(pk=collection.pk).update(
+                status=CollectionStatus.POSTED,
+                receipt_date=demand.issue_date + timedelta(days=rng.randint(0, 150)),
+            )
+            RevenueDemand.objects.filter(pk=demand.pk).update(status=DemandStatus.PAID)
+
+    def expected(self, organization):
+        """The original per-demand Python computation."""
+        days, on_time = [], 0
+        demands = RevenueDemand.objects.filter(
+            fiscal_year=self.fiscal_year, status=DemandStatus.PAID
+        )
+        if organization is not None:
+            demands = demands.filter(organization=organization)
+        for demand in demands:
+            first = demand.collections.filter(
+                status=CollectionStatus.POSTED
+            ).order_by('receipt_date').first()
+            if first:
+                days.append((first.receipt_date - demand.issue_date).days)
+                on_time += first.receipt_date <= demand.due_date
+        return days, on_time
+
+    def test_matches_python_computation(self):
+        days, on_time = self.expected(self.org)
+        self.assertTrue(days)
+
+        report = RevenueReports.collection_efficiency_report(self.org, self.fiscal_year)
+
+        self.assertEqual(report['avg_days_to_collect'], round(sum(days) / len(days), 1))
+        self.assertEqual(report['median_days_to_collect'], round(statistics.median(days), 1))
+        self.assertEqual(report['p90_days_to_collect'], round(percentile(days, 0.9), 1))
+        self.assertEqual(report['on_time_collections'], on_time)
+        self.assertEqual(report['late_collections'], len(days) - on_time)
+
+        histogram = {item['key']: item['count'] for item in report['days_histogram']}
+        for key, label, min_days, max_days in DAYS_TO_COLLECT_BUCKETS:
+            self.assertEqual(histogram[key], sum(
+                1 for d in days
+                if (min_days is None or d >= min_days) and (max_days is None or d <= max_days)
+            ))
+
+        distribution = report['days_by_month_head']
+        self.assertEqual(sum(row['count'] for row in distribution), len(days))
+        for row in distribution:
+            self.assertLessEqual(row['median_days'], row['p90_days'])
+
+    def test_query_count_is_independent_of_volume(self):
+        paid = RevenueDemand.objects.filter(organization=self.org, status=DemandStatus.PAID)
+        RevenueDemand.objects.filter(pk__in=list(paid.values_list('pk', flat=True)[2:])).update(
+            status=DemandStatus.POSTED
+        )
+        with CaptureQueriesContext(connection) as small:
+            RevenueReports.collection_efficiency_report(self.org, self.fiscal_year)
+
+        self.spread_receipts(random.Random(7))
+        with CaptureQueriesContext(connection) as large:
+            RevenueReports.collection_efficiency_report(self.org, self.fiscal_year)
+        self.assertEqual(len(small), len(large))
+
+    def test_provincial_comparison_across_tmas(self):
+        # percentile_cont is in the grouped query on PostgreSQL; elsewhere a ranking query follows
+        with self.assertNumQueries(1 if connection.vendor == 'postgresql' else 2):
+            rows = RevenueReports.days_to_collect_by_tma(self.fiscal_year)
+
+        self.assertEqual({row['organization'] for row in rows}, {org.pk for org in self.orgs})
+        for row in rows:
+            days, on_time = self.expected(Organization.objects.get(pk=row['organization']))
+            self.assertEqual(row['count'], len(days))
+            self.assertEqual(row['on_time'], on_time)
+            self.assertEqual(row['median_days'], round(statistics.median(days), 1))
+        averages = [row['avg_days'] for row in rows]
+        self.assertEqual(averages, sorted(averages))
+
+    def test_provincial_view_is_for_oversight_users(self):
+        url = reverse('revenue:report_days_to_collect')
+        tma_user = User.objects.create_user(
+            cnic='77777-7777777-1', email='tma@example.com', password='pass', organization=self.org
+        )
+        self.client.force_login(tma_user)
+        self.assertNotIn('rows', self.client.get(url).context)
+
+        lcb_user = User.objects.create_superuser(
+            cnic='77777-7777777-2', email='lcb@example.com', password='pass'
+        )
+        self.client.force_login(lcb_user)
+        response = self.client.get(url, {'fiscal_year': self.fiscal_year.pk})
+        self.assertEqual(len(response.context['rows']), len(self.orgs))
@@ -0,0 +1,82 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for streamed demand and collection exports
+-------------------------------------------------------------------------
+"""
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import RevenueCollection, RevenueDemand
+
+User = get_user_model()
+
+
+class StreamingExportTest(TmaTestDataMixin, TestCase):
+    """Exports stream rows instead of building the file in memory"""
+
+    demand_count = 25
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            cnic='66666-6666666-6', email='export@example.com', password='pass', organization=cls.org
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def read_csv(self, response):
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_demand_csv_streams_stored_balances(self):
+        response = self.client.get(reverse('revenue:demand_export'))
+        rows = self.read_csv(response)
+
+        demands = RevenueDemand.objects.filter(organization=self.org)
+        self.assertEqual(rows[0][0], 'Challan No')
+        self.assertEqual(len(rows) - 1, demands.count())
+
+        by_challan = {row[0]: row for row in rows[1:]}
+        for demand in demands:
+            row = by_challan[demand.challan_no]
+            self.assertEqual(float(row[9]), float(demand.collected_amount))
+            self.assertEqual(float(row[10]), float(demand.outstanding_amount))
+            self.assertEqual(row[11], demand.get_status_display())
+
+    def test_collection_csv_streams_all_rows(self):
+        response = self.client.get(reverse('revenue:collection_export'))
+        rows = self.read_csv(response)
+
+        self.assertEqual(rows[0][0], 'Receipt No')
+        self.assertEqual(
+            len(rows) - 1, RevenueCollection.objects.filter(organization=self.org).count()
+        )
+
+    def test_excel_exports_use_write_only_workbooks(self):
+        from openpyxl import load_workbook
+
+        for name, model in (('demand_export', RevenueDemand), ('collection_export', RevenueCollection)):
+            response = self.client.get(reverse(f'revenue:{name}'), {'format': 'excel'})
+            self.assertEqual(
+                response['Content-Type'],
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+            workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+            sheet = workbook.active
+            self.assertEqual(
+                sum(1 for _ in sheet.iter_rows()) - 1,
+                model.objects.filter(organization=self.org).count()
+            )
+            self.assertTrue(next(sheet.iter_rows(max_row=1))[0].font.bold)
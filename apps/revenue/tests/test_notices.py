@@ -0,0 +1,171 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for demand notice printing and notice batches
+-------------------------------------------------------------------------
+"""
+import importlib.util
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import skipIf, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.models import Organization
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import (
+    DemandNoticeBatch, DemandStatus, NoticeBatchStatus, NoticeFormat, RevenueDemand
+)
+from apps.revenue.notices import DemandNoticeService
+
+User = get_user_model()
+HAS_WEASYPRINT = importlib.util.find_spec('weasyprint') is not None
+
+
+class NoticeTestMixin(TmaTestDataMixin):
+    """A TMA with posted, partially paid and paid demands."""
+
+    demand_count = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user(
+            cnic='77777-7777777-7', email='notices@example.com', password='pass', organization=cls.org
+        )
+
+    def setUp(self):
+        self.demands = RevenueDemand.objects.filter(organization=self.org).exclude(status=DemandStatus.CANCELLED)
+
+
+class NoticeRenderingTests(NoticeTestMixin, TestCase):
+    """Notice data is read in one query and rendered from plain values."""
+
+    def test_notice_context_and_html(self):
+        with self.assertNumQueries(1):
+            notices = [
+                DemandNoticeService.notice_context(demand, date(2025, 6, 30))
+                for demand in DemandNoticeService.notice_queryset().filter(pk__in=self.demands)
+            ]
+        self.assertEqual(len(notices), self.demands.count())
+
+        demand = self.demands.first()
+        notice = next(n for n in notices if n['challan_no'] == demand.challan_no)
+        self.assertEqual(notice['outstanding_amount'], demand.outstanding_amount)
+        self.assertEqual(notice['total_due'], demand.outstanding_amount + notice['penalty'])
+
+        html = DemandNoticeService.render_html(demand)
+        self.assertIn(demand.challan_no, html)
+        self.assertIn('page-break-after', html)
+
+    def test_single_notice_view(self):
+        self.client.force_login(self.user)
+        demand = self.demands.first()
+        response = self.client.get(reverse('revenue:demand_notice', args=[demand.pk]))
+        self.assertEqual(response.status_code, 200)
+        if response['Content-Type'] == 'application/pdf':
+            self.assertTrue(response.content.startswith(b'%PDF'))
+        else:
+            self.assertContains(response, demand.challan_no)
+
+
+class NoticeBatchTests(NoticeTestMixin, TestCase):
+    """Batches are queued, claimed once and rendered in the background."""
+
+    def test_queue_and_claim(self):
+        batch = DemandNoticeService.queue(self.org, self.demands, NoticeFormat.ZIP, self.user)
+        self.assertEqual(batch.status, NoticeBatchStatus.PENDING)
+        self.assertEqual(batch.total_count, self.demands.count())
+        self.assertEqual(set(batch.demands.values_list('pk', flat=True)), set(self.demands.values_list('pk', flat=True)))
+
+        claimed = DemandNoticeService.claim()
+        self.assertEqual((claimed.pk, claimed.status), (batch.pk, NoticeBatchStatus.RUNNING))
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(DemandNoticeService.claim())
+        self.assertIsNone(DemandNoticeService.claim(batch.pk))
+
+    @override_settings(NOTICE_BATCH_STALE_SECONDS=600)
+    def test_stale_running_batch_is_claimed_again(self):
+        batch = DemandNoticeService.queue(self.org, self.demands, NoticeFormat.ZIP, self.user)
+        claimed = DemandNoticeService.claim()
+        DemandNoticeBatch.objects.filter(pk=batch.pk).update(rendered_count=5)
+        self.assertIsNone(DemandNoticeService.claim())
+
+        # The rendering process died: no progress for longer than the timeout
+        DemandNoticeBatch.objects.filter(pk=batch.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=601)
+        )
+        reclaimed = DemandNoticeService.claim(batch.pk)
+        self.assertEqual((reclaimed.pk, reclaimed.status), (batch.pk, NoticeBatchStatus.RUNNING))
+        self.assertEqual(reclaimed.rendered_count, 0)
+        self.assertGreaterEqual(reclaimed.started_at, claimed.started_at)
+        self.assertIsNone(DemandNoticeService.claim())
+
+    @skipIf(HAS_WEASYPRINT, 'WeasyPrint is installed')
+    def test_missing_renderer_fails_batch(self):
+        batch = DemandNoticeService.queue(self.org, self.demands, NoticeFormat.PDF, self.user)
+        out = StringIO()
+        call_command('render_demand_notices', workers=0, stdout=out, stderr=StringIO())
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, NoticeBatchStatus.FAILED)
+        self.assertIn('WeasyPrint', batch.error_message)
+        self.assertIn('1 failed', out.getvalue())
+
+    @skipUnless(HAS_WEASYPRINT, 'WeasyPrint is not installed')
+    def test_render_zip_and_merged_pdf(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            batch = DemandNoticeService.queue(self.org, self.demands, NoticeFormat.ZIP, self.user)
+            batch = DemandNoticeService.render_batch(DemandNoticeService.claim(), workers=0, chunk_size=5)
+            self.assertEqual(batch.status, NoticeBatchStatus.COMPLETED, batch.error_message)
+            self.assertEqual(batch.rendered_count, batch.total_count)
+            with zipfile.ZipFile(batch.file.open('rb')) as archive:
+                self.assertEqual(
+                    sorted(archive.namelist()),
+                    sorted(f'{challan_no}.pdf' for challan_no in self.demands.values_list('challan_no', flat=True))
+                )
+
+            batch = DemandNoticeService.queue(self.org, self.demands, NoticeFormat.PDF, self.user)
+            batch = DemandNoticeService.render_batch(DemandNoticeService.claim(), workers=0)
+            self.assertTrue(batch.file.name.endswith('.pdf'))
+            self.assertTrue(batch.file.open('rb').read(4) == b'%PDF')
+
+
+class NoticeBatchViewTests(NoticeTestMixin, TestCase):
+    """Batches are queued from the demand filters and scoped to the TMA."""
+
+    def test_queue_progress_and_scope(self):
+        self.client.force_login(self.user)
+        url = reverse('revenue:notice_batch_create')
+        outstanding = self.demands.filter(status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL])
+
+        response = self.client.get(url)
+        self.assertEqual(response.context['demand_count'], outstanding.count())
+
+        response = self.client.post(url, {'output_format': NoticeFormat.ZIP, 'status': '', 'search': ''})
+        batch = DemandNoticeBatch.objects.get()
+        self.assertRedirects(response, reverse('revenue:notice_batch_detail', args=[batch.pk]))
+        self.assertEqual(batch.total_count, outstanding.count())
+        self.assertEqual(batch.created_by, self.user)
+
+        response = self.client.get(reverse('revenue:notice_batch_detail', args=[batch.pk]))
+        self.assertContains(response, 'http-equiv="refresh"')
+        self.assertEqual(
+            self.client.get(reverse('revenue:notice_batch_download', args=[batch.pk])).status_code, 404
+        )
+
+        other = Organization.objects.create(name='Other TMA', ddo_code='OTHER-1')
+        self.client.force_login(User.objects.create_user(
+            cnic='77777-7777777-8', email='other@example.com', password='pass', organization=other
+        ))
+        self.assertEqual(
+            self.client.get(reverse('revenue:notice_batch_detail', args=[batch.pk])).status_code, 404
+        )
@@ -0,0 +1,101 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for bulk overdue reminders and notification digests
+-------------------------------------------------------------------------
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.core.models import Notification, Organization
+from apps.core.services import NotificationService
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import DemandStatus, RevenueDemand
+from apps.revenue.notifications import RevenueNotifications
+from apps.users.models import Role, RoleCode
+
+User = get_user_model()
+
+
+class OverdueReminderTest(TmaTestDataMixin, TestCase):
+    """Overdue reminders are fanned out with a fixed number of queries"""
+
+    demand_count = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        role = Role.objects.create(name='Finance Officer', code=RoleCode.FINANCE_OFFICER)
+        cls.officers = []
+        for i in range(3):
+            officer = User.objects.create_user(
+                cnic=f'44444-444444{i}-4', email=f'fo{i}@example.com', password='pass',
+                organization=cls.org,
+            )
+            officer.roles.add(role)
+            cls.officers.append(officer)
+
+        today = timezone.now().date()
+        demands = RevenueDemand.objects.filter(organization=cls.org)
+        demands.update(due_date=today + timedelta(days=30))
+        cls.overdue_ids = list(demands.order_by('pk').values_list('pk', flat=True)[:8])
+        RevenueDemand.objects.filter(pk__in=cls.overdue_ids[:4]).update(
+            status=DemandStatus.POSTED, due_date=today - timedelta(days=7)
+        )
+        RevenueDemand.objects.filter(pk__in=cls.overdue_ids[4:]).update(
+            status=DemandStatus.POSTED, due_date=today - timedelta(days=15)
+        )
+
+    def _outstanding_count(self):
+        return sum(
+            1 for demand in RevenueDemand.objects.filter(pk__in=self.overdue_ids)
+            if demand.get_outstanding_balance() > 0
+        )
+
+    @override_settings(NOTIFICATION_DIGEST_THRESHOLD=50)
+    def test_individual_reminders_use_bulk_insert(self):
+        expected = self._outstanding_count()
+        with self.assertNumQueries(5):
+            sent = RevenueNotifications.notify_overdue_demands(self.org)
+
+        self.assertEqual(sent, expected * len(self.officers))
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.officers[0], title='Overdue Payment Alert').count(),
+            expected
+        )
+
+    @override_settings(NOTIFICATION_DIGEST_THRESHOLD=2)
+    def test_many_reminders_collapse_into_digest(self):
+        expected = self._outstanding_count()
+        sent = RevenueNotifications.notify_overdue_demands(self.org)
+
+        self.assertEqual(sent, len(self.officers))
+        notification = Notification.objects.get(recipient=self.officers[0])
+        self.assertIn(f'{expected} demands became overdue', notification.message)
+
+
+class FanOutTest(TestCase):
+    """NotificationService.fan_out resolves recipients once and de-duplicates"""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Fan-out TMA')
+        for i in range(3):
+            User.objects.create_user(
+                cnic=f'33333-333333{i}-3', email=f'user{i}@example.com', password='pass',
+                organization=self.org,
+            )
+
+    def test_queryset_recipients_and_duplicate_payloads(self):
+        payload = {'title': 'Budget released', 'message': 'Q1 release posted'}
+        with self.assertNumQueries(4):
+            created = NotificationService.fan_out(
+                User.objects.filter(organization=self.org), [payload, dict(payload)]
+            )
+        self.assertEqual(len(created), 3)
+        self.assertEqual(Notification.objects.filter(title='Budget released').count(), 3)
@@ -0,0 +1,92 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for the set-based nightly penalty recomputation
+-------------------------------------------------------------------------
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import DemandStatus, RevenueDemand
+from apps.revenue.services import OPEN_STATUSES, RevenuePenaltyService
+
+
+class PenaltyRecomputeTest(TmaTestDataMixin, TestCase):
+    """The SQL penalty matches RevenueDemand.calculate_penalty() exactly"""
+
+    AS_OF = date(2025, 6, 30)
+
+    demand_count = 40
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        RevenueDemand.objects.filter(organization=cls.org).update(status=DemandStatus.POSTED)
+
+    def randomize(self, rng):
+        for pk in RevenueDemand.objects.filter(organization=self.org).values_list('pk', flat=True):
+            RevenueDemand.objects.filter(pk=pk).update(
+                amount=Decimal(rng.randint(1, 5_000_000)) / 100,
+                apply_penalty=rng.random() > 0.1,
+                penalty_waived=rng.random() < 0.1,
+                penalty_rate=Decimal(rng.randint(0, 500)) / 100,
+                grace_period_days=rng.choice([0, 0, 7, 15, 30, 365]),
+                max_penalty_percent=Decimal(rng.randint(0, 50000)) / 100,
+                due_date=self.AS_OF - timedelta(days=rng.randint(-30, 400)),
+                penalty_amount=Decimal('0.00'),
+            )
+
+    def test_matches_python_formula_on_random_demands(self):
+        rng = random.Random(20250630)
+        for _ in range(5):
+            self.randomize(rng)
+            RevenuePenaltyService.recompute(self.org, as_of_date=self.AS_OF)
+
+            for demand in RevenueDemand.objects.filter(organization=self.org):
+                self.assertEqual(
+                    demand.penalty_amount, demand.calculate_penalty(self.AS_OF),
+                    f"amount={demand.amount} rate={demand.penalty_rate} due={demand.due_date} "
+                    f"grace={demand.grace_period_days} cap={demand.max_penalty_percent}"
+                )
+
+    def test_half_paisa_rounds_up_and_cap_applies(self):
+        demand = RevenueDemand.objects.filter(organization=self.org).first()
+        RevenueDemand.objects.filter(pk=demand.pk).update(
+            amount=Decimal('1.00'), apply_penalty=True, penalty_waived=False,
+            penalty_rate=Decimal('0.50'), grace_period_days=0, max_penalty_percent=Decimal('100.00'),
+            due_date=self.AS_OF - timedelta(days=1),
+        )
+        RevenuePenaltyService.recompute(self.org, as_of_date=self.AS_OF)
+        demand.refresh_from_db()
+        self.assertEqual(demand.penalty_amount, Decimal('0.01'))
+
+        RevenueDemand.objects.filter(pk=demand.pk).update(
+            amount=Decimal('1000.00'), max_penalty_percent=Decimal('10.00'),
+            due_date=self.AS_OF - timedelta(days=90),
+        )
+        RevenuePenaltyService.recompute(self.org, as_of_date=self.AS_OF)
+        demand.refresh_from_db()
+        self.assertEqual(demand.penalty_amount, Decimal('100.00'))
+
+    def test_command_only_touches_changed_open_demands(self):
+        self.randomize(random.Random(7))
+        RevenueDemand.objects.filter(organization=self.org).exclude(
+            pk__in=RevenueDemand.objects.filter(organization=self.org).values('pk')[:5]
+        ).update(status=DemandStatus.PAID, penalty_amount=Decimal('9.99'))
+
+        call_command('recompute_penalties', org=self.org.pk, as_of=self.AS_OF, stdout=StringIO())
+
+        self.assertEqual(RevenueDemand.objects.filter(penalty_amount=Decimal('9.99')).count(), 35)
+        self.assertEqual(RevenuePenaltyService.recompute(self.org, as_of_date=self.AS_OF), 0)
+        self.assertEqual(
+            RevenueDemand.objects.filter(organization=self.org, status__in=OPEN_STATUSES).count(), 5
+        )
@@ -0,0 +1,83 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Test cases for the single-query revenue-by-head and payer summaries
+-------------------------------------------------------------------------
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.test import TestCase
+
+from apps.core.testing import TmaTestDataMixin
+from apps.revenue.models import (
+    CollectionStatus, DemandStatus, Payer, RevenueCollection, RevenueDemand
+)
+from apps.revenue.reports import RevenueReports
+
+BILLED = [DemandStatus.POSTED, DemandStatus.PARTIAL, DemandStatus.PAID]
+
+
+class RevenueSummaryTest(TmaTestDataMixin, TestCase):
+    """Summaries run one query regardless of the number of heads or payers"""
+
+    demand_count = 25
+
+    def test_revenue_by_head_matches_per_head_totals(self):
+        with self.assertNumQueries(1):
+            summary = RevenueReports.revenue_by_head_summary(self.org, self.fiscal_year)
+
+        self.assertTrue(summary)
+        self.assertEqual(
+            sum(item['total_demanded'] for item in summary),
+            RevenueDemand.objects.filter(organization=self.org, status__in=BILLED)
+            .aggregate(total=Sum('amount'))['total']
+        )
+        self.assertEqual(
+            sum(item['total_collected'] for item in summary),
+            RevenueCollection.objects.filter(
+                demand__organization=self.org, demand__status__in=BILLED,
+                status=CollectionStatus.POSTED
+            ).aggregate(total=Sum('amount_received'))['total'] or Decimal('0.00')
+        )
+        for item in summary:
+            self.assertEqual(item['outstanding'], item['total_demanded'] - item['total_collected'])
+
+    def test_payer_summary_matches_source_rows(self):
+        for fiscal_year in (None, self.fiscal_year):
+            with self.assertNumQueries(1):
+                rows = list(RevenueReports.payer_wise_summary(self.org, fiscal_year=fiscal_year))
+
+            self.assertTrue(rows)
+            for row in rows:
+                payer = Payer.objects.get(pk=row['payer_id'])
+                demands = payer.demands.filter(status__in=BILLED)
+                collections = RevenueCollection.objects.filter(
+                    demand__payer=payer, status=CollectionStatus.POSTED
+                )
+                self.assertEqual(row['total_demanded'], demands.aggregate(total=Sum('amount'))['total'])
+                self.assertEqual(row['demand_count'], demands.count())
+                self.assertEqual(row['collection_count'], collections.count())
+                self.assertEqual(row['outstanding'], row['total_demanded'] - row['total_collected'])
+
+            outstanding = [row['outstanding'] for row in rows]
+            self.assertEqual(outstanding, sorted(outstanding, reverse=True))
+
+    def test_payer_summary_sorts_and_pages_in_database(self):
+        rows = RevenueReports.payer_wise_summary(self.org, sort='name')
+        names = [row['payer_name'] for row in rows]
+        self.assertEqual(names, sorted(names))
+
+        with self.assertNumQueries(1):
+            page = list(RevenueReports.payer_wise_summary(self.org, sort='name')[:3])
+        self.assertEqual([row['payer_name'] for row in page], names[:3])
+
+        # Unknown sort keys fall back to outstanding
+        fallback = list(RevenueReports.payer_wise_summary(self.org, sort='-cnic_ntn'))
+        self.assertEqual(
+            [row['outstanding'] for row in fallback],
+            sorted((row['outstanding'] for row in fallback), reverse=True)
+        )
@@ -29,6 +29,12 @@ urlpatterns = [
     path('demands/<int:pk>/post/', views.DemandPostView.as_view(), name='demand_post'),
     path('demands/<int:pk>/cancel/', views.DemandCancelView.as_view(), name='demand_cancel'),
     path('demands/<int:pk>/waive-penalty/', views.DemandWaivePenaltyView.as_view(), name='demand_waive_penalty'),
+    path('demands/<int:pk>/notice/', views.DemandNoticeView.as_view(), name='demand_notice'),
+    
+    # Demand notice batches
+    path('notices/', views.NoticeBatchCreateView.as_view(), name='notice_batch_create'),
+    path('notices/<int:pk>/', views.NoticeBatchDetailView.as_view(), name='notice_batch_detail'),
+    path('notices/<int:pk>/download/', views.NoticeBatchDownloadView.as_view(), name='notice_batch_download'),
     
     # Collections
     path('collections/', views.CollectionListView.as_view(), name='collection_list'),
@@ -49,6 +55,7 @@ urlpatterns = [
     path('reports/revenue-by-head/', views.RevenueByHeadReportView.as_view(), name='report_revenue_by_head'),
     path('reports/payer-wise-summary/', views.PayerWiseSummaryView.as_view(), name='report_payer_wise'),
     path('reports/collection-efficiency/', views.CollectionEfficiencyReportView.as_view(), name='report_collection_efficiency'),
+    path('reports/days-to-collect/', views.DaysToCollectComparisonView.as_view(), name='report_days_to_collect'),
     path('reports/overdue-demands/', views.OverdueDemandsReportView.as_view(), name='report_overdue_demands'),
     path('reports/demand-vs-collection/', views.DemandVsCollectionComparisonView.as_view(), name='report_demand_vs_collection'),
     
@@ -10,8 +10,9 @@ Description: Views for the Revenue module including Payer, Demand,
 """
 from typing import Any, Dict
 import json
-import csv
+import os
 from decimal import Decimal
+from datetime import date
 from django.views.generic import (
     ListView, CreateView, DetailView, UpdateView, TemplateView, View
 )
@@ -19,10 +20,12 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy, reverse
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
 from django.db import transaction
 from django.db.models import Sum, Count, Q, Max
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
 from django.views.decorators.csrf import csrf_protect
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -30,16 +33,21 @@ from django.utils import timezone
 from apps.users.permissions import MakerRequiredMixin, CashierRequiredMixin, CheckerRequiredMixin
 from apps.revenue.models import (
     Payer, RevenueDemand, RevenueCollection, 
-    DemandStatus, CollectionStatus
+    DemandStatus, CollectionStatus,
+    DemandNoticeBatch, NoticeBatchStatus, NoticeFormat
 )
 from apps.revenue.forms import (
     PayerForm, DemandForm, CollectionForm,
     DemandPostForm, CollectionPostForm, DemandCancelForm
 )
-from apps.revenue.reports import RevenueReports
+from apps.revenue.notices import DemandNoticeService
+from apps.revenue.reports import RevenueReports, PAYER_SUMMARY_SORTS
+from apps.revenue.services import next_challan_counter
 from apps.budgeting.models import FiscalYear, Department
 from apps.finance.models import BudgetHead, AccountType, FunctionCode
 from apps.core.exceptions import WorkflowTransitionException
+from apps.core.db_routers import ReportingDatabaseMixin
+from apps.core.exports import csv_response, xlsx_response
 
 
 class RevenueDashboardView(LoginRequiredMixin, TemplateView):
@@ -222,6 +230,28 @@ class PayerDetailView(LoginRequiredMixin, DetailView):
 # Demand Views
 # ============================================================================
 
+def filter_demands(queryset, params):
+    """Apply the demand list filters (status, fiscal year, search) from request parameters."""
+    # Filter by status
+    status = params.get('status')
+    if status and status in dict(DemandStatus.choices):
+        queryset = queryset.filter(status=status)
+    
+    # Filter by fiscal year
+    fy_id = params.get('fiscal_year')
+    if fy_id:
+        queryset = queryset.filter(fiscal_year_id=fy_id)
+    
+    # Search by challan no or payer name
+    search = params.get('search', '')
+    if search:
+        queryset = queryset.filter(
+            Q(challan_no__icontains=search) | Q(payer__name__icontains=search)
+        )
+    
+    return queryset
+
+
 class DemandListView(LoginRequiredMixin, ListView):
     """List view for revenue demands."""
     
@@ -252,24 +282,7 @@ class DemandListView(LoginRequiredMixin, ListView):
             'collections'
         ).order_by('-issue_date', '-created_at')
         
-        # Filter by status
-        status = self.request.GET.get('status')
-        if status and status in dict(DemandStatus.choices):
-            queryset = queryset.filter(status=status)
-        
-        # Filter by fiscal year
-        fy_id = self.request.GET.get('fiscal_year')
-        if fy_id:
-            queryset = queryset.filter(fiscal_year_id=fy_id)
-        
-        # Search by challan no or payer name
-        search = self.request.GET.get('search', '')
-        if search:
-            queryset = queryset.filter(
-                Q(challan_no__icontains=search) | Q(payer__name__icontains=search)
-            )
-        
-        return queryset
+        return filter_demands(queryset, self.request.GET)
     
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -341,23 +354,7 @@ class DemandCreateView(LoginRequiredMixin, MakerRequiredMixin, CreateView):
         # Generate challan number with transaction lock to prevent race conditions
         with transaction.atomic():
             fy = form.instance.fiscal_year
-            
-            # Get the max challan number for this fiscal year with lock
-            last_demand = RevenueDemand.objects.select_for_update().filter(
-                organization=org,
-                fiscal_year=fy
-            ).aggregate(Max('challan_no'))
-            
-            # Extract counter from last challan number
-            if last_demand['challan_no__max']:
-                # Parse CH-2025-26-0001 → get 0001 → increment
-                parts = last_demand['challan_no__max'].split('-')
-                try:
-                    counter = int(parts[-1]) + 1
-                except (ValueError, IndexError):
-                    counter = 1
-            else:
-                counter = 1
+            counter = next_challan_counter(org, fy)
             
             form.instance.challan_no = f"CH-{fy.year_name}-{counter:04d}"
             
@@ -411,6 +408,110 @@ class DemandDetailView(LoginRequiredMixin, DetailView):
         return context
 
 
+class DemandNoticeView(LoginRequiredMixin, View):
+    """Print the demand notice (challan) of one demand as PDF, or HTML without WeasyPrint."""
+    
+    def get(self, request: HttpRequest, pk: int) -> HttpResponse:
+        org = getattr(request.user, 'organization', None)
+        demand = get_object_or_404(
+            DemandNoticeService.notice_queryset().exclude(status=DemandStatus.CANCELLED),
+            pk=pk, organization=org
+        )
+        try:
+            pdf = DemandNoticeService.render_pdf(demand)
+        except (ImportError, OSError):
+            # WeasyPrint not installed or GTK libraries missing, return HTML for print
+            return HttpResponse(DemandNoticeService.render_html(demand))
+        
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = f'inline; filename="challan_{demand.challan_no}.pdf"'
+        return response
+
+
+class NoticeBatchCreateView(LoginRequiredMixin, TemplateView):
+    """
+    Queue the demand notices of a billing cycle for batch printing.
+    
+    Demands are selected with the demand list filters; without a status
+    filter only outstanding (posted and partially paid) demands are printed.
+    The batch is rendered in the background by `render_demand_notices`.
+    """
+    
+    template_name = 'revenue/notice_batch_form.html'
+    
+    def get_demands(self, params):
+        org = getattr(self.request.user, 'organization', None)
+        demands = filter_demands(RevenueDemand.objects.filter(organization=org), params)
+        if not params.get('status'):
+            demands = demands.filter(status__in=[DemandStatus.POSTED, DemandStatus.PARTIAL])
+        return demands.exclude(status=DemandStatus.CANCELLED)
+    
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        org = getattr(self.request.user, 'organization', None)
+        
+        context['status_choices'] = DemandStatus.choices
+        context['current_status'] = self.request.GET.get('status', '')
+        context['search_query'] = self.request.GET.get('search', '')
+        context['fiscal_years'] = FiscalYear.objects.all().order_by('-start_date')
+        context['format_choices'] = NoticeFormat.choices
+        context['demand_count'] = self.get_demands(self.request.GET).count()
+        context['recent_batches'] = DemandNoticeBatch.objects.filter(
+            organization=org
+        ).select_related('created_by')[:10]
+        return context
+    
+    def post(self, request: HttpRequest) -> HttpResponse:
+        org = getattr(request.user, 'organization', None)
+        if not org:
+            messages.error(request, _('No organization found for user.'))
+            return redirect('revenue:demand_list')
+        
+        output_format = request.POST.get('output_format', NoticeFormat.PDF)
+        if output_format not in dict(NoticeFormat.choices):
+            output_format = NoticeFormat.PDF
+        
+        demands = self.get_demands(request.POST)
+        if not demands.exists():
+            messages.error(request, _('No demands match the selected filters.'))
+            return redirect('revenue:notice_batch_create')
+        
+        batch = DemandNoticeService.queue(org, demands, output_format, request.user)
+        messages.success(
+            request,
+            _(f'{batch.total_count} notices queued for printing. '
+              f'The file will be available here when rendering completes.')
+        )
+        return redirect('revenue:notice_batch_detail', pk=batch.pk)
+
+
+class NoticeBatchDetailView(LoginRequiredMixin, DetailView):
+    """Progress and download of a demand notice batch."""
+    
+    model = DemandNoticeBatch
+    template_name = 'revenue/notice_batch_detail.html'
+    context_object_name = 'batch'
+    
+    def get_queryset(self):
+        org = getattr(self.request.user, 'organization', None)
+        return DemandNoticeBatch.objects.filter(organization=org).select_related('created_by')
+
+
+class NoticeBatchDownloadView(LoginRequiredMixin, View):
+    """Download the rendered file of a completed notice batch."""
+    
+    def get(self, request: HttpRequest, pk: int) -> FileResponse:
+        org = getattr(request.user, 'organization', None)
+        batch = get_object_or_404(
+            DemandNoticeBatch, pk=pk, organization=org, status=NoticeBatchStatus.COMPLETED
+        )
+        if not batch.file:
+            raise Http404(_('The batch has no file.'))
+        return FileResponse(
+            batch.file.open('rb'), as_attachment=True, filename=os.path.basename(batch.file.name)
+        )
+
+
 class DemandPostView(LoginRequiredMixin, CheckerRequiredMixin, View):
     """View for posting a demand to GL.
     
@@ -782,8 +883,8 @@ class DemandOutstandingAPIView(LoginRequiredMixin, View):
             demand = RevenueDemand.objects.get(pk=pk, organization=org)
             return JsonResponse({
                 'demand_amount': str(demand.amount),
-                'total_collected': str(demand.get_total_collected()),
-                'outstanding': str(demand.get_outstanding_balance()),
+                'total_collected': str(demand.collected_amount),
+                'outstanding': str(demand.outstanding_amount),
                 'payer_name': demand.payer.name,
                 'challan_no': demand.challan_no,
             })
@@ -921,132 +1022,64 @@ class DemandExportView(LoginRequiredMixin, View):
         else:
             return self._export_csv(demands, org)
     
-    def _export_csv(self, demands, organization) -> HttpResponse:
-        """Export demands to CSV format."""
+    HEADERS = [
+        'Challan No', 'Fiscal Year', 'Payer Name', 'CNIC/NTN',
+        'Revenue Head Code', 'Revenue Head Name', 'Issue Date', 'Due Date',
+        'Amount (Rs)', 'Total Collected (Rs)', 'Outstanding (Rs)',
+        'Status', 'Period Description', 'Posted Date', 'Posted By'
+    ]
+    
+    @staticmethod
+    def _rows(demands):
+        """Export rows read with values_list() in chunks from the database."""
+        status_labels = dict(DemandStatus.choices)
+        rows = demands.values_list(
+            'challan_no', 'fiscal_year__year_name', 'payer__name', 'payer__cnic_ntn',
+            'budget_head__nam_head__code', 'budget_head__nam_head__name',
+            'issue_date', 'due_date', 'amount', 'collected_amount', 'outstanding_amount',
+            'status', 'period_description', 'posted_at',
+            'posted_by__first_name', 'posted_by__last_name'
+        ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        
+        for (challan_no, year_name, payer_name, cnic_ntn, head_code, head_name,
+             issue_date, due_date, amount, collected, outstanding,
+             status, period_description, posted_at, first_name, last_name) in rows:
+            yield [
+                challan_no,
+                year_name,
+                payer_name,
+                cnic_ntn or '',
+                head_code,
+                head_name,
+                issue_date,
+                due_date,
+                float(amount),
+                float(collected),
+                float(outstanding),
+                str(status_labels.get(status, status)),
+                period_description or '',
+                posted_at.strftime('%Y-%m-%d %H:%M') if posted_at else '',
+                f"{first_name or ''} {last_name or ''}".strip()
+            ]
+    
+    def _export_csv(self, demands, organization) -> StreamingHttpResponse:
+        """Stream demands as CSV."""
         timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
         filename = f'revenue_demands_{organization.name}_{timestamp}.csv'
-        
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Add UTF-8 BOM for Excel compatibility
-        response.write('\ufeff')
-        
-        writer = csv.writer(response)
-        
-        # Header row
-        writer.writerow([
-            'Challan No',
-            'Fiscal Year',
-            'Payer Name',
-            'CNIC/NTN',
-            'Revenue Head Code',
-            'Revenue Head Name',
-            'Issue Date',
-            'Due Date',
-            'Amount (Rs)',
-            'Total Collected (Rs)',
-            'Outstanding (Rs)',
-            'Status',
-            'Period Description',
-            'Posted Date',
-            'Posted By'
-        ])
-        
-        # Data rows
-        for demand in demands:
-            writer.writerow([
-                demand.challan_no,
-                demand.fiscal_year.year_name,
-                demand.payer.name,
-                demand.payer.cnic_ntn or '',
-                demand.budget_head.nam_head.code,
-                demand.budget_head.nam_head.name,
-                demand.issue_date.strftime('%Y-%m-%d'),
-                demand.due_date.strftime('%Y-%m-%d'),
-                float(demand.amount),
-                float(demand.get_total_collected()),
-                float(demand.get_outstanding_balance()),
-                demand.get_status_display(),
-                demand.period_description or '',
-                demand.posted_at.strftime('%Y-%m-%d %H:%M') if demand.posted_at else '',
-                demand.posted_by.get_full_name() if demand.posted_by else ''
-            ])
-        
-        return response
+        return csv_response(filename, self.HEADERS, self._rows(demands))
     
     def _export_excel(self, demands, organization) -> HttpResponse:
-        """Export demands to Excel format."""
+        """Export demands to a write-only Excel workbook."""
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'revenue_demands_{organization.name}_{timestamp}.xlsx'
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from openpyxl.utils import get_column_letter
+            return xlsx_response(filename, 'Revenue Demands', self.HEADERS, self._rows(demands))
         except ImportError:
             messages.error(
                 self.request,
                 _('Excel export requires openpyxl. Please use CSV format.')
             )
             return redirect('revenue:demand_list')
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Revenue Demands"
-        
-        # Header row with formatting
-        headers = [
-            'Challan No', 'Fiscal Year', 'Payer Name', 'CNIC/NTN',
-            'Revenue Head Code', 'Revenue Head Name', 'Issue Date', 'Due Date',
-            'Amount (Rs)', 'Total Collected (Rs)', 'Outstanding (Rs)',
-            'Status', 'Period Description', 'Posted Date', 'Posted By'
-        ]
-        
-        header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-        header_font = Font(bold=True, color='FFFFFF')
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Data rows
-        for row_num, demand in enumerate(demands, 2):
-            ws.cell(row=row_num, column=1).value = demand.challan_no
-            ws.cell(row=row_num, column=2).value = demand.fiscal_year.year_name
-            ws.cell(row=row_num, column=3).value = demand.payer.name
-            ws.cell(row=row_num, column=4).value = demand.payer.cnic_ntn or ''
-            ws.cell(row=row_num, column=5).value = demand.budget_head.nam_head.code
-            ws.cell(row=row_num, column=6).value = demand.budget_head.nam_head.name
-            ws.cell(row=row_num, column=7).value = demand.issue_date
-            ws.cell(row=row_num, column=8).value = demand.due_date
-            ws.cell(row=row_num, column=9).value = float(demand.amount)
-            ws.cell(row=row_num, column=10).value = float(demand.get_total_collected())
-            ws.cell(row=row_num, column=11).value = float(demand.get_outstanding_balance())
-            ws.cell(row=row_num, column=12).value = demand.get_status_display()
-            ws.cell(row=row_num, column=13).value = demand.period_description or ''
-            ws.cell(row=row_num, column=14).value = (
-                demand.posted_at.strftime('%Y-%m-%d %H:%M') if demand.posted_at else ''
-            )
-            ws.cell(row=row_num, column=15).value = (
-                demand.posted_by.get_full_name() if demand.posted_by else ''
-            )
-        
-        # Auto-adjust column widths
-        for col_num in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col_num)].width = 15
-        
-        # Prepare response
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'revenue_demands_{organization.name}_{timestamp}.xlsx'
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        wb.save(response)
-        return response
 
 
 class CollectionExportView(LoginRequiredMixin, View):
@@ -1100,144 +1133,92 @@ class CollectionExportView(LoginRequiredMixin, View):
         else:
             return self._export_csv(collections, org)
     
-    def _export_csv(self, collections, organization) -> HttpResponse:
-        """Export collections to CSV format."""
+    HEADERS = [
+        'Receipt No', 'Receipt Date', 'Challan No', 'Payer Name',
+        'Revenue Head', 'Bank Account', 'Instrument Type', 'Instrument No',
+        'Amount Received (Rs)', 'Status', 'Posted Date', 'Posted By', 'Remarks'
+    ]
+    
+    @staticmethod
+    def _rows(collections):
+        """Export rows read with values_list() in chunks from the database."""
+        status_labels = dict(CollectionStatus.choices)
+        instrument_labels = dict(RevenueCollection._meta.get_field('instrument_type').flatchoices)
+        rows = collections.values_list(
+            'receipt_no', 'receipt_date', 'demand__challan_no', 'demand__payer__name',
+            'demand__budget_head__nam_head__name', 'bank_account__title',
+            'instrument_type', 'instrument_no', 'amount_received', 'status', 'posted_at',
+            'posted_by__first_name', 'posted_by__last_name', 'remarks'
+        ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+        
+        for (receipt_no, receipt_date, challan_no, payer_name, head_name, bank_account,
+             instrument_type, instrument_no, amount, status, posted_at,
+             first_name, last_name, remarks) in rows:
+            yield [
+                receipt_no,
+                receipt_date,
+                challan_no,
+                payer_name,
+                head_name,
+                bank_account,
+                str(instrument_labels.get(instrument_type, instrument_type)),
+                instrument_no or '',
+                float(amount),
+                str(status_labels.get(status, status)),
+                posted_at.strftime('%Y-%m-%d %H:%M') if posted_at else '',
+                f"{first_name or ''} {last_name or ''}".strip(),
+                remarks or ''
+            ]
+    
+    def _export_csv(self, collections, organization) -> StreamingHttpResponse:
+        """Stream collections as CSV."""
         timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
         filename = f'revenue_collections_{organization.name}_{timestamp}.csv'
-        
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Add UTF-8 BOM
-        response.write('\ufeff')
-        
-        writer = csv.writer(response)
-        
-        # Header row
-        writer.writerow([
-            'Receipt No',
-            'Receipt Date',
-            'Challan No',
-            'Payer Name',
-            'Revenue Head',
-            'Bank Account',
-            'Instrument Type',
-            'Instrument No',
-            'Amount Received (Rs)',
-            'Status',
-            'Posted Date',
-            'Posted By',
-            'Remarks'
-        ])
-        
-        # Data rows
-        for collection in collections:
-            writer.writerow([
-                collection.receipt_no,
-                collection.receipt_date.strftime('%Y-%m-%d'),
-                collection.demand.challan_no,
-                collection.demand.payer.name,
-                collection.demand.budget_head.nam_head.name,
-                collection.bank_account.title,
-                collection.get_instrument_type_display(),
-                collection.instrument_no or '',
-                float(collection.amount_received),
-                collection.get_status_display(),
-                collection.posted_at.strftime('%Y-%m-%d %H:%M') if collection.posted_at else '',
-                collection.posted_by.get_full_name() if collection.posted_by else '',
-                collection.remarks or ''
-            ])
-        
-        return response
+        return csv_response(filename, self.HEADERS, self._rows(collections))
     
     def _export_excel(self, collections, organization) -> HttpResponse:
-        """Export collections to Excel format."""
+        """Export collections to a write-only Excel workbook."""
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'revenue_collections_{organization.name}_{timestamp}.xlsx'
         try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-            from openpyxl.utils import get_column_letter
+            return xlsx_response(filename, 'Revenue Collections', self.HEADERS, self._rows(collections))
         except ImportError:
             messages.error(
                 self.request,
                 _('Excel export requires openpyxl. Please use CSV format.')
             )
             return redirect('revenue:collection_list')
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Revenue Collections"
-        
-        # Header row with formatting
-        headers = [
-            'Receipt No', 'Receipt Date', 'Challan No', 'Payer Name',
-            'Revenue Head', 'Bank Account', 'Instrument Type', 'Instrument No',
-            'Amount Received (Rs)', 'Status', 'Posted Date', 'Posted By', 'Remarks'
-        ]
-        
-        header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-        header_font = Font(bold=True, color='FFFFFF')
-        
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-        
-        # Data rows
-        for row_num, collection in enumerate(collections, 2):
-            ws.cell(row=row_num, column=1).value = collection.receipt_no
-            ws.cell(row=row_num, column=2).value = collection.receipt_date
-            ws.cell(row=row_num, column=3).value = collection.demand.challan_no
-            ws.cell(row=row_num, column=4).value = collection.demand.payer.name
-            ws.cell(row=row_num, column=5).value = collection.demand.budget_head.nam_head.name
-            ws.cell(row=row_num, column=6).value = collection.bank_account.title
-            ws.cell(row=row_num, column=7).value = collection.get_instrument_type_display()
-            ws.cell(row=row_num, column=8).value = collection.instrument_no or ''
-            ws.cell(row=row_num, column=9).value = float(collection.amount_received)
-            ws.cell(row=row_num, column=10).value = collection.get_status_display()
-            ws.cell(row=row_num, column=11).value = (
-                collection.posted_at.strftime('%Y-%m-%d %H:%M') if collection.posted_at else ''
-            )
-            ws.cell(row=row_num, column=12).value = (
-                collection.posted_by.get_full_name() if collection.posted_by else ''
-            )
-            ws.cell(row=row_num, column=13).value = collection.remarks or ''
-        
-        # Auto-adjust column widths
-        for col_num in range(1, len(headers) + 1):
-            ws.column_dimensions[get_column_letter(col_num)].width = 15
-        
-        # Prepare response
-        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'revenue_collections_{organization.name}_{timestamp}.xlsx'
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        wb.save(response)
-        return response
 
 
 # =============================================================================
 # REPORT VIEWS
 # =============================================================================
 
-class OutstandingReceivablesReportView(LoginRequiredMixin, TemplateView):
+class OutstandingReceivablesReportView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Aging analysis report for outstanding receivables.
     
-    Shows demands categorized by age: 0-30, 31-60, 61-90, 90+ days
+    Shows demands categorized by age: 0-30, 31-60, 61-90, 90+ days.
+    LCB users without an organization see all TMAs. Detail rows are
+    loaded for the expanded bucket only (?bucket=...&after=...).
     """
     template_name = 'revenue/reports/outstanding_receivables.html'
     
+    @staticmethod
+    def parse_cursor(value: str):
+        """Decode an 'issue_date:id' keyset cursor; None if missing or malformed."""
+        try:
+            issue_date, pk = value.split(':')
+            return date.fromisoformat(issue_date), int(pk)
+        except (AttributeError, ValueError):
+            return None
+    
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        org = getattr(self.request.user, 'organization', None)
+        user = self.request.user
+        org = getattr(user, 'organization', None)
         
-        if not org:
+        if not org and not user.is_oversight_user():
             return context
         
         # Get fiscal year from request or use current
@@ -1255,14 +1236,31 @@ class OutstandingReceivablesReportView(LoginRequiredMixin, TemplateView):
         
         context.update({
             'report_data': report_data,
+            'is_provincial': org is None,
             'fiscal_years': FiscalYear.objects.all().order_by('-start_date'),
             'selected_fiscal_year': fiscal_year
         })
         
+        bucket = self.request.GET.get('bucket')
+        if bucket in report_data['buckets']:
+            page = RevenueReports.aging_bucket_demands(
+                organization=org,
+                bucket=bucket,
+                as_of_date=report_data['as_of_date'],
+                fiscal_year=fiscal_year,
+                after=self.parse_cursor(self.request.GET.get('after'))
+            )
+            if page['next']:
+                page['next_cursor'] = f"{page['next'][0].isoformat()}:{page['next'][1]}"
+            context.update({
+                'expanded_bucket': report_data['buckets'][bucket],
+                'bucket_page': page,
+            })
+        
         return context
 
 
-class RevenueByHeadReportView(LoginRequiredMixin, TemplateView):
+class RevenueByHeadReportView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Revenue summary by budget head.
     
@@ -1312,13 +1310,15 @@ class RevenueByHeadReportView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class PayerWiseSummaryView(LoginRequiredMixin, TemplateView):
+class PayerWiseSummaryView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Payer-wise revenue summary.
     
-    Shows total demands, collections, and outstanding for each payer.
+    Shows total demands, collections, and outstanding for each payer,
+    sorted (?sort=) and paginated (?page=) in the database.
     """
     template_name = 'revenue/reports/payer_wise_summary.html'
+    paginate_by = 50
     
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -1333,14 +1333,23 @@ class PayerWiseSummaryView(LoginRequiredMixin, TemplateView):
         if fiscal_year_id:
             fiscal_year = FiscalYear.objects.filter(id=fiscal_year_id).first()
         
+        sort = self.request.GET.get('sort', '-outstanding')
+        if sort.lstrip('-') not in PAYER_SUMMARY_SORTS:
+            sort = '-outstanding'
+        
         # Generate report
         report_data = RevenueReports.payer_wise_summary(
             organization=org,
-            fiscal_year=fiscal_year
+            fiscal_year=fiscal_year,
+            sort=sort
         )
+        page_obj = Paginator(report_data, self.paginate_by).get_page(self.request.GET.get('page'))
         
         context.update({
-            'report_data': report_data,
+            'report_data': page_obj.object_list,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
+            'sort': sort,
             'fiscal_years': FiscalYear.objects.all().order_by('-start_date'),
             'selected_fiscal_year': fiscal_year
         })
@@ -1348,7 +1357,7 @@ class PayerWiseSummaryView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class CollectionEfficiencyReportView(LoginRequiredMixin, TemplateView):
+class CollectionEfficiencyReportView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Collection efficiency metrics report.
     
@@ -1388,7 +1397,39 @@ class CollectionEfficiencyReportView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class OverdueDemandsReportView(LoginRequiredMixin, TemplateView):
+class DaysToCollectComparisonView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
+    """
+    Provincial comparison of days to collect across TMAs.
+    
+    Available to oversight users (LCB/LGD/Admin without an organization).
+    """
+    template_name = 'revenue/reports/days_to_collect_comparison.html'
+    
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        
+        if not self.request.user.is_oversight_user():
+            return context
+        
+        # Get fiscal year from request or use current
+        fiscal_year_id = self.request.GET.get('fiscal_year')
+        if fiscal_year_id:
+            fiscal_year = FiscalYear.objects.filter(id=fiscal_year_id).first()
+        else:
+            fiscal_year = FiscalYear.get_current_operating_year()
+        
+        context.update({
+            'fiscal_years': FiscalYear.objects.all().order_by('-start_date'),
+            'selected_fiscal_year': fiscal_year
+        })
+        
+        if fiscal_year:
+            context['rows'] = RevenueReports.days_to_collect_by_tma(fiscal_year)
+        
+        return context
+
+
+class OverdueDemandsReportView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Overdue demands report.
     
@@ -1413,7 +1454,7 @@ class OverdueDemandsReportView(LoginRequiredMixin, TemplateView):
         return context
 
 
-class DemandVsCollectionComparisonView(LoginRequiredMixin, TemplateView):
+class DemandVsCollectionComparisonView(LoginRequiredMixin, ReportingDatabaseMixin, TemplateView):
     """
     Demand vs Collection comparison report.
     
@@ -0,0 +1,45 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Middleware caching the authenticated user's role codes in
+             the session, versioned by CustomUser.roles_version.
+-------------------------------------------------------------------------
+"""
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+
+
+SESSION_KEY = '_role_codes'
+
+
+class RoleCacheMiddleware:
+    """
+    Answer role checks of request.user without querying the roles table.
+    
+    The role codes are stored in the session together with the user id
+    and roles_version. While both match, request.user is primed from the
+    session; otherwise the codes are loaded once and stored again. Role
+    assignments bump roles_version (see apps.users.signals), which
+    invalidates every session of the affected users.
+    
+    Usage:
+        Add to MIDDLEWARE after SessionMiddleware and AuthenticationMiddleware.
+    """
+    
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+    
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and hasattr(request, 'session'):
+            cached = request.session.get(SESSION_KEY)
+            if cached and cached[0] == user.pk and cached[1] == user.roles_version:
+                user.set_role_codes(cached[2])
+            else:
+                request.session[SESSION_KEY] = [user.pk, user.roles_version, sorted(user.role_codes)]
+        
+        return self.get_response(request)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_migrate_department_to_fk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='roles_version',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Incremented when roles are assigned or removed.', verbose_name='Roles Version'),
+        ),
+    ]
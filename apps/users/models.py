@@ -284,6 +284,15 @@ class CustomUser(AbstractUser):
         help_text=_('Roles assigned to this user.')
     )
     
+    # Bumped whenever the user's roles change; invalidates role codes
+    # cached in the session (see apps.users.middleware.RoleCacheMiddleware)
+    roles_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Roles Version'),
+        help_text=_('Incremented when roles are assigned or removed.')
+    )
+    
     # Multi-tenancy: Link user to their organization
     # NULL for LCB/LGD users who have oversight across all organizations
     organization = models.ForeignKey(
@@ -367,6 +376,29 @@ class CustomUser(AbstractUser):
             return dict(UserRole.choices).get(self.role, self.role)
         return 'No Role'
     
+    @property
+    def role_codes(self) -> frozenset:
+        """
+        Codes of the user's roles, loaded once per user instance.
+        
+        request.user is a fresh instance per request, so this is a
+        per-request cache; RoleCacheMiddleware fills it from the session
+        while roles_version is unchanged.
+        """
+        codes = getattr(self, '_role_codes', None)
+        if codes is None:
+            codes = frozenset(self.roles.values_list('code', flat=True)) if self.pk else frozenset()
+            self._role_codes = codes
+        return codes
+    
+    def set_role_codes(self, codes) -> None:
+        """Prime the role-code cache (e.g. from the session)."""
+        self._role_codes = frozenset(codes)
+    
+    def clear_role_codes(self) -> None:
+        """Drop the role-code cache so the next check reloads it."""
+        self._role_codes = None
+    
     def has_role(self, role_code: str) -> bool:
         """
         Check if user has a specific role by code.
@@ -377,7 +409,7 @@ class CustomUser(AbstractUser):
         Returns:
             True if user has the role, False otherwise.
         """
-        return self.roles.filter(code=role_code).exists()
+        return role_code in self.role_codes
     
     def has_any_role(self, role_codes: List[str]) -> bool:
         """
@@ -391,11 +423,11 @@ class CustomUser(AbstractUser):
         """
         if self.is_superuser:
             return True
-        return self.roles.filter(code__in=role_codes).exists()
+        return not self.role_codes.isdisjoint(role_codes)
     
     def get_role_codes(self) -> List[str]:
         """Return list of role codes assigned to this user."""
-        return list(self.roles.values_list('code', flat=True))
+        return sorted(self.role_codes)
     
     # Role-checking methods for RBAC (updated to use new roles M2M)
     def is_maker(self) -> bool:
@@ -1,7 +1,11 @@
 from django.contrib.auth.signals import user_login_failed
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
 import logging
 
+from apps.users.models import CustomUser, Role
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,3 +31,35 @@ def log_failed_login(sender, credentials, request, **kwargs):
         ip,
         getattr(request, 'path', None)
     )
+
+
+
+def bump_roles_version(user_ids) -> None:
+    """Invalidate the cached role codes of the given users."""
+    CustomUser.objects.filter(pk__in=list(user_ids)).update(roles_version=F('roles_version') + 1)
+
+
+@receiver(m2m_changed, sender=CustomUser.roles.through)
+def user_roles_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Assigning or removing roles, from either side, bumps the users' roles_version."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        # user.roles.add()/remove()/clear(): instance is the user
+        bump_roles_version([instance.pk])
+        instance.roles_version += 1
+        instance.clear_role_codes()
+    elif action == 'pre_clear':
+        bump_roles_version(instance.users.values_list('pk', flat=True))
+    else:
+        # role.users.add()/remove(): pk_set holds the user ids
+        bump_roles_version(pk_set or [])
+
+
+@receiver(post_save, sender=Role)
+@receiver(pre_delete, sender=Role)
+def role_changed(sender, instance, created=False, **kwargs):
+    """A recoded or deleted role changes the role codes of its holders."""
+    if not created:
+        bump_roles_version(instance.users.values_list('pk', flat=True))
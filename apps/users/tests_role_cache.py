@@ -0,0 +1,72 @@
+"""
+-------------------------------------------------------------------------
+System: KP-CFMS (Computerized Financial Management System)
+Client: Local Government Department, Khyber Pakhtunkhwa
+Team Lead: Jamil Shah
+Developers: Ali Asghar, Akhtar Munir and Zarif Khan
+Description: Tests for the per-request and session role-code cache.
+-------------------------------------------------------------------------
+"""
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from apps.users.middleware import SESSION_KEY, RoleCacheMiddleware
+from apps.users.models import CustomUser, Role, RoleCode
+
+
+class RoleCacheTests(TestCase):
+    """Role checks are answered from memory and invalidated by version."""
+
+    def setUp(self):
+        self.tmo = Role.objects.create(name='TMO', code=RoleCode.TMO)
+        self.accountant = Role.objects.create(name='Accountant', code=RoleCode.ACCOUNTANT)
+        self.user = CustomUser.objects.create_user(
+            cnic='99999-9999999-1', email='roles@example.com', password='pass', first_name='Role'
+        )
+        self.user.roles.add(self.tmo)
+
+    def _fresh_user(self):
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_role_checks_use_one_query_per_instance(self):
+        user = self._fresh_user()
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_approver())
+            self.assertTrue(user.has_role(RoleCode.TMO))
+            self.assertFalse(user.is_checker())
+            self.assertFalse(user.has_any_role([RoleCode.ACCOUNTANT, RoleCode.CASHIER]))
+            self.assertEqual(user.get_role_codes(), [RoleCode.TMO])
+
+    def test_role_changes_bump_version_and_refresh_instance(self):
+        user = self._fresh_user()
+        version = user.roles_version
+        self.assertFalse(user.is_checker())
+
+        user.roles.add(self.accountant)
+        self.assertTrue(user.is_checker())
+        self.assertEqual(self._fresh_user().roles_version, version + 1)
+
+        self.accountant.users.remove(user)
+        self.assertEqual(self._fresh_user().roles_version, version + 2)
+        self.assertFalse(self._fresh_user().is_checker())
+
+    def _request(self, session):
+        request = RequestFactory().get('/')
+        request.user = self._fresh_user()
+        request.session = session
+        RoleCacheMiddleware(lambda request: HttpResponse())(request)
+        return request
+
+    def test_middleware_primes_user_from_session_until_version_changes(self):
+        session = {}
+        self._request(session)
+        self.assertEqual(session[SESSION_KEY][2], [RoleCode.TMO])
+
+        request = self._request(session)
+        with self.assertNumQueries(0):
+            self.assertTrue(request.user.is_approver())
+
+        self.user.roles.add(self.accountant)
+        request = self._request(session)
+        self.assertTrue(request.user.is_checker())
+        self.assertEqual(sorted(session[SESSION_KEY][2]), sorted([RoleCode.TMO, RoleCode.ACCOUNTANT]))
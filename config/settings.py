@@ -62,11 +62,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.instrumentation.RequestInstrumentationMiddleware',  # Per-request query/latency profiling
     # 'apps.core.middleware_script_name.ScriptNameMiddleware',  # Handle X-Script-Name for subpath deployment
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'apps.core.db_routers.ReadYourWritesMiddleware',  # Replica read-your-writes window
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.users.middleware.RoleCacheMiddleware',  # Session-cached role codes
     'apps.core.middleware.TenantMiddleware',  # Multi-tenancy enforcement
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -222,6 +225,108 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
 # Database Connection Pooling (10 minutes)
 DATABASES['default']['CONN_MAX_AGE'] = 600
 
+# Set when connections go through a transaction-mode pooler (PgBouncer):
+# the RLS organization variable is then set per transaction (SET LOCAL)
+# instead of once per persistent connection, and TenantMiddleware runs
+# each request in a transaction so its queries see it.
+DATABASE_TRANSACTION_POOLING = env.bool('DATABASE_TRANSACTION_POOLING', default=False)
+# Server-side cursors (queryset.iterator() in streamed exports) do not
+# survive a transaction-mode pooler outside a transaction.
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = DATABASE_TRANSACTION_POOLING
+
+# Reporting Read Replica (optional)
+# Heavy reports and dashboards read from this streaming replica when
+# REPORTING_DB_HOST is set; otherwise everything uses the primary.
+if env('REPORTING_DB_HOST', default=''):
+    DATABASES['reporting'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env('REPORTING_DB_NAME', default=env('DB_NAME')),
+        'USER': env('REPORTING_DB_USER', default=env('DB_USER')),
+        'PASSWORD': env('REPORTING_DB_PASSWORD', default=env('DB_PASSWORD')),
+        'HOST': env('REPORTING_DB_HOST'),
+        'PORT': env('REPORTING_DB_PORT', default=env('DB_PORT')),
+        'CONN_MAX_AGE': 600,
+        # Tests run the replica alias against the primary's test database
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['apps.core.db_routers.ReportingRouter']
+
+# Fall back to the primary when the replica is further behind than this
+REPORTING_DB_MAX_LAG_SECONDS = env.int('REPORTING_DB_MAX_LAG_SECONDS', default=30)
+# How often (per process) to re-check replica lag
+REPORTING_DB_LAG_CHECK_SECONDS = 10
+# Sessions read from the primary for this long after any write request
+REPORTING_DB_READ_YOUR_WRITES_SECONDS = 60
+
+# Request Instrumentation
+# Per-view query budgets (view name -> max queries per request). Requests
+# over budget are logged as warnings by RequestInstrumentationMiddleware.
+REQUEST_INSTRUMENTATION_ENABLED = env.bool('REQUEST_INSTRUMENTATION_ENABLED', default=True)
+QUERY_BUDGETS = {
+    '*': 150,
+    'dashboard:index': 60,
+    'dashboard:provincial': 60,
+    'dashboard:workspace_finance': 30,
+    'dashboard:workspace_audit': 30,
+    'dashboard:workspace_revenue': 30,
+    'dashboard:workspace_pao': 30,
+    'reporting:trial_balance': 25,
+    'reporting:general_ledger': 25,
+}
+
+# Metrics (Prometheus text format at /metrics/, superusers only)
+# Set METRICS_MULTIPROC_DIR to a directory shared by the gunicorn workers so
+# the endpoint reports totals across all of them; empty it on service start.
+METRICS_MULTIPROC_DIR = env('METRICS_MULTIPROC_DIR', default='')
+METRICS_FLUSH_INTERVAL = 5
+
+# Dashboard widgets
+# Threads computing the panels of a full server-side dashboard page
+# (?render=full); 1 computes them serially in the request thread.
+DASHBOARD_WIDGET_WORKERS = env.int('DASHBOARD_WIDGET_WORKERS', default=4)
+
+# Seconds a per-organization role workspace snapshot is cached; bill,
+# payment, demand and collection changes invalidate it earlier.
+WORKSPACE_SNAPSHOT_TIMEOUT = env.int('WORKSPACE_SNAPSHOT_TIMEOUT', default=60)
+
+# Seconds the sidebar/notification badge counters stay cached. Posting
+# events adjust them in place; with a per-process cache (LocMemCache) this
+# bounds how long other workers show a stale count. Run
+# `recompute_counters` nightly to correct drift.
+COUNTER_CACHE_TIMEOUT = env.int('COUNTER_CACHE_TIMEOUT', default=300)
+
+# Seconds the fiscal calendar (the list of fiscal years) stays cached.
+# FiscalYear saves and the admin window actions invalidate it, but only in
+# the worker that made the change, so other workers may show old planning
+# windows for this long. Budget edit checks always read the database.
+FISCAL_CALENDAR_TIMEOUT = env.int('FISCAL_CALENDAR_TIMEOUT', default=300)
+
+# Notification fan-out: rows per bulk insert, and the number of distinct
+# notifications per run above which recipients get one digest instead.
+NOTIFICATION_BATCH_SIZE = env.int('NOTIFICATION_BATCH_SIZE', default=500)
+NOTIFICATION_DIGEST_THRESHOLD = env.int('NOTIFICATION_DIGEST_THRESHOLD', default=5)
+
+# Email outbox: emails are queued in the database and delivered by
+# `dispatch_emails`. A failed email is retried after RETRY_DELAY seconds,
+# doubling per attempt, and marked FAILED after MAX_ATTEMPTS.
+EMAIL_OUTBOX_BATCH_SIZE = env.int('EMAIL_OUTBOX_BATCH_SIZE', default=100)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env.int('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5)
+EMAIL_OUTBOX_RETRY_DELAY = env.int('EMAIL_OUTBOX_RETRY_DELAY', default=60)
+
+# Streamed exports: rows fetched per database round trip, and the size
+# above which a generated Excel file is spooled to disk.
+EXPORT_CHUNK_SIZE = env.int('EXPORT_CHUNK_SIZE', default=2000)
+EXPORT_SPOOL_MAX_SIZE = env.int('EXPORT_SPOOL_MAX_SIZE', default=5 * 1024 * 1024)
+
+# Demand notice batches: notices per merged PDF part / worker task, and
+# the number of rendering processes (0 renders in the command's process).
+NOTICE_BATCH_CHUNK_SIZE = env.int('NOTICE_BATCH_CHUNK_SIZE', default=250)
+NOTICE_RENDER_WORKERS = env.int('NOTICE_RENDER_WORKERS', default=4)
+# Seconds a RUNNING batch may go without progress (one chunk rendered)
+# before another command takes it over, e.g. after the renderer was killed.
+NOTICE_BATCH_STALE_SECONDS = env.int('NOTICE_BATCH_STALE_SECONDS', default=1800)
+
 # Voucher Reversal Configuration
 VOUCHER_REVERSAL_CUTOFF_DAYS = 30
 
@@ -263,6 +368,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        # One JSON line per request; kept out of the console
+        'apps.core.instrumentation': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -22,6 +22,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from apps.users.forms import CNICAuthenticationForm
 from apps.dashboard.views import EBaldiaDashboardView
+from apps.core.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -39,6 +40,7 @@ urlpatterns = [
     path('reports/', include('apps.reporting.urls')),
     path('property/', include('apps.property.urls')),
     path('system-admin/', include('apps.system_admin.urls')),
+    path('metrics/', metrics_view, name='metrics'),
     path('', EBaldiaDashboardView.as_view(), name='home'),
 ]
 